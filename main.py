@@ -1,10 +1,18 @@
-from src.network.socket_handler import SocketHandler
-from src.network.version_exchange import VersionExchanger
-from src.utils.logger import Logger
+import argparse
+import getpass
+import sys
+import threading
 from src.config.config import Config
 
+# 하위 명령에 필요한 모듈 (cryptography, opentelemetry 등) 은 그 명령을 실행할 때
+# 가져옴: cron 처럼 한 번 실행하고 끝나는 호출의 시작 시간을 줄이기 위함
+
 
 def main():
+    from src.network.socket_handler import SocketHandler
+    from src.network.version_exchange import VersionExchanger
+    from src.utils.logger import Logger
+
     logger = Logger.get_logger(__name__)
     handler = SocketHandler()
     version = VersionExchanger(Config.SSH_CLIENT_VERSION)
@@ -39,5 +47,236 @@ def main():
         handler.close()
 
 
+def parse_hosts(args):
+    """Host names from --hosts and --hosts-file; "host:port" selects a port."""
+    entries = []
+    if args.hosts:
+        entries += args.hosts.split(",")
+    if args.hosts_file:
+        with open(args.hosts_file) as hosts_file:
+            entries += [line.split("#")[0] for line in hosts_file]
+    for entry in entries:
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.rpartition(":") if ":" in entry else (entry, "", "")
+        yield (host, int(port)) if port else host
+
+
+def inventory_hosts(args):
+    """HostConfig for each inventory host; --hosts entries act as Host patterns."""
+    from src.config.inventory import Inventory
+
+    inventory = Inventory.load(args.inventory)
+    patterns = [e if isinstance(e, str) else e[0] for e in parse_hosts(args)]
+    return [inventory.lookup(alias) for alias in inventory.hosts(patterns or None)]
+
+
+def inventory_connection_factory(hosts):
+    """
+    Connect with each host's identity files and secrets. Every secret the
+    selected hosts refer to is fetched in one batch before the fan-out.
+    """
+    from src.auth.auth_manager import AuthManager
+    from src.config.secrets import SecretCache, create_secret_backend
+    from src.network.transport import Transport
+
+    secrets = SecretCache(create_secret_backend())
+    secrets.prefetch([ref for host in hosts for ref in host.secret_references])
+    by_address = {(host.hostname, host.port): host for host in hosts}
+
+    def factory(hostname, port, username, timeout):
+        host = by_address[(hostname, port)]
+        password = host.get("passwordsecret")
+        passphrase = host.get("passphrasesecret")
+        auth_manager = AuthManager(
+            identity_files=host.identity_files or None,
+            password=password and (lambda: secrets.get(password)),
+            passphrase=passphrase and (lambda path: secrets.get(passphrase)),
+        )
+        transport = Transport(hostname, port, username, auth_manager=auth_manager)
+        return transport.connect(timeout=timeout)
+
+    return factory
+
+
+def run_exec(args):
+    from src.session.executor import (
+        DEFAULT_CONCURRENCY,
+        DEFAULT_TIMEOUT,
+        ExecutionSummary,
+        ParallelExecutor,
+    )
+
+    targets = parse_hosts(args)
+    connection_factory = None
+    if args.inventory:
+        hosts = inventory_hosts(args)
+        targets = [(h.hostname, h.port, args.user or h.user) for h in hosts]
+        connection_factory = inventory_connection_factory(hosts)
+    executor = ParallelExecutor(
+        concurrency=args.concurrency or DEFAULT_CONCURRENCY,
+        timeout=args.timeout or DEFAULT_TIMEOUT,
+        connection_factory=connection_factory,
+    )
+    summary = ExecutionSummary()
+    for result in executor.run(targets, args.command, args.user, args.port):
+        summary.add(result)
+        status = result.error or f"exit {result.exit_status}"
+        print(f"[{result.host}:{result.port}] {status} ({result.duration:.2f}s)")
+        for stream, data in ((sys.stdout, result.stdout), (sys.stderr, result.stderr)):
+            for line in data.decode(errors="replace").splitlines():
+                print(f"[{result.host}] {line}", file=stream)
+        sys.stdout.flush()
+
+    stats = summary.as_dict()
+    if stats["total"]:
+        print(
+            f"{stats['succeeded']}/{stats['total']} succeeded, {stats['failed']} failed; "
+            f"latency p50={stats['p50']:.2f}s p90={stats['p90']:.2f}s "
+            f"p99={stats['p99']:.2f}s max={stats['max']:.2f}s"
+        )
+    return 1 if stats["failed"] else 0
+
+
+def run_shell(args):
+    from src.shell.shell_manager import DEFAULT_TERM, ShellManager
+
+    manager = ShellManager()
+    try:
+        user = args.user or getpass.getuser()
+        shell = manager.open_shell(
+            args.host,
+            args.port,
+            user,
+            term=args.term or DEFAULT_TERM,
+            record=args.record,
+        )
+        status = shell.interact()
+    finally:
+        manager.close()
+    return status or 0
+
+
+def run_forward(args):
+    from src.session.connection_pool import ConnectionPool
+    from src.session.port_forwarding import PortForwarder, parse_forward_spec
+
+    local = [parse_forward_spec(spec) for spec in args.local]
+    remote = [parse_forward_spec(spec) for spec in args.remote]
+    pool = ConnectionPool()
+    lease = pool.acquire(args.host, args.port, args.user or getpass.getuser())
+    forwarder = PortForwarder(lease.transport)
+    try:
+        for bind_address, port, host, host_port in local:
+            bound = forwarder.forward_local(
+                port, host, host_port, bind_address or "127.0.0.1"
+            )
+            print(f"Forwarding local port {bound} to {host}:{host_port}")
+        for bind_address, port, host, host_port in remote:
+            bound = forwarder.forward_remote(port, host, host_port, bind_address)
+            print(f"Forwarding remote port {bound} to {host}:{host_port}")
+        sys.stdout.flush()
+        # Ctrl-C 까지 중계
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        forwarder.close()
+        lease.release(discard=True)
+        pool.close()
+    return 0
+
+
+def run_replay(args):
+    from src.session.recording import RecordingReader
+
+    with RecordingReader(args.recording) as recording:
+        if args.search:
+            for when in recording.search(args.search.encode()):
+                print(f"{when:10.3f}s")
+        elif args.at is not None:
+            print("\n".join(recording.screen_at(args.at).display).rstrip())
+        else:
+            output = sys.stdout.buffer
+
+            def write(data):
+                output.write(data)
+                output.flush()
+
+            recording.replay(write, start=args.start, speed=args.speed)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Python SSH client")
+    subparsers = parser.add_subparsers(dest="mode")
+
+    exec_parser = subparsers.add_parser("exec", help="run a command on many hosts")
+    exec_parser.add_argument("command")
+    exec_parser.add_argument("--hosts", help="comma separated host[:port] list")
+    exec_parser.add_argument("--hosts-file", help="file with one host[:port] per line")
+    exec_parser.add_argument(
+        "--inventory",
+        default=Config.INVENTORY_PATH,
+        help="ssh_config style inventory; --hosts then selects Host patterns",
+    )
+    exec_parser.add_argument("--user", "-l")
+    exec_parser.add_argument("--port", "-p", type=int, default=22)
+    exec_parser.add_argument(
+        "--concurrency", "-c", type=int, help="parallel hosts (default 32)"
+    )
+    exec_parser.add_argument(
+        "--timeout", "-t", type=float, help="seconds per host (default 60)"
+    )
+
+    shell_parser = subparsers.add_parser("shell", help="interactive shell on one host")
+    shell_parser.add_argument("host")
+    shell_parser.add_argument("--user", "-l")
+    shell_parser.add_argument("--port", "-p", type=int, default=22)
+    shell_parser.add_argument(
+        "--term", help="TERM for the remote PTY (default xterm-256color)"
+    )
+    shell_parser.add_argument("--record", help="record the session to this file")
+
+    forward_parser = subparsers.add_parser("forward", help="TCP port forwarding")
+    forward_parser.add_argument("host")
+    forward_parser.add_argument("--user", "-l")
+    forward_parser.add_argument("--port", "-p", type=int, default=22)
+    forward_parser.add_argument(
+        "-L",
+        dest="local",
+        action="append",
+        default=[],
+        metavar="[BIND:]PORT:HOST:HOSTPORT",
+        help="forward a local port to HOST:HOSTPORT via the server",
+    )
+    forward_parser.add_argument(
+        "-R",
+        dest="remote",
+        action="append",
+        default=[],
+        metavar="[BIND:]PORT:HOST:HOSTPORT",
+        help="forward a server port back to HOST:HOSTPORT here",
+    )
+
+    replay_parser = subparsers.add_parser("replay", help="play back a recorded session")
+    replay_parser.add_argument("recording")
+    replay_parser.add_argument("--start", type=float, default=0.0, help="seconds in")
+    replay_parser.add_argument("--speed", type=float, default=1.0)
+    replay_parser.add_argument("--at", type=float, help="print the screen at this time")
+    replay_parser.add_argument("--search", help="print the times this text appeared")
+    return parser
+
+
 if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    if arguments.mode == "exec":
+        sys.exit(run_exec(arguments))
+    if arguments.mode == "shell":
+        sys.exit(run_shell(arguments))
+    if arguments.mode == "forward":
+        sys.exit(run_forward(arguments))
+    if arguments.mode == "replay":
+        sys.exit(run_replay(arguments))
     main()
@@ -0,0 +1,99 @@
+# src/auth/agent.py
+# ssh-agent 프로토콜 클라이언트 (draft-miller-ssh-agent): 키 목록 조회와 서명 요청
+
+import os
+import socket
+import struct
+import threading
+from src.network.message import MessageReader, pack_byte, pack_string, pack_uint32
+
+SSH_AGENT_FAILURE = 5
+SSH2_AGENTC_REQUEST_IDENTITIES = 11
+SSH2_AGENT_IDENTITIES_ANSWER = 12
+SSH2_AGENTC_SIGN_REQUEST = 13
+SSH2_AGENT_SIGN_RESPONSE = 14
+
+# RSA 키로 SHA-2 서명을 요청하는 플래그
+SIGN_FLAGS = {"rsa-sha2-256": 2, "rsa-sha2-512": 4}
+MAX_AGENT_REPLY = 256 * 1024
+
+
+class AgentError(ConnectionError):
+    pass
+
+
+class AgentClient:
+    """
+    Client for the ssh-agent on ``SSH_AUTH_SOCK``.
+
+    The socket is opened on first use and kept for later requests; one
+    request is in flight at a time.
+    """
+
+    def __init__(self, path=None, timeout=10.0):
+        self.path = path or os.environ.get("SSH_AUTH_SOCK")
+        self.timeout = timeout
+        self._socket = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return bool(self.path) and os.path.exists(self.path)
+
+    def identities(self):
+        """List of (public key blob, comment) the agent holds."""
+        reader = self._request(pack_byte(SSH2_AGENTC_REQUEST_IDENTITIES))
+        if reader.read_byte() != SSH2_AGENT_IDENTITIES_ANSWER:
+            raise AgentError("Agent refused to list identities")
+        return [
+            (reader.read_string(), reader.read_text())
+            for _ in range(reader.read_uint32())
+        ]
+
+    def sign(self, key_blob, data, algorithm):
+        """SSH signature blob over ``data`` made by the agent with ``key_blob``."""
+        reader = self._request(
+            pack_byte(SSH2_AGENTC_SIGN_REQUEST)
+            + pack_string(key_blob)
+            + pack_string(data)
+            + pack_uint32(SIGN_FLAGS.get(algorithm, 0))
+        )
+        if reader.read_byte() != SSH2_AGENT_SIGN_RESPONSE:
+            raise AgentError("Agent refused to sign")
+        return reader.read_string()
+
+    def close(self):
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def _request(self, message):
+        with self._lock:
+            try:
+                if self._socket is None:
+                    self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self._socket.settimeout(self.timeout)
+                    self._socket.connect(self.path)
+                self._socket.sendall(pack_string(message))
+                length = struct.unpack(">I", self._receive(4))[0]
+                if length > MAX_AGENT_REPLY:
+                    raise AgentError(f"Agent reply too large: {length}")
+                return MessageReader(self._receive(length))
+            except OSError as e:
+                # 응답이 어긋난 소켓은 재사용하지 않음
+                if self._socket is not None:
+                    self._socket.close()
+                    self._socket = None
+                if isinstance(e, AgentError):
+                    raise
+                raise AgentError(f"ssh-agent request failed: {e}") from e
+
+    def _receive(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._socket.recv(size - len(data))
+            if not chunk:
+                raise AgentError("ssh-agent closed the connection")
+            data += chunk
+        return bytes(data)
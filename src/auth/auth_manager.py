@@ -1,11 +1,258 @@
+import os
+import threading
+from src.auth.agent import AgentClient, AgentError
+from src.auth.key_cache import key_cache as shared_key_cache
+from src.crypto.host_keys import fingerprint, key_type_of, sign
+from src.network.message import (
+    MessageReader,
+    SSH_MSG_EXT_INFO,
+    SSH_MSG_KEXINIT,
+    SSH_MSG_SERVICE_ACCEPT,
+    SSH_MSG_SERVICE_REQUEST,
+    SSH_MSG_USERAUTH_BANNER,
+    SSH_MSG_USERAUTH_FAILURE,
+    SSH_MSG_USERAUTH_PASSWD_CHANGEREQ,
+    SSH_MSG_USERAUTH_REQUEST,
+    SSH_MSG_USERAUTH_SUCCESS,
+    pack_boolean,
+    pack_byte,
+    pack_string,
+)
+from src.utils import telemetry
 from src.utils.logger import Logger
 
+DEFAULT_IDENTITY_FILES = ("~/.ssh/id_ed25519", "~/.ssh/id_ecdsa", "~/.ssh/id_rsa")
+# 공개키 타입 -> 인증 서명 알고리즘
+SIGNATURE_ALGORITHMS = {
+    "ssh-ed25519": "ssh-ed25519",
+    "ecdsa-sha2-nistp256": "ecdsa-sha2-nistp256",
+    "ssh-rsa": "rsa-sha2-256",
+}
+
+
+class AuthenticationError(ConnectionError):
+    pass
+
+
+class Credential:
+    """One thing to try: a public key (agent or file) or a password."""
+
+    def __init__(self, method, identity, blob=None, signer=None, password=None):
+        self.method = method
+        self.identity = identity
+        self.blob = blob
+        self.signer = signer
+        self.password = password
+
+    def __repr__(self):
+        return f"Credential({self.method}, {self.identity})"
+
 
 class AuthManager:
-    def __init__(self):
+    """
+    ssh-userauth client (RFC 4252): publickey and password.
+
+    Keys come from the ssh-agent first, then ``identity_files`` (their .pub
+    files are read so a key is only decrypted when it is actually used,
+    through the shared KeyCache). ``password`` and ``passphrase`` may be
+    strings or callables, so secrets are fetched only when needed.
+
+    Which credential worked is remembered per (host, port, user) and
+    counted across hosts; later attempts try the remembered one first, then
+    the one that worked most often, so a fleet usually authenticates in a
+    single round trip.
+    """
+
+    _history_lock = threading.Lock()
+    _last_success = {}
+    _success_counts = {}
+
+    def __init__(
+        self,
+        identity_files=None,
+        password=None,
+        passphrase=None,
+        agent=None,
+        use_agent=True,
+        key_cache=None,
+    ):
         self.logger = Logger.get_logger(__name__)
+        self.identity_files = list(
+            DEFAULT_IDENTITY_FILES if identity_files is None else identity_files
+        )
+        self.password = password
+        self.passphrase = passphrase
+        self.agent = agent if agent is not None or not use_agent else AgentClient()
+        self.key_cache = key_cache or shared_key_cache
+
+    def credentials(self):
+        """Credentials in default order: agent keys, key files, password."""
+        credentials = []
+        seen = set()
+
+        def add_key(blob, signer):
+            if blob in seen or key_type_of(blob) not in SIGNATURE_ALGORITHMS:
+                return
+            seen.add(blob)
+            credentials.append(
+                Credential("publickey", fingerprint(blob), blob=blob, signer=signer)
+            )
+
+        if self.agent is not None and self.agent.available:
+            try:
+                for blob, _ in self.agent.identities():
+                    add_key(blob, self._agent_signer(blob))
+            except AgentError as e:
+                self.logger.warning(f"Ignoring ssh-agent: {e}")
+
+        for path in self.identity_files:
+            path = os.path.expanduser(path)
+            if not os.path.exists(path):
+                continue
+            try:
+                add_key(
+                    self.key_cache.public_blob(path, self.passphrase),
+                    self._file_signer(path),
+                )
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Skipping identity file {path}: {e}")
+
+        if self.password is not None:
+            credentials.append(
+                Credential("password", "password", password=self.password)
+            )
+        return credentials
+
+    def _agent_signer(self, blob):
+        return lambda data, algorithm: self.agent.sign(blob, data, algorithm)
+
+    def _file_signer(self, path):
+        def signer(data, algorithm):
+            return sign(self.key_cache.load(path, self.passphrase), algorithm, data)
+
+        return signer
+
+    def order(self, credentials, host, port, username):
+        """Most likely to succeed first; otherwise keep the default order."""
+        with self._history_lock:
+            last = self._last_success.get((host, port, username))
+            counts = dict(self._success_counts)
+        return sorted(
+            credentials,
+            key=lambda c: (c.identity != last, -counts.get(c.identity, 0)),
+        )
+
+    def _remember(self, credential, host, port, username):
+        with self._history_lock:
+            self._last_success[(host, port, username)] = credential.identity
+            self._success_counts[credential.identity] = (
+                self._success_counts.get(credential.identity, 0) + 1
+            )
+
+    def authenticate(self, transport, username):
+        """Authenticate ``username`` on ``transport``; returns the method used."""
+        with telemetry.span(
+            "ssh.auth", phase="auth", **{"ssh.user": username}
+        ) as current:
+            credentials = self.order(
+                self.credentials(), transport.host, transport.port, username
+            )
+            if not credentials:
+                raise AuthenticationError("No credentials available")
+
+            # 서비스 요청과 첫 인증 시도를 한 번에 보내 왕복 한 번을 줄임
+            transport.send_packet(
+                pack_byte(SSH_MSG_SERVICE_REQUEST) + pack_string("ssh-userauth"),
+                flush=False,
+            )
+            service_accepted = False
+            allowed = None
+            for credential in credentials:
+                if allowed is not None and credential.method not in allowed:
+                    continue
+                try:
+                    self._send_attempt(transport, username, credential)
+                except (AgentError, LookupError, ValueError) as e:
+                    self.logger.warning(f"Skipping {credential}: {e}")
+                    continue
+                if not service_accepted:
+                    self._expect(transport, SSH_MSG_SERVICE_ACCEPT)
+                    service_accepted = True
+                success, methods = self._read_result(transport)
+                if success:
+                    self._remember(credential, transport.host, transport.port, username)
+                    current.set_attribute("ssh.auth.method", credential.method)
+                    self.logger.info(
+                        f"Authenticated {username}@{transport.host} with {credential}"
+                    )
+                    return credential.method
+                if methods is not None:
+                    allowed = methods
+            raise AuthenticationError(
+                f"Authentication failed for {username}@{transport.host}"
+            )
+
+    def _send_attempt(self, transport, username, credential):
+        prefix = (
+            pack_byte(SSH_MSG_USERAUTH_REQUEST)
+            + pack_string(username)
+            + pack_string("ssh-connection")
+            + pack_string(credential.method)
+        )
+        if credential.method == "password":
+            password = credential.password
+            if callable(password):
+                password = password()
+            transport.send_packet(prefix + pack_boolean(False) + pack_string(password))
+            return
+
+        # 서명을 바로 붙여 보냄 (공개키 조회 왕복 생략, RFC 4252 7)
+        algorithm = SIGNATURE_ALGORITHMS[key_type_of(credential.blob)]
+        request = (
+            prefix
+            + pack_boolean(True)
+            + pack_string(algorithm)
+            + pack_string(credential.blob)
+        )
+        signature = credential.signer(
+            pack_string(transport.session_id) + request, algorithm
+        )
+        transport.send_packet(request + pack_string(signature))
+
+    def _next_message(self, transport):
+        while True:
+            payload = transport.read_packet()
+            message_type = payload[0]
+            if message_type == SSH_MSG_USERAUTH_BANNER:
+                banner = MessageReader(payload, 1).read_text()
+                self.logger.info(f"Server banner: {banner.strip()}")
+            elif message_type == SSH_MSG_EXT_INFO:
+                continue
+            elif (
+                message_type < SSH_MSG_SERVICE_REQUEST
+                or SSH_MSG_KEXINIT <= message_type < SSH_MSG_USERAUTH_REQUEST
+            ):
+                # 인증 중에 시작된 재키 교환도 transport 가 처리
+                transport.handle_packet(payload)
+            else:
+                return payload
+
+    def _expect(self, transport, message_type):
+        payload = self._next_message(transport)
+        if payload[0] != message_type:
+            raise AuthenticationError(
+                f"Expected message {message_type}, got {payload[0]}"
+            )
 
-    def authenticate(self, username, password):
-        self.logger.info(f"Attempting to authenticate user: {username}")
-        # Implement authentication logic here
-        pass
+    def _read_result(self, transport):
+        """(success, allowed methods or None) for the attempt just sent."""
+        payload = self._next_message(transport)
+        message_type = payload[0]
+        if message_type == SSH_MSG_USERAUTH_SUCCESS:
+            return True, None
+        if message_type == SSH_MSG_USERAUTH_FAILURE:
+            return False, set(MessageReader(payload, 1).read_name_list())
+        if message_type == SSH_MSG_USERAUTH_PASSWD_CHANGEREQ:
+            self.logger.warning("Server requires a password change")
+            return False, None
+        raise AuthenticationError(f"Unexpected message {message_type} during auth")
@@ -0,0 +1,96 @@
+# src/benchmarks/bench_cipher_suites.py
+"""
+Per-suite packet crypto microbenchmark.
+
+Usage: python -m src.benchmarks.bench_cipher_suites [--seconds 0.5]
+"""
+
+import argparse
+import os
+import time
+from src.crypto.cipher_suites import CIPHER_SUITES, MAC_SUITES
+from src.network.packet_framer import PacketFramer
+from src.network.packet_manager import PacketManager
+
+SUITES = [
+    ("chacha20-poly1305@openssh.com", None),
+    ("aes128-gcm@openssh.com", None),
+    ("aes256-gcm@openssh.com", None),
+    ("aes128-ctr", "hmac-sha2-256-etm@openssh.com"),
+    ("aes128-ctr", "hmac-sha2-256"),
+    ("aes256-ctr", "hmac-sha2-512"),
+]
+PAYLOAD_SIZES = [64, 1024, 32 * 1024]
+
+
+def _make_pair(cipher, mac):
+    suite = CIPHER_SUITES[cipher]
+    key = os.urandom(suite.key_size)
+    iv = os.urandom(suite.iv_size) or None
+    mac_key = os.urandom(MAC_SUITES[mac].key_size) if mac else None
+    sender, receiver = PacketManager(), PacketManager()
+    sender.set_outgoing_cipher(cipher, key, iv, mac, mac_key)
+    receiver.set_incoming_cipher(cipher, key, iv, mac, mac_key)
+    return sender, receiver
+
+
+def bench_suite(cipher, mac, payload_size, seconds):
+    """Seal and open packets for ``seconds``; returns (packets/s, MB/s)."""
+    sender, receiver = _make_pair(cipher, mac)
+    framer = PacketFramer(receiver)
+    payload = os.urandom(payload_size)
+
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            framer.feed(sender.create_packet(payload))
+            framer.next_packet()
+        count += 100
+    elapsed = time.perf_counter() - started
+    return count / elapsed, count * payload_size / elapsed / 1e6
+
+
+def bench_create_and_parse(cipher, mac, payload_size, count):
+    """
+    Time ``count`` create_packet calls, then parsing the same packets.
+
+    Returns packets/s and MB/s of payload for each side separately.
+    """
+    sender, receiver = _make_pair(cipher, mac)
+    payload = os.urandom(payload_size)
+
+    started = time.perf_counter()
+    packets = [sender.create_packet(payload) for _ in range(count)]
+    create_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for packet in packets:
+        receiver.parse_packet(packet)
+    parse_elapsed = time.perf_counter() - started
+
+    megabytes = count * payload_size / 1e6
+    return {
+        "create_ops_per_s": count / create_elapsed,
+        "create_mb_per_s": megabytes / create_elapsed,
+        "parse_ops_per_s": count / parse_elapsed,
+        "parse_mb_per_s": megabytes / parse_elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'suite':48} {'payload':>8} {'pkt/s':>10} {'MB/s':>8}")
+    for cipher, mac in SUITES:
+        name = cipher if mac is None else f"{cipher} + {mac}"
+        for size in PAYLOAD_SIZES:
+            rate, throughput = bench_suite(cipher, mac, size, args.seconds)
+            print(f"{name:48} {size:>8} {rate:>10.0f} {throughput:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# src/benchmarks/bench_startup.py
+"""
+Cold-start cost of one-shot CLI invocations, measured with ``-X importtime``.
+
+Usage: python -m src.benchmarks.bench_startup [--rounds 10] [-- main.py args]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 명령을 실행할 때만 필요한 무거운 패키지: 시작 경로에서 가져오면 안 됨
+DEFERRED_PACKAGES = ("cryptography", "colorlog", "dotenv", "opentelemetry")
+HELP_COMMAND = ("main.py", "--help")
+
+
+def parse_importtime(output):
+    """[(module, self_us, cumulative_us, depth)] from ``-X importtime`` stderr."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 헤더 줄
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        imports.append((module, int(fields[0]), int(fields[1]), depth))
+    return imports
+
+
+def run_importtime(args=HELP_COMMAND):
+    """Run ``python -X importtime <args>`` in a clean interpreter; (imports, s)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr), time.perf_counter() - started
+
+
+def deferred_imports(imports):
+    """The DEFERRED_PACKAGES modules that were imported anyway."""
+    return sorted(
+        module
+        for module, _, _, _ in imports
+        if module.split(".")[0] in DEFERRED_PACKAGES
+    )
+
+
+def bench_startup(rounds=10, args=HELP_COMMAND):
+    wall = []
+    import_time = []
+    for _ in range(rounds):
+        imports, elapsed = run_importtime(args)
+        wall.append(elapsed)
+        import_time.append(sum(cum for _, _, cum, depth in imports if depth == 0))
+    return {
+        "wall_p50_ms": statistics.median(wall) * 1000,
+        "import_p50_ms": statistics.median(import_time) / 1000,
+        "modules": len(imports),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports shown")
+    parser.add_argument("command", nargs="*", default=list(HELP_COMMAND))
+    args = parser.parse_args()
+
+    print(bench_startup(args.rounds, args.command))
+    imports, _ = run_importtime(args.command)
+    for module, _, cumulative, depth in sorted(imports, key=lambda i: -i[2])[
+        : args.top
+    ]:
+        print(f"{cumulative / 1000:8.2f} ms  {'  ' * depth}{module}")
+    deferred = deferred_imports(imports)
+    if deferred:
+        print(f"Deferred packages imported at startup: {', '.join(deferred)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# src/benchmarks/bench_transport.py
+"""
+Connection-level benchmarks against the in-process LoopbackServer.
+
+Usage: python -m src.benchmarks.bench_transport [--rounds 20] [--megabytes 32]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import threading
+import time
+from src.benchmarks.loopback_server import SERVER_VERSION, LoopbackServerThread
+from src.crypto.host_keys import HostKeyVerifier
+from src.network.socket_handler import SocketHandler
+from src.network.transport import Transport
+from src.network.version_exchange import VersionExchanger
+
+CHUNK_SIZE = 256 * 1024
+
+
+def latency_summary(samples):
+    """Latency percentiles of ``samples`` (seconds) in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p90_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def connect(server, timeout=10):
+    verifier = HostKeyVerifier(os.devnull, policy="ignore")
+    return Transport("127.0.0.1", server.port, host_key_verifier=verifier).connect(
+        timeout=timeout
+    )
+
+
+def bench_version_exchange(rounds):
+    """Banner exchange over a socketpair, excluding socket setup."""
+    samples = []
+    for _ in range(rounds):
+        client, server = socket.socketpair()
+
+        def answer():
+            server.sendall(f"{SERVER_VERSION}\r\n".encode())
+            server.recv(256)
+
+        responder = threading.Thread(target=answer)
+        responder.start()
+        handler = SocketHandler()
+        handler.socket = client
+        started = time.perf_counter()
+        is_valid, result = VersionExchanger("SSH-2.0-Bench").exchange_versions(handler)
+        samples.append(time.perf_counter() - started)
+        responder.join()
+        client.close()
+        server.close()
+        if not is_valid:
+            raise ConnectionError(result)
+    return latency_summary(samples)
+
+
+def bench_handshake(server, rounds):
+    """TCP connect, version exchange and key exchange to a ready transport."""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        transport = connect(server)
+        samples.append(time.perf_counter() - started)
+        transport.close()
+    return latency_summary(samples)
+
+
+def bench_channel_upload(server, total_bytes):
+    """Send ``total_bytes`` on one session channel to a discarding peer."""
+    transport = connect(server)
+    try:
+        channel = transport.open_session(timeout=10)
+        channel.exec_command("sink")
+        chunk = memoryview(bytes(CHUNK_SIZE))
+        started = time.perf_counter()
+        sent = 0
+        while sent < total_bytes:
+            channel.send(chunk[: total_bytes - sent])
+            sent += min(CHUNK_SIZE, total_bytes - sent)
+        channel.send_eof()
+        channel.recv_exit_status(timeout=30)
+        elapsed = time.perf_counter() - started
+    finally:
+        transport.close()
+    return {"mb_per_s": total_bytes / elapsed / 1e6}
+
+
+def bench_channel_download(server, total_bytes):
+    """Receive ``total_bytes`` generated by the peer on one session channel."""
+    transport = connect(server)
+    try:
+        channel = transport.open_session(timeout=10)
+        buffer = memoryview(bytearray(CHUNK_SIZE))
+        started = time.perf_counter()
+        channel.exec_command(f"source {total_bytes}")
+        received = 0
+        while received < total_bytes:
+            count = channel.recv_into(buffer, timeout=30)
+            if not count:
+                raise ConnectionError("Server closed the channel early")
+            received += count
+        elapsed = time.perf_counter() - started
+        channel.close(timeout=10)
+    finally:
+        transport.close()
+    return {"mb_per_s": total_bytes / elapsed / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--megabytes", type=int, default=32)
+    args = parser.parse_args()
+
+    total = args.megabytes * 1024 * 1024
+    print("version exchange", bench_version_exchange(args.rounds))
+    with LoopbackServerThread() as server:
+        print("handshake", bench_handshake(server, args.rounds))
+        print("channel upload", bench_channel_upload(server, total))
+        print("channel download", bench_channel_download(server, total))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# src/benchmarks/load_test.py
+"""
+Many concurrent client sessions on one event loop against LoopbackServer.
+
+Each session connects with AsyncSSHConnection, opens a session channel,
+runs ``source N`` and reads the output until the server closes the
+channel. Without ``--port`` an in-process server is started with the
+given link impairments; with it, an already running server is used
+(e.g. ``python -m src.benchmarks.loopback_server`` in another process).
+
+Usage: python -m src.benchmarks.load_test [--sessions 1000]
+       [--concurrency 200] [--latency 0.02] [--port 2222]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from src.benchmarks.bench_transport import latency_summary
+from src.benchmarks.loopback_server import LinkProfile, LoopbackServer
+from src.crypto.host_keys import HostKeyVerifier
+from src.network.async_connection import AsyncSSHConnection
+from src.network.message import (
+    MessageReader,
+    SSH_MSG_CHANNEL_CLOSE,
+    SSH_MSG_CHANNEL_DATA,
+    SSH_MSG_CHANNEL_OPEN,
+    SSH_MSG_CHANNEL_OPEN_CONFIRMATION,
+    SSH_MSG_CHANNEL_REQUEST,
+    SSH_MSG_CHANNEL_WINDOW_ADJUST,
+    pack_boolean,
+    pack_byte,
+    pack_string,
+    pack_uint32,
+)
+
+WINDOW_SIZE = 2 * 1024 * 1024
+MAX_PACKET_SIZE = 32 * 1024
+
+
+async def run_session(host, port, output_size, verifier):
+    """One connection and one command; returns (handshake seconds, total seconds)."""
+    connection = AsyncSSHConnection(host, port, host_key_verifier=verifier)
+    started = time.perf_counter()
+    try:
+        await connection.connect()
+        handshake = time.perf_counter() - started
+        await connection.send_packet(
+            pack_byte(SSH_MSG_CHANNEL_OPEN)
+            + pack_string("session")
+            + pack_uint32(0)
+            + pack_uint32(WINDOW_SIZE)
+            + pack_uint32(MAX_PACKET_SIZE)
+        )
+        payload = await connection.read_packet()
+        if payload[0] != SSH_MSG_CHANNEL_OPEN_CONFIRMATION:
+            raise ConnectionError(f"Channel open failed with message {payload[0]}")
+        recipient = pack_uint32(MessageReader(payload, 5).read_uint32())
+        await connection.send_packet(
+            pack_byte(SSH_MSG_CHANNEL_REQUEST)
+            + recipient
+            + pack_string("exec")
+            + pack_boolean(False)
+            + pack_string(f"source {output_size}")
+        )
+
+        received = consumed = 0
+        while (payload := await connection.read_packet())[0] != SSH_MSG_CHANNEL_CLOSE:
+            if payload[0] != SSH_MSG_CHANNEL_DATA:
+                continue
+            size = len(MessageReader(payload, 5).read_string_view())
+            received += size
+            consumed += size
+            if consumed >= WINDOW_SIZE // 2:
+                await connection.send_packet(
+                    pack_byte(SSH_MSG_CHANNEL_WINDOW_ADJUST)
+                    + recipient
+                    + pack_uint32(consumed)
+                )
+                consumed = 0
+        await connection.send_packet(pack_byte(SSH_MSG_CHANNEL_CLOSE) + recipient)
+        if received != output_size:
+            raise ConnectionError(f"Received {received} of {output_size} bytes")
+        return handshake, time.perf_counter() - started
+    finally:
+        await connection.close()
+
+
+async def load_test(host, port, sessions, concurrency, output_size, timeout=60):
+    """Run ``sessions`` sessions, at most ``concurrency`` at a time."""
+    verifier = HostKeyVerifier(os.devnull, policy="ignore")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            return await asyncio.wait_for(
+                run_session(host, port, output_size, verifier), timeout
+            )
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(limited() for _ in range(sessions)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+
+    completed = [result for result in results if not isinstance(result, BaseException)]
+    metrics = {
+        "sessions_per_s": len(completed) / elapsed,
+        "failed": sessions - len(completed),
+    }
+    if completed:
+        handshake = latency_summary([result[0] for result in completed])
+        session = latency_summary([result[1] for result in completed])
+        metrics.update({f"handshake_{k}": v for k, v in handshake.items()})
+        metrics.update({f"session_{k}": v for k, v in session.items()})
+    return metrics
+
+
+async def run(sessions, concurrency, output_size, link=None, port=None):
+    """Load-test an in-process server, or the one on 127.0.0.1:``port``."""
+    if port is not None:
+        return await load_test("127.0.0.1", port, sessions, concurrency, output_size)
+    async with LoopbackServer(link=link) as server:
+        return await load_test(
+            server.host, server.port, sessions, concurrency, output_size
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--output-size", type=int, default=64 * 1024)
+    parser.add_argument("--latency", type=float, default=0.0, help="one-way seconds")
+    parser.add_argument("--bandwidth", type=float, help="bytes per second")
+    parser.add_argument("--loss", type=float, default=0.0, help="segment loss rate")
+    parser.add_argument("--port", type=int, help="use a server already listening")
+    args = parser.parse_args()
+
+    link = LinkProfile(args.latency, args.bandwidth, args.loss)
+    metrics = asyncio.run(
+        run(args.sessions, args.concurrency, args.output_size, link, args.port)
+    )
+    for name, value in metrics.items():
+        print(f"{name}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,792 @@
+# src/benchmarks/loopback_server.py
+"""
+Embedded asyncio SSH server stand-in for integration and load tests.
+
+It speaks the parts of the protocol this client implements: version
+exchange, key exchange (the server side of KeyExchange, rekeys included,
+started by the server itself every ``rekey_bytes`` sent when that is set),
+the ssh-userauth service (publickey and password), session channels
+and TCP forwarding (``direct-tcpip`` channels and ``tcpip-forward``
+requests, relayed with asyncio streams). ``exec`` understands
+
+    sink        read and discard stdin, exit 0 at EOF
+    source N    write N bytes to stdout and exit 0
+    echo        copy stdin back to stdout (``shell`` does the same)
+    exit N      exit with status N
+
+Every connection can be slowed down by a LinkProfile: one-way latency,
+a bandwidth cap and segment loss, applied to each direction separately.
+TCP never loses data on the loopback, so loss is modelled the way TCP
+shows it to the application: a lost segment holds back its chunk, and
+everything behind it, for one retransmission timeout.
+
+Usage: python -m src.benchmarks.loopback_server [--port 2222]
+       [--latency 0.05] [--bandwidth 1000000] [--loss 0.01]
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import threading
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from src.crypto.host_keys import verify_signature
+from src.crypto.key_exchange import KeyExchange
+from src.network.message import (
+    MessageReader,
+    SSH_MSG_CHANNEL_CLOSE,
+    SSH_MSG_CHANNEL_DATA,
+    SSH_MSG_CHANNEL_EOF,
+    SSH_MSG_CHANNEL_FAILURE,
+    SSH_MSG_CHANNEL_OPEN,
+    SSH_MSG_CHANNEL_OPEN_CONFIRMATION,
+    SSH_MSG_CHANNEL_OPEN_FAILURE,
+    SSH_MSG_CHANNEL_REQUEST,
+    SSH_MSG_CHANNEL_SUCCESS,
+    SSH_MSG_CHANNEL_WINDOW_ADJUST,
+    SSH_MSG_DISCONNECT,
+    SSH_MSG_GLOBAL_REQUEST,
+    SSH_MSG_KEXINIT,
+    SSH_MSG_NEWKEYS,
+    SSH_MSG_REQUEST_FAILURE,
+    SSH_MSG_REQUEST_SUCCESS,
+    SSH_MSG_SERVICE_ACCEPT,
+    SSH_MSG_SERVICE_REQUEST,
+    SSH_MSG_USERAUTH_FAILURE,
+    SSH_MSG_USERAUTH_PK_OK,
+    SSH_MSG_USERAUTH_REQUEST,
+    SSH_MSG_USERAUTH_SUCCESS,
+    pack_boolean,
+    pack_byte,
+    pack_name_list,
+    pack_string,
+    pack_uint32,
+)
+from src.network.packet_framer import PacketFramer
+from src.network.packet_manager import PacketManager
+from src.utils.logger import Logger
+
+SERVER_VERSION = "SSH-2.0-LoopbackServer_1.0"
+WINDOW_SIZE = 8 * 1024 * 1024
+MAX_PACKET_SIZE = 32 * 1024
+READ_SIZE = 64 * 1024
+MAX_BANNER_LENGTH = 8192
+# 손실은 세그먼트 단위로 적용 (이더넷 MSS)
+SEGMENT_SIZE = 1448
+# RFC 4254 5.1
+SSH_OPEN_CONNECT_FAILED = 2
+SSH_OPEN_UNKNOWN_CHANNEL_TYPE = 3
+# 채널 출력을 이 패킷 수만큼씩 암호화해 씀
+_SEND_BATCH = 16
+# 키 교환 중에는 이 번호 미만의 메시지만 주고받음 (RFC 4253 7.1)
+_FIRST_SERVICE_MESSAGE = 50
+
+_ZEROS = bytes(MAX_PACKET_SIZE)
+
+
+class LinkProfile:
+    """Impairments applied to each direction of every connection."""
+
+    def __init__(self, latency=0.0, bandwidth=None, loss=0.0, retransmit_timeout=0.2):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.loss = loss
+        self.retransmit_timeout = retransmit_timeout
+
+    @property
+    def impaired(self):
+        return bool(self.latency or self.bandwidth or self.loss)
+
+
+class _Link:
+    """Delivery schedule of one direction: chunks arrive in order, never early."""
+
+    def __init__(self, profile, rng):
+        self.profile = profile
+        self.rng = rng
+        self._free_at = 0.0
+        self._last_delivery = 0.0
+
+    def delivery_time(self, now, size):
+        profile = self.profile
+        sent = max(now, self._free_at)
+        if profile.bandwidth:
+            sent += size / profile.bandwidth
+        self._free_at = sent
+        delivery = sent + profile.latency
+        if profile.loss:
+            segments = -(-size // SEGMENT_SIZE)
+            if self.rng.random() < 1 - (1 - profile.loss) ** segments:
+                delivery += profile.retransmit_timeout
+        self._last_delivery = max(self._last_delivery, delivery)
+        return self._last_delivery
+
+
+async def _sleep_until(loop, deadline):
+    delay = deadline - loop.time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+class _Connection:
+    """
+    asyncio stream pair with the link impairments applied.
+
+    Without impairments reads and writes go straight to the streams. With
+    them, a reader task and a writer task hold every chunk back until its
+    delivery time.
+    """
+
+    def __init__(self, reader, writer, profile, rng):
+        self.reader = reader
+        self.writer = writer
+        self.impaired = profile.impaired
+        self._loop = asyncio.get_running_loop()
+        self._tasks = []
+        if self.impaired:
+            self._receive_link = _Link(profile, rng)
+            self._send_link = _Link(profile, rng)
+            self._inbound = asyncio.Queue()
+            self._outbound = asyncio.Queue()
+            self._tasks = [
+                asyncio.create_task(self._read_loop()),
+                asyncio.create_task(self._write_loop()),
+            ]
+
+    def write(self, buffers):
+        if not self.impaired:
+            self.writer.writelines(buffers)
+            return
+        data = b"".join(buffers)
+        delivery = self._send_link.delivery_time(self._loop.time(), len(data))
+        self._outbound.put_nowait((delivery, data))
+
+    async def drain(self):
+        # 지연 모드에서는 채널 윈도우가 대기열 크기를 제한
+        if not self.impaired:
+            await self.writer.drain()
+
+    async def read(self):
+        if not self.impaired:
+            return await self.reader.read(READ_SIZE)
+        delivery, data = await self._inbound.get()
+        await _sleep_until(self._loop, delivery)
+        return data
+
+    async def _read_loop(self):
+        try:
+            while data := await self.reader.read(READ_SIZE):
+                delivery = self._receive_link.delivery_time(
+                    self._loop.time(), len(data)
+                )
+                self._inbound.put_nowait((delivery, data))
+        except OSError:
+            pass
+        self._inbound.put_nowait((0.0, b""))
+
+    async def _write_loop(self):
+        try:
+            while (item := await self._outbound.get())[1] is not None:
+                delivery, data = item
+                await _sleep_until(self._loop, delivery)
+                self.writer.write(data)
+                await self.writer.drain()
+        except OSError:
+            pass
+
+    async def close(self):
+        if self._tasks:
+            self._outbound.put_nowait((0.0, None))
+            await asyncio.wait([self._tasks[1]], timeout=1)
+            for task in self._tasks:
+                task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+
+class _Channel:
+    def __init__(self, local_id, remote_id, remote_window, remote_max_packet):
+        self.local_id = local_id
+        self.remote_id = remote_id
+        self.remote_window = remote_window
+        self.remote_max_packet = min(remote_max_packet, MAX_PACKET_SIZE)
+        self.consumed = 0
+        self.echo = False
+        self.pending = bytearray()
+        self.to_send = 0
+        self.exit_status = 0
+        self.finishing = False
+        self.close_sent = False
+        # TCP 포워딩 채널: 상대 소켓과 창이 열리기를 기다리는 이벤트
+        self.writer = None
+        self.opened = None
+        self.eof_sent = False
+        self.eof_received = False
+        self.window_opened = asyncio.Event()
+
+
+class _Session:
+    def __init__(self, server, connection):
+        self.server = server
+        self.connection = connection
+        self.packet_manager = PacketManager()
+        self.framer = PacketFramer(self.packet_manager)
+        self.client_version = None
+        self.session_id = None
+        self.strict = False
+        self.channels = {}
+        self.forwards = {}
+        self._next_id = 0
+        self._held = None
+
+    def send(self, payload):
+        # 키 교환 중에 만든 응답은 NEWKEYS 를 보낸 뒤에 새 키로 보냄
+        if self._held is not None and payload[0] >= _FIRST_SERVICE_MESSAGE:
+            self._held.append(payload)
+            return
+        self.connection.write([self.packet_manager.create_packet(payload)])
+
+    async def _next_payload(self):
+        while (payload := self.framer.next_packet()) is None:
+            data = await self.connection.read()
+            if not data:
+                return None
+            self.framer.feed(data)
+        return bytes(payload)
+
+    async def _read_banner(self):
+        received = b""
+        while b"\n" not in received:
+            if len(received) > MAX_BANNER_LENGTH:
+                raise ConnectionError("Client version line too long")
+            data = await self.connection.read()
+            if not data:
+                raise ConnectionError("Connection closed before version exchange")
+            received += data
+        line, _, excess = received.partition(b"\n")
+        self.framer.feed(excess)
+        return line.decode("utf-8", errors="replace").strip()
+
+    async def run(self):
+        self.connection.write([f"{SERVER_VERSION}\r\n".encode()])
+        self.client_version = await self._read_banner()
+        if not self.client_version.startswith("SSH-2.0-"):
+            raise ConnectionError(f"Unsupported client version {self.client_version}")
+        await self._key_exchange()
+        try:
+            await self._serve_messages()
+        finally:
+            for forward in self.forwards.values():
+                forward.cancel()
+            for channel in self.channels.values():
+                if channel.writer is not None:
+                    channel.writer.close()
+
+    async def _serve_messages(self):
+        while (payload := await self._next_payload()) is not None:
+            message_type = payload[0]
+            if message_type == SSH_MSG_DISCONNECT:
+                return
+            if message_type == SSH_MSG_KEXINIT:
+                await self._key_exchange(payload)
+            else:
+                self._dispatch(message_type, MessageReader(payload, 1))
+            self._send_pending()
+            while self._rekey_due():
+                await self._key_exchange()
+                self._send_pending()
+            await self.connection.drain()
+
+    def _rekey_due(self):
+        rekey_bytes = self.server.rekey_bytes
+        return bool(rekey_bytes) and self.packet_manager.rekey_due(rekey_bytes, 0, 0)
+
+    async def _key_exchange(self, peer_kexinit=None):
+        """
+        Initial exchange, or a rekey started by either side. Channel
+        messages the client sent before it saw our KEXINIT are handled in
+        between; replies to them wait for our NEWKEYS.
+        """
+        kex = KeyExchange(
+            self.packet_manager,
+            self.client_version,
+            SERVER_VERSION,
+            host_key=self.server.host_key,
+            session_id=self.session_id,
+            strict=self.strict,
+        )
+        outputs = [kex.start()] if peer_kexinit is None else kex.handle(peer_kexinit)
+        self._held = []
+        while True:
+            for payload in outputs:
+                self.send(payload)
+            kex.outputs_sent()
+            if any(payload[0] == SSH_MSG_NEWKEYS for payload in outputs):
+                held, self._held = self._held, None
+                for payload in held:
+                    self.send(payload)
+            if kex.complete:
+                break
+            await self.connection.drain()
+            payload = await self._next_payload()
+            if payload is None:
+                raise ConnectionError("Connection closed during key exchange")
+            if payload[0] >= _FIRST_SERVICE_MESSAGE:
+                self._dispatch(payload[0], MessageReader(payload, 1))
+                outputs = []
+            else:
+                outputs = kex.handle(payload)
+        self.session_id = kex.session_id
+        self.strict = kex.strict
+
+    def _dispatch(self, message_type, reader):
+        if message_type == SSH_MSG_SERVICE_REQUEST:
+            self.send(
+                pack_byte(SSH_MSG_SERVICE_ACCEPT) + pack_string(reader.read_string())
+            )
+        elif message_type == SSH_MSG_USERAUTH_REQUEST:
+            self._on_userauth(reader)
+        elif message_type == SSH_MSG_GLOBAL_REQUEST:
+            self._on_global_request(reader)
+        elif message_type == SSH_MSG_CHANNEL_OPEN:
+            self._on_channel_open(reader)
+        elif SSH_MSG_CHANNEL_OPEN < message_type <= SSH_MSG_CHANNEL_FAILURE:
+            channel = self.channels.get(reader.read_uint32())
+            if channel is not None:
+                self._on_channel_message(message_type, channel, reader)
+
+    def _on_userauth(self, reader):
+        username = reader.read_text()
+        reader.read_text()
+        method = reader.read_text()
+        self.server.auth_attempts.append((username, method))
+        accepted = False
+        if method == "publickey":
+            has_signature = reader.read_boolean()
+            algorithm = reader.read_text()
+            blob = reader.read_string()
+            authorized = self.server.authorized_keys
+            if authorized is not None and blob not in authorized:
+                accepted = False
+            elif not has_signature:
+                # 서명 없는 조회: 이 키를 받아들인다고 응답 (RFC 4252 7)
+                self.send(
+                    pack_byte(SSH_MSG_USERAUTH_PK_OK)
+                    + pack_string(algorithm)
+                    + pack_string(blob)
+                )
+                return
+            else:
+                signed = pack_string(self.session_id) + bytes(
+                    reader.data[: reader.offset]
+                )
+                try:
+                    verify_signature(blob, reader.read_string(), signed, algorithm)
+                    accepted = True
+                except ValueError:
+                    accepted = False
+        elif method == "password":
+            reader.read_boolean()
+            password = reader.read_text()
+            passwords = self.server.passwords
+            accepted = passwords is None or passwords.get(username) == password
+
+        if accepted:
+            self.send(pack_byte(SSH_MSG_USERAUTH_SUCCESS))
+        else:
+            self.send(
+                pack_byte(SSH_MSG_USERAUTH_FAILURE)
+                + pack_name_list(["publickey", "password"])
+                + pack_boolean(False)
+            )
+
+    def _on_global_request(self, reader):
+        request_name = reader.read_text()
+        want_reply = reader.read_boolean()
+        reply = pack_byte(SSH_MSG_REQUEST_FAILURE)
+        if request_name == "tcpip-forward":
+            address, port = reader.read_text(), reader.read_uint32()
+            listener = socket.create_server((address or "127.0.0.1", port))
+            bound = listener.getsockname()[1]
+            self.forwards[(address, bound)] = asyncio.ensure_future(
+                self._serve_forward(listener, address, bound)
+            )
+            reply = pack_byte(SSH_MSG_REQUEST_SUCCESS)
+            if port == 0:
+                reply += pack_uint32(bound)
+        elif request_name == "cancel-tcpip-forward":
+            address, port = reader.read_text(), reader.read_uint32()
+            forward = self.forwards.pop((address, port), None)
+            if forward is not None:
+                forward.cancel()
+                reply = pack_byte(SSH_MSG_REQUEST_SUCCESS)
+        if want_reply:
+            self.send(reply)
+
+    def _open_failure(self, remote_id, reason_code, description):
+        self.send(
+            pack_byte(SSH_MSG_CHANNEL_OPEN_FAILURE)
+            + pack_uint32(remote_id)
+            + pack_uint32(reason_code)
+            + pack_string(description)
+            + pack_string("")
+        )
+
+    def _on_channel_open(self, reader):
+        channel_type = reader.read_text()
+        remote_id = reader.read_uint32()
+        if channel_type not in ("session", "direct-tcpip"):
+            self._open_failure(
+                remote_id,
+                SSH_OPEN_UNKNOWN_CHANNEL_TYPE,
+                f"Unsupported channel type {channel_type}",
+            )
+            return
+        channel = _Channel(
+            self._next_id, remote_id, reader.read_uint32(), reader.read_uint32()
+        )
+        self._next_id += 1
+        if channel_type == "direct-tcpip":
+            channel.exit_status = None
+            target = (reader.read_text(), reader.read_uint32())
+            asyncio.ensure_future(self._open_direct(channel, *target))
+            return
+        self._confirm(channel)
+
+    def _confirm(self, channel):
+        self.channels[channel.local_id] = channel
+        self.send(
+            pack_byte(SSH_MSG_CHANNEL_OPEN_CONFIRMATION)
+            + pack_uint32(channel.remote_id)
+            + pack_uint32(channel.local_id)
+            + pack_uint32(WINDOW_SIZE)
+            + pack_uint32(MAX_PACKET_SIZE)
+        )
+
+    # ---- TCP 포워딩 ------------------------------------------------------
+
+    async def _open_direct(self, channel, host, port):
+        try:
+            stream_reader, channel.writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            self._open_failure(channel.remote_id, SSH_OPEN_CONNECT_FAILED, str(e))
+            return
+        self._confirm(channel)
+        await self._relay_tcp(channel, stream_reader)
+
+    async def _serve_forward(self, listener, address, port):
+        async def on_connection(stream_reader, writer):
+            channel = _Channel(self._next_id, None, 0, 0)
+            self._next_id += 1
+            channel.exit_status = None
+            channel.writer = writer
+            channel.opened = asyncio.get_running_loop().create_future()
+            self.channels[channel.local_id] = channel
+            origin, origin_port = writer.get_extra_info("peername")[:2]
+            self.send(
+                pack_byte(SSH_MSG_CHANNEL_OPEN)
+                + pack_string("forwarded-tcpip")
+                + pack_uint32(channel.local_id)
+                + pack_uint32(WINDOW_SIZE)
+                + pack_uint32(MAX_PACKET_SIZE)
+                + pack_string(address)
+                + pack_uint32(port)
+                + pack_string(origin)
+                + pack_uint32(origin_port)
+            )
+            if await channel.opened:
+                await self._relay_tcp(channel, stream_reader)
+            else:
+                writer.close()
+
+        server = await asyncio.start_server(on_connection, sock=listener)
+        async with server:
+            await server.serve_forever()
+
+    async def _relay_tcp(self, channel, stream_reader):
+        """Copy the TCP peer's output to the channel as the client's window allows."""
+        try:
+            while data := await stream_reader.read(READ_SIZE):
+                channel.pending += data
+                self._send_pending()
+                while len(channel.pending) >= READ_SIZE and not channel.close_sent:
+                    channel.window_opened.clear()
+                    await channel.window_opened.wait()
+        except OSError:
+            pass
+        channel.finishing = True
+        self._send_pending()
+
+    def _on_channel_message(self, message_type, channel, reader):
+        if message_type == SSH_MSG_CHANNEL_OPEN_CONFIRMATION:
+            channel.remote_id = reader.read_uint32()
+            channel.remote_window = reader.read_uint32()
+            channel.remote_max_packet = min(reader.read_uint32(), MAX_PACKET_SIZE)
+            channel.opened.set_result(True)
+            return
+        if message_type == SSH_MSG_CHANNEL_OPEN_FAILURE:
+            del self.channels[channel.local_id]
+            channel.opened.set_result(False)
+            return
+        recipient = pack_uint32(channel.remote_id)
+        if message_type == SSH_MSG_CHANNEL_DATA:
+            data = reader.read_string_view()
+            if channel.echo:
+                channel.pending += data
+            elif channel.writer is not None:
+                channel.writer.write(bytes(data))
+            channel.consumed += len(data)
+            if channel.consumed >= WINDOW_SIZE // 2:
+                self.send(
+                    pack_byte(SSH_MSG_CHANNEL_WINDOW_ADJUST)
+                    + recipient
+                    + pack_uint32(channel.consumed)
+                )
+                channel.consumed = 0
+        elif message_type == SSH_MSG_CHANNEL_WINDOW_ADJUST:
+            channel.remote_window += reader.read_uint32()
+            channel.window_opened.set()
+        elif message_type == SSH_MSG_CHANNEL_REQUEST:
+            request_type = reader.read_text()
+            want_reply = reader.read_boolean()
+            accepted = self._on_channel_request(channel, request_type, reader)
+            if want_reply:
+                reply = SSH_MSG_CHANNEL_SUCCESS if accepted else SSH_MSG_CHANNEL_FAILURE
+                self.send(pack_byte(reply) + recipient)
+        elif message_type == SSH_MSG_CHANNEL_EOF:
+            if channel.writer is None:
+                channel.finishing = True
+            else:
+                channel.eof_received = True
+                if channel.writer.can_write_eof():
+                    channel.writer.write_eof()
+        elif message_type == SSH_MSG_CHANNEL_CLOSE:
+            del self.channels[channel.local_id]
+            channel.window_opened.set()
+            if channel.writer is not None:
+                channel.writer.close()
+            if not channel.close_sent:
+                self.send(pack_byte(SSH_MSG_CHANNEL_CLOSE) + recipient)
+
+    def _on_channel_request(self, channel, request_type, reader):
+        if request_type == "shell":
+            channel.echo = True
+            return True
+        if request_type in ("pty-req", "env", "window-change"):
+            return True
+        if request_type != "exec":
+            return False
+
+        command, *arguments = reader.read_text().split() or [""]
+        if command == "source" and arguments:
+            channel.to_send = int(arguments[0])
+            channel.finishing = True
+        elif command == "exit" and arguments:
+            channel.exit_status = int(arguments[0])
+            channel.finishing = True
+        elif command == "echo":
+            channel.echo = True
+        elif command != "sink":
+            channel.exit_status = 127
+            channel.finishing = True
+        return True
+
+    def _send_pending(self):
+        """
+        Write channel output while the client's window allows, then finish.
+        Stops early, to be called again after the exchange, once a rekey is due.
+        """
+        if self._held is not None:
+            return
+        for channel in list(self.channels.values()):
+            if channel.remote_id is None:
+                continue
+            recipient = pack_uint32(channel.remote_id)
+            payloads = []
+            while channel.remote_window and (channel.pending or channel.to_send):
+                if self._rekey_due():
+                    break
+                size = min(channel.remote_window, channel.remote_max_packet)
+                if channel.pending:
+                    data = bytes(channel.pending[:size])
+                    del channel.pending[:size]
+                else:
+                    data = _ZEROS[: min(size, channel.to_send)]
+                    channel.to_send -= len(data)
+                channel.remote_window -= len(data)
+                payloads.append(
+                    pack_byte(SSH_MSG_CHANNEL_DATA) + recipient + pack_string(data)
+                )
+                if len(payloads) == _SEND_BATCH:
+                    self.connection.write(self.packet_manager.create_packets(payloads))
+                    payloads = []
+            if payloads:
+                self.connection.write(self.packet_manager.create_packets(payloads))
+            if self._rekey_due():
+                return
+
+            if (
+                channel.finishing
+                and not channel.pending
+                and not channel.to_send
+                and not channel.close_sent
+            ):
+                if channel.writer is not None:
+                    # TCP 는 반쯤 닫힌 상태가 있으므로 양쪽 EOF 뒤에 CLOSE
+                    if not channel.eof_sent:
+                        channel.eof_sent = True
+                        self.send(pack_byte(SSH_MSG_CHANNEL_EOF) + recipient)
+                    if channel.eof_received:
+                        channel.close_sent = True
+                        self.send(pack_byte(SSH_MSG_CHANNEL_CLOSE) + recipient)
+                    continue
+                channel.close_sent = True
+                if channel.exit_status is not None:
+                    self.send(
+                        pack_byte(SSH_MSG_CHANNEL_REQUEST)
+                        + recipient
+                        + pack_string("exit-status")
+                        + pack_boolean(False)
+                        + pack_uint32(channel.exit_status)
+                    )
+                self.send(pack_byte(SSH_MSG_CHANNEL_EOF) + recipient)
+                self.send(pack_byte(SSH_MSG_CHANNEL_CLOSE) + recipient)
+
+
+class LoopbackServer:
+    """
+    In-process SSH server on an asyncio event loop.
+
+    ``await start()`` listens on ``host``:``port`` (port 0 picks a free one,
+    see ``port`` afterwards). ``link`` impairs every accepted connection;
+    ``seed`` makes the loss pattern reproducible. ``authorized_keys`` (key
+    blobs) and ``passwords`` (user -> password) restrict authentication;
+    left as None, any key or password is accepted. Every attempt is
+    appended to ``auth_attempts`` as (user, method). With ``rekey_bytes``
+    the server starts a key exchange itself whenever it has sent or
+    received that much under the current keys.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        host_key=None,
+        link=None,
+        seed=None,
+        authorized_keys=None,
+        passwords=None,
+        rekey_bytes=None,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.host = host
+        self.port = port
+        self.host_key = host_key or ed25519.Ed25519PrivateKey.generate()
+        self.link = link or LinkProfile()
+        self.authorized_keys = authorized_keys
+        self.passwords = passwords
+        self.rekey_bytes = rekey_bytes
+        self.auth_attempts = []
+        self.accepted = 0
+        self._rng = random.Random(seed)
+        self._server = None
+        self._connections = set()
+
+    @property
+    def active(self):
+        return len(self._connections)
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._serve, self.host, self.port, backlog=4096
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        for connection in list(self._connections):
+            await connection.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _serve(self, reader, writer):
+        connection = _Connection(reader, writer, self.link, self._rng)
+        self._connections.add(connection)
+        self.accepted += 1
+        try:
+            await _Session(self, connection).run()
+        except (ConnectionError, OSError, ValueError) as e:
+            self.logger.debug(f"Loopback session ended: {e}")
+        finally:
+            self._connections.discard(connection)
+            await connection.close()
+
+
+class LoopbackServerThread:
+    """Run a LoopbackServer on its own event loop, for blocking clients."""
+
+    def __init__(self, **options):
+        self.server = LoopbackServer(**options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.server.port
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.server.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+async def _serve(args):
+    link = LinkProfile(args.latency, args.bandwidth, args.loss)
+    async with LoopbackServer(
+        args.host, args.port, link=link, seed=args.seed
+    ) as server:
+        print(f"Listening on {server.host}:{server.port}")
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2222)
+    parser.add_argument("--latency", type=float, default=0.0, help="one-way seconds")
+    parser.add_argument("--bandwidth", type=float, help="bytes per second")
+    parser.add_argument("--loss", type=float, default=0.0, help="segment loss rate")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# src/benchmarks/run_benchmarks.py
+"""
+Run the packet, transport and startup benchmarks and write the results as JSON.
+
+Usage: python -m src.benchmarks.run_benchmarks [--output results.json]
+       [--compare baseline.json] [--quick]
+
+Metrics ending in ``_per_s`` are better when higher, ``_ms`` when lower.
+With ``--compare`` each metric is printed next to the baseline value and
+the relative change, so runs on two commits can be diffed directly.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from src.benchmarks.bench_cipher_suites import (
+    PAYLOAD_SIZES,
+    SUITES,
+    bench_create_and_parse,
+)
+from src.benchmarks.bench_startup import bench_startup
+from src.benchmarks.bench_transport import (
+    bench_channel_download,
+    bench_channel_upload,
+    bench_handshake,
+    bench_version_exchange,
+)
+from src.benchmarks.loopback_server import LoopbackServerThread
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(quick=False):
+    """Run every benchmark; returns a list of {benchmark, params, metrics}."""
+    packets = 2000 if quick else 20000
+    rounds = 3 if quick else 20
+    total = (4 if quick else 64) * 1024 * 1024
+    results = []
+
+    def record(benchmark, params, metrics):
+        results.append({"benchmark": benchmark, "params": params, "metrics": metrics})
+
+    for cipher, mac in SUITES:
+        for size in PAYLOAD_SIZES:
+            record(
+                "packet",
+                {"cipher": cipher, "mac": mac, "payload_size": size},
+                bench_create_and_parse(cipher, mac, size, packets),
+            )
+
+    record("startup", {"command": "main.py --help"}, bench_startup(rounds))
+    record("version_exchange", {}, bench_version_exchange(rounds))
+    with LoopbackServerThread() as server:
+        record("handshake", {}, bench_handshake(server, rounds))
+        record(
+            "channel_upload",
+            {"bytes": total},
+            bench_channel_upload(server, total),
+        )
+        record(
+            "channel_download",
+            {"bytes": total},
+            bench_channel_download(server, total),
+        )
+    return results
+
+
+def _key(result):
+    return result["benchmark"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline):
+    """Lines of ``metric: new (old, +x%)`` for the results found in ``baseline``."""
+    previous = {_key(result): result["metrics"] for result in baseline}
+    lines = []
+    for result in results:
+        old = previous.get(_key(result), {})
+        params = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        for metric, value in result["metrics"].items():
+            line = f"{result['benchmark']} {params} {metric}: {value:.2f}"
+            if old.get(metric):
+                change = (value - old[metric]) / old[metric] * 100
+                line += f" ({old[metric]:.2f}, {change:+.1f}%)"
+            lines.append(line)
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    args = parser.parse_args()
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "results": run(args.quick),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    for line in compare(report["results"], baseline):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
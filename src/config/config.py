@@ -1,20 +1,110 @@
 import os
-from dotenv import load_dotenv
 
-# .env 파일 load
-load_dotenv()
+
+def _find_dotenv():
+    """The first .env from here up to the root, where load_dotenv() looks."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# .env 파일 load: 파일이 있을 때만 python-dotenv 를 가져옴 (시작 시간 절약)
+_dotenv_path = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+
+    load_dotenv(_dotenv_path)
 
 
 class Config:
     VAULT_URL = os.getenv("VAULT_URL", "http://localhost:8200")
     VAULT_TOKEN = os.getenv("VAULT_TOKEN")
     VAULT_SECRET_PATH = os.getenv("VAULT_SECRET_PATH", "secret/data/server-info")
+    # 비밀 백엔드 ("vault" | "file": SECRET_FILE 의 JSON) 와 캐시 유지 시간 (초)
+    SECRET_BACKEND = os.getenv("SSH_SECRET_BACKEND", "vault")
+    SECRET_FILE = os.getenv("SSH_SECRET_FILE", "secrets.json")
+    SECRET_CACHE_TTL = float(os.getenv("SSH_SECRET_CACHE_TTL", "300"))
+
+    # 셸 세션 녹화 디렉터리 (src.session.recording), 비어 있으면 녹화하지 않음
+    RECORDING_DIR = os.getenv("SSH_RECORDING_DIR")
+
+    # ssh_config 형식의 호스트 인벤토리 (src.config.inventory)
+    INVENTORY_PATH = os.getenv("SSH_INVENTORY")
 
-    SERVER_HOST = "monitor.kprolabs.space"
-    SERVER_PORT = 2024
+    # 로컬 테스트: SSH_SERVER_HOST=127.0.0.1 SSH_SERVER_PORT=2222 (src.benchmarks.loopback_server)
+    SERVER_HOST = os.getenv("SSH_SERVER_HOST", "monitor.kprolabs.space")
+    SERVER_PORT = int(os.getenv("SSH_SERVER_PORT", "2024"))
 
     SSH_CLIENT_VERSION = "SSH-2.0-PythonSSHClient_1.0"
 
+    # KEXINIT 에 광고하는 알고리즘 (선호 순서)
+    KEX_ALGORITHMS = [
+        "curve25519-sha256",
+        "curve25519-sha256@libssh.org",
+        "ecdh-sha2-nistp256",
+        "diffie-hellman-group14-sha256",
+    ]
+    SERVER_HOST_KEY_ALGORITHMS = [
+        "ssh-ed25519",
+        "ecdsa-sha2-nistp256",
+        "rsa-sha2-512",
+        "rsa-sha2-256",
+    ]
+    ENCRYPTION_ALGORITHMS = [
+        "chacha20-poly1305@openssh.com",
+        "aes128-gcm@openssh.com",
+        "aes256-gcm@openssh.com",
+        "aes128-ctr",
+        "aes192-ctr",
+        "aes256-ctr",
+    ]
+    MAC_ALGORITHMS = [
+        "hmac-sha2-256-etm@openssh.com",
+        "hmac-sha2-512-etm@openssh.com",
+        "hmac-sha2-256",
+        "hmac-sha2-512",
+    ]
+    COMPRESSION_ALGORITHMS = ["zlib@openssh.com", "zlib", "none"]
+    # 압축 사용 ("no" | "yes" | "adaptive": 압축이 안 되는 데이터는 자동으로 건너뜀)
+    COMPRESSION = os.getenv("SSH_COMPRESSION", "no")
+
+    # 자동 재키 교환 (RFC 4253 9): 한 방향이 현재 키로 이만큼 보내거나 받았거나
+    # 키가 이 시간 (초) 을 넘기면 새 키 교환 시작, 0 이면 해당 조건 없음
+    REKEY_BYTES = int(os.getenv("SSH_REKEY_BYTES", str(1 << 30)))
+    # 시퀀스 번호 (uint32) 가 한 바퀴 돌기 전에 교체 (RFC 4344 3.1)
+    REKEY_PACKETS = int(os.getenv("SSH_REKEY_PACKETS", str(1 << 31)))
+    REKEY_INTERVAL = float(os.getenv("SSH_REKEY_INTERVAL", "3600"))
+
+    # 로그 ("DEBUG" 이면 패킷 덤프 포함)
+    LOG_LEVEL = os.getenv("SSH_LOG_LEVEL", "INFO").upper()
+    LOG_FILE = os.getenv("SSH_LOG_FILE", "ssh_client.log")
+    # 패킷 덤프는 앞부분만, N 번에 한 번만 기록
+    LOG_PAYLOAD_BYTES = int(os.getenv("SSH_LOG_PAYLOAD_BYTES", "64"))
+    LOG_PAYLOAD_SAMPLE = max(1, int(os.getenv("SSH_LOG_PAYLOAD_SAMPLE", "1")))
+
+    # 송신 합치기: 작은 패킷을 모아 한 번의 sendmsg 로 전송 (바이트 / 초)
+    SEND_COALESCE_BYTES = 64 * 1024
+    SEND_COALESCE_DELAY = 0.002
+    TCP_NODELAY = True
+    # 0 이면 커널 기본값 (자동 튜닝) 사용
+    SOCKET_SEND_BUFFER = int(os.getenv("SSH_SO_SNDBUF", "0"))
+    SOCKET_RECEIVE_BUFFER = int(os.getenv("SSH_SO_RCVBUF", "0"))
+
+    # 호스트 키 확인 ("strict" | "accept-new" | "ignore")
+    KNOWN_HOSTS_PATH = os.getenv(
+        "SSH_KNOWN_HOSTS", os.path.expanduser("~/.ssh/known_hosts")
+    )
+    HOST_KEY_CACHE_PATH = os.getenv(
+        "SSH_HOST_KEY_CACHE", os.path.expanduser("~/.cache/ssh-client/host_keys.json")
+    )
+    HOST_KEY_POLICY = os.getenv("SSH_HOST_KEY_POLICY", "accept-new")
+
     @classmethod
     def get_vault_url(cls):
         return cls.VAULT_URL
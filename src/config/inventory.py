@@ -0,0 +1,155 @@
+# src/config/inventory.py
+# ssh_config 형식의 호스트 인벤토리 (Host 패턴 블록, 먼저 나온 값 우선)
+
+import fnmatch
+import os
+import re
+
+DEFAULT_PORT = 22
+# 여러 번 지정하면 누적되는 키워드 (ssh_config 와 동일)
+CUMULATIVE_KEYWORDS = {"identityfile"}
+# 값이 비밀 참조 ("path#key") 인 키워드; 팬아웃 전에 한꺼번에 미리 가져옴
+SECRET_KEYWORDS = ("passwordsecret", "passphrasesecret")
+
+_LINE = re.compile(r"\s*(\S+?)\s*(?:=\s*|\s+)(.*?)\s*$")
+
+
+class _HostBlock:
+    def __init__(self, patterns):
+        self.positive = [p.lower() for p in patterns if not p.startswith("!")]
+        self.negative = [p[1:].lower() for p in patterns if p.startswith("!")]
+        self.options = []
+
+    @property
+    def literal(self):
+        """True when the block names hosts exactly (no wildcards or negations)."""
+        return not self.negative and not any(
+            c in pattern for pattern in self.positive for c in "*?["
+        )
+
+    def matches(self, host):
+        if any(fnmatch.fnmatchcase(host, p) for p in self.negative):
+            return False
+        return any(fnmatch.fnmatchcase(host, p) for p in self.positive)
+
+
+class HostConfig:
+    """Options that apply to one host alias, after merging every matching block."""
+
+    def __init__(self, alias, options):
+        self.alias = alias
+        self.options = options
+
+    def get(self, keyword, default=None):
+        return self.options.get(keyword.lower(), default)
+
+    @property
+    def hostname(self):
+        return self.get("hostname", self.alias).replace("%h", self.alias)
+
+    @property
+    def port(self):
+        return int(self.get("port", DEFAULT_PORT))
+
+    @property
+    def user(self):
+        return self.get("user")
+
+    @property
+    def identity_files(self):
+        return [os.path.expanduser(path) for path in self.get("identityfile", [])]
+
+    @property
+    def secret_references(self):
+        return [self.options[k] for k in SECRET_KEYWORDS if k in self.options]
+
+    def __repr__(self):
+        return f"HostConfig({self.alias} -> {self.hostname}:{self.port})"
+
+
+class Inventory:
+    """
+    Fleet inventory in ssh_config syntax.
+
+    ``Host`` lines take several patterns (``*``, ``?``, ``!negation``);
+    options before the first ``Host`` apply to every host. As in ssh_config
+    the first value obtained for a keyword wins, so specific blocks go
+    before general ones. Blocks that name hosts literally are indexed by
+    name and only wildcard blocks are scanned, so a lookup does not walk
+    the whole file; results are cached per alias.
+    """
+
+    def __init__(self, text=""):
+        self.blocks = []
+        self._exact = {}
+        self._wildcard = []
+        self._cache = {}
+        self._parse(text)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.expanduser(path)) as f:
+            return cls(f.read())
+
+    def _parse(self, text):
+        block = _HostBlock(["*"])
+        self.blocks.append(block)
+        for number, raw in enumerate(text.splitlines(), 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            match = _LINE.match(line)
+            if not match or not match.group(2):
+                raise ValueError(f"Line {number}: expected 'Keyword value': {raw!r}")
+            keyword, value = match.group(1).lower(), match.group(2)
+            if keyword == "host":
+                block = _HostBlock(value.split())
+                self.blocks.append(block)
+            elif keyword == "match":
+                raise ValueError(f"Line {number}: Match blocks are not supported")
+            else:
+                block.options.append((keyword, value.strip('"')))
+
+        for index, block in enumerate(self.blocks):
+            if block.literal:
+                for name in block.positive:
+                    self._exact.setdefault(name, []).append(index)
+            else:
+                self._wildcard.append(index)
+
+    def lookup(self, alias):
+        """HostConfig for ``alias``; unknown hosts get only the wildcard options."""
+        key = alias.lower()
+        config = self._cache.get(key)
+        if config is None:
+            indexes = self._exact.get(key, []) + [
+                index for index in self._wildcard if self.blocks[index].matches(key)
+            ]
+            options = {}
+            for index in sorted(indexes):
+                for keyword, value in self.blocks[index].options:
+                    if keyword in CUMULATIVE_KEYWORDS:
+                        options.setdefault(keyword, []).append(value)
+                    else:
+                        options.setdefault(keyword, value)
+            config = self._cache[key] = HostConfig(alias, options)
+        return config
+
+    def hosts(self, patterns=None):
+        """
+        Host aliases named literally in the inventory, in file order.
+
+        ``patterns`` (e.g. ``["web-*", "!web-3"]``) narrows the selection
+        the same way a Host line would.
+        """
+        selector = _HostBlock(patterns or ["*"])
+        return [name for name in self._exact if selector.matches(name)]
+
+    def secret_references(self, aliases):
+        """Distinct secret references used by ``aliases``, for one prefetch."""
+        references = dict.fromkeys(
+            reference
+            for alias in aliases
+            for reference in self.lookup(alias).secret_references
+        )
+        return list(references)
@@ -0,0 +1,176 @@
+# src/config/secrets.py
+# 비밀 조회: 교체 가능한 백엔드 (Vault / 로컬 JSON) + TTL 캐시 + 일괄 선조회
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.config.config import Config
+from src.utils.logger import Logger
+
+
+class SecretError(LookupError):
+    pass
+
+
+def parse_reference(reference):
+    """Split ``"path#key"`` into (path, key); key is None for the whole secret."""
+    path, _, key = reference.partition("#")
+    return path, key or None
+
+
+class FileSecretBackend:
+    """
+    Secrets from a local JSON file ``{"path": {"key": "value"}}``.
+
+    Stand-in for Vault in tests and local runs. The file is re-read on
+    every fetch, so edits show up once cached entries expire.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self, paths):
+        """Return ``{path: data}`` for the paths that exist."""
+        with open(self.path) as f:
+            secrets = json.load(f)
+        return {path: secrets[path] for path in paths if path in secrets}
+
+
+class VaultSecretBackend:
+    """
+    HashiCorp Vault over its HTTP API (KV v1 and v2 reads).
+
+    Vault has no multi-read endpoint, so a batch is read with up to
+    ``max_workers`` requests in flight.
+    """
+
+    def __init__(self, url, token, max_workers=8, timeout=10.0):
+        self.logger = Logger.get_logger(__name__)
+        self.url = url.rstrip("/")
+        self.token = token
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def _read(self, path):
+        request = urllib.request.Request(f"{self.url}/v1/{path.lstrip('/')}")
+        if self.token:
+            request.add_header("X-Vault-Token", self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise ConnectionError(f"Vault read of {path} failed: HTTP {e.code}") from e
+        except (OSError, ValueError) as e:
+            raise ConnectionError(f"Vault read of {path} failed: {e}") from e
+        data = body.get("data") or {}
+        # KV v2 는 실제 값을 data.data 아래에 둠
+        if "metadata" in data and isinstance(data.get("data"), dict):
+            data = data["data"]
+        return data
+
+    def fetch(self, paths):
+        paths = list(paths)
+        if len(paths) == 1:
+            results = [self._read(paths[0])]
+        else:
+            with ThreadPoolExecutor(min(self.max_workers, len(paths))) as pool:
+                results = list(pool.map(self._read, paths))
+        self.logger.debug(f"Fetched {len(paths)} secrets from Vault")
+        return {path: data for path, data in zip(paths, results) if data is not None}
+
+
+def create_secret_backend():
+    """Backend selected by Config.SECRET_BACKEND ("vault" or "file")."""
+    if Config.SECRET_BACKEND == "file":
+        return FileSecretBackend(Config.SECRET_FILE)
+    if Config.SECRET_BACKEND == "vault":
+        return VaultSecretBackend(Config.get_vault_url(), Config.get_vault_token())
+    raise ValueError(f"Unknown secret backend: {Config.SECRET_BACKEND}")
+
+
+class SecretCache:
+    """
+    TTL cache in front of a secret backend.
+
+    ``prefetch`` fetches every missing or expired path in one backend
+    batch, so a fan-out to many hosts sharing a few secrets costs one round
+    of requests instead of one per connection. Concurrent lookups of a path
+    that is already being fetched wait for that fetch instead of issuing
+    their own.
+    """
+
+    def __init__(self, backend, ttl=None, clock=time.monotonic):
+        self.backend = backend
+        self.ttl = Config.SECRET_CACHE_TTL if ttl is None else ttl
+        self.clock = clock
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, reference):
+        """Value for ``"path#key"``, or the whole secret (a dict) for ``"path"``."""
+        path, key = parse_reference(reference)
+        data = self._get_many([path])[path]
+        if key is None:
+            return data
+        if key not in data:
+            raise SecretError(f"Secret {path} has no key {key}")
+        return data[key]
+
+    def prefetch(self, references):
+        """Load every referenced secret into the cache with one backend batch."""
+        paths = dict.fromkeys(parse_reference(r)[0] for r in references)
+        if paths:
+            self._get_many(list(paths))
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def _get_many(self, paths):
+        results, waiting, missing = {}, {}, []
+        now = self.clock()
+        with self._lock:
+            for path in paths:
+                entry = self._entries.get(path)
+                if entry is not None and entry[0] > now:
+                    results[path] = entry[1]
+                elif path in self._inflight:
+                    waiting[path] = self._inflight[path]
+                else:
+                    self._inflight[path] = Future()
+                    missing.append(path)
+
+        if missing:
+            try:
+                fetched = self.backend.fetch(missing)
+            except BaseException as e:
+                with self._lock:
+                    for path in missing:
+                        self._inflight.pop(path).set_exception(e)
+                raise
+            expires = self.clock() + self.ttl
+            with self._lock:
+                for path in missing:
+                    future = self._inflight.pop(path)
+                    if path in fetched:
+                        self._entries[path] = (expires, fetched[path])
+                        future.set_result(fetched[path])
+                        results[path] = fetched[path]
+                    else:
+                        future.set_exception(SecretError(f"Secret not found: {path}"))
+
+        for path, future in waiting.items():
+            results[path] = future.result()
+        for path in paths:
+            if path not in results:
+                raise SecretError(f"Secret not found: {path}")
+        return results
@@ -0,0 +1,291 @@
+# src/crypto/cipher_suites.py
+
+import hashlib
+import hmac
+import struct
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.poly1305 import Poly1305
+
+
+def _seal_each(cipher, sequence_number, view, spans):
+    return [
+        cipher.seal((sequence_number + i) & 0xFFFFFFFF, view[start:end])
+        for i, (start, end) in enumerate(spans)
+    ]
+
+
+class PlainCipher:
+    """'none' 암호화: 초기 키 교환 전 평문 패킷용."""
+
+    name = "none"
+    block_size = 8
+    tag_length = 0
+    length_in_clear = False
+
+    def seal(self, sequence_number, packet):
+        return b""
+
+    def seal_many(self, sequence_number, view, spans):
+        return [b""] * len(spans)
+
+    def open_length(self, sequence_number, first_block):
+        return struct.unpack_from(">I", first_block)[0]
+
+    def open(self, sequence_number, packet, tag):
+        pass
+
+
+class HmacKey:
+    """HMAC with the key schedule done once; each packet works on a ``copy()``."""
+
+    def __init__(self, suite, key):
+        self.suite = suite
+        self.length = suite.length
+        self._template = hmac.new(key, digestmod=suite.digestmod)
+
+    def sign(self, sequence_number, *parts):
+        mac = self._template.copy()
+        mac.update(struct.pack(">I", sequence_number & 0xFFFFFFFF))
+        for part in parts:
+            mac.update(part)
+        return mac.digest()
+
+    def verify(self, sequence_number, tag, *parts):
+        if not hmac.compare_digest(self.sign(sequence_number, *parts), tag):
+            raise ValueError("MAC verification failed")
+
+
+class CtrCipher:
+    """
+    AES-CTR with a separate HMAC.
+
+    The classic mode MACs the plaintext (RFC 4253 6.4); with an
+    ``-etm@openssh.com`` MAC the length stays in clear and the MAC covers
+    the ciphertext, so a packet is authenticated before it is decrypted.
+    """
+
+    block_size = 16
+
+    def __init__(self, name, key, iv, mac, encrypt):
+        if mac is None:
+            mac_length, etm = 0, False
+        else:
+            mac_length, etm = mac.length, mac.suite.etm
+        self.name = name
+        self.mac = mac
+        self.tag_length = mac_length
+        self.length_in_clear = etm
+        cipher = Cipher(algorithms.AES(key), modes.CTR(iv), backend=default_backend())
+        self._context = cipher.encryptor() if encrypt else cipher.decryptor()
+
+    def seal(self, sequence_number, packet):
+        if self.length_in_clear:
+            body = packet[4:]
+            self._context.update_into(body, body)
+            return self.mac.sign(sequence_number, packet)
+
+        tag = self.mac.sign(sequence_number, packet) if self.mac else b""
+        self._context.update_into(packet, packet)
+        return tag
+
+    def seal_many(self, sequence_number, view, spans):
+        if self.length_in_clear:
+            return _seal_each(self, sequence_number, view, spans)
+
+        # 평문 MAC 모드에서는 패킷들이 버퍼에 연속으로 놓여 있으므로 한 번에 암호화
+        tags = [
+            self.mac.sign(sequence_number + i, view[start:end]) if self.mac else b""
+            for i, (start, end) in enumerate(spans)
+        ]
+        if spans:
+            region = view[spans[0][0] : spans[-1][1]]
+            self._context.update_into(region, region)
+        return tags
+
+    def open_length(self, sequence_number, first_block):
+        if not self.length_in_clear:
+            self._context.update_into(first_block, first_block)
+        return struct.unpack_from(">I", first_block)[0]
+
+    def open(self, sequence_number, packet, tag):
+        if self.length_in_clear:
+            self.mac.verify(sequence_number, tag, packet)
+            body = packet[4:]
+            self._context.update_into(body, body)
+            return
+
+        rest = packet[self.block_size :]
+        self._context.update_into(rest, rest)
+        if self.mac:
+            self.mac.verify(sequence_number, tag, packet)
+
+
+class AesGcmCipher:
+    """aes{128,256}-gcm@openssh.com (RFC 5647 with the OpenSSH naming)."""
+
+    block_size = 16
+    tag_length = 16
+    length_in_clear = True
+
+    def __init__(self, name, key, iv, mac, encrypt):
+        self.name = name
+        self._aead = AESGCM(key)
+        self._fixed = iv[:4]
+        self._invocation_counter = int.from_bytes(iv[4:12], "big")
+
+    def _next_nonce(self):
+        nonce = self._fixed + self._invocation_counter.to_bytes(8, "big")
+        self._invocation_counter = (self._invocation_counter + 1) & 0xFFFFFFFFFFFFFFFF
+        return nonce
+
+    def seal(self, sequence_number, packet):
+        sealed = self._aead.encrypt(self._next_nonce(), packet[4:], packet[:4])
+        packet[4:] = sealed[: -self.tag_length]
+        return sealed[-self.tag_length :]
+
+    def seal_many(self, sequence_number, view, spans):
+        return _seal_each(self, sequence_number, view, spans)
+
+    def open_length(self, sequence_number, first_block):
+        return struct.unpack_from(">I", first_block)[0]
+
+    def open(self, sequence_number, packet, tag):
+        try:
+            plaintext = self._aead.decrypt(
+                self._next_nonce(), bytes(packet[4:]) + bytes(tag), packet[:4]
+            )
+        except InvalidTag:
+            raise ValueError("MAC verification failed")
+        packet[4:] = plaintext
+
+
+class ChaCha20Poly1305Cipher:
+    """
+    chacha20-poly1305@openssh.com.
+
+    This is not the RFC 8439 AEAD: the length is encrypted with its own key,
+    the nonce is the sequence number and Poly1305 covers the ciphertext, so
+    it is built from the raw ChaCha20 and Poly1305 primitives.
+    """
+
+    block_size = 8
+    tag_length = 16
+    length_in_clear = True
+
+    def __init__(self, name, key, iv, mac, encrypt):
+        self.name = name
+        self._main_key = key[:32]
+        self._header_key = key[32:64]
+        self._encrypted_length = None
+
+    def _stream(self, key, sequence_number):
+        nonce = b"\x00" * 8 + struct.pack(">Q", sequence_number)
+        return Cipher(
+            algorithms.ChaCha20(key, nonce), mode=None, backend=default_backend()
+        ).encryptor()
+
+    def _main_stream(self, sequence_number):
+        """Return (keystream positioned at block 1, Poly1305 keyed from block 0)."""
+        stream = self._stream(self._main_key, sequence_number)
+        poly_key = stream.update(b"\x00" * 64)[:32]
+        return stream, Poly1305(poly_key)
+
+    def seal(self, sequence_number, packet):
+        header = packet[:4]
+        self._stream(self._header_key, sequence_number).update_into(header, header)
+        stream, poly = self._main_stream(sequence_number)
+        body = packet[4:]
+        stream.update_into(body, body)
+        poly.update(packet)
+        return poly.finalize()
+
+    def seal_many(self, sequence_number, view, spans):
+        return _seal_each(self, sequence_number, view, spans)
+
+    def open_length(self, sequence_number, first_block):
+        header = first_block[:4]
+        self._encrypted_length = bytes(header)
+        self._stream(self._header_key, sequence_number).update_into(header, header)
+        return struct.unpack_from(">I", header)[0]
+
+    def open(self, sequence_number, packet, tag):
+        stream, poly = self._main_stream(sequence_number)
+        body = packet[4:]
+        poly.update(self._encrypted_length)
+        poly.update(body)
+        try:
+            poly.verify(bytes(tag))
+        except InvalidSignature:
+            raise ValueError("MAC verification failed")
+        stream.update_into(body, body)
+
+
+class CipherSuite:
+    def __init__(self, name, factory, key_size, iv_size, aead=False):
+        self.name = name
+        self.factory = factory
+        self.key_size = key_size
+        self.iv_size = iv_size
+        # AEAD 는 자체 태그를 쓰므로 MAC 협상 결과를 사용하지 않음
+        self.aead = aead
+
+
+class MacSuite:
+    def __init__(self, name, digestmod, etm=False):
+        self.name = name
+        self.digestmod = digestmod
+        self.etm = etm
+        self.key_size = self.length = digestmod().digest_size
+
+
+CIPHER_SUITES = {
+    suite.name: suite
+    for suite in (
+        CipherSuite("chacha20-poly1305@openssh.com", ChaCha20Poly1305Cipher, 64, 0, True),
+        CipherSuite("aes128-gcm@openssh.com", AesGcmCipher, 16, 12, True),
+        CipherSuite("aes256-gcm@openssh.com", AesGcmCipher, 32, 12, True),
+        CipherSuite("aes128-ctr", CtrCipher, 16, 16),
+        CipherSuite("aes192-ctr", CtrCipher, 24, 16),
+        CipherSuite("aes256-ctr", CtrCipher, 32, 16),
+    )
+}
+
+MAC_SUITES = {
+    suite.name: suite
+    for suite in (
+        MacSuite("hmac-sha2-256-etm@openssh.com", hashlib.sha256, etm=True),
+        MacSuite("hmac-sha2-512-etm@openssh.com", hashlib.sha512, etm=True),
+        MacSuite("hmac-sha2-256", hashlib.sha256),
+        MacSuite("hmac-sha2-512", hashlib.sha512),
+    )
+}
+
+
+def get_cipher_suite(name):
+    try:
+        return CIPHER_SUITES[name]
+    except KeyError:
+        raise ValueError(f"Unsupported cipher: {name}")
+
+
+def get_mac_suite(name):
+    try:
+        return MAC_SUITES[name]
+    except KeyError:
+        raise ValueError(f"Unsupported MAC: {name}")
+
+
+def create_packet_cipher(cipher_name, key, iv, mac_name=None, mac_key=None, encrypt=True):
+    """
+    Build the per-direction packet cipher for a negotiated algorithm pair.
+
+    :param encrypt: True for the outgoing direction, False for incoming
+    """
+    suite = get_cipher_suite(cipher_name)
+    mac = None
+    if mac_name and not suite.aead:
+        mac = HmacKey(get_mac_suite(mac_name), mac_key)
+    return suite.factory(cipher_name, key, iv, mac, encrypt)
@@ -1,12 +1,4 @@
-import sys
-import os
-
-# 현재 스크립트의 디렉토리를 얻습니다
-current_dir = os.path.dirname(os.path.abspath(__file__))
-# 프로젝트 루트 디렉토리를 sys.path에 추가합니다
-sys.path.insert(0, os.path.dirname(current_dir))
-
-from utils.logger import Logger
+from src.utils.logger import Logger
 
 
 class CryptoManager:
@@ -26,6 +18,3 @@ class CryptoManager:
         self.logger.debug("Decrypting data")
         # Implement decryption logic here
         pass
-
-
-print(CryptoManager().some_method())
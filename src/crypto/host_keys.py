@@ -0,0 +1,285 @@
+# src/crypto/host_keys.py
+# 호스트 키 파싱/서명 검증과 known_hosts 확인 (메모리 + 디스크 캐시)
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+from src.network.message import MessageReader, pack_mpint, pack_string
+from src.utils.logger import Logger
+
+# 서명 알고리즘 -> 공개키 타입
+KEY_TYPES = {
+    "ssh-ed25519": "ssh-ed25519",
+    "ecdsa-sha2-nistp256": "ecdsa-sha2-nistp256",
+    "rsa-sha2-256": "ssh-rsa",
+    "rsa-sha2-512": "ssh-rsa",
+}
+_RSA_HASHES = {"rsa-sha2-256": hashes.SHA256, "rsa-sha2-512": hashes.SHA512}
+
+
+class HostKeyError(ValueError):
+    pass
+
+
+def key_type_of(blob):
+    return MessageReader(blob).read_text()
+
+
+def load_public_key(blob):
+    """Parse an SSH public key blob into a cryptography public key."""
+    key_type = key_type_of(blob)
+    line = key_type.encode() + b" " + base64.b64encode(blob)
+    return serialization.load_ssh_public_key(line)
+
+
+def public_key_blob(key):
+    """SSH wire encoding of a public (or private) key."""
+    if hasattr(key, "public_key"):
+        key = key.public_key()
+    line = key.public_bytes(
+        serialization.Encoding.OpenSSH, serialization.PublicFormat.OpenSSH
+    )
+    return base64.b64decode(line.split()[1])
+
+
+def fingerprint(blob):
+    digest = base64.b64encode(hashlib.sha256(blob).digest()).rstrip(b"=")
+    return "SHA256:" + digest.decode()
+
+
+def verify_signature(key_blob, signature_blob, data, algorithm=None):
+    """Verify an SSH signature blob over ``data``; raises HostKeyError."""
+    reader = MessageReader(signature_blob)
+    signature_algorithm = reader.read_text()
+    signature = reader.read_string()
+    if algorithm and signature_algorithm != algorithm:
+        raise HostKeyError(
+            f"Signature algorithm {signature_algorithm} does not match {algorithm}"
+        )
+    if KEY_TYPES.get(signature_algorithm) != key_type_of(key_blob):
+        raise HostKeyError(f"Unsupported signature algorithm: {signature_algorithm}")
+
+    key = load_public_key(key_blob)
+    try:
+        if signature_algorithm == "ssh-ed25519":
+            key.verify(signature, data)
+        elif signature_algorithm == "ecdsa-sha2-nistp256":
+            numbers = MessageReader(signature)
+            r, s = numbers.read_mpint(), numbers.read_mpint()
+            key.verify(encode_dss_signature(r, s), data, ec.ECDSA(hashes.SHA256()))
+        else:
+            key.verify(
+                signature, data, padding.PKCS1v15(), _RSA_HASHES[signature_algorithm]()
+            )
+    except InvalidSignature:
+        raise HostKeyError("Signature verification failed")
+
+
+def sign(private_key, algorithm, data):
+    """Create an SSH signature blob with ``private_key`` using ``algorithm``."""
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        signature = private_key.sign(data)
+    elif isinstance(private_key, ec.EllipticCurvePrivateKey):
+        r, s = decode_dss_signature(private_key.sign(data, ec.ECDSA(hashes.SHA256())))
+        signature = pack_mpint(r) + pack_mpint(s)
+    elif isinstance(private_key, rsa.RSAPrivateKey):
+        signature = private_key.sign(data, padding.PKCS1v15(), _RSA_HASHES[algorithm]())
+    else:
+        raise ValueError(f"Unsupported key type: {type(private_key).__name__}")
+    return pack_string(algorithm) + pack_string(signature)
+
+
+def signature_algorithms_for(key):
+    """SSH signature algorithms usable with a private or public key."""
+    blob_type = key_type_of(public_key_blob(key))
+    return [name for name, key_type in KEY_TYPES.items() if key_type == blob_type]
+
+
+def _host_pattern(host, port):
+    return host if port == 22 else f"[{host}]:{port}"
+
+
+def _wildcard(pattern):
+    # known_hosts 패턴은 * 와 ? 만 특수 문자 ("[host]:port" 의 대괄호는 문자 그대로)
+    regex = re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".")
+    return re.compile(regex + r"\Z", re.IGNORECASE)
+
+
+def _matches(patterns, host_pattern):
+    if patterns.startswith("|1|"):
+        _, _, salt, digest = patterns.split("|")
+        expected = hmac.new(
+            base64.b64decode(salt), host_pattern.encode(), hashlib.sha1
+        ).digest()
+        return hmac.compare_digest(expected, base64.b64decode(digest))
+
+    matched = False
+    for pattern in patterns.split(","):
+        negated = pattern.startswith("!")
+        if _wildcard(pattern.lstrip("!")).match(host_pattern):
+            if negated:
+                return False
+            matched = True
+    return matched
+
+
+class KnownHosts:
+    """Reader/appender for an OpenSSH known_hosts file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def lookup(self, host, port):
+        """Return (keys, revoked): key blobs listed for the host, revoked blobs."""
+        host_pattern = _host_pattern(host, port)
+        keys, revoked = [], []
+        try:
+            with open(self.path) as known_hosts:
+                for line in known_hosts:
+                    fields = line.split()
+                    if not fields or fields[0].startswith("#"):
+                        continue
+                    marker = None
+                    if fields[0].startswith("@"):
+                        marker, fields = fields[0], fields[1:]
+                    if len(fields) < 3 or marker == "@cert-authority":
+                        continue
+                    if not _matches(fields[0], host_pattern):
+                        continue
+                    try:
+                        blob = base64.b64decode(fields[2])
+                    except ValueError:
+                        continue
+                    (revoked if marker == "@revoked" else keys).append(blob)
+        except FileNotFoundError:
+            pass
+        return keys, revoked
+
+    def add(self, host, port, blob):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as known_hosts:
+            known_hosts.write(
+                f"{_host_pattern(host, port)} {key_type_of(blob)} "
+                f"{base64.b64encode(blob).decode()}\n"
+            )
+
+
+class HostKeyVerifier:
+    """
+    Decide whether a server host key is trusted.
+
+    Keys already verified against known_hosts are remembered in memory (per
+    process) and in a small JSON cache on disk, both tied to the
+    known_hosts mtime/size, so repeated connects to the same hosts skip
+    re-reading and re-hashing a large known_hosts file.
+
+    ``policy``: "strict" rejects unknown hosts, "accept-new" records them in
+    known_hosts, "ignore" trusts every key (tests/lab only).
+    """
+
+    _memory_cache = {}
+
+    def __init__(self, known_hosts_path, cache_path=None, policy="accept-new"):
+        self.logger = Logger.get_logger(__name__)
+        self.known_hosts = KnownHosts(known_hosts_path)
+        self.cache_path = cache_path
+        self.policy = policy
+
+    def known_key_types(self, host, port):
+        """Key types already trusted for the host, to prefer in the KEXINIT."""
+        hosts = self._cache()["hosts"]
+        return [
+            key_type_of(base64.b64decode(encoded))
+            for encoded in hosts.get(_host_pattern(host, port), [])
+        ]
+
+    def verify(self, host, port, blob):
+        if self.policy == "ignore":
+            return True
+
+        pattern = _host_pattern(host, port)
+        encoded = base64.b64encode(blob).decode()
+        cache = self._cache()
+        if encoded in cache["hosts"].get(pattern, []):
+            return True
+
+        keys, revoked = self.known_hosts.lookup(host, port)
+        if blob in revoked:
+            raise HostKeyError(f"Host key for {host}:{port} is revoked")
+        if blob not in keys:
+            key_type = key_type_of(blob)
+            if any(key_type_of(known) == key_type for known in keys):
+                raise HostKeyError(
+                    f"Host key for {host}:{port} has changed ({fingerprint(blob)})"
+                )
+            if self.policy != "accept-new":
+                raise HostKeyError(
+                    f"Unknown host key for {host}:{port} ({fingerprint(blob)})"
+                )
+            self.logger.warning(f"Adding new host key for {pattern}: {fingerprint(blob)}")
+            self.known_hosts.add(host, port, blob)
+            # 줄을 추가만 했으므로 기존 캐시 내용은 여전히 유효
+            cache["stamp"] = self.known_hosts.stamp()
+
+        cache["hosts"].setdefault(pattern, []).append(encoded)
+        self._save(cache)
+        return True
+
+    def _cache(self):
+        """The cache valid for the current known_hosts, loading it from disk once."""
+        path = self.known_hosts.path
+        stamp = self.known_hosts.stamp()
+        cache = self._memory_cache.get(path)
+        if cache is not None and cache["stamp"] == stamp:
+            return cache
+
+        cache = self._load()
+        if cache is None or cache["stamp"] != stamp:
+            cache = {"known_hosts": path, "stamp": stamp, "hosts": {}}
+        self._memory_cache[path] = cache
+        return cache
+
+    def _load(self):
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path) as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if cache.get("known_hosts") != self.known_hosts.path:
+            return None
+        return cache
+
+    def _save(self, cache):
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w") as cache_file:
+                json.dump(cache, cache_file)
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not write host key cache: {e}")
@@ -0,0 +1,460 @@
+# src/crypto/key_exchange.py
+# RFC 4253 7-8절 키 교환 상태 머신 (curve25519 / ecdh-nistp256 / dh-group14)
+
+import hashlib
+import os
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, x25519
+from src.config.config import Config
+from src.crypto.cipher_suites import get_cipher_suite, get_mac_suite
+from src.crypto.host_keys import (
+    KEY_TYPES,
+    public_key_blob,
+    sign,
+    signature_algorithms_for,
+    verify_signature,
+)
+from src.network.message import (
+    MessageReader,
+    SSH_MSG_DEBUG,
+    SSH_MSG_IGNORE,
+    SSH_MSG_KEXINIT,
+    SSH_MSG_NEWKEYS,
+    pack_byte,
+    pack_mpint,
+    pack_string,
+)
+from src.utils.logger import Logger
+
+SSH_MSG_KEX_ECDH_INIT = 30
+SSH_MSG_KEX_ECDH_REPLY = 31
+
+# RFC 3526 2048-bit MODP group 14
+GROUP14_PRIME = int(
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22"
+    "514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6"
+    "F44C42E9A637ED6B0BFF5CB6F406B7EDEE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3D"
+    "C2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB"
+    "9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3BE39E772C180E8603"
+    "9B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA0510"
+    "15728E5A8AACAA68FFFFFFFFFFFFFFFF",
+    16,
+)
+GROUP14_GENERATOR = 2
+
+# Terrapin 대응 (OpenSSH strict KEX)
+STRICT_KEX_CLIENT = "kex-strict-c-v00@openssh.com"
+STRICT_KEX_SERVER = "kex-strict-s-v00@openssh.com"
+
+
+class Curve25519Exchange:
+    """curve25519-sha256 (RFC 8731)."""
+
+    hash = hashlib.sha256
+
+    def __init__(self):
+        self._private_key = x25519.X25519PrivateKey.generate()
+        self.public = self._private_key.public_key().public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+
+    def encode_public(self, value):
+        return pack_string(value)
+
+    def read_public(self, reader):
+        return reader.read_string()
+
+    def shared_secret(self, peer_public):
+        if len(peer_public) != 32:
+            raise ValueError("Invalid curve25519 public key")
+        shared = self._private_key.exchange(
+            x25519.X25519PublicKey.from_public_bytes(peer_public)
+        )
+        if not any(shared):
+            raise ValueError("Invalid curve25519 shared secret")
+        return int.from_bytes(shared, "big")
+
+
+class EcdhNistp256Exchange:
+    """ecdh-sha2-nistp256 (RFC 5656)."""
+
+    hash = hashlib.sha256
+
+    def __init__(self):
+        self._private_key = ec.generate_private_key(ec.SECP256R1())
+        self.public = self._private_key.public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+        )
+
+    def encode_public(self, value):
+        return pack_string(value)
+
+    def read_public(self, reader):
+        return reader.read_string()
+
+    def shared_secret(self, peer_public):
+        peer = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), peer_public)
+        return int.from_bytes(self._private_key.exchange(ec.ECDH(), peer), "big")
+
+
+class Group14Exchange:
+    """diffie-hellman-group14-sha256 (RFC 8268)."""
+
+    hash = hashlib.sha256
+
+    def __init__(self):
+        # 2048-bit 그룹에는 512-bit 지수면 충분 (RFC 8268 권고 이상)
+        self._exponent = int.from_bytes(os.urandom(64), "big") | 1 << 511
+        self.public = pow(GROUP14_GENERATOR, self._exponent, GROUP14_PRIME)
+
+    def encode_public(self, value):
+        return pack_mpint(value)
+
+    def read_public(self, reader):
+        return reader.read_mpint()
+
+    def shared_secret(self, peer_public):
+        if not 1 < peer_public < GROUP14_PRIME - 1:
+            raise ValueError("Invalid DH public value")
+        return pow(peer_public, self._exponent, GROUP14_PRIME)
+
+
+KEX_METHODS = {
+    "curve25519-sha256": Curve25519Exchange,
+    "curve25519-sha256@libssh.org": Curve25519Exchange,
+    "ecdh-sha2-nistp256": EcdhNistp256Exchange,
+    "diffie-hellman-group14-sha256": Group14Exchange,
+}
+
+
+class NegotiatedAlgorithms:
+    def __init__(self, client, server):
+        """``client``/``server`` are the parsed KEXINIT name-list tuples."""
+        self.kex = _choose(client[0], server[0], "key exchange")
+        self.host_key = _choose(client[1], server[1], "host key")
+        self.cipher_client_to_server = _choose(client[2], server[2], "cipher")
+        self.cipher_server_to_client = _choose(client[3], server[3], "cipher")
+        self.mac_client_to_server = self._mac(
+            self.cipher_client_to_server, client[4], server[4]
+        )
+        self.mac_server_to_client = self._mac(
+            self.cipher_server_to_client, client[5], server[5]
+        )
+        self.compression_client_to_server = _choose(client[6], server[6], "compression")
+        self.compression_server_to_client = _choose(client[7], server[7], "compression")
+
+    @staticmethod
+    def _mac(cipher, client, server):
+        if get_cipher_suite(cipher).aead:
+            return None
+        return _choose(client, server, "MAC")
+
+
+def _choose(client, server, kind):
+    for name in client:
+        if name in server:
+            return name
+    raise ConnectionError(
+        f"No common {kind} algorithm (client: {client}, server: {server})"
+    )
+
+
+def parse_kexinit(payload):
+    """Return (name-lists tuple, first_kex_packet_follows) of a KEXINIT payload."""
+    reader = MessageReader(payload, 17)
+    name_lists = tuple(reader.read_name_list() for _ in range(10))
+    return name_lists, reader.read_boolean()
+
+
+class KeyExchange:
+    """
+    Key exchange state machine, independent of the socket layer.
+
+    ``start()`` returns the KEXINIT to send; every received KEX message goes
+    to ``handle()``, which returns payloads to send in order. After those
+    are sent the caller calls ``outputs_sent()`` so the new outgoing keys
+    take effect right after NEWKEYS. ``complete`` turns true once the
+    peer's NEWKEYS has switched the incoming direction.
+
+    The same class runs the server side (``host_key`` set) for the
+    in-process test server. A rekey passes the first exchange's
+    ``session_id`` and ``strict`` flag: strict KEX keeps resetting the
+    sequence numbers at every NEWKEYS for the life of the connection.
+    """
+
+    def __init__(
+        self,
+        packet_manager,
+        client_version,
+        server_version,
+        host_key_verifier=None,
+        host=None,
+        port=None,
+        host_key=None,
+        session_id=None,
+        strict=False,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.packet_manager = packet_manager
+        self.client_version = client_version.strip()
+        self.server_version = server_version.strip()
+        self.host_key_verifier = host_key_verifier
+        self.host = host
+        self.port = port
+        self.host_key = host_key
+        self.is_server = host_key is not None
+        self.session_id = session_id
+        self.algorithms = None
+        self.server_host_key = None
+        self.local_kexinit = None
+        self.peer_kexinit = None
+        self.complete = False
+        self.strict = strict
+        self._initial = session_id is None
+        self._exchange = None
+        self._pending_outgoing = None
+        self._pending_incoming = None
+        self._ignore_guessed_packet = False
+
+    def start(self):
+        self.local_kexinit = self._create_kexinit()
+        return self.local_kexinit
+
+    def _create_kexinit(self):
+        if self.is_server:
+            kex = list(Config.KEX_ALGORITHMS)
+            host_keys = signature_algorithms_for(self.host_key)
+            strict = STRICT_KEX_SERVER
+        else:
+            kex = list(Config.KEX_ALGORITHMS)
+            host_keys = self._host_key_preference()
+            strict = STRICT_KEX_CLIENT
+        if self._initial:
+            kex.append(strict)
+        compression = Config.COMPRESSION_ALGORITHMS
+        if not self.is_server and Config.COMPRESSION == "no":
+            compression = ["none"]
+
+        return self.packet_manager.create_kexinit_payload(
+            os.urandom(16),
+            kex,
+            host_keys,
+            Config.ENCRYPTION_ALGORITHMS,
+            Config.ENCRYPTION_ALGORITHMS,
+            Config.MAC_ALGORITHMS,
+            Config.MAC_ALGORITHMS,
+            compression,
+            compression,
+            [],
+            [],
+        )
+
+    def _host_key_preference(self):
+        algorithms = list(Config.SERVER_HOST_KEY_ALGORITHMS)
+        if not self.host_key_verifier or self.host is None:
+            return algorithms
+        # 이미 신뢰하는 키 타입을 먼저 요청해 불필요한 "새 호스트 키" 처리를 피함
+        known = set(self.host_key_verifier.known_key_types(self.host, self.port))
+        return sorted(algorithms, key=lambda name: KEY_TYPES.get(name) not in known)
+
+    def handle(self, payload):
+        message_type = payload[0]
+        if message_type in (SSH_MSG_IGNORE, SSH_MSG_DEBUG) and not (
+            self.strict and self._initial
+        ):
+            return []
+        if message_type == SSH_MSG_KEXINIT:
+            return self._on_kexinit(payload)
+        if message_type == SSH_MSG_NEWKEYS:
+            self._on_newkeys()
+            return []
+        if self._ignore_guessed_packet:
+            self._ignore_guessed_packet = False
+            return []
+        if message_type == SSH_MSG_KEX_ECDH_INIT and self.is_server:
+            return self._on_init(payload)
+        if message_type == SSH_MSG_KEX_ECDH_REPLY and not self.is_server:
+            return self._on_reply(payload)
+        raise ConnectionError(f"Unexpected message {message_type} during key exchange")
+
+    def outputs_sent(self):
+        """Switch outgoing keys once NEWKEYS has gone out."""
+        if self._pending_outgoing:
+            self._pending_outgoing()
+            self._pending_outgoing = None
+            if self.strict:
+                self.packet_manager.sequence_number = 0
+
+    def _on_kexinit(self, payload):
+        self.peer_kexinit = bytes(payload)
+        outputs = []
+        if self.local_kexinit is None:
+            outputs.append(self.start())
+
+        local, _ = parse_kexinit(self.local_kexinit)
+        peer, guessed = parse_kexinit(self.peer_kexinit)
+        client, server = (peer, local) if self.is_server else (local, peer)
+        self.algorithms = NegotiatedAlgorithms(client, server)
+        if self._initial:
+            peer_strict = STRICT_KEX_CLIENT if self.is_server else STRICT_KEX_SERVER
+            self.strict = peer_strict in peer[0]
+            # strict KEX: 상대 KEXINIT 은 연결의 첫 패킷이어야 함 (Terrapin)
+            if self.strict and self.packet_manager.receive_sequence_number != 1:
+                raise ConnectionError("KEXINIT was not the first packet in strict KEX")
+        if guessed and (client[0][0] != server[0][0] or client[1][0] != server[1][0]):
+            self._ignore_guessed_packet = True
+
+        self._exchange = KEX_METHODS[self.algorithms.kex]()
+        self.logger.debug(f"Negotiated key exchange {self.algorithms.kex}")
+        if not self.is_server:
+            outputs.append(
+                pack_byte(SSH_MSG_KEX_ECDH_INIT)
+                + self._exchange.encode_public(self._exchange.public)
+            )
+        return outputs
+
+    def _on_reply(self, payload):
+        reader = MessageReader(payload, 1)
+        host_key_blob = reader.read_string()
+        server_public = self._exchange.read_public(reader)
+        signature = reader.read_string()
+
+        shared = self._exchange.shared_secret(server_public)
+        exchange_hash = self._exchange_hash(
+            host_key_blob, self._exchange.public, server_public, shared
+        )
+        verify_signature(
+            host_key_blob, signature, exchange_hash, self.algorithms.host_key
+        )
+        if self.host_key_verifier:
+            self.host_key_verifier.verify(self.host, self.port, host_key_blob)
+        self.server_host_key = host_key_blob
+        return self._finish(shared, exchange_hash)
+
+    def _on_init(self, payload):
+        client_public = self._exchange.read_public(MessageReader(payload, 1))
+        shared = self._exchange.shared_secret(client_public)
+        host_key_blob = public_key_blob(self.host_key)
+        exchange_hash = self._exchange_hash(
+            host_key_blob, client_public, self._exchange.public, shared
+        )
+        reply = (
+            pack_byte(SSH_MSG_KEX_ECDH_REPLY)
+            + pack_string(host_key_blob)
+            + self._exchange.encode_public(self._exchange.public)
+            + pack_string(sign(self.host_key, self.algorithms.host_key, exchange_hash))
+        )
+        return [reply] + self._finish(shared, exchange_hash)
+
+    def _exchange_hash(self, host_key_blob, client_public, server_public, shared):
+        encode = self._exchange.encode_public
+        client_kexinit, server_kexinit = (
+            (self.peer_kexinit, self.local_kexinit)
+            if self.is_server
+            else (self.local_kexinit, self.peer_kexinit)
+        )
+        return self._exchange.hash(
+            pack_string(self.client_version)
+            + pack_string(self.server_version)
+            + pack_string(client_kexinit)
+            + pack_string(server_kexinit)
+            + pack_string(host_key_blob)
+            + encode(client_public)
+            + encode(server_public)
+            + pack_mpint(shared)
+        ).digest()
+
+    def _finish(self, shared, exchange_hash):
+        if self.session_id is None:
+            self.session_id = exchange_hash
+        keys = self._derive_keys(pack_mpint(shared), exchange_hash)
+        algorithms = self.algorithms
+
+        def client_to_server(apply):
+            apply(
+                algorithms.cipher_client_to_server,
+                keys["C"],
+                keys["A"],
+                algorithms.mac_client_to_server,
+                keys["E"],
+            )
+
+        def server_to_client(apply):
+            apply(
+                algorithms.cipher_server_to_client,
+                keys["D"],
+                keys["B"],
+                algorithms.mac_server_to_client,
+                keys["F"],
+            )
+
+        packet_manager = self.packet_manager
+        outgoing, incoming = (
+            (server_to_client, client_to_server)
+            if self.is_server
+            else (client_to_server, server_to_client)
+        )
+        compression_out, compression_in = (
+            (
+                algorithms.compression_server_to_client,
+                algorithms.compression_client_to_server,
+            )
+            if self.is_server
+            else (
+                algorithms.compression_client_to_server,
+                algorithms.compression_server_to_client,
+            )
+        )
+
+        def switch_outgoing():
+            outgoing(packet_manager.set_outgoing_cipher)
+            packet_manager.set_outgoing_compression(
+                compression_out, adaptive=Config.COMPRESSION == "adaptive"
+            )
+
+        def switch_incoming():
+            incoming(packet_manager.set_incoming_cipher)
+            packet_manager.set_incoming_compression(compression_in)
+
+        self._pending_outgoing = switch_outgoing
+        self._pending_incoming = switch_incoming
+        return [pack_byte(SSH_MSG_NEWKEYS)]
+
+    def _derive_keys(self, shared, exchange_hash):
+        """RFC 4253 7.2: K1 = HASH(K || H || X || session_id), extended as needed."""
+        algorithms = self.algorithms
+        sizes = {
+            "A": get_cipher_suite(algorithms.cipher_client_to_server).iv_size,
+            "B": get_cipher_suite(algorithms.cipher_server_to_client).iv_size,
+            "C": get_cipher_suite(algorithms.cipher_client_to_server).key_size,
+            "D": get_cipher_suite(algorithms.cipher_server_to_client).key_size,
+            "E": _mac_key_size(algorithms.mac_client_to_server),
+            "F": _mac_key_size(algorithms.mac_server_to_client),
+        }
+        hash_function = self._exchange.hash
+        keys = {}
+        for letter, size in sizes.items():
+            key = hash_function(
+                shared + exchange_hash + letter.encode() + self.session_id
+            ).digest()
+            while len(key) < size:
+                key += hash_function(shared + exchange_hash + key).digest()
+            keys[letter] = key[:size]
+        return keys
+
+    def _on_newkeys(self):
+        if self._pending_incoming is None:
+            raise ConnectionError("NEWKEYS received before key exchange finished")
+        self._pending_incoming()
+        self._pending_incoming = None
+        if self.strict:
+            self.packet_manager.receive_sequence_number = 0
+        self.complete = True
+        self.logger.info(
+            f"Key exchange complete: {self.algorithms.kex}, "
+            f"{self.algorithms.cipher_client_to_server}"
+        )
+
+
+def _mac_key_size(name):
+    return get_mac_suite(name).key_size if name else 0
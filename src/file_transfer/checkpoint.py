@@ -0,0 +1,121 @@
+import json
+import mmap
+import os
+from src.utils.logger import Logger
+
+CHECKPOINT_SUFFIX = ".xfer-checkpoint"
+# 체크포인트 파일 갱신 간격 (확정 오프셋 기준)
+DEFAULT_CHECKPOINT_INTERVAL = 8 * 1024 * 1024
+
+
+class RangeTracker:
+    """
+    Track completed byte ranges and the contiguous offset confirmed so far.
+
+    Pipelined requests finish out of order; only the prefix with no holes
+    is safe to resume from.
+    """
+
+    def __init__(self, start=0):
+        self.watermark = start
+        self.highest = start
+        self._completed = {}
+
+    def complete(self, start, end):
+        self.highest = max(self.highest, end)
+        self._completed[start] = end
+        while self.watermark in self._completed:
+            self.watermark = self._completed.pop(self.watermark)
+
+
+class TransferCheckpoint:
+    """
+    Sidecar file next to the local file recording the confirmed offset.
+
+    ``identity`` (paths, size, mtime) ties the checkpoint to one version of
+    the source; a checkpoint for anything else is ignored, so a changed
+    source restarts from zero instead of producing a spliced file.
+    """
+
+    def __init__(self, local_path, identity, interval=DEFAULT_CHECKPOINT_INTERVAL):
+        self.logger = Logger.get_logger(__name__)
+        self.path = local_path + CHECKPOINT_SUFFIX
+        self.identity = identity
+        self.interval = interval
+        self._saved = 0
+
+    def load(self):
+        """Return the offset to resume from (0 when there is no usable checkpoint)."""
+        try:
+            with open(self.path) as checkpoint_file:
+                state = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return 0
+        if state.get("identity") != self.identity:
+            self.logger.info(f"Ignoring stale checkpoint {self.path}")
+            return 0
+        self._saved = state.get("offset", 0)
+        return self._saved
+
+    def update(self, offset):
+        if offset - self._saved >= self.interval:
+            self.save(offset)
+
+    def save(self, offset):
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w") as checkpoint_file:
+                json.dump(
+                    {"identity": self.identity, "offset": offset}, checkpoint_file
+                )
+            os.replace(temporary, self.path)
+            self._saved = offset
+        except OSError as e:
+            self.logger.warning(f"Could not write checkpoint {self.path}: {e}")
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class MappedFile:
+    """
+    A local file of known size mapped into memory for chunked transfers.
+
+    ``view(offset, length)`` hands out zero-copy slices for uploads and
+    ``write(offset, data)`` copies received data straight into the mapping.
+    Empty files are not mappable, so they get an empty buffer instead.
+    """
+
+    def __init__(self, file, size, writable=False):
+        self.size = size
+        if size == 0:
+            self._map = None
+            self._view = memoryview(bytearray())
+            return
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(file.fileno(), size, access=access)
+        self._view = memoryview(self._map)
+
+    def view(self, offset, length):
+        return self._view[offset : offset + length]
+
+    def write(self, offset, data):
+        self._view[offset : offset + len(data)] = data
+
+    def close(self):
+        self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # 실패한 전송의 슬라이스가 아직 남아 있으면 GC 가 정리
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,340 @@
+import hashlib
+import os
+import posixpath
+import re
+import shlex
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.file_transfer.checkpoint import MappedFile
+from src.file_transfer.scp_handler import SCPClient
+from src.file_transfer.sftp_handler import SFTPAttributes, SFTPClient, SFTPError
+from src.utils.logger import Logger
+
+DEFAULT_WORKERS = 4
+# SFTP v3 의 mtime 은 초 단위
+MTIME_TOLERANCE = 1.0
+# 원격 sha256sum 명령 줄 길이 상한: ARG_MAX (보통 2 MiB 이상) 보다 충분히 작게 나눔
+DIGEST_COMMAND_BYTES = 64 * 1024
+_SHA256SUM_ESCAPES = {b"\\": b"\\", b"n": b"\n", b"r": b"\r"}
+
+
+class FileEntry:
+    def __init__(self, size, mtime, is_dir=False):
+        self.size = size
+        self.mtime = mtime
+        self.is_dir = is_dir
+
+
+class SyncResult:
+    def __init__(self):
+        self.transferred = []
+        self.skipped = 0
+        self.bytes = 0
+        self.errors = []
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def __repr__(self):
+        return (
+            f"SyncResult(transferred={len(self.transferred)}, skipped={self.skipped}, "
+            f"bytes={self.bytes}, errors={len(self.errors)})"
+        )
+
+
+def parse_sha256sum(output):
+    """{path: digest} from ``sha256sum`` output, undoing its filename escapes."""
+    digests = {}
+    for line in output.split(b"\n"):
+        if not line:
+            continue
+        # 이름에 \ 나 줄바꿈이 있으면 줄 앞에 \ 를 붙이고 이름을 이스케이프함
+        escaped = line.startswith(b"\\")
+        digest, _, path = line[escaped:].partition(b" ")
+        path = path[1:]  # 텍스트 모드 " ", 바이너리 모드 "*"
+        if escaped:
+            path = re.sub(
+                rb"\\(.)",
+                lambda m: _SHA256SUM_ESCAPES.get(m.group(1), m.group(0)),
+                path,
+            )
+        digests[path.decode(errors="replace")] = digest.decode()
+    return digests
+
+
+def local_sha256(path):
+    with open(path, "rb") as local_file:
+        size = os.fstat(local_file.fileno()).st_size
+        with MappedFile(local_file, size) as mapped:
+            return hashlib.sha256(mapped.view(0, size)).hexdigest()
+
+
+def walk_local(root):
+    """{relative posix path: FileEntry} for everything under ``root``."""
+    entries = {}
+    pending = [""]
+    while pending:
+        relative = pending.pop()
+        with os.scandir(os.path.join(root, relative)) as scan:
+            for entry in scan:
+                path = posixpath.join(relative, entry.name) if relative else entry.name
+                st = entry.stat(follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    entries[path] = FileEntry(0, st.st_mtime, is_dir=True)
+                    pending.append(path)
+                elif entry.is_file(follow_symlinks=False):
+                    entries[path] = FileEntry(st.st_size, st.st_mtime)
+    return entries
+
+
+def walk_remote(client, root):
+    """Like walk_local, over SFTP; a missing ``root`` yields an empty tree."""
+    entries = {}
+    pending = [""]
+    while pending:
+        relative = pending.pop()
+        try:
+            listing = client.listdir_attr(posixpath.join(root, relative))
+        except SFTPError:
+            if relative:
+                raise
+            return entries
+        for name, attrs in listing:
+            path = posixpath.join(relative, name) if relative else name
+            if attrs.is_dir():
+                entries[path] = FileEntry(0, attrs.mtime, is_dir=True)
+                pending.append(path)
+            elif attrs.permissions is None or stat.S_ISREG(attrs.permissions):
+                entries[path] = FileEntry(attrs.size, attrs.mtime)
+    return entries
+
+
+class DirectorySync:
+    """
+    Recursive one-way directory sync over SFTP (or SCP for the data).
+
+    Both trees are walked first. A file is transferred only when it is
+    missing on the destination, or its size differs, or its mtime differs
+    and (with ``checksum``) its SHA-256 differs too, which skips files that
+    were touched but not changed. Remote digests come from ``sha256sum``
+    over an exec channel, so checksum mode needs a POSIX remote. Changed
+    files are spread over ``workers`` threads, each with its own SFTP
+    channel (or SCP exec channels), so small files overlap their round
+    trips and large files share the link.
+
+    ``client_factory`` returns a new SFTPClient; to spread the work over
+    several connections, return clients on different transports.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        client_factory=None,
+        workers=DEFAULT_WORKERS,
+        checksum=False,
+        method="sftp",
+    ):
+        if method not in ("sftp", "scp"):
+            raise ValueError(f"Unknown transfer method: {method}")
+        if method == "scp" and transport is None:
+            raise ValueError("SCP transfers need a transport")
+        self.logger = Logger.get_logger(__name__)
+        self.transport = transport
+        self.client_factory = client_factory or (
+            lambda: SFTPClient.from_transport(transport)
+        )
+        self.workers = workers
+        self.checksum = checksum
+        self.method = method
+        self._local = threading.local()
+        self._clients = []
+        self._clients_lock = threading.Lock()
+
+    def upload(self, local_root, remote_root):
+        """Copy new and changed files from ``local_root`` to ``remote_root``."""
+        client = self._client()
+        source = walk_local(local_root)
+        destination = walk_remote(client, remote_root)
+
+        if remote_root not in ("", ".", "/") and not destination:
+            self._ensure_remote_dir(client, remote_root)
+        for path in sorted(p for p, e in source.items() if e.is_dir):
+            if path not in destination:
+                client.mkdir(posixpath.join(remote_root, path))
+
+        changed, identical = self._changed_files(
+            source,
+            destination,
+            lambda paths: {p: local_sha256(os.path.join(local_root, p)) for p in paths},
+            lambda paths: self._remote_digests(remote_root, paths),
+        )
+        # 내용이 같은 파일은 mtime 만 맞춰 다음 동기화에서 해시를 다시 계산하지 않음
+        for path in identical:
+            mtime = source[path].mtime
+            attrs = SFTPAttributes(atime=mtime, mtime=mtime)
+            client.setstat(posixpath.join(remote_root, path), attrs)
+        return self._run(
+            changed,
+            source,
+            lambda path: self._upload_file(
+                os.path.join(local_root, path),
+                posixpath.join(remote_root, path),
+                source[path],
+            ),
+        )
+
+    def download(self, remote_root, local_root):
+        """Copy new and changed files from ``remote_root`` to ``local_root``."""
+        source = walk_remote(self._client(), remote_root)
+        os.makedirs(local_root, exist_ok=True)
+        destination = walk_local(local_root)
+
+        for path in sorted(p for p, e in source.items() if e.is_dir):
+            os.makedirs(os.path.join(local_root, path), exist_ok=True)
+
+        changed, identical = self._changed_files(
+            source,
+            destination,
+            lambda paths: self._remote_digests(remote_root, paths),
+            lambda paths: {p: local_sha256(os.path.join(local_root, p)) for p in paths},
+        )
+        for path in identical:
+            mtime = source[path].mtime
+            os.utime(os.path.join(local_root, path), (mtime, mtime))
+        return self._run(
+            changed,
+            source,
+            lambda path: self._download_file(
+                posixpath.join(remote_root, path),
+                os.path.join(local_root, path),
+                source[path],
+            ),
+        )
+
+    def close(self):
+        with self._clients_lock:
+            for client in self._clients:
+                client.quit()
+            self._clients.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- 변경 감지 -----------------------------------------------------
+
+    def _changed_files(self, source, destination, source_digests, destination_digests):
+        """Return (changed paths, paths whose content matched but mtime did not)."""
+        changed, suspects = [], []
+        for path, entry in source.items():
+            if entry.is_dir:
+                continue
+            other = destination.get(path)
+            if other is None or other.is_dir or other.size != entry.size:
+                changed.append(path)
+            elif abs((other.mtime or 0) - (entry.mtime or 0)) > MTIME_TOLERANCE:
+                suspects.append(path)
+
+        if suspects and self.checksum:
+            # 크기는 같고 mtime 만 다른 파일은 내용을 비교해 확인
+            source_hashes = source_digests(suspects)
+            destination_hashes = destination_digests(suspects)
+            identical = [
+                p for p in suspects if source_hashes[p] == destination_hashes.get(p)
+            ]
+            changed += [p for p in suspects if p not in identical]
+        else:
+            changed += suspects
+            identical = []
+        return sorted(changed), identical
+
+    def _remote_digests(self, remote_root, paths):
+        if self.transport is None:
+            raise ValueError("Checksum mode needs a transport for remote sha256sum")
+        prefix = len(remote_root.rstrip("/")) + 1 if remote_root else 0
+        digests = {}
+        batch, length = [], 0
+        for path in paths:
+            quoted = shlex.quote(posixpath.join(remote_root, path))
+            if batch and length + len(quoted) + 1 > DIGEST_COMMAND_BYTES:
+                digests.update(self._sha256sum(batch))
+                batch, length = [], 0
+            batch.append(quoted)
+            length += len(quoted) + 1
+        if batch:
+            digests.update(self._sha256sum(batch))
+        return {path[prefix:]: digest for path, digest in digests.items()}
+
+    def _sha256sum(self, quoted_paths):
+        channel = self.transport.open_session()
+        try:
+            channel.exec_command(f"sha256sum -- {' '.join(quoted_paths)}")
+            output = bytearray()
+            while data := channel.recv():
+                output += data
+        finally:
+            channel.close()
+        return parse_sha256sum(bytes(output))
+
+    # ---- 전송 ---------------------------------------------------------
+
+    def _run(self, changed, source, transfer):
+        result = SyncResult()
+        result.skipped = sum(1 for e in source.values() if not e.is_dir) - len(changed)
+        self.logger.info(
+            f"Syncing {len(changed)} changed files, {result.skipped} unchanged"
+        )
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="sync") as pool:
+            futures = {pool.submit(transfer, path): path for path in changed}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result.bytes += future.result()
+                    result.transferred.append(path)
+                except Exception as e:
+                    self.logger.warning(f"Failed to sync {path}: {e}")
+                    result.errors.append((path, e))
+        # 완료 순서가 아니라 경로 순서로 보고
+        result.transferred.sort()
+        result.errors.sort(key=lambda error: error[0])
+        return result
+
+    def _upload_file(self, local_path, remote_path, entry):
+        if self.method == "scp":
+            return SCPClient(self.transport).put(local_path, remote_path, preserve=True)
+        client = self._client()
+        size = client.put(local_path, remote_path)
+        client.setstat(
+            remote_path, SFTPAttributes(atime=entry.mtime, mtime=entry.mtime)
+        )
+        return size
+
+    def _download_file(self, remote_path, local_path, entry):
+        if self.method == "scp":
+            return SCPClient(self.transport).get(remote_path, local_path, preserve=True)
+        size = self._client().get(remote_path, local_path)
+        os.utime(local_path, (entry.mtime, entry.mtime))
+        return size
+
+    def _client(self):
+        """The calling thread's SFTP client (one channel per worker)."""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+            with self._clients_lock:
+                self._clients.append(client)
+        return client
+
+    def _ensure_remote_dir(self, client, path):
+        parts = [p for p in path.split("/") if p]
+        current = "/" if path.startswith("/") else ""
+        for part in parts:
+            current = posixpath.join(current, part)
+            try:
+                client.stat(current)
+            except SFTPError:
+                client.mkdir(current)
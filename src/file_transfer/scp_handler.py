@@ -0,0 +1,150 @@
+import os
+import shlex
+from src.file_transfer.checkpoint import MappedFile
+from src.utils.logger import Logger
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+class SCPError(IOError):
+    pass
+
+
+class SCPClient:
+    """
+    Single-file SCP (rcp protocol) transfers over exec channels.
+
+    Local files are memory mapped: uploads send mapped slices without
+    copying them into intermediate buffers, downloads receive straight into
+    the mapping. The protocol has no offsets, so interrupted SCP transfers
+    cannot resume; use SFTPClient with ``resume=True`` for that.
+    """
+
+    def __init__(self, transport, timeout=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.logger = Logger.get_logger(__name__)
+        self.transport = transport
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def put(self, local_path, remote_path, preserve=False, callback=None):
+        """Upload one file; returns the number of bytes sent."""
+        flags = "-p " if preserve else ""
+        channel = self._exec(f"scp {flags}-t {shlex.quote(remote_path)}")
+        try:
+            self._read_ack(channel)
+            with open(local_path, "rb") as local_file:
+                st = os.fstat(local_file.fileno())
+                if preserve:
+                    channel.sendall(
+                        f"T{int(st.st_mtime)} 0 {int(st.st_atime)} 0\n".encode()
+                    )
+                    self._read_ack(channel)
+                name = os.path.basename(local_path)
+                channel.sendall(
+                    f"C{st.st_mode & 0o7777:04o} {st.st_size} {name}\n".encode()
+                )
+                self._read_ack(channel)
+
+                with MappedFile(local_file, st.st_size) as source:
+                    offset = 0
+                    while offset < st.st_size:
+                        chunk = source.view(offset, self.chunk_size)
+                        channel.send_buffers((chunk,))
+                        offset += len(chunk)
+                        del chunk
+                        if callback:
+                            callback(offset, st.st_size)
+            channel.sendall(b"\x00")
+            self._read_ack(channel)
+            channel.send_eof()
+            self._check_exit(channel)
+            return st.st_size
+        finally:
+            channel.close(timeout=self.timeout)
+
+    def get(self, remote_path, local_path, preserve=False, callback=None):
+        """Download one file; returns the number of bytes received."""
+        flags = "-p " if preserve else ""
+        channel = self._exec(f"scp {flags}-f {shlex.quote(remote_path)}")
+        try:
+            channel.sendall(b"\x00")
+            times = None
+            line = self._read_line(channel)
+            if line.startswith("T"):
+                mtime, _, atime, _ = line[1:].split()
+                times = (int(atime), int(mtime))
+                channel.sendall(b"\x00")
+                line = self._read_line(channel)
+            if not line.startswith("C"):
+                raise SCPError(f"Unexpected SCP header: {line!r}")
+            mode, size, _ = line[1:].split(" ", 2)
+            size = int(size)
+            channel.sendall(b"\x00")
+
+            with open(local_path, "w+b") as local_file:
+                local_file.truncate(size)
+                with MappedFile(local_file, size, writable=True) as sink:
+                    self._receive_into(channel, sink, size, callback)
+            self._read_ack(channel)
+            channel.sendall(b"\x00")
+            os.chmod(local_path, int(mode, 8))
+            if times:
+                os.utime(local_path, times)
+            self._check_exit(channel)
+            return size
+        finally:
+            channel.close(timeout=self.timeout)
+
+    def _exec(self, command):
+        self._buffer.clear()
+        channel = self.transport.open_session(timeout=self.timeout)
+        try:
+            channel.exec_command(command)
+        except BaseException:
+            channel.close(timeout=self.timeout)
+            raise
+        return channel
+
+    def _receive_into(self, channel, sink, size, callback):
+        received = min(len(self._buffer), size)
+        sink.write(0, self._buffer[:received])
+        del self._buffer[:received]
+        while received < size:
+            target = sink.view(received, min(self.chunk_size, size - received))
+            count = channel.recv_into(target, timeout=self.timeout)
+            target.release()
+            if not count:
+                raise SCPError("Connection closed during SCP transfer")
+            received += count
+            if callback:
+                callback(received, size)
+
+    def _fill(self, channel):
+        data = channel.recv(timeout=self.timeout)
+        if not data:
+            raise SCPError("SCP channel closed")
+        self._buffer += data
+
+    def _read_line(self, channel):
+        while b"\n" not in self._buffer:
+            self._fill(channel)
+        line, _, rest = bytes(self._buffer).partition(b"\n")
+        self._buffer[:] = rest
+        if line[:1] in (b"\x01", b"\x02"):
+            raise SCPError(line[1:].decode(errors="replace"))
+        return line.decode(errors="replace")
+
+    def _read_ack(self, channel):
+        if not self._buffer:
+            self._fill(channel)
+        if self._buffer[0] == 0:
+            del self._buffer[:1]
+            return
+        self._read_line(channel)
+        raise SCPError("Unexpected SCP response")
+
+    def _check_exit(self, channel):
+        status = channel.recv_exit_status(timeout=self.timeout)
+        if status not in (0, None):
+            raise SCPError(f"Remote scp exited with status {status}")
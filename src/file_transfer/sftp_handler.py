@@ -0,0 +1,568 @@
+import os
+import stat
+from src.file_transfer.checkpoint import MappedFile, RangeTracker, TransferCheckpoint
+from src.network.message import (
+    MessageReader,
+    pack_byte,
+    pack_string,
+    pack_uint32,
+    pack_uint64,
+)
+from src.utils.logger import Logger
+
+SFTP_VERSION = 3
+
+SSH_FXP_INIT = 1
+SSH_FXP_VERSION = 2
+SSH_FXP_OPEN = 3
+SSH_FXP_CLOSE = 4
+SSH_FXP_READ = 5
+SSH_FXP_WRITE = 6
+SSH_FXP_LSTAT = 7
+SSH_FXP_FSTAT = 8
+SSH_FXP_SETSTAT = 9
+SSH_FXP_FSETSTAT = 10
+SSH_FXP_OPENDIR = 11
+SSH_FXP_READDIR = 12
+SSH_FXP_REMOVE = 13
+SSH_FXP_MKDIR = 14
+SSH_FXP_RMDIR = 15
+SSH_FXP_REALPATH = 16
+SSH_FXP_STAT = 17
+SSH_FXP_RENAME = 18
+SSH_FXP_STATUS = 101
+SSH_FXP_HANDLE = 102
+SSH_FXP_DATA = 103
+SSH_FXP_NAME = 104
+SSH_FXP_ATTRS = 105
+
+SSH_FXF_READ = 0x01
+SSH_FXF_WRITE = 0x02
+SSH_FXF_APPEND = 0x04
+SSH_FXF_CREAT = 0x08
+SSH_FXF_TRUNC = 0x10
+SSH_FXF_EXCL = 0x20
+
+SSH_FX_OK = 0
+SSH_FX_EOF = 1
+SSH_FX_NO_SUCH_FILE = 2
+SSH_FX_PERMISSION_DENIED = 3
+SSH_FX_FAILURE = 4
+
+SSH_FILEXFER_ATTR_SIZE = 0x01
+SSH_FILEXFER_ATTR_UIDGID = 0x02
+SSH_FILEXFER_ATTR_PERMISSIONS = 0x04
+SSH_FILEXFER_ATTR_ACMODTIME = 0x08
+SSH_FILEXFER_ATTR_EXTENDED = 0x80000000
+
+# 64 x 32KiB: 대부분의 WAN 에서 대역폭-지연 곱을 채우는 크기
+DEFAULT_WINDOW = 64
+DEFAULT_CHUNK_SIZE = 32 * 1024
+RECV_SIZE = 256 * 1024
+
+
+class SFTPError(IOError):
+    def __init__(self, code, message):
+        super().__init__(f"{message} (SFTP status {code})")
+        self.code = code
+
+
+class SFTPAttributes:
+    def __init__(
+        self, size=None, uid=None, gid=None, permissions=None, atime=None, mtime=None
+    ):
+        self.size = size
+        self.uid = uid
+        self.gid = gid
+        self.permissions = permissions
+        self.atime = atime
+        self.mtime = mtime
+
+    @classmethod
+    def read(cls, reader):
+        attrs = cls()
+        flags = reader.read_uint32()
+        if flags & SSH_FILEXFER_ATTR_SIZE:
+            attrs.size = reader.read_uint64()
+        if flags & SSH_FILEXFER_ATTR_UIDGID:
+            attrs.uid, attrs.gid = reader.read_uint32(), reader.read_uint32()
+        if flags & SSH_FILEXFER_ATTR_PERMISSIONS:
+            attrs.permissions = reader.read_uint32()
+        if flags & SSH_FILEXFER_ATTR_ACMODTIME:
+            attrs.atime, attrs.mtime = reader.read_uint32(), reader.read_uint32()
+        if flags & SSH_FILEXFER_ATTR_EXTENDED:
+            for _ in range(reader.read_uint32()):
+                reader.read_string()
+                reader.read_string()
+        return attrs
+
+    def pack(self):
+        flags, body = 0, b""
+        if self.size is not None:
+            flags |= SSH_FILEXFER_ATTR_SIZE
+            body += pack_uint64(self.size)
+        if self.uid is not None and self.gid is not None:
+            flags |= SSH_FILEXFER_ATTR_UIDGID
+            body += pack_uint32(self.uid) + pack_uint32(self.gid)
+        if self.permissions is not None:
+            flags |= SSH_FILEXFER_ATTR_PERMISSIONS
+            body += pack_uint32(self.permissions)
+        if self.atime is not None and self.mtime is not None:
+            flags |= SSH_FILEXFER_ATTR_ACMODTIME
+            body += pack_uint32(int(self.atime)) + pack_uint32(int(self.mtime))
+        return pack_uint32(flags) + body
+
+    def is_dir(self):
+        return self.permissions is not None and stat.S_ISDIR(self.permissions)
+
+    def __repr__(self):
+        return f"SFTPAttributes(size={self.size}, mode={self.permissions}, mtime={self.mtime})"
+
+
+class SFTPClient:
+    """
+    SFTP version 3 client over a session channel.
+
+    Requests are tagged with ids and may be answered in any order, so
+    ``get``/``put`` keep ``window`` READ/WRITE requests in flight at once and
+    match replies by id. Requests are queued and sent together so a full
+    window of READs costs one channel write instead of one per request.
+    """
+
+    def __init__(self, channel, timeout=None):
+        self.logger = Logger.get_logger(__name__)
+        self.channel = channel
+        self.timeout = timeout
+        self.server_version = None
+        self.extensions = {}
+        self._request_id = 0
+        self._outgoing = []
+        self._buffer = bytearray()
+        self._responses = {}
+
+    @classmethod
+    def from_transport(cls, transport, timeout=None):
+        """Open a session channel on ``transport`` and start the sftp subsystem."""
+        channel = transport.open_session(timeout=timeout)
+        try:
+            channel.invoke_subsystem("sftp")
+            client = cls(channel, timeout)
+            client.init()
+        except BaseException:
+            channel.close()
+            raise
+        return client
+
+    def init(self):
+        self._send_raw(pack_byte(SSH_FXP_INIT) + pack_uint32(SFTP_VERSION))
+        message_type, reader = self._read_message()
+        if message_type != SSH_FXP_VERSION:
+            raise SFTPError(
+                SSH_FX_FAILURE, f"Expected SSH_FXP_VERSION, got {message_type}"
+            )
+        self.server_version = reader.read_uint32()
+        while reader.remaining:
+            self.extensions[reader.read_text()] = reader.read_string()
+        self.logger.debug(
+            f"SFTP version {self.server_version}, extensions {self.extensions}"
+        )
+
+    # ---- 파일 / 디렉터리 연산 ------------------------------------------
+
+    def open(self, path, flags=SSH_FXF_READ, attrs=None):
+        attrs = attrs or SFTPAttributes()
+        return self._handle(
+            self._call(
+                SSH_FXP_OPEN, pack_string(path), pack_uint32(flags), attrs.pack()
+            )
+        )
+
+    def close(self, handle):
+        self._check_status(self._call(SSH_FXP_CLOSE, pack_string(handle)))
+
+    def read(self, handle, offset, length):
+        """Return up to ``length`` bytes at ``offset``; b"" at end of file."""
+        response = self._call(
+            SSH_FXP_READ, pack_string(handle), pack_uint64(offset), pack_uint32(length)
+        )
+        return bytes(self._data(response) or b"")
+
+    def write(self, handle, offset, data):
+        self._check_status(
+            self._call(
+                SSH_FXP_WRITE,
+                pack_string(handle),
+                pack_uint64(offset),
+                pack_string(data),
+            )
+        )
+
+    def stat(self, path):
+        return self._attrs(self._call(SSH_FXP_STAT, pack_string(path)))
+
+    def lstat(self, path):
+        return self._attrs(self._call(SSH_FXP_LSTAT, pack_string(path)))
+
+    def fstat(self, handle):
+        return self._attrs(self._call(SSH_FXP_FSTAT, pack_string(handle)))
+
+    def setstat(self, path, attrs):
+        self._check_status(self._call(SSH_FXP_SETSTAT, pack_string(path), attrs.pack()))
+
+    def listdir_attr(self, path="."):
+        """Return [(filename, SFTPAttributes)] for a directory, without . and .."""
+        handle = self._handle(self._call(SSH_FXP_OPENDIR, pack_string(path)))
+        entries = []
+        try:
+            while True:
+                names = self._names(self._call(SSH_FXP_READDIR, pack_string(handle)))
+                if names is None:
+                    break
+                entries += [(n, a) for n, _, a in names if n not in (".", "..")]
+        finally:
+            self.close(handle)
+        return entries
+
+    def listdir(self, path="."):
+        return [name for name, _ in self.listdir_attr(path)]
+
+    def remove(self, path):
+        self._check_status(self._call(SSH_FXP_REMOVE, pack_string(path)))
+
+    def mkdir(self, path, mode=0o755):
+        attrs = SFTPAttributes(permissions=mode)
+        self._check_status(self._call(SSH_FXP_MKDIR, pack_string(path), attrs.pack()))
+
+    def rmdir(self, path):
+        self._check_status(self._call(SSH_FXP_RMDIR, pack_string(path)))
+
+    def rename(self, old_path, new_path):
+        self._check_status(
+            self._call(SSH_FXP_RENAME, pack_string(old_path), pack_string(new_path))
+        )
+
+    def realpath(self, path="."):
+        names = self._names(self._call(SSH_FXP_REALPATH, pack_string(path)))
+        return names[0][0]
+
+    # ---- 파이프라인 전송 -----------------------------------------------
+
+    def get(
+        self,
+        remote_path,
+        local_path,
+        window=DEFAULT_WINDOW,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        callback=None,
+        resume=False,
+    ):
+        """
+        Download ``remote_path`` with up to ``window`` READs outstanding.
+
+        Each DATA reply is copied into a memory map of the destination at
+        its own offset as it arrives, whatever order the server answers in.
+        Short reads are re-requested for the missing tail. With ``resume``
+        the confirmed offset is kept in a sidecar checkpoint, and a later
+        call picks up from there if the remote file is unchanged. Returns
+        the number of bytes transferred by this call.
+        """
+        handle = self.open(remote_path, SSH_FXF_READ)
+        try:
+            attrs = self.fstat(handle)
+            checkpoint = None
+            start = 0
+            if resume:
+                identity = {
+                    "get": remote_path,
+                    "size": attrs.size,
+                    "mtime": attrs.mtime,
+                }
+                checkpoint = TransferCheckpoint(local_path, identity)
+                start = checkpoint.load() if os.path.exists(local_path) else 0
+            with open(local_path, "r+b" if start else "w+b") as local_file:
+                transferred = self._pipelined_read(
+                    handle,
+                    local_file,
+                    attrs.size,
+                    start,
+                    window,
+                    chunk_size,
+                    checkpoint,
+                    callback,
+                )
+        finally:
+            self.close(handle)
+        if checkpoint:
+            checkpoint.remove()
+        return transferred
+
+    def _pipelined_read(
+        self, handle, local_file, size, start, window, chunk_size, checkpoint, callback
+    ):
+        if size is not None:
+            local_file.truncate(size)
+            sink = MappedFile(local_file, size, writable=True)
+            write = sink.write
+        else:
+            # 크기를 모르면 매핑할 수 없으므로 pwrite 로 기록
+            sink = None
+            fd = local_file.fileno()
+            write = lambda offset, data: os.pwrite(fd, data, offset)  # noqa: E731
+
+        tracker = RangeTracker(start)
+        pending = {}
+        retries = []
+        next_offset = start
+        eof = False
+        try:
+            while True:
+                while len(pending) < window:
+                    if retries:
+                        offset, length = retries.pop()
+                    elif not eof and (size is None or next_offset < size):
+                        offset = next_offset
+                        length = (
+                            chunk_size
+                            if size is None
+                            else min(chunk_size, size - offset)
+                        )
+                        next_offset += length
+                    else:
+                        break
+                    request_id = self._queue(
+                        SSH_FXP_READ,
+                        pack_string(handle),
+                        pack_uint64(offset),
+                        pack_uint32(length),
+                    )
+                    pending[request_id] = (offset, length)
+                if not pending:
+                    break
+                self._flush()
+
+                request_id, response = self._next_response(pending)
+                offset, length = pending.pop(request_id)
+                data = self._data(response)
+                if data is None:
+                    eof = True
+                    continue
+                write(offset, data)
+                tracker.complete(offset, offset + len(data))
+                if len(data) < length:
+                    retries.append((offset + len(data), length - len(data)))
+                if checkpoint:
+                    checkpoint.update(tracker.watermark)
+                if callback:
+                    callback(tracker.highest, size)
+        except BaseException:
+            if checkpoint:
+                checkpoint.save(tracker.watermark)
+            raise
+        finally:
+            if sink is not None:
+                sink.close()
+
+        if eof and size is not None and tracker.highest < size:
+            # 전송 중 원격 파일이 줄어든 경우
+            local_file.truncate(tracker.highest)
+        return tracker.highest - start
+
+    def put(
+        self,
+        local_path,
+        remote_path,
+        window=DEFAULT_WINDOW,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        callback=None,
+        resume=False,
+    ):
+        """
+        Upload ``local_path`` with up to ``window`` WRITEs outstanding.
+
+        WRITE data is sliced straight out of a memory map of the local file.
+        With ``resume`` the acknowledged offset is checkpointed next to the
+        local file and a later call continues from it.
+        """
+        with open(local_path, "rb") as local_file:
+            st = os.fstat(local_file.fileno())
+            checkpoint = None
+            start = 0
+            if resume:
+                identity = {
+                    "put": remote_path,
+                    "size": st.st_size,
+                    "mtime": st.st_mtime_ns,
+                }
+                checkpoint = TransferCheckpoint(local_path, identity)
+                start = checkpoint.load()
+            flags = SSH_FXF_WRITE | SSH_FXF_CREAT | (0 if start else SSH_FXF_TRUNC)
+            handle = self.open(remote_path, flags)
+            try:
+                with MappedFile(local_file, st.st_size) as source:
+                    transferred = self._pipelined_write(
+                        handle, source, start, window, chunk_size, checkpoint, callback
+                    )
+            finally:
+                self.close(handle)
+        if checkpoint:
+            checkpoint.remove()
+        return transferred
+
+    def _pipelined_write(
+        self, handle, source, start, window, chunk_size, checkpoint, callback
+    ):
+        tracker = RangeTracker(start)
+        pending = {}
+        offset = start
+        try:
+            while True:
+                while len(pending) < window and offset < source.size:
+                    chunk = source.view(offset, chunk_size)
+                    request_id = self._queue(
+                        SSH_FXP_WRITE,
+                        pack_string(handle),
+                        pack_uint64(offset),
+                        data=chunk,
+                    )
+                    pending[request_id] = (offset, len(chunk))
+                    offset += len(chunk)
+                    # 전송이 끝날 때까지 슬라이스가 매핑을 붙잡지 않도록
+                    del chunk
+                if not pending:
+                    break
+                self._flush()
+
+                request_id, response = self._next_response(pending)
+                self._check_status(response)
+                chunk_offset, length = pending.pop(request_id)
+                tracker.complete(chunk_offset, chunk_offset + length)
+                if checkpoint:
+                    checkpoint.update(tracker.watermark)
+                if callback:
+                    callback(tracker.watermark, source.size)
+        except BaseException:
+            self._outgoing.clear()
+            if checkpoint:
+                checkpoint.save(tracker.watermark)
+            raise
+        return tracker.watermark - start
+
+    # ---- 요청 / 응답 ---------------------------------------------------
+
+    def _queue(self, message_type, *fields, data=None):
+        """
+        Queue a request; ``data`` (any buffer) is appended as a final string
+        without being copied into the header.
+        """
+        self._request_id = (self._request_id + 1) & 0xFFFFFFFF
+        header = (
+            pack_byte(message_type) + pack_uint32(self._request_id) + b"".join(fields)
+        )
+        if data is None:
+            self._outgoing.append(pack_uint32(len(header)) + header)
+        else:
+            length = len(header) + 4 + len(data)
+            self._outgoing.append(pack_uint32(length) + header + pack_uint32(len(data)))
+            self._outgoing.append(data)
+        return self._request_id
+
+    def _flush(self):
+        if self._outgoing:
+            buffers = self._outgoing
+            self._outgoing = []
+            self.channel.send_buffers(buffers)
+
+    def _send_raw(self, body):
+        self.channel.sendall(pack_uint32(len(body)) + body)
+
+    def _call(self, message_type, *fields):
+        request_id = self._queue(message_type, *fields)
+        self._flush()
+        return self._next_response((request_id,))[1]
+
+    def _next_response(self, request_ids):
+        """Return (request_id, (type, reader)) for the first of ``request_ids`` answered."""
+        while True:
+            for request_id in request_ids:
+                if request_id in self._responses:
+                    return request_id, self._responses.pop(request_id)
+            message_type, reader = self._read_message()
+            self._responses[reader.read_uint32()] = (message_type, reader)
+
+    def _read_message(self):
+        while True:
+            if len(self._buffer) >= 4:
+                length = int.from_bytes(self._buffer[:4], "big")
+                if len(self._buffer) >= 4 + length:
+                    message = bytes(self._buffer[4 : 4 + length])
+                    del self._buffer[: 4 + length]
+                    return message[0], MessageReader(message, 1)
+            data = self.channel.recv(RECV_SIZE, timeout=self.timeout)
+            if not data:
+                raise SFTPError(SSH_FX_FAILURE, "SFTP channel closed")
+            self._buffer += data
+
+    # ---- 응답 해석 -----------------------------------------------------
+
+    @staticmethod
+    def _status(reader):
+        code = reader.read_uint32()
+        message = reader.read_text() if reader.remaining >= 4 else ""
+        return code, message
+
+    def _check_status(self, response):
+        message_type, reader = response
+        if message_type != SSH_FXP_STATUS:
+            raise SFTPError(
+                SSH_FX_FAILURE, f"Expected SSH_FXP_STATUS, got {message_type}"
+            )
+        code, message = self._status(reader)
+        if code != SSH_FX_OK:
+            raise SFTPError(code, message)
+
+    def _expect(self, response, expected):
+        message_type, reader = response
+        if message_type == SSH_FXP_STATUS:
+            raise SFTPError(*self._status(reader))
+        if message_type != expected:
+            raise SFTPError(SSH_FX_FAILURE, f"Unexpected SFTP response {message_type}")
+        return reader
+
+    def _handle(self, response):
+        return self._expect(response, SSH_FXP_HANDLE).read_string()
+
+    def _attrs(self, response):
+        return SFTPAttributes.read(self._expect(response, SSH_FXP_ATTRS))
+
+    def _data(self, response):
+        """DATA payload as a memoryview, or None at end of file."""
+        message_type, reader = response
+        if message_type == SSH_FXP_STATUS:
+            code, message = self._status(reader)
+            if code == SSH_FX_EOF:
+                return None
+            raise SFTPError(code, message)
+        return self._expect(response, SSH_FXP_DATA).read_string_view()
+
+    def _names(self, response):
+        """[(filename, longname, attrs)], or None at end of a directory listing."""
+        message_type, reader = response
+        if message_type == SSH_FXP_STATUS:
+            code, message = self._status(reader)
+            if code == SSH_FX_EOF:
+                return None
+            raise SFTPError(code, message)
+        reader = self._expect(response, SSH_FXP_NAME)
+        return [
+            (reader.read_text(), reader.read_text(), SFTPAttributes.read(reader))
+            for _ in range(reader.read_uint32())
+        ]
+
+    def quit(self):
+        self.channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.quit()
@@ -0,0 +1,130 @@
+import asyncio
+from src.config.config import Config
+from src.crypto.host_keys import HostKeyVerifier
+from src.crypto.key_exchange import KeyExchange
+from src.network.async_socket_handler import AsyncSocketHandler
+from src.network.message import SSH_MSG_DISCONNECT, MessageReader
+from src.network.packet_framer import PacketFramer
+from src.network.packet_manager import PacketManager
+from src.network.version_exchange import VersionExchanger
+from src.utils import telemetry
+from src.utils.logger import Logger
+
+
+class AsyncSSHConnection:
+    """
+    Event-loop driven SSH connection.
+
+    Runs the version exchange, the key exchange and packet framing on an
+    AsyncSocketHandler without blocking, so thousands of connections can
+    share one event loop.
+    """
+
+    def __init__(
+        self,
+        host,
+        port,
+        client_version=Config.SSH_CLIENT_VERSION,
+        host_key_verifier=None,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.host = host
+        self.port = port
+        self.client_version = client_version
+        self.host_key_verifier = host_key_verifier or HostKeyVerifier(
+            Config.KNOWN_HOSTS_PATH, Config.HOST_KEY_CACHE_PATH, Config.HOST_KEY_POLICY
+        )
+        self.socket_handler = AsyncSocketHandler()
+        self.version_exchanger = VersionExchanger(client_version)
+        self.packet_manager = PacketManager()
+        self.framer = PacketFramer(self.packet_manager)
+        self.server_version = None
+        self.session_id = None
+        self.client_kexinit = None
+        self.server_kexinit = None
+
+    async def connect(self, timeout=None):
+        """Connect, exchange versions and run the key exchange."""
+        try:
+            await asyncio.wait_for(self._handshake(), timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _handshake(self):
+        with telemetry.span(
+            "ssh.connect",
+            phase="connect",
+            **{"net.peer.name": self.host, "net.peer.port": self.port},
+        ):
+            with telemetry.span("ssh.tcp_connect", phase="tcp"):
+                await self.socket_handler.connect(self.host, self.port)
+
+            # KEXINIT 은 서버 버전과 무관하므로 배너와 함께 보냄
+            kex = self._create_key_exchange()
+            is_valid, result = await self.version_exchanger.exchange_versions_async(
+                self.socket_handler, self.packet_manager.create_packet(kex.start())
+            )
+            if not is_valid:
+                raise ConnectionError(result)
+            self.server_version = kex.server_version = result
+            self.framer.feed(self.version_exchanger.excess)
+            await self.key_exchange(kex)
+
+    def _create_key_exchange(self):
+        return KeyExchange(
+            self.packet_manager,
+            self.client_version,
+            self.server_version or "",
+            host_key_verifier=self.host_key_verifier,
+            host=self.host,
+            port=self.port,
+            session_id=self.session_id,
+        )
+
+    async def key_exchange(self, kex=None):
+        """Run a key exchange; ``kex`` may already have sent its KEXINIT."""
+        with telemetry.span("ssh.key_exchange", phase="key_exchange") as current:
+            if kex is None:
+                kex = self._create_key_exchange()
+                outputs = [kex.start()]
+            else:
+                outputs = []
+            while True:
+                for payload in outputs:
+                    await self.send_packet(payload)
+                kex.outputs_sent()
+                if kex.complete:
+                    break
+                payload = await self.read_packet()
+                if payload[0] == SSH_MSG_DISCONNECT:
+                    reader = MessageReader(payload, 5)
+                    raise ConnectionError(
+                        f"Disconnected by server: {reader.read_text()}"
+                    )
+                outputs = kex.handle(payload)
+            telemetry.describe_key_exchange(current, kex)
+
+        self.session_id = kex.session_id
+        self.client_kexinit = kex.local_kexinit
+        self.server_kexinit = kex.peer_kexinit
+        self.logger.info(f"Key exchange with {self.host}:{self.port} complete")
+        return kex
+
+    async def send_packet(self, payload):
+        await self.socket_handler.send(self.packet_manager.create_packet(payload))
+
+    async def read_packet(self):
+        """Return the next payload as bytes, reading from the socket as needed."""
+        while True:
+            payload = self.framer.next_packet()
+            if payload is not None:
+                return bytes(payload)
+            data = await self.socket_handler.receive()
+            if not data:
+                raise ConnectionError("Connection closed by peer")
+            self.framer.feed(data)
+
+    async def close(self):
+        if self.socket_handler.writer:
+            await self.socket_handler.close()
@@ -0,0 +1,64 @@
+import asyncio
+from src.utils.logger import Logger
+
+
+class AsyncSocketHandler:
+    """asyncio streams counterpart of SocketHandler; one event loop can drive many."""
+
+    def __init__(self):
+        self.logger = Logger.get_logger(__name__)
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host, port, timeout=None):
+        self.logger.info(f"Attempting to connect to {host}:{port}")
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), timeout
+            )
+            self.logger.info(f"Successfully connected to {host}:{port}")
+        except (OSError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Failed to connect to {host}:{port}. Error: {str(e)}")
+            raise
+
+    def write(self, data):
+        """Queue data without waiting for the transport buffer to drain."""
+        if not self.writer:
+            raise ValueError("Socket is not connected")
+        self.writer.write(data)
+
+    async def send(self, data):
+        self.write(data)
+        try:
+            await self.writer.drain()
+        except OSError as e:
+            self.logger.error(f"Failed to send data. Error: {str(e)}")
+            raise
+
+    async def receive(self, buffer_size=64 * 1024):
+        if not self.reader:
+            raise ValueError("Socket is not connected")
+
+        try:
+            return await self.reader.read(buffer_size)
+        except OSError as e:
+            self.logger.error(f"Failed to receive data. Error: {str(e)}")
+            raise
+
+    async def receive_line(self):
+        """Read up to and including the next LF (used for the version banner)."""
+        if not self.reader:
+            raise ValueError("Socket is not connected")
+        return await self.reader.readline()
+
+    async def close(self):
+        if self.writer:
+            self.logger.info("Closing socket connection")
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.reader = self.writer = None
+        else:
+            self.logger.warning("Attempting to close a non-existent socket connection")
@@ -0,0 +1,133 @@
+# src/network/compression.py
+
+import struct
+import time
+import zlib
+
+# zlib@openssh.com 은 인증 성공 후에만 압축을 시작 (인증 전 공격 표면 축소)
+DELAYED_COMPRESSION = "zlib@openssh.com"
+COMPRESSION_ALGORITHMS = ("zlib@openssh.com", "zlib", "none")
+
+# 압축 해제 결과가 패킷 상한을 넘으면 거부 (zip bomb 방지)
+MAX_DECOMPRESSED_LENGTH = 256 * 1024
+# 적응형 모드에서 이보다 작은 payload 는 표본으로 쓰지 않음
+MIN_SAMPLE_SIZE = 512
+MAX_STORED_BLOCK = 0xFFFF
+
+
+def _stored_blocks(payload):
+    """Wrap ``payload`` in uncompressed deflate blocks (byte aligned, no CPU)."""
+    view = memoryview(payload)
+    pieces = []
+    for offset in range(0, max(len(view), 1), MAX_STORED_BLOCK):
+        chunk = view[offset : offset + MAX_STORED_BLOCK]
+        pieces.append(b"\x00" + struct.pack("<HH", len(chunk), len(chunk) ^ 0xFFFF))
+        pieces.append(chunk)
+    return b"".join(pieces)
+
+
+class Compressor:
+    """
+    One direction of an SSH zlib stream (RFC 4253 6.2).
+
+    Every payload is flushed so the peer can decompress it on its own, but
+    the dictionary carries over between packets, which is what makes small
+    repetitive messages (log lines, shell output) compress well.
+
+    With ``adaptive`` the compression ratio and CPU time of larger payloads
+    are tracked as moving averages. When data stops compressing (archives,
+    media, encrypted files) the stream switches to stored deflate blocks,
+    which the peer still reads as ordinary zlib data, and every
+    ``probe_interval`` large payloads one is compressed again to see whether
+    the data has changed. Before stored blocks are inserted the compressor
+    is reset with a full flush, so it never refers back across them.
+    """
+
+    def __init__(
+        self,
+        level=6,
+        adaptive=False,
+        max_ratio=0.9,
+        min_savings_rate=1024 * 1024,
+        probe_interval=64,
+        smoothing=0.25,
+    ):
+        self._compressobj = zlib.compressobj(level)
+        self.adaptive = adaptive
+        self.max_ratio = max_ratio
+        self.min_savings_rate = min_savings_rate
+        self.probe_interval = probe_interval
+        self.smoothing = smoothing
+        self.enabled = True
+        self.ratio = None
+        self.savings_rate = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_time = 0.0
+        self._skipped = 0
+
+    def compress(self, payload):
+        if not self.adaptive:
+            output = self._deflate(payload)
+        elif len(payload) < MIN_SAMPLE_SIZE:
+            output = self._deflate(payload) if self.enabled else _stored_blocks(payload)
+        elif self.enabled:
+            output = self._sample(payload)
+        elif self._skipped + 1 >= self.probe_interval:
+            output = self._sample(payload, probe=True)
+        else:
+            self._skipped += 1
+            output = _stored_blocks(payload)
+        self.bytes_in += len(payload)
+        self.bytes_out += len(output)
+        return output
+
+    def _deflate(self, payload):
+        return self._compressobj.compress(payload) + self._compressobj.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def _sample(self, payload, probe=False):
+        started = time.perf_counter()
+        output = self._deflate(payload)
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.cpu_time += elapsed
+
+        ratio = len(output) / len(payload)
+        savings_rate = (len(payload) - len(output)) / elapsed
+        if probe:
+            self.ratio, self.savings_rate = ratio, savings_rate
+            self._skipped = 0
+        else:
+            self.ratio = self._average(self.ratio, ratio)
+            self.savings_rate = self._average(self.savings_rate, savings_rate)
+
+        self.enabled = (
+            self.ratio <= self.max_ratio and self.savings_rate >= self.min_savings_rate
+        )
+        if not self.enabled:
+            # 이후 stored 블록을 건너 참조하지 않도록 사전을 초기화
+            output += self._compressobj.flush(zlib.Z_FULL_FLUSH)
+        return output
+
+    def _average(self, current, sample):
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+
+class Decompressor:
+    """The receiving side of an SSH zlib stream."""
+
+    def __init__(self, max_length=MAX_DECOMPRESSED_LENGTH):
+        self._decompressobj = zlib.decompressobj()
+        self.max_length = max_length
+
+    def decompress(self, payload):
+        try:
+            output = self._decompressobj.decompress(payload, self.max_length)
+        except zlib.error as e:
+            raise ValueError(f"Invalid compressed payload: {e}") from e
+        if self._decompressobj.unconsumed_tail:
+            raise ValueError("Decompressed payload exceeds the maximum packet size")
+        return output
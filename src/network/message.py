@@ -0,0 +1,125 @@
+# src/network/message.py
+# SSH 메시지 번호와 RFC 4251 5절 데이터 타입 인코딩/디코딩
+
+import struct
+
+SSH_MSG_DISCONNECT = 1
+SSH_MSG_IGNORE = 2
+SSH_MSG_UNIMPLEMENTED = 3
+SSH_MSG_DEBUG = 4
+SSH_MSG_SERVICE_REQUEST = 5
+SSH_MSG_SERVICE_ACCEPT = 6
+SSH_MSG_EXT_INFO = 7
+SSH_MSG_KEXINIT = 20
+SSH_MSG_NEWKEYS = 21
+
+SSH_MSG_USERAUTH_REQUEST = 50
+SSH_MSG_USERAUTH_FAILURE = 51
+SSH_MSG_USERAUTH_SUCCESS = 52
+SSH_MSG_USERAUTH_BANNER = 53
+SSH_MSG_USERAUTH_PK_OK = 60
+SSH_MSG_USERAUTH_PASSWD_CHANGEREQ = 60
+
+SSH_MSG_GLOBAL_REQUEST = 80
+SSH_MSG_REQUEST_SUCCESS = 81
+SSH_MSG_REQUEST_FAILURE = 82
+SSH_MSG_CHANNEL_OPEN = 90
+SSH_MSG_CHANNEL_OPEN_CONFIRMATION = 91
+SSH_MSG_CHANNEL_OPEN_FAILURE = 92
+SSH_MSG_CHANNEL_WINDOW_ADJUST = 93
+SSH_MSG_CHANNEL_DATA = 94
+SSH_MSG_CHANNEL_EXTENDED_DATA = 95
+SSH_MSG_CHANNEL_EOF = 96
+SSH_MSG_CHANNEL_CLOSE = 97
+SSH_MSG_CHANNEL_REQUEST = 98
+SSH_MSG_CHANNEL_SUCCESS = 99
+SSH_MSG_CHANNEL_FAILURE = 100
+
+_UINT32 = struct.Struct(">I")
+_UINT64 = struct.Struct(">Q")
+
+
+def pack_byte(value):
+    return bytes([value])
+
+
+def pack_boolean(value):
+    return b"\x01" if value else b"\x00"
+
+
+def pack_uint32(value):
+    return _UINT32.pack(value)
+
+
+def pack_uint64(value):
+    return _UINT64.pack(value)
+
+
+def pack_string(value):
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return _UINT32.pack(len(value)) + bytes(value)
+
+
+def pack_mpint(value):
+    if value == 0:
+        return _UINT32.pack(0)
+    magnitude = value if value > 0 else -value - 1
+    length = (magnitude.bit_length() + 8) // 8
+    return pack_string(value.to_bytes(length, "big", signed=True))
+
+
+def pack_name_list(names):
+    return pack_string(",".join(names).encode("ascii"))
+
+
+class MessageReader:
+    """Sequential reader over one message payload."""
+
+    def __init__(self, data, offset=0):
+        self.data = memoryview(data)
+        self.offset = offset
+
+    @property
+    def remaining(self):
+        return len(self.data) - self.offset
+
+    def _take(self, size):
+        if size > self.remaining:
+            raise ValueError("Truncated SSH message")
+        start = self.offset
+        self.offset += size
+        return self.data[start : self.offset]
+
+    def read_byte(self):
+        return self._take(1)[0]
+
+    def read_boolean(self):
+        return self.read_byte() != 0
+
+    def read_uint32(self):
+        return _UINT32.unpack(self._take(4))[0]
+
+    def read_uint64(self):
+        return _UINT64.unpack(self._take(8))[0]
+
+    def read_string(self):
+        """Return the next string as bytes."""
+        return bytes(self._take(self.read_uint32()))
+
+    def read_string_view(self):
+        """Return the next string as a memoryview into the payload (no copy)."""
+        return self._take(self.read_uint32())
+
+    def read_text(self):
+        return self.read_string().decode("utf-8", errors="replace")
+
+    def read_mpint(self):
+        return int.from_bytes(self.read_string(), "big", signed=True)
+
+    def read_name_list(self):
+        value = self.read_string().decode("ascii")
+        return value.split(",") if value else []
+
+    def read_remaining(self):
+        return bytes(self._take(self.remaining))
@@ -0,0 +1,120 @@
+# src/network/packet_framer.py
+
+from src.utils.logger import Logger
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+# 이보다 여유 공간이 적으면 읽기 전에 버퍼를 앞으로 당긴다
+MIN_READ_SIZE = 4096
+
+
+class PacketFramer:
+    """
+    Incremental SSH packet framer over a reusable receive buffer.
+
+    Bytes are read with ``recv_into`` straight into one ``bytearray``; the
+    first cipher block of each packet is decrypted to learn ``packet_length``
+    and the remaining bytes are decrypted in place once they have arrived.
+    Payloads are handed out as ``memoryview`` slices of that buffer, so they
+    are only valid until the next call that reads into the framer.
+    """
+
+    def __init__(self, packet_manager, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.logger = Logger.get_logger(__name__)
+        self.packet_manager = packet_manager
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._packet_length = None
+
+    @property
+    def buffered(self):
+        """Number of received bytes not yet consumed as packets."""
+        return self._end - self._start
+
+    def feed(self, data):
+        """Append bytes that were already read elsewhere (e.g. after the banner)."""
+        size = len(data)
+        self._reserve(self.buffered + size)
+        self._view[self._end : self._end + size] = data
+        self._end += size
+
+    def receive(self, socket_handler):
+        """Read once from the socket into the free part of the buffer."""
+        self._reserve(self._bytes_needed())
+        if len(self._buffer) - self._end < MIN_READ_SIZE and self._start:
+            self._compact()
+
+        received = socket_handler.receive_into(self._view[self._end :])
+        if not received:
+            raise ConnectionError("Connection closed by peer")
+        self._end += received
+        return received
+
+    def next_packet(self):
+        """Return the next buffered payload, or None if it is not complete yet."""
+        packet_manager = self.packet_manager
+        if self._packet_length is None:
+            block_size = packet_manager.receive_block_size
+            if self.buffered < block_size:
+                return None
+            self._packet_length = packet_manager.begin_packet(
+                self._view[self._start : self._start + block_size]
+            )
+
+        total = 4 + self._packet_length + packet_manager.receive_mac_length
+        if self.buffered < total:
+            return None
+
+        payload = packet_manager.finish_packet(
+            self._view[self._start : self._start + total]
+        )
+        self._start += total
+        self._packet_length = None
+        if self._start == self._end:
+            self._start = self._end = 0
+        return payload
+
+    def packets(self):
+        """Yield every complete payload currently in the buffer."""
+        while True:
+            payload = self.next_packet()
+            if payload is None:
+                return
+            yield payload
+
+    def read_packet(self, socket_handler):
+        """Block until one whole packet has been received and return its payload."""
+        while True:
+            payload = self.next_packet()
+            if payload is not None:
+                return payload
+            self.receive(socket_handler)
+
+    def _bytes_needed(self):
+        if self._packet_length is None:
+            return self.packet_manager.receive_block_size
+        return 4 + self._packet_length + self.packet_manager.receive_mac_length
+
+    def _reserve(self, size):
+        """Make room for ``size`` bytes counted from the current packet start."""
+        if self._start + size <= len(self._buffer):
+            return
+        if size <= len(self._buffer):
+            self._compact()
+            return
+
+        # 패킷이 버퍼보다 크면 새 버퍼를 할당 (이전 버퍼의 view 는 그대로 유효)
+        capacity = max(size, 2 * len(self._buffer))
+        self.logger.debug("Growing receive buffer to %d bytes", capacity)
+        buffer = bytearray(capacity)
+        buffered = self.buffered
+        buffer[:buffered] = self._view[self._start : self._end]
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._start, self._end = 0, buffered
+
+    def _compact(self):
+        buffered = self.buffered
+        self._view[:buffered] = self._view[self._start : self._end]
+        self._start, self._end = 0, buffered
@@ -1,82 +1,320 @@
 # src/network/packet_manager.py
 
 import struct
-import hmac
-import hashlib
 import os
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
+import time
+from src.crypto.cipher_suites import PlainCipher, create_packet_cipher
+from src.network.compression import (
+    COMPRESSION_ALGORITHMS,
+    DELAYED_COMPRESSION,
+    Compressor,
+    Decompressor,
+)
+from src.network.message import SSH_MSG_USERAUTH_SUCCESS
+from src.utils import telemetry
+
+# OpenSSH 와 동일한 상한 (PACKET_MAX_SIZE)
+MAX_PACKET_LENGTH = 256 * 1024
+# 시퀀스 번호는 uint32 로 2^32 에서 0 으로 돌아감 (RFC 4253 6.4)
+SEQUENCE_MASK = 0xFFFFFFFF
 
 
 class PacketManager:
     def __init__(self):
         self.sequence_number = 0
-        self.encryption_key = None
-        self.mac_key = None
-        self.cipher = None
-
-    def set_encryption(self, encryption_key, mac_key):
-        self.encryption_key = encryption_key
-        self.mac_key = mac_key
-        self.cipher = Cipher(
-            algorithms.AES(encryption_key),
-            modes.CTR(b"\x00" * 16),
-            backend=default_backend(),
+        self.receive_sequence_number = 0
+        self._send_cipher = PlainCipher()
+        self._receive_cipher = PlainCipher()
+        self._batch_buffer = bytearray()
+        self._compressor = None
+        self._decompressor = None
+        self._send_compression = "none"
+        self._receive_compression = "none"
+        self._adaptive_compression = False
+        self.authenticated = False
+        self.stats = telemetry.traffic.track(self)
+        # 현재 키로 보낸/받은 (패킷 수, 바이트 수, 키 설치 시각): 재키 교환 판단용
+        self._send_mark = (0, 0, time.monotonic())
+        self._receive_mark = (0, 0, time.monotonic())
+
+    def set_encryption(
+        self,
+        encryption_key,
+        mac_key,
+        iv=None,
+        decryption_key=None,
+        decryption_mac_key=None,
+        decryption_iv=None,
+        cipher=None,
+        mac="hmac-sha2-256",
+    ):
+        """
+        Install the transport keys for both directions.
+
+        The cipher contexts created here live until the next call, so the
+        AES-CTR counter keeps running across packets as RFC 4344 requires.
+        ``cipher`` defaults to AES-CTR sized by the key; receive-side keys
+        default to the send-side ones.
+        """
+        cipher = cipher or f"aes{len(encryption_key) * 8}-ctr"
+        mac = mac if mac_key else None
+        self.set_outgoing_cipher(cipher, encryption_key, iv, mac, mac_key)
+        self.set_incoming_cipher(
+            cipher,
+            decryption_key or encryption_key,
+            decryption_iv or iv,
+            mac,
+            decryption_mac_key or mac_key,
+        )
+
+    def set_outgoing_cipher(self, cipher, key, iv=None, mac=None, mac_key=None):
+        """Switch the send direction to the named cipher/MAC suite."""
+        self._send_cipher = create_packet_cipher(
+            cipher, key, iv or b"\x00" * 16, mac, mac_key, encrypt=True
         )
+        stats = self.stats
+        self._send_mark = (stats.packets_sent, stats.bytes_sent, time.monotonic())
+
+    def set_incoming_cipher(self, cipher, key, iv=None, mac=None, mac_key=None):
+        """Switch the receive direction to the named cipher/MAC suite."""
+        self._receive_cipher = create_packet_cipher(
+            cipher, key, iv or b"\x00" * 16, mac, mac_key, encrypt=False
+        )
+        stats = self.stats
+        self._receive_mark = (
+            stats.packets_received,
+            stats.bytes_received,
+            time.monotonic(),
+        )
+
+    def rekey_due(self, max_bytes, max_packets, max_age):
+        """
+        Whether either direction has used its keys past a limit (RFC 4253 9,
+        RFC 4344 3.2). A limit of 0 or None is not checked.
+        """
+        stats = self.stats
+        for packets, size, (packets_mark, bytes_mark, installed) in (
+            (stats.packets_sent, stats.bytes_sent, self._send_mark),
+            (stats.packets_received, stats.bytes_received, self._receive_mark),
+        ):
+            if max_bytes and size - bytes_mark >= max_bytes:
+                return True
+            if max_packets and packets - packets_mark >= max_packets:
+                return True
+            if max_age and time.monotonic() - installed >= max_age:
+                return True
+        return False
+
+    def set_outgoing_compression(self, name, adaptive=False):
+        """
+        Switch the send direction to ``none``, ``zlib`` or ``zlib@openssh.com``.
+
+        Called on every NEWKEYS: each key exchange starts a new zlib stream
+        (RFC 4253 6.2). Delayed compression starts with the first packet
+        after SSH_MSG_USERAUTH_SUCCESS.
+        """
+        if name not in COMPRESSION_ALGORITHMS:
+            raise ValueError(f"Unsupported compression: {name}")
+        self._adaptive_compression = adaptive
+        self._send_compression = name
+        self._compressor = None
+        self._start_compression()
+
+    def set_incoming_compression(self, name):
+        """Switch the receive direction; see set_outgoing_compression."""
+        if name not in COMPRESSION_ALGORITHMS:
+            raise ValueError(f"Unsupported compression: {name}")
+        self._receive_compression = name
+        self._decompressor = None
+        self._start_compression()
+
+    @property
+    def compressor(self):
+        """The active outgoing Compressor (ratio/CPU statistics), or None."""
+        return self._compressor
+
+    def _start_compression(self):
+        def active(name):
+            return name != "none" and (
+                name != DELAYED_COMPRESSION or self.authenticated
+            )
+
+        if self._compressor is None and active(self._send_compression):
+            self._compressor = Compressor(adaptive=self._adaptive_compression)
+        if self._decompressor is None and active(self._receive_compression):
+            self._decompressor = Decompressor()
+
+    def _check_authenticated(self, payload):
+        # 클라이언트는 USERAUTH_SUCCESS 수신 후, 서버는 송신 후 지연 압축 시작
+        if (
+            not self.authenticated
+            and payload
+            and payload[0] == SSH_MSG_USERAUTH_SUCCESS
+        ):
+            self.authenticated = True
+            self._start_compression()
+
+    @property
+    def receive_block_size(self):
+        """Bytes needed from an incoming packet before its length is known."""
+        return self._receive_cipher.block_size
+
+    @property
+    def receive_mac_length(self):
+        return self._receive_cipher.tag_length
+
+    def _padding_length(self, payload_length, cipher):
+        # AEAD/EtM 에서는 평문으로 전송되는 길이 필드를 정렬 계산에서 제외
+        covered = payload_length + (1 if cipher.length_in_clear else 5)
+        padding_length = cipher.block_size - (covered % cipher.block_size)
+        if padding_length < 4:
+            padding_length += cipher.block_size
+        return padding_length
 
     def create_packet(self, payload):
         """Create an SSH packet from the given payload."""
-        padding_length = 8 - ((len(payload) + 5) % 8)
-        if padding_length < 4:
-            padding_length += 8
+        cipher = self._send_cipher
+        message = payload
+        if self._compressor is not None:
+            payload = self._compressor.compress(payload)
+        padding_length = self._padding_length(len(payload), cipher)
 
         padding = os.urandom(padding_length)
         packet_length = len(payload) + padding_length + 1
-        packet = (
+        packet = bytearray(
             struct.pack(">I", packet_length)
             + bytes([padding_length])
             + payload
             + padding
         )
 
-        if self.encryption_key:
-            encryptor = self.cipher.encryptor()
-            packet = encryptor.update(packet) + encryptor.finalize()
+        stats = self.stats
+        if stats.packets_sent % telemetry.CRYPTO_SAMPLE_INTERVAL:
+            mac = cipher.seal(self.sequence_number, memoryview(packet))
+        else:
+            started = time.perf_counter()
+            mac = cipher.seal(self.sequence_number, memoryview(packet))
+            telemetry.record_crypto("seal", cipher, time.perf_counter() - started)
+        self.sequence_number = (self.sequence_number + 1) & SEQUENCE_MASK
+        stats.packets_sent += 1
+        stats.bytes_sent += len(packet) + len(mac)
+        self._check_authenticated(message)
+        return bytes(packet) + mac
+
+    def create_packets(self, payloads):
+        """
+        Create several SSH packets with as few cipher calls as possible.
+
+        All packets are laid out back to back in a reusable buffer and sealed
+        in place; with AES-CTR that is a single ``update_into`` for the whole
+        batch. Returns the wire segments in order as a list of memoryviews
+        (suitable for ``sendmsg``), valid until the next call.
+        """
+        cipher = self._send_cipher
+        layout = []
+        total = 0
+        for message in payloads:
+            payload = message
+            if self._compressor is not None:
+                payload = self._compressor.compress(message)
+            padding_length = self._padding_length(len(payload), cipher)
+            size = 5 + len(payload) + padding_length
+            layout.append((total, size, payload, padding_length))
+            total += size
+            self._check_authenticated(message)
+
+        if len(self._batch_buffer) < total:
+            self._batch_buffer = bytearray(total)
+        view = memoryview(self._batch_buffer)
+        padding = os.urandom(total)
 
-        if self.mac_key:
-            mac = hmac.new(
-                self.mac_key,
-                struct.pack(">I", self.sequence_number) + packet,
-                hashlib.sha256,
-            ).digest()
-            packet += mac
+        spans = []
+        for offset, size, payload, padding_length in layout:
+            end = offset + size
+            struct.pack_into(">IB", view, offset, size - 4, padding_length)
+            view[offset + 5 : end - padding_length] = payload
+            view[end - padding_length : end] = padding[offset : offset + padding_length]
+            spans.append((offset, end))
 
-        self.sequence_number += 1
-        return packet
+        stats = self.stats
+        sampled = (
+            stats.packets_sent // telemetry.CRYPTO_SAMPLE_INTERVAL
+            != (stats.packets_sent + len(spans)) // telemetry.CRYPTO_SAMPLE_INTERVAL
+        )
+        started = time.perf_counter() if sampled else 0.0
+        tags = cipher.seal_many(self.sequence_number, view, spans)
+        if sampled:
+            elapsed = time.perf_counter() - started
+            telemetry.record_crypto("seal", cipher, elapsed / len(spans))
+        self.sequence_number = (self.sequence_number + len(spans)) & SEQUENCE_MASK
+        stats.packets_sent += len(spans)
+        stats.bytes_sent += total + cipher.tag_length * len(spans)
+
+        segments = []
+        for (start, end), tag in zip(spans, tags):
+            segments.append(view[start:end])
+            if tag:
+                segments.append(tag)
+        return segments
 
     def parse_packet(self, data):
         """Parse an SSH packet and return the payload."""
-        if self.mac_key:
-            mac_length = 32  # SHA256
-            received_mac = data[-mac_length:]
-            data = data[:-mac_length]
-            expected_mac = hmac.new(
-                self.mac_key,
-                struct.pack(">I", self.sequence_number) + data,
-                hashlib.sha256,
-            ).digest()
-            if received_mac != expected_mac:
-                raise ValueError("MAC verification failed")
-
-        if self.encryption_key:
-            decryptor = self.cipher.decryptor()
-            data = decryptor.update(data) + decryptor.finalize()
-
-        packet_length = struct.unpack(">I", data[:4])[0]
-        padding_length = data[4]
-        payload = data[5 : packet_length - padding_length]
-
-        self.sequence_number += 1
+        view = memoryview(bytearray(data))
+        packet_length = self.begin_packet(view[: self.receive_block_size])
+        payload = self.finish_packet(
+            view[: 4 + packet_length + self.receive_mac_length]
+        )
+        return bytes(payload)
+
+    def begin_packet(self, first_block):
+        """
+        Decrypt the first cipher block of an incoming packet in place.
+
+        :param first_block: writable memoryview of exactly ``receive_block_size`` bytes
+        :return: the packet_length field of the packet
+        """
+        cipher = self._receive_cipher
+        packet_length = cipher.open_length(self.receive_sequence_number, first_block)
+
+        aligned = packet_length if cipher.length_in_clear else packet_length + 4
+        if packet_length > MAX_PACKET_LENGTH or packet_length < cipher.block_size - 4:
+            raise ValueError(f"Invalid packet length: {packet_length}")
+        if aligned % cipher.block_size:
+            raise ValueError("Packet length is not a multiple of the block size")
+        return packet_length
+
+    def finish_packet(self, packet):
+        """
+        Decrypt the rest of an incoming packet in place and verify its MAC.
+
+        :param packet: writable memoryview of the whole packet plus MAC, whose
+            first block was already handled by ``begin_packet``
+        :return: memoryview of the payload inside ``packet`` (no copy), or
+            the decompressed payload as bytes when compression is active
+        """
+        cipher = self._receive_cipher
+        body = packet[: len(packet) - cipher.tag_length]
+        stats = self.stats
+        if stats.packets_received % telemetry.CRYPTO_SAMPLE_INTERVAL:
+            cipher.open(self.receive_sequence_number, body, packet[len(body) :])
+        else:
+            started = time.perf_counter()
+            cipher.open(self.receive_sequence_number, body, packet[len(body) :])
+            telemetry.record_crypto("open", cipher, time.perf_counter() - started)
+        stats.packets_received += 1
+        stats.bytes_received += len(packet)
+
+        padding_length = body[4]
+        if padding_length < 4 or padding_length > len(body) - 5:
+            raise ValueError(f"Invalid padding length: {padding_length}")
+
+        self.receive_sequence_number = (
+            self.receive_sequence_number + 1
+        ) & SEQUENCE_MASK
+        payload = body[5 : len(body) - padding_length]
+        if self._decompressor is not None:
+            payload = self._decompressor.decompress(payload)
+        self._check_authenticated(payload)
         return payload
 
     def create_kexinit_packet(
@@ -94,6 +332,37 @@ class PacketManager:
         languages_server_to_client,
     ):
         """Create a SSH_MSG_KEXINIT packet."""
+        return self.create_packet(
+            self.create_kexinit_payload(
+                cookie,
+                kex_algorithms,
+                server_host_key_algorithms,
+                encryption_algorithms_client_to_server,
+                encryption_algorithms_server_to_client,
+                mac_algorithms_client_to_server,
+                mac_algorithms_server_to_client,
+                compression_algorithms_client_to_server,
+                compression_algorithms_server_to_client,
+                languages_client_to_server,
+                languages_server_to_client,
+            )
+        )
+
+    def create_kexinit_payload(
+        self,
+        cookie,
+        kex_algorithms,
+        server_host_key_algorithms,
+        encryption_algorithms_client_to_server,
+        encryption_algorithms_server_to_client,
+        mac_algorithms_client_to_server,
+        mac_algorithms_server_to_client,
+        compression_algorithms_client_to_server,
+        compression_algorithms_server_to_client,
+        languages_client_to_server,
+        languages_server_to_client,
+    ):
+        """Create a SSH_MSG_KEXINIT payload (kept by the caller for the exchange hash)."""
         payload = (
             b"\x14"  # SSH_MSG_KEXINIT
             + cookie
@@ -110,7 +379,7 @@ class PacketManager:
             + b"\x00"  # first_kex_packet_follows
             + b"\x00\x00\x00\x00"  # 0 (reserved for future extension)
         )
-        return self.create_packet(payload)
+        return payload
 
     def _create_name_list(self, names):
         name_list = ",".join(names).encode("ascii")
@@ -1,51 +1,269 @@
+import os
 import socket
-from src.utils.logger import Logger
+import threading
+import time
+from contextlib import contextmanager
+from src.config.config import Config
+from src.utils.logger import Logger, log_payload
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
 
 
 class SocketHandler:
-    def __init__(self):
+    """
+    Blocking TCP socket with an optional coalescing send queue.
+
+    ``send`` writes immediately (after anything already queued).
+    ``queue`` holds small packets back so that a burst of them, such as
+    window adjusts or keystrokes, leaves in one ``sendmsg`` call and fills
+    TCP segments. The queue flushes once ``coalesce_bytes`` are pending,
+    ``coalesce_delay`` seconds after its first packet, or before the next
+    receive, so nothing queued can delay a reply being waited for.
+
+    A write that fails (possibly after part of it went out) leaves a gap in
+    the packet stream, so the error is kept and raised again by every later
+    send, flush and receive instead of sending past the gap.
+    """
+
+    def __init__(
+        self,
+        coalesce_bytes=Config.SEND_COALESCE_BYTES,
+        coalesce_delay=Config.SEND_COALESCE_DELAY,
+        nodelay=Config.TCP_NODELAY,
+        send_buffer_size=Config.SOCKET_SEND_BUFFER,
+        receive_buffer_size=Config.SOCKET_RECEIVE_BUFFER,
+    ):
         self.logger = Logger.get_logger(__name__)
         self.socket = None
+        self.coalesce_bytes = coalesce_bytes
+        self.coalesce_delay = coalesce_delay
+        self.nodelay = nodelay
+        self.send_buffer_size = send_buffer_size
+        self.receive_buffer_size = receive_buffer_size
+        self._queue = []
+        self._queued_bytes = 0
+        self._deadline = None
+        self._send_condition = threading.Condition(threading.RLock())
+        self._flusher = None
+        self._send_error = None
 
-    def connect(self, host, port):
+    def connect(self, host, port, timeout=None):
         self.logger.info(f"Attempting to connect to {host}:{port}")
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # 버퍼 크기는 연결 전에 설정해야 TCP 윈도우 스케일에 반영됨
+            if self.send_buffer_size:
+                self.socket.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size
+                )
+            if self.receive_buffer_size:
+                self.socket.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer_size
+                )
+            self._send_error = None
+            if timeout is not None:
+                self.socket.settimeout(timeout)
             self.socket.connect((host, port))
+            self.set_nodelay(self.nodelay)
             self.logger.info(f"Successfully connected to {host}:{port}")
         except socket.error as e:
             self.logger.error(f"Failed to connect to {host}:{port}. Error: {str(e)}")
             raise
 
+    def set_nodelay(self, enabled):
+        """Turn Nagle's algorithm off (True) or on; the queue does the batching."""
+        self.nodelay = enabled
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(enabled))
+
+    def set_cork(self, enabled):
+        """Hold partial TCP segments in the kernel (Linux TCP_CORK; no-op elsewhere)."""
+        if hasattr(socket, "TCP_CORK"):
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, int(enabled))
+
+    @contextmanager
+    def corked(self):
+        """Cork the socket for a run of writes, sending full segments only."""
+        self.set_cork(True)
+        try:
+            yield
+        finally:
+            if self.socket:
+                self.set_cork(False)
+
     def send(self, data):
         if not self.socket:
             raise ValueError("Socket is not connected")
 
-        self.logger.debug(f"Sending data: {data}")
+        log_payload(self.logger, "Sending data", data)
+        try:
+            with self._send_condition:
+                self._check_send_error()
+                if self._queue:
+                    self._send_vectored(self._take_queue() + [data])
+                else:
+                    self.socket.sendall(data)
+        except socket.error as e:
+            self._send_error = self._send_error or e
+            self.logger.error(f"Failed to send data. Error: {str(e)}")
+            raise
+
+    def send_buffers(self, buffers):
+        """Send queued data and then ``buffers`` with scatter/gather writes."""
+        if not self.socket:
+            raise ValueError("Socket is not connected")
+
         try:
-            self.socket.sendall(data)
-            self.logger.debug("Data sent successfully")
+            with self._send_condition:
+                self._check_send_error()
+                self._send_vectored(self._take_queue() + list(buffers))
         except socket.error as e:
+            self._send_error = self._send_error or e
             self.logger.error(f"Failed to send data. Error: {str(e)}")
             raise
 
+    def queue(self, data):
+        """
+        Queue ``data`` for a coalesced write.
+
+        The data is copied, so reusable buffers (``create_packets`` segments)
+        may be passed in.
+        """
+        if not self.socket:
+            raise ValueError("Socket is not connected")
+
+        with self._send_condition:
+            self._check_send_error()
+            self._queue.append(bytes(data))
+            self._queued_bytes += len(data)
+            if self._queued_bytes < self.coalesce_bytes and self.coalesce_delay > 0:
+                if self._deadline is None:
+                    self._deadline = time.monotonic() + self.coalesce_delay
+                    self._start_flusher()
+                    self._send_condition.notify()
+                return
+        self.flush()
+
+    def flush(self):
+        """Write everything queued now."""
+        with self._send_condition:
+            self._check_send_error()
+            if not self._queue:
+                return
+            try:
+                self._send_vectored(self._take_queue())
+            except socket.error as e:
+                self._send_error = e
+                self.logger.error(f"Failed to send data. Error: {str(e)}")
+                raise
+
+    def _check_send_error(self):
+        if self._send_error is not None:
+            raise self._send_error
+
+    def _take_queue(self):
+        buffers = self._queue
+        self._queue = []
+        self._queued_bytes = 0
+        self._deadline = None
+        return buffers
+
+    def _send_vectored(self, buffers):
+        views = [memoryview(b).cast("B") for b in buffers if len(b)]
+        if not hasattr(self.socket, "sendmsg"):
+            self.socket.sendall(b"".join(views))
+            return
+        if len(views) <= IOV_MAX:
+            self._sendmsg_all(views)
+            return
+        # sendmsg 한 번에 담지 못하면 여러 번에 나눠 보내는 동안 작은 세그먼트를 막음
+        with self.corked():
+            self._sendmsg_all(views)
+
+    def _sendmsg_all(self, views):
+        index = 0
+        while index < len(views):
+            sent = self.socket.sendmsg(views[index : index + IOV_MAX])
+            while index < len(views) and sent >= len(views[index]):
+                sent -= len(views[index])
+                index += 1
+            if sent:
+                views[index] = views[index][sent:]
+
+    def _start_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="socket-flush", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        """Flush the queue when its oldest packet has waited ``coalesce_delay``."""
+        with self._send_condition:
+            while self.socket is not None:
+                if self._deadline is None:
+                    self._send_condition.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._send_condition.wait(remaining)
+                    continue
+                try:
+                    self._send_vectored(self._take_queue())
+                except OSError as e:
+                    # 이미 암호화된 패킷이 빠졌으므로 이후의 send/flush/receive 가
+                    # 모두 이 오류를 다시 냄
+                    self._send_error = e
+                    self.logger.warning(f"Delayed flush failed: {e}")
+                    return
+
     def receive(self, buffer_size=1024):
         if not self.socket:
             raise ValueError("Socket is not connected")
 
-        self.logger.debug(f"Attempting to receive data (buffer size: {buffer_size})")
+        self.flush()
         try:
             data = self.socket.recv(buffer_size)
-            self.logger.debug(f"Received data: {data}")
+            log_payload(self.logger, "Received data", data)
             return data
         except socket.error as e:
             self.logger.error(f"Failed to receive data. Error: {str(e)}")
             raise
 
+    def receive_into(self, buffer, nbytes=0):
+        if not self.socket:
+            raise ValueError("Socket is not connected")
+
+        self.flush()
+        try:
+            received = self.socket.recv_into(buffer, nbytes)
+            log_payload(self.logger, "Received data", buffer, received)
+            return received
+        except socket.error as e:
+            self.logger.error(f"Failed to receive data. Error: {str(e)}")
+            raise
+
     def close(self):
         if self.socket:
             self.logger.info("Closing socket connection")
-            self.socket.close()
-            self.socket = None
+            # 전송 중인 스레드가 있으면 기다리지 않고 shutdown 으로 깨움
+            if self._send_condition.acquire(blocking=False):
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+                finally:
+                    self._send_condition.release()
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            with self._send_condition:
+                self.socket.close()
+                self.socket = None
+                self._queue.clear()
+                self._send_condition.notify_all()
         else:
             self.logger.warning("Attempting to close a non-existent socket connection")
@@ -0,0 +1,307 @@
+import threading
+import time
+from collections import deque
+from src.auth.auth_manager import AuthManager
+from src.config.config import Config
+from src.crypto.host_keys import HostKeyVerifier
+from src.crypto.key_exchange import KeyExchange
+from src.network.packet_framer import PacketFramer
+from src.network.packet_manager import PacketManager
+from src.network.socket_handler import SocketHandler
+from src.network.message import (
+    MessageReader,
+    SSH_MSG_DEBUG,
+    SSH_MSG_DISCONNECT,
+    SSH_MSG_IGNORE,
+    SSH_MSG_KEXINIT,
+    SSH_MSG_NEWKEYS,
+    SSH_MSG_SERVICE_REQUEST,
+    SSH_MSG_UNIMPLEMENTED,
+)
+from src.network.version_exchange import VersionExchanger
+from src.session.channel_manager import ChannelManager
+from src.utils import telemetry
+from src.utils.logger import Logger
+
+# 키 교환 메시지 번호 범위 (RFC 4250 4.1.2)
+KEX_MESSAGES = range(SSH_MSG_KEXINIT, 50)
+# 재키 교환이 끝난 뒤 보류했던 패킷을 이만큼씩 묶어 전송
+_RELEASE_BATCH = 64
+
+
+class Transport:
+    """
+    One SSH connection: socket, version exchange and packet framing.
+
+    A transport can be shared by several sessions (see ConnectionPool), so
+    sending and receiving are each guarded by their own lock. Channels are
+    multiplexed over it by ``channel_manager``.
+
+    Keys are renewed in the background once either direction has carried
+    ``rekey_bytes`` or ``rekey_packets`` under them, or they are older than
+    ``rekey_interval`` seconds (checked as packets go by), and whenever the
+    server asks. Until our NEWKEYS is out, outgoing service and channel
+    messages are held in order rather than sent; the reading thread drives
+    the exchange as its messages arrive, so senders never wait for it.
+    """
+
+    def __init__(
+        self,
+        host,
+        port,
+        username=None,
+        client_version=Config.SSH_CLIENT_VERSION,
+        host_key_verifier=None,
+        auth_manager=None,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.host = host
+        self.port = port
+        self.username = username
+        self.auth_manager = auth_manager
+        self.socket_handler = SocketHandler()
+        self.client_version = client_version
+        self.version_exchanger = VersionExchanger(client_version)
+        self.host_key_verifier = host_key_verifier or HostKeyVerifier(
+            Config.KNOWN_HOSTS_PATH, Config.HOST_KEY_CACHE_PATH, Config.HOST_KEY_POLICY
+        )
+        self.packet_manager = PacketManager()
+        self.framer = PacketFramer(self.packet_manager)
+        self.server_version = None
+        self.session_id = None
+        self.channel_manager = ChannelManager(self)
+        self.created_at = time.monotonic()
+        self.rekey_bytes = Config.REKEY_BYTES
+        self.rekey_packets = Config.REKEY_PACKETS
+        self.rekey_interval = Config.REKEY_INTERVAL
+        self.rekeys = 0
+        self._send_lock = threading.Lock()
+        self._receive_lock = threading.Lock()
+        self._closed = False
+        self._strict_kex = False
+        # 진행 중인 키 교환과 그동안 보류한 페이로드 (None 이면 보류하지 않음)
+        self._kex = None
+        self._kex_span = None
+        self._held = None
+
+    def connect(self, timeout=None):
+        """Open the TCP connection, exchange versions and run the key exchange."""
+        with telemetry.span(
+            "ssh.connect",
+            phase="connect",
+            **{"net.peer.name": self.host, "net.peer.port": self.port},
+        ):
+            with telemetry.span("ssh.tcp_connect", phase="tcp"):
+                self.socket_handler.connect(self.host, self.port, timeout=timeout)
+            # KEXINIT 은 서버 버전과 무관하므로 배너와 함께 보냄
+            kex = self._create_key_exchange()
+            is_valid, result = self.version_exchanger.exchange_versions(
+                self.socket_handler, self.packet_manager.create_packet(kex.start())
+            )
+            if not is_valid:
+                self.close()
+                raise ConnectionError(result)
+            self.server_version = kex.server_version = result.strip()
+            self.framer.feed(self.version_exchanger.excess)
+            try:
+                self.key_exchange(kex)
+                if self.username is not None:
+                    self.authenticate()
+            except BaseException:
+                self.close()
+                raise
+        return self
+
+    def _create_key_exchange(self):
+        return KeyExchange(
+            self.packet_manager,
+            self.client_version,
+            self.server_version or "",
+            host_key_verifier=self.host_key_verifier,
+            host=self.host,
+            port=self.port,
+            session_id=self.session_id,
+            strict=self._strict_kex,
+        )
+
+    def key_exchange(self, kex=None):
+        """
+        Run a key exchange to completion and switch to the new keys.
+
+        ``kex`` is an exchange whose KEXINIT already went out (with the
+        version banner); otherwise a new one is started. This reads the
+        socket itself, so it is meant for the initial exchange; once
+        channels are open use ``rekey``.
+        """
+        with telemetry.span("ssh.key_exchange", phase="key_exchange") as current:
+            if kex is None:
+                kex = self._create_key_exchange()
+                outputs = [kex.start()]
+            else:
+                outputs = []
+            self._kex = kex
+            try:
+                while True:
+                    for payload in outputs:
+                        self.send_packet(payload)
+                    kex.outputs_sent()
+                    if kex.complete:
+                        break
+                    payload = self.read_packet()
+                    if payload[0] == SSH_MSG_DISCONNECT:
+                        self.handle_packet(payload)
+                    outputs = kex.handle(payload)
+            finally:
+                self._kex = None
+            telemetry.describe_key_exchange(current, kex)
+        self.session_id = kex.session_id
+        self._strict_kex = kex.strict
+        return kex
+
+    def rekey(self, wait=False, timeout=None):
+        """
+        Start a key exchange now unless one is already running. With
+        ``wait`` block, reading packets, until the new keys are in use.
+        """
+        with self._send_lock:
+            if self._kex is None:
+                self._start_rekey()
+        if wait:
+            self.channel_manager._wait_for(lambda: self._kex is None, timeout)
+
+    def _rekey_due(self):
+        return (
+            self._kex is None
+            and self.session_id is not None
+            and self.packet_manager.rekey_due(
+                self.rekey_bytes, self.rekey_packets, self.rekey_interval
+            )
+        )
+
+    def _start_rekey(self):
+        """Send our KEXINIT and start holding other messages; needs ``_send_lock``."""
+        kex = self._kex = self._create_key_exchange()
+        self._held = deque()
+        self._kex_span = telemetry.tracer.start_span("ssh.rekey")
+        self.logger.info(f"Starting key re-exchange with {self.host}:{self.port}")
+        self.socket_handler.send(self.packet_manager.create_packet(kex.start()))
+
+    def _on_kex_message(self, payload):
+        """Feed a key exchange message that arrived between channel traffic."""
+        kex = self._kex
+        if kex is None and payload[0] == SSH_MSG_KEXINIT:
+            # 서버가 시작한 재키 교환: 우리 KEXINIT 을 먼저 보냄
+            with self._send_lock:
+                if self._kex is None:
+                    self._start_rekey()
+                kex = self._kex
+        if kex is None:
+            raise ConnectionError(f"Unexpected key exchange message {payload[0]}")
+        try:
+            outputs = kex.handle(payload)
+            with self._send_lock:
+                for output in outputs:
+                    self.socket_handler.send(self.packet_manager.create_packet(output))
+                # 송신 키 교체와 보류 패킷 전송을 한 번에 처리해 다른 송신과 섞이지 않게 함
+                kex.outputs_sent()
+                if any(output[0] == SSH_MSG_NEWKEYS for output in outputs):
+                    self._release_held()
+        except BaseException as e:
+            telemetry.end_span(self._kex_span, e)
+            raise
+        if kex.complete:
+            telemetry.describe_key_exchange(self._kex_span, kex)
+            telemetry.end_span(self._kex_span)
+            self._kex = self._kex_span = None
+            self.rekeys += 1
+            self.logger.info(f"Key re-exchange with {self.host}:{self.port} complete")
+
+    def _release_held(self):
+        held, self._held = self._held, None
+        while held:
+            batch = [held.popleft() for _ in range(min(len(held), _RELEASE_BATCH))]
+            self.socket_handler.send_buffers(self.packet_manager.create_packets(batch))
+
+    def authenticate(self, auth_manager=None):
+        """Run ssh-userauth for ``username``; the default AuthManager uses agent and ~/.ssh keys."""
+        auth_manager = auth_manager or self.auth_manager or AuthManager()
+        return auth_manager.authenticate(self, self.username)
+
+    def send_packet(self, payload, flush=True):
+        """
+        Send one payload. With ``flush=False`` the packet is queued so it can
+        share a write with whatever follows (see SocketHandler.queue).
+        """
+        with self._send_lock:
+            if self._held is not None and payload[0] >= SSH_MSG_SERVICE_REQUEST:
+                self._held.append(bytes(payload))
+                if flush:
+                    self.socket_handler.flush()
+                return
+            packet = self.packet_manager.create_packet(payload)
+            if flush:
+                self.socket_handler.send(packet)
+            else:
+                self.socket_handler.queue(packet)
+            if self._rekey_due():
+                self._start_rekey()
+
+    def send_packets(self, payloads, flush=True):
+        """Send several payloads with one batched encryption and one write."""
+        with self._send_lock:
+            if self._held is not None:
+                self._held.extend(map(bytes, payloads))
+                if flush:
+                    self.socket_handler.flush()
+                return
+            segments = self.packet_manager.create_packets(payloads)
+            if flush:
+                self.socket_handler.send_buffers(segments)
+            else:
+                for segment in segments:
+                    self.socket_handler.queue(segment)
+            if self._rekey_due():
+                self._start_rekey()
+
+    def flush(self):
+        """Write any queued packets now."""
+        self.socket_handler.flush()
+
+    def read_packet(self):
+        """Block until the next packet arrives and return its payload as bytes."""
+        with self._receive_lock:
+            payload = bytes(self.framer.read_packet(self.socket_handler))
+        if self._rekey_due():
+            with self._send_lock:
+                if self._rekey_due():
+                    self._start_rekey()
+        return payload
+
+    def handle_packet(self, payload):
+        """Handle transport-layer messages the channel layer passes down."""
+        message_type = payload[0]
+        if message_type in (SSH_MSG_IGNORE, SSH_MSG_DEBUG, SSH_MSG_UNIMPLEMENTED):
+            return
+        if message_type in KEX_MESSAGES:
+            self._on_kex_message(payload)
+            return
+        if message_type == SSH_MSG_DISCONNECT:
+            reader = MessageReader(payload, 1)
+            reason_code = reader.read_uint32()
+            description = reader.read_text()
+            self.logger.info(f"Server disconnected ({reason_code}): {description}")
+            self.close()
+            raise ConnectionError(f"Disconnected by server: {description}")
+        self.logger.warning(f"Unexpected message type {message_type}")
+
+    def open_session(self, timeout=None):
+        return self.channel_manager.open_session(timeout=timeout)
+
+    def is_active(self):
+        return not self._closed and self.socket_handler.socket is not None
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.socket_handler.close()
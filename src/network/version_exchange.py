@@ -1,6 +1,74 @@
 import re
+from src.config.config import Config
+from src.network.packet_manager import PacketManager
+from src.network.socket_handler import SocketHandler
+from src.utils import telemetry
 from src.utils.logger import Logger
-from typing import Tuple
+from typing import Optional, Tuple
+
+# RFC 4253 4.2: CR LF 포함 최대 255 바이트
+MAX_BANNER_LENGTH = 255
+# 배너 이전 줄 (RFC 4253 4.2) 의 개수와 한 줄 길이 제한
+MAX_PRE_BANNER_LINES = 1024
+MAX_PRE_BANNER_LINE_LENGTH = 8192
+
+
+class BannerReader:
+    """
+    버전 줄을 읽는 버퍼 리더 (소켓과 무관).
+
+    받은 바이트를 ``feed()`` 로 넣고 ``next_banner()`` 가 줄이 완성될 때까지
+    None 을 반환합니다. "SSH-" 로 시작하지 않는 배너 이전 줄은 건너뛰고
+    ``pre_banner`` 에 보관합니다. 배너 뒤에 같이 도착한 바이트 (서버의
+    KEXINIT 등) 는 ``excess`` 로 패킷 프레이머에 넘깁니다.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.pre_banner = []
+        self.banner = None
+
+    def feed(self, data):
+        self.buffer += data
+
+    @property
+    def excess(self) -> bytes:
+        return bytes(self.buffer) if self.banner is not None else b""
+
+    def next_banner(self) -> Optional[str]:
+        """완성된 배너 줄 (CR LF 제외) 또는 아직 부족하면 None; 잘못된 입력은 ValueError."""
+        while self.banner is None:
+            end = self.buffer.find(b"\n")
+            # OpenSSH 와 같이 NUL 이 섞인 줄은 SSH 서버가 아닌 것으로 봄
+            if self.buffer.find(b"\0", 0, end if end >= 0 else len(self.buffer)) >= 0:
+                raise ValueError("Invalid characters before the server version")
+            if end < 0:
+                self._check_partial()
+                return None
+            line = bytes(self.buffer[:end]).rstrip(b"\r")
+            del self.buffer[: end + 1]
+            if line.startswith(b"SSH-"):
+                if end + 1 > MAX_BANNER_LENGTH:
+                    raise ValueError(
+                        f"Server version exceeds maximum length of {MAX_BANNER_LENGTH}"
+                    )
+                self.banner = line.decode("utf-8", errors="replace")
+            else:
+                self.pre_banner.append(line.decode("utf-8", errors="replace"))
+                if len(self.pre_banner) > MAX_PRE_BANNER_LINES:
+                    raise ValueError("Too many lines before the server version")
+        return self.banner
+
+    def _check_partial(self):
+        if self.buffer.startswith(b"SSH-"):
+            if len(self.buffer) > MAX_BANNER_LENGTH:
+                raise ValueError(
+                    f"Server version exceeds maximum length of {MAX_BANNER_LENGTH}"
+                )
+        elif len(self.buffer) > MAX_PRE_BANNER_LINE_LENGTH:
+            raise ValueError(
+                f"Pre-banner line exceeds maximum length of {MAX_PRE_BANNER_LINE_LENGTH}"
+            )
 
 
 class VersionExchanger:
@@ -8,6 +76,8 @@ class VersionExchanger:
         self.logger = Logger.get_logger(__name__)
         self.client_version = client_version
         self.server_version = None
+        # 배너와 같은 recv 로 받은 이후 바이트
+        self.excess = b""
         self.supported_versions = ["2.0"]  # 지원하는 SSH 버전 목록
 
     def get_client_version_string(self) -> str:
@@ -38,39 +108,104 @@ class VersionExchanger:
         self.logger.info(f"server_version : {self.server_version}")
         return True, version
 
-    def exchange_versions(self, socket_handler) -> Tuple[bool, str]:
+    def _client_banner(self, kexinit_packet) -> bytes:
+        banner = self.get_client_version_string().encode()
+        if len(banner) > MAX_BANNER_LENGTH:
+            raise ValueError(
+                f"Client version exceeds maximum length of {MAX_BANNER_LENGTH}"
+            )
+        # KEXINIT 을 배너와 같은 쓰기로 보내 왕복 한 번을 줄임 (RFC 4253 7.1 허용)
+        return banner + kexinit_packet
+
+    def _accept_banner(self, reader) -> Tuple[bool, str]:
+        for line in reader.pre_banner:
+            self.logger.info(f"Server pre-banner line: {line}")
+        self.excess = reader.excess
+        self.logger.info(f"Success {reader.banner}")
+
+        # 서버 버전 파싱 및 검증
+        is_valid, result = self.parse_server_version(reader.banner)
+        if not is_valid:
+            self.logger.error(f"Version exchange failed: {result}")
+            return False, f"Version exchange failed: {result}"
+
+        self.server_version = reader.banner
+        self.logger.debug(
+            f"Version exchange successful. Server version: {self.server_version}"
+        )
+        return True, self.server_version
+
+    def exchange_versions(self, socket_handler, kexinit_packet=b"") -> Tuple[bool, str]:
         """
         서버와 버전을 교환합니다.
 
         :param socket_handler: 소켓 통신을 위한 핸들러 객체
+        :param kexinit_packet: 배너와 함께 보낼 KEXINIT 패킷 (선택)
         :return: 버전 교환 성공 여부
         """
+        with telemetry.span(
+            "ssh.version_exchange", phase="version_exchange"
+        ) as current:
+            is_valid, result = self._exchange_versions(socket_handler, kexinit_packet)
+            telemetry.describe_version_exchange(current, is_valid, result)
+            return is_valid, result
+
+    def _exchange_versions(self, socket_handler, kexinit_packet) -> Tuple[bool, str]:
         try:
             # 클라이언트 버전 전송
-            socket_handler.send(self.get_client_version_string().encode())
-            self.logger.info(f"Success {self.get_client_version_string()}")
+            socket_handler.send(self._client_banner(kexinit_packet))
             self.logger.debug("Client version sent successfully")
 
-            # 서버 버전 수신
-            server_version_string = socket_handler.receive().decode()
-            self.logger.info(f"Success {server_version_string}")
-            self.logger.debug("Server version received successfully")
+            # 서버 버전 수신 (배너 뒤에 붙어 온 KEXINIT 등은 excess 에 보관)
+            reader = BannerReader()
+            while reader.next_banner() is None:
+                data = socket_handler.receive()
+                if not data:
+                    raise ConnectionError("Connection closed during version exchange")
+                reader.feed(data)
+            return self._accept_banner(reader)
+
+        except Exception as e:
+            self.logger.error(f"Error during version exchange: {str(e)}")
+            return False, f"None server version"
 
-            # 서버 버전 파싱 및 검증
-            is_valid, result = self.parse_server_version(server_version_string)
-            if not is_valid:
-                self.logger.error(f"Version exchange failed: {result}")
-                return False, f"Version exchange failed"
+    async def exchange_versions_async(
+        self, socket_handler, kexinit_packet=b""
+    ) -> Tuple[bool, str]:
+        """
+        AsyncSocketHandler 로 서버와 버전을 교환합니다.
 
-            self.server_version = server_version_string
-            self.logger.debug(
-                f"Version exchange successful. Server version: {self.server_version}"
+        :param socket_handler: AsyncSocketHandler 객체
+        :param kexinit_packet: 배너와 함께 보낼 KEXINIT 패킷 (선택)
+        :return: 버전 교환 성공 여부
+        """
+        with telemetry.span(
+            "ssh.version_exchange", phase="version_exchange"
+        ) as current:
+            is_valid, result = await self._exchange_versions_async(
+                socket_handler, kexinit_packet
             )
-            return True, self.server_version
+            telemetry.describe_version_exchange(current, is_valid, result)
+            return is_valid, result
+
+    async def _exchange_versions_async(
+        self, socket_handler, kexinit_packet
+    ) -> Tuple[bool, str]:
+        try:
+            await socket_handler.send(self._client_banner(kexinit_packet))
+            self.logger.debug("Client version sent successfully")
+
+            reader = BannerReader()
+            while reader.next_banner() is None:
+                data = await socket_handler.receive()
+                if not data:
+                    raise ConnectionError("Connection closed during version exchange")
+                reader.feed(data)
+            return self._accept_banner(reader)
 
         except Exception as e:
             self.logger.error(f"Error during version exchange: {str(e)}")
-            return False, f"None server version"
+            return False, f"Version exchange error: {e}"
 
     def get_negotiated_version(self) -> str:
         """협상된 SSH 버전을 반환합니다."""
@@ -78,3 +213,46 @@ class VersionExchanger:
             self.logger.info(f"negotiated version : {self.supported_versions}")
             return self.supported_versions[0]  # 현재는 항상 2.0을 반환
         return None
+
+
+class VersionExchange:
+    """
+    소켓 핸들러에 묶인 예외 기반 버전 교환.
+
+    VersionExchanger 와 같은 배너 리더를 쓰지만, 실패하면 ValueError 를
+    던지고 성공하면 주석을 뺀 "SSH-protoversion-softwareversion" 을
+    반환합니다. 전체 배너 줄 (교환 해시용) 은 ``server_banner`` 에 있습니다.
+    """
+
+    def __init__(self, socket_handler: SocketHandler, packet_manager: PacketManager):
+        self.socket_handler = socket_handler
+        self.packet_manager = packet_manager
+        self.exchanger = VersionExchanger(Config.SSH_CLIENT_VERSION)
+        self.server_banner = None
+        self.excess = b""
+
+    def exchange_versions(self, kexinit_payload=None) -> str:
+        """
+        버전을 교환하고 서버 버전을 반환합니다.
+
+        :param kexinit_payload: 배너와 같은 쓰기로 보낼 KEXINIT (선택)
+        :raises ValueError: 배너가 없거나, 너무 길거나, 지원하지 않는 버전일 때
+        """
+        kexinit_packet = b""
+        if kexinit_payload is not None:
+            kexinit_packet = self.packet_manager.create_packet(kexinit_payload)
+        self.socket_handler.send(self.exchanger._client_banner(kexinit_packet))
+
+        reader = BannerReader()
+        while reader.next_banner() is None:
+            data = self.socket_handler.receive()
+            if not data:
+                raise ValueError("Connection closed before the server version")
+            reader.feed(data)
+
+        is_valid, result = self.exchanger.parse_server_version(reader.banner)
+        if not is_valid:
+            raise ValueError(result)
+        self.server_banner = reader.banner
+        self.excess = reader.excess
+        return reader.banner.split(" ", 1)[0]
@@ -0,0 +1,734 @@
+# src/session/channel_manager.py
+# RFC 4254 연결 프로토콜: 하나의 transport 위에 여러 채널을 다중화
+
+import threading
+import time
+from collections import deque
+from src.network.message import (
+    MessageReader,
+    SSH_MSG_CHANNEL_CLOSE,
+    SSH_MSG_CHANNEL_DATA,
+    SSH_MSG_CHANNEL_EOF,
+    SSH_MSG_CHANNEL_EXTENDED_DATA,
+    SSH_MSG_CHANNEL_FAILURE,
+    SSH_MSG_CHANNEL_OPEN,
+    SSH_MSG_CHANNEL_OPEN_CONFIRMATION,
+    SSH_MSG_CHANNEL_OPEN_FAILURE,
+    SSH_MSG_CHANNEL_REQUEST,
+    SSH_MSG_CHANNEL_SUCCESS,
+    SSH_MSG_CHANNEL_WINDOW_ADJUST,
+    SSH_MSG_GLOBAL_REQUEST,
+    SSH_MSG_REQUEST_FAILURE,
+    SSH_MSG_REQUEST_SUCCESS,
+    pack_boolean,
+    pack_byte,
+    pack_string,
+    pack_uint32,
+)
+from src.session.recording import INPUT, OUTPUT, STDERR
+from src.utils import telemetry
+from src.utils.logger import Logger
+
+# OpenSSH 기본값과 동일 (CHAN_SES_WINDOW_DEFAULT, CHAN_SES_PACKET_DEFAULT)
+DEFAULT_WINDOW_SIZE = 2 * 1024 * 1024
+DEFAULT_MAX_PACKET_SIZE = 32 * 1024
+# 소비된 데이터가 윈도우의 이 비율을 넘으면 WINDOW_ADJUST 전송
+DEFAULT_WINDOW_ADJUST_THRESHOLD = 0.5
+# 한 번의 flush 에서 묶어 보내는 최대 패킷 수
+MAX_PACKETS_PER_FLUSH = 16
+
+SSH_EXTENDED_DATA_STDERR = 1
+SSH_OPEN_ADMINISTRATIVELY_PROHIBITED = 1
+SSH_OPEN_UNKNOWN_CHANNEL_TYPE = 3
+
+_CHANNEL_MESSAGES = range(SSH_MSG_GLOBAL_REQUEST, SSH_MSG_CHANNEL_FAILURE + 1)
+
+
+class ChannelOpenError(ConnectionError):
+    def __init__(self, reason_code, description):
+        super().__init__(f"Channel open failed ({reason_code}): {description}")
+        self.reason_code = reason_code
+        self.description = description
+
+
+class Channel:
+    """
+    One multiplexed channel.
+
+    ``send`` blocks until the data has been handed to the transport, which
+    only happens as fast as the peer's window allows; ``recv`` hands back
+    buffered data and returns window space to the peer as it is consumed.
+
+    Event-driven users (see PortForwarder) set ``listener`` and use the
+    non-blocking ``send_nowait``, ``recv_ready`` and ``close(wait=False)``.
+    """
+
+    def __init__(self, manager, local_id, channel_type, window_size, max_packet_size):
+        self.manager = manager
+        self.local_id = local_id
+        self.remote_id = None
+        self.channel_type = channel_type
+        self.local_window_size = window_size
+        self.local_window = window_size
+        self.local_max_packet_size = max_packet_size
+        self.remote_window = 0
+        self.remote_max_packet_size = 0
+        self.exit_status = None
+        self.exit_signal = None
+        self.opened = False
+        self.open_error = None
+        self.eof_received = False
+        self.eof_sent = False
+        self.close_received = False
+        self.close_sent = False
+        self._stdout = bytearray()
+        self._stderr = bytearray()
+        self._consumed = 0
+        self._outbound = deque()
+        self._outbound_bytes = 0
+        self._scheduled = False
+        self._request_replies = deque()
+        self._pending_eof = False
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        # 데이터를 넘겨받는 쪽에서 기록 (src.session.recording.SessionRecorder)
+        self.recorder = None
+        # listener(channel): 데이터, 윈도우, EOF, 종료, 열림 결과가 도착할 때마다
+        # 패킷을 처리하는 스레드에서 호출됨 (블록하면 안 됨)
+        self.listener = None
+        self._span = None
+
+    @property
+    def closed(self):
+        return self.close_received or self.close_sent
+
+    @property
+    def send_space(self):
+        """Bytes ``send_nowait`` can take without queueing past the peer's window."""
+        return max(0, self.remote_window - self._outbound_bytes)
+
+    def send(self, data):
+        """
+        Queue data for the peer and block until all of it is handed to the
+        transport (which holds it back in order while keys are renewed).
+        """
+        if self.eof_sent or self.close_sent:
+            raise ConnectionError("Channel is closed for sending")
+        if not data:
+            return 0
+        if self.recorder is not None:
+            self.recorder.record(INPUT, data)
+        self.manager._enqueue(self, memoryview(data).cast("B"))
+        self.manager._drain(self)
+        return len(data)
+
+    sendall = send
+
+    def send_buffers(self, buffers):
+        """Send several buffers in order with a single drain, without joining them."""
+        if self.eof_sent or self.close_sent:
+            raise ConnectionError("Channel is closed for sending")
+        for data in buffers:
+            if len(data):
+                if self.recorder is not None:
+                    self.recorder.record(INPUT, data)
+                self.manager._enqueue(self, memoryview(data).cast("B"))
+        self.manager._drain(self)
+
+    def send_nowait(self, data=b""):
+        """
+        Queue data and send what the peer's window allows right now, without
+        waiting for more; returns the byte count still queued. ``data`` may
+        be a reusable buffer, since whatever is left queued is copied. Call
+        again (with no data) once the listener reports window space.
+        """
+        if self.eof_sent or self.close_sent:
+            raise ConnectionError("Channel is closed for sending")
+        if len(data) and self.recorder is not None:
+            self.recorder.record(INPUT, data)
+        return self.manager._send_nowait(self, data)
+
+    def recv(self, size=DEFAULT_MAX_PACKET_SIZE, timeout=None):
+        """Return up to ``size`` bytes; b"" once the peer sent EOF/CLOSE."""
+        return self.manager._recv(self, self._stdout, size, timeout)
+
+    def recv_into(self, buffer, timeout=None):
+        """Copy received data into ``buffer``; returns the byte count (0 at EOF)."""
+        return self.manager._recv_into(self, self._stdout, buffer, timeout)
+
+    def recv_stderr(self, size=DEFAULT_MAX_PACKET_SIZE, timeout=None):
+        return self.manager._recv(self, self._stderr, size, timeout)
+
+    def recv_ready(self):
+        return bool(self._stdout)
+
+    def recv_stderr_ready(self):
+        return bool(self._stderr)
+
+    def wait_readable(self, timeout=None):
+        """Block until stdout or stderr data is buffered or the peer sent EOF."""
+        self.manager._wait_for(
+            lambda: self._stdout or self._stderr or self.eof_received, timeout
+        )
+
+    def send_eof(self):
+        self.manager._send_eof(self)
+
+    def send_request(self, request_type, data=b"", want_reply=True, timeout=None):
+        """Send a CHANNEL_REQUEST; returns True/False for the reply (or None)."""
+        return self.manager._send_request(self, request_type, data, want_reply, timeout)
+
+    def exec_command(self, command):
+        if not self.send_request("exec", pack_string(command)):
+            raise ConnectionError(f"Exec request refused: {command}")
+
+    def invoke_shell(self):
+        if not self.send_request("shell"):
+            raise ConnectionError("Shell request refused")
+
+    def invoke_subsystem(self, name):
+        if not self.send_request("subsystem", pack_string(name)):
+            raise ConnectionError(f"Subsystem request refused: {name}")
+
+    def request_pty(self, term="xterm", width=80, height=24, modes=b"\x00"):
+        data = (
+            pack_string(term)
+            + pack_uint32(width)
+            + pack_uint32(height)
+            + pack_uint32(0)
+            + pack_uint32(0)
+            + pack_string(modes)
+        )
+        if not self.send_request("pty-req", data):
+            raise ConnectionError("PTY request refused")
+
+    def recv_exit_status(self, timeout=None):
+        """Wait for the channel to close and return the remote exit status."""
+        self.manager._wait_for(lambda: self.close_received, timeout)
+        return self.exit_status
+
+    def close(self, timeout=None, wait=True):
+        """Send CLOSE; with ``wait`` block until the peer's CLOSE arrives."""
+        self.manager._close_channel(self, timeout, wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ChannelManager:
+    """
+    Channel layer for one transport.
+
+    The transport only needs ``send_packet``, ``send_packets`` (both with
+    a ``flush`` flag) and ``read_packet``. Whichever thread is waiting for something reads the
+    next packet and dispatches it for everyone (leader/follower), so no
+    reader thread is needed. Outgoing data from all channels is scheduled
+    round-robin, one packet per channel per turn, so a bulk transfer
+    cannot starve an interactive channel on the same transport.
+    """
+
+    def __init__(
+        self,
+        transport,
+        window_size=DEFAULT_WINDOW_SIZE,
+        max_packet_size=DEFAULT_MAX_PACKET_SIZE,
+        window_adjust_threshold=DEFAULT_WINDOW_ADJUST_THRESHOLD,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.transport = transport
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        self.window_adjust_threshold = window_adjust_threshold
+        self.channels = {}
+        self.open_handlers = {}
+        self.closed = False
+        self._next_id = 0
+        self._ready = deque()
+        self._global_replies = deque()
+        self._condition = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._reading = False
+        self._error = None
+
+    # ---- 채널 생성 -------------------------------------------------------
+
+    def open_channel(
+        self,
+        channel_type="session",
+        extra=b"",
+        window_size=None,
+        max_packet_size=None,
+        timeout=None,
+        wait=True,
+    ):
+        """
+        Open a channel and wait for the peer to confirm it. Without
+        ``wait`` the channel is returned at once; ``opened`` or
+        ``open_error`` is set when the answer arrives.
+        """
+        with self._condition:
+            channel = self._new_channel(channel_type, window_size, max_packet_size)
+
+        self.transport.send_packet(
+            pack_byte(SSH_MSG_CHANNEL_OPEN)
+            + pack_string(channel_type)
+            + pack_uint32(channel.local_id)
+            + pack_uint32(channel.local_window_size)
+            + pack_uint32(channel.local_max_packet_size)
+            + extra
+        )
+        if not wait:
+            return channel
+        self._wait_for(lambda: channel.opened or channel.open_error, timeout)
+        if channel.open_error:
+            with self._condition:
+                self._forget(channel, channel.open_error)
+            raise channel.open_error
+        return channel
+
+    def open_session(self, timeout=None):
+        return self.open_channel("session", timeout=timeout)
+
+    def register_open_handler(self, channel_type, handler):
+        """
+        Accept server-initiated channels of ``channel_type``.
+
+        ``handler(channel, reader)`` is called from the dispatching thread
+        with the confirmed channel and a reader positioned at the
+        type-specific data; it must not block.
+        """
+        self.open_handlers[channel_type] = handler
+
+    def _new_channel(self, channel_type, window_size, max_packet_size):
+        local_id = self._next_id
+        self._next_id += 1
+        channel = Channel(
+            self,
+            local_id,
+            channel_type,
+            window_size or self.window_size,
+            max_packet_size or self.max_packet_size,
+        )
+        self.channels[local_id] = channel
+        channel._span = telemetry.tracer.start_span(
+            "ssh.channel",
+            attributes={"ssh.channel.type": channel_type, "ssh.channel.id": local_id},
+        )
+        return channel
+
+    def _forget(self, channel, error=None):
+        """Drop a closed channel and end its span."""
+        self.channels.pop(channel.local_id, None)
+        if channel._span is not None:
+            channel._span.set_attributes(
+                {
+                    "ssh.channel.bytes_sent": channel.bytes_sent,
+                    "ssh.channel.bytes_received": channel.bytes_received,
+                }
+            )
+            if channel.exit_status is not None:
+                channel._span.set_attribute("ssh.exit_status", channel.exit_status)
+            telemetry.end_span(channel._span, error)
+            channel._span = None
+
+    # ---- 전역 요청 -------------------------------------------------------
+
+    def global_request(self, request_name, data=b"", want_reply=True, timeout=None):
+        """Send a GLOBAL_REQUEST; returns the reply payload reader or None."""
+        self.transport.send_packet(
+            pack_byte(SSH_MSG_GLOBAL_REQUEST)
+            + pack_string(request_name)
+            + pack_boolean(want_reply)
+            + data
+        )
+        if not want_reply:
+            return None
+        self._wait_for(lambda: self._global_replies, timeout)
+        with self._condition:
+            success, reader = self._global_replies.popleft()
+        if not success:
+            raise ConnectionError(f"Global request refused: {request_name}")
+        return reader
+
+    # ---- 패킷 처리 -------------------------------------------------------
+
+    def process_packet(self):
+        """Read and dispatch one packet (for callers driving the transport)."""
+        self._wait_for(None)
+
+    def _wait_for(self, predicate, timeout=None):
+        """
+        Block until ``predicate()`` holds, reading packets while waiting.
+
+        With ``predicate=None`` exactly one packet is read and dispatched.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while predicate is None or not predicate():
+                if self._error is not None:
+                    raise ConnectionError("Transport closed") from self._error
+                if self._reading:
+                    remaining = (
+                        None if deadline is None else deadline - time.monotonic()
+                    )
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting on channel")
+                    self._condition.wait(remaining)
+                    continue
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError("Timed out waiting on channel")
+
+                self._reading = True
+                self._condition.release()
+                try:
+                    payload = self.transport.read_packet()
+                except BaseException as e:
+                    self._condition.acquire()
+                    self._reading = False
+                    self._fail(e)
+                    raise
+                self._condition.acquire()
+                self._reading = False
+                try:
+                    self.dispatch(payload)
+                finally:
+                    self._condition.notify_all()
+                if predicate is None:
+                    return
+
+    def _fail(self, error):
+        self._error = error
+        self.closed = True
+        for channel in list(self.channels.values()):
+            channel.close_received = True
+            channel.eof_received = True
+            if channel._span is not None:
+                telemetry.end_span(channel._span, error)
+                channel._span = None
+            if channel.listener is not None:
+                channel.listener(channel)
+        self._condition.notify_all()
+
+    def dispatch(self, payload):
+        """Handle one connection-protocol message; others go to the transport."""
+        message_type = payload[0]
+        if message_type not in _CHANNEL_MESSAGES:
+            handler = getattr(self.transport, "handle_packet", None)
+            if handler:
+                handler(payload)
+            return
+
+        reader = MessageReader(payload, 1)
+        if message_type == SSH_MSG_GLOBAL_REQUEST:
+            self._on_global_request(reader)
+        elif message_type in (SSH_MSG_REQUEST_SUCCESS, SSH_MSG_REQUEST_FAILURE):
+            self._global_replies.append(
+                (message_type == SSH_MSG_REQUEST_SUCCESS, reader)
+            )
+        elif message_type == SSH_MSG_CHANNEL_OPEN:
+            self._on_channel_open(reader)
+        else:
+            channel = self.channels.get(reader.read_uint32())
+            if channel is None:
+                self.logger.warning(f"Message {message_type} for unknown channel")
+                return
+            self._on_channel_message(channel, message_type, reader)
+            if channel.listener is not None:
+                channel.listener(channel)
+
+    def _on_channel_message(self, channel, message_type, reader):
+        if message_type == SSH_MSG_CHANNEL_DATA:
+            self._on_data(channel, channel._stdout, reader.read_string_view())
+        elif message_type == SSH_MSG_CHANNEL_EXTENDED_DATA:
+            data_type = reader.read_uint32()
+            data = reader.read_string_view()
+            if data_type == SSH_EXTENDED_DATA_STDERR:
+                self._on_data(channel, channel._stderr, data)
+        elif message_type == SSH_MSG_CHANNEL_WINDOW_ADJUST:
+            channel.remote_window += reader.read_uint32()
+            self._schedule(channel)
+        elif message_type == SSH_MSG_CHANNEL_OPEN_CONFIRMATION:
+            channel.remote_id = reader.read_uint32()
+            channel.remote_window = reader.read_uint32()
+            channel.remote_max_packet_size = reader.read_uint32()
+            channel.opened = True
+        elif message_type == SSH_MSG_CHANNEL_OPEN_FAILURE:
+            reason_code = reader.read_uint32()
+            channel.open_error = ChannelOpenError(reason_code, reader.read_text())
+        elif message_type == SSH_MSG_CHANNEL_EOF:
+            channel.eof_received = True
+        elif message_type == SSH_MSG_CHANNEL_CLOSE:
+            self._on_close(channel)
+        elif message_type == SSH_MSG_CHANNEL_REQUEST:
+            self._on_channel_request(channel, reader)
+        elif message_type in (SSH_MSG_CHANNEL_SUCCESS, SSH_MSG_CHANNEL_FAILURE):
+            channel._request_replies.append(message_type == SSH_MSG_CHANNEL_SUCCESS)
+
+    def _on_data(self, channel, buffer, data):
+        if len(data) > channel.local_window:
+            self.logger.warning(
+                f"Channel {channel.local_id}: peer exceeded window "
+                f"({len(data)} > {channel.local_window})"
+            )
+        channel.local_window -= len(data)
+        channel.bytes_received += len(data)
+        buffer += data
+
+    def _on_close(self, channel):
+        channel.close_received = True
+        channel.eof_received = True
+        channel._outbound.clear()
+        channel._outbound_bytes = 0
+        if not channel.close_sent:
+            channel.close_sent = True
+            self.transport.send_packet(
+                pack_byte(SSH_MSG_CHANNEL_CLOSE) + pack_uint32(channel.remote_id)
+            )
+        self._forget(channel)
+
+    def _on_channel_request(self, channel, reader):
+        request_type = reader.read_text()
+        want_reply = reader.read_boolean()
+        if request_type == "exit-status":
+            channel.exit_status = reader.read_uint32()
+        elif request_type == "exit-signal":
+            channel.exit_signal = reader.read_text()
+        elif want_reply:
+            self.transport.send_packet(
+                pack_byte(SSH_MSG_CHANNEL_FAILURE) + pack_uint32(channel.remote_id)
+            )
+
+    def _on_global_request(self, reader):
+        request_name = reader.read_text()
+        if reader.read_boolean():
+            # keepalive@openssh.com 등은 실패 응답으로 충분
+            self.logger.debug(f"Refusing global request: {request_name}")
+            self.transport.send_packet(pack_byte(SSH_MSG_REQUEST_FAILURE))
+
+    def _on_channel_open(self, reader):
+        channel_type = reader.read_text()
+        sender_id = reader.read_uint32()
+        window = reader.read_uint32()
+        max_packet_size = reader.read_uint32()
+        handler = self.open_handlers.get(channel_type)
+        if handler is None:
+            self.transport.send_packet(
+                pack_byte(SSH_MSG_CHANNEL_OPEN_FAILURE)
+                + pack_uint32(sender_id)
+                + pack_uint32(SSH_OPEN_UNKNOWN_CHANNEL_TYPE)
+                + pack_string(f"Unsupported channel type: {channel_type}")
+                + pack_string("")
+            )
+            return
+
+        channel = self._new_channel(channel_type, None, None)
+        channel.remote_id = sender_id
+        channel.remote_window = window
+        channel.remote_max_packet_size = max_packet_size
+        channel.opened = True
+        self.transport.send_packet(
+            pack_byte(SSH_MSG_CHANNEL_OPEN_CONFIRMATION)
+            + pack_uint32(sender_id)
+            + pack_uint32(channel.local_id)
+            + pack_uint32(channel.local_window_size)
+            + pack_uint32(channel.local_max_packet_size)
+        )
+        handler(channel, reader)
+
+    # ---- 송신 스케줄링 ----------------------------------------------------
+
+    def _enqueue(self, channel, data):
+        with self._condition:
+            channel._outbound.append(data)
+            channel._outbound_bytes += len(data)
+            self._schedule(channel)
+
+    def _schedule(self, channel):
+        if channel._outbound_bytes and channel.remote_window and not channel._scheduled:
+            channel._scheduled = True
+            self._ready.append(channel)
+
+    def _send_nowait(self, channel, data):
+        if len(data):
+            self._enqueue(channel, memoryview(data).cast("B"))
+        self.flush()
+        with self._condition:
+            if channel._outbound_bytes and len(data):
+                # 호출자가 버퍼를 다시 쓸 수 있도록 남은 데이터는 복사해 둠
+                channel._outbound = deque(bytes(chunk) for chunk in channel._outbound)
+            pending_eof = channel._pending_eof and not channel._outbound_bytes
+            queued = channel._outbound_bytes
+        if pending_eof:
+            self._send_eof(channel)
+        return queued
+
+    def _drain(self, channel):
+        """Flush until ``channel`` has nothing left to send."""
+        while True:
+            self.flush()
+            with self._condition:
+                if not channel._outbound_bytes:
+                    break
+            self._wait_for(
+                lambda: not channel._outbound_bytes
+                or channel.remote_window
+                or channel.close_received
+            )
+            if channel.close_received and channel._outbound_bytes == 0:
+                break
+        if channel._pending_eof:
+            self._send_eof(channel)
+
+    def flush(self):
+        """Send queued channel data, one packet per ready channel per round."""
+        with self._send_lock:
+            with self._condition:
+                payloads = self._next_round()
+            while payloads:
+                with self._condition:
+                    following = self._next_round()
+                # 라운드가 이어지면 큐에 모아 한 번의 쓰기로 전송
+                self.transport.send_packets(payloads, flush=not following)
+                payloads = following
+
+    def _next_round(self):
+        payloads = []
+        while self._ready and len(payloads) < MAX_PACKETS_PER_FLUSH:
+            channel = self._ready.popleft()
+            channel._scheduled = False
+            size = min(
+                channel.remote_window,
+                channel.remote_max_packet_size,
+                channel._outbound_bytes,
+            )
+            if size <= 0 or channel.close_sent:
+                continue
+            payloads.append(
+                pack_byte(SSH_MSG_CHANNEL_DATA)
+                + pack_uint32(channel.remote_id)
+                + pack_uint32(size)
+                + self._take_outbound(channel, size)
+            )
+            channel.remote_window -= size
+            channel.bytes_sent += size
+            self._schedule(channel)
+        return payloads
+
+    def _take_outbound(self, channel, size):
+        chunks = []
+        channel._outbound_bytes -= size
+        while size:
+            head = channel._outbound[0]
+            if len(head) <= size:
+                chunks.append(channel._outbound.popleft())
+                size -= len(head)
+            else:
+                chunks.append(head[:size])
+                channel._outbound[0] = head[size:]
+                size = 0
+        return b"".join(chunks)
+
+    # ---- 수신 / 윈도우 ---------------------------------------------------
+
+    def _recv(self, channel, buffer, size, timeout):
+        self._wait_for(lambda: buffer or channel.eof_received, timeout)
+        with self._condition:
+            data = bytes(buffer[:size])
+            del buffer[: len(data)]
+        if data and channel.recorder is not None:
+            self._record(channel, buffer, data)
+        self._consume(channel, len(data))
+        return data
+
+    def _recv_into(self, channel, buffer, target, timeout):
+        self._wait_for(lambda: buffer or channel.eof_received, timeout)
+        with self._condition:
+            count = min(len(target), len(buffer))
+            target[:count] = buffer[:count]
+            del buffer[:count]
+        if count and channel.recorder is not None:
+            self._record(channel, buffer, memoryview(target)[:count])
+        self._consume(channel, count)
+        return count
+
+    def _record(self, channel, buffer, data):
+        stream = OUTPUT if buffer is channel._stdout else STDERR
+        channel.recorder.record(stream, data)
+
+    def _consume(self, channel, count):
+        with self._condition:
+            channel._consumed += count
+            adjust = self._window_adjustment(channel)
+        if adjust:
+            # 윈도우 조정은 급하지 않으므로 다음 송신과 합쳐서 전송
+            self.transport.send_packet(
+                pack_byte(SSH_MSG_CHANNEL_WINDOW_ADJUST)
+                + pack_uint32(channel.remote_id)
+                + pack_uint32(adjust),
+                flush=False,
+            )
+
+    def _window_adjustment(self, channel):
+        threshold = channel.local_window_size * self.window_adjust_threshold
+        if channel._consumed < threshold or channel.close_received:
+            return 0
+        adjust = channel._consumed
+        channel._consumed = 0
+        channel.local_window += adjust
+        return adjust
+
+    # ---- 요청 / 종료 -----------------------------------------------------
+
+    def _send_request(self, channel, request_type, data, want_reply, timeout):
+        self.transport.send_packet(
+            pack_byte(SSH_MSG_CHANNEL_REQUEST)
+            + pack_uint32(channel.remote_id)
+            + pack_string(request_type)
+            + pack_boolean(want_reply)
+            + data
+        )
+        if not want_reply:
+            return None
+        self._wait_for(
+            lambda: channel._request_replies or channel.close_received, timeout
+        )
+        with self._condition:
+            if not channel._request_replies:
+                return False
+            return channel._request_replies.popleft()
+
+    def _send_eof(self, channel):
+        with self._condition:
+            if channel.eof_sent or channel.close_sent:
+                return
+            if channel._outbound_bytes:
+                # 남은 데이터를 다 보낸 뒤 _drain 에서 EOF 전송
+                channel._pending_eof = True
+                return
+            channel.eof_sent = True
+        self.transport.send_packet(
+            pack_byte(SSH_MSG_CHANNEL_EOF) + pack_uint32(channel.remote_id)
+        )
+
+    def _close_channel(self, channel, timeout, wait=True):
+        with self._condition:
+            send_close = not channel.close_sent and channel.remote_id is not None
+            channel.close_sent = True
+        if send_close and not self.closed:
+            self.transport.send_packet(
+                pack_byte(SSH_MSG_CHANNEL_CLOSE) + pack_uint32(channel.remote_id)
+            )
+            if not wait:
+                # 상대의 CLOSE 가 도착하면 _on_close 에서 정리
+                return
+            try:
+                self._wait_for(lambda: channel.close_received, timeout)
+            except (ConnectionError, TimeoutError) as e:
+                self.logger.warning(
+                    f"Channel {channel.local_id} close not confirmed: {e}"
+                )
+        with self._condition:
+            self._forget(channel)
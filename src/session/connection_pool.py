@@ -0,0 +1,241 @@
+import threading
+import time
+from src.network.transport import Transport
+from src.utils import telemetry
+from src.utils.logger import Logger
+
+
+def _default_connection_factory(host, port, username):
+    return Transport(host, port, username).connect()
+
+
+class PooledConnection:
+    """Bookkeeping for one pooled transport."""
+
+    def __init__(self, key, transport):
+        self.key = key
+        self.transport = transport
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.in_use = 0
+        # 풀에서 빠졌지만 아직 사용 중인 세션이 있는 연결
+        self.retired = False
+
+    def age(self, now):
+        return now - self.created_at
+
+    def idle_time(self, now):
+        return now - self.last_used if self.in_use == 0 else 0.0
+
+
+class ConnectionLease:
+    """A session's claim on a pooled transport; release it (or use ``with``)."""
+
+    def __init__(self, pool, connection):
+        self.pool = pool
+        self.connection = connection
+        self.transport = connection.transport
+        self.released = False
+
+    def release(self, discard=False):
+        if not self.released:
+            self.released = True
+            self.pool.release(self, discard=discard)
+
+    def __enter__(self):
+        return self.transport
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release(discard=exc_type is not None and not self.transport.is_active())
+
+
+class ConnectionPool:
+    """
+    Keyed pool of authenticated transports, keyed by (host, port, username).
+
+    Several sessions are multiplexed over one transport (up to
+    ``max_sessions_per_connection``) before another TCP connection is made
+    to the same key, and at most ``max_connections_per_host`` transports are
+    kept per key. Idle and over-age transports are evicted lazily on
+    ``acquire``/``release``/``prune``; there is no background thread.
+    Handshakes, health checks and closes all run outside the pool lock, so
+    a stuck peer only delays the caller that is talking to it.
+    """
+
+    def __init__(
+        self,
+        connection_factory=None,
+        max_connections_per_host=4,
+        max_sessions_per_connection=10,
+        max_idle=300.0,
+        max_lifetime=3600.0,
+        health_check=None,
+        acquire_timeout=30.0,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.connection_factory = connection_factory or _default_connection_factory
+        self.max_connections_per_host = max_connections_per_host
+        self.max_sessions_per_connection = max_sessions_per_connection
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check or (lambda transport: transport.is_active())
+        self.acquire_timeout = acquire_timeout
+        self.connections = {}
+        self._pending = {}
+        # 락을 잡은 채 풀에서 뺀 transport: 락을 놓은 뒤 닫음
+        self._closing = []
+        self._condition = threading.Condition()
+        self._closed = False
+        telemetry.track_pool(self)
+
+    def acquire(self, host, port, username, timeout=None):
+        """Return a ConnectionLease, reusing a live transport when possible."""
+        key = (host, port, username)
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            try:
+                with self._condition:
+                    connection = self._reserve(key, deadline)
+                    shared = connection is not None and connection.in_use > 1
+            finally:
+                self._close_retired()
+            if connection is None:
+                break
+            # 유휴 연결의 상태 확인도 락 밖에서 (예약해 두어 다른 스레드가 닫지 않음)
+            if shared or self.health_check(connection.transport):
+                self.logger.debug(f"Reusing pooled connection for {key}")
+                return ConnectionLease(self, connection)
+            with self._condition:
+                connection.in_use -= 1
+                self._remove(connection)
+                self._condition.notify_all()
+
+        # 핸드셰이크는 락 밖에서 수행 (다른 호스트의 acquire 를 막지 않도록)
+        try:
+            transport = self.connection_factory(host, port, username)
+        except BaseException:
+            with self._condition:
+                self._pending[key] -= 1
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._pending[key] -= 1
+            connection = PooledConnection(key, transport)
+            connection.in_use = 1
+            self.connections.setdefault(key, []).append(connection)
+            self.logger.info(
+                f"Opened pooled connection for {host}:{port} as {username}"
+            )
+            return ConnectionLease(self, connection)
+
+    def release(self, lease, discard=False):
+        connection = lease.connection
+        with self._condition:
+            connection.in_use -= 1
+            connection.last_used = time.monotonic()
+            if discard:
+                self._remove(connection)
+            elif connection.retired and connection.in_use == 0:
+                self._closing.append(connection.transport)
+            self._evict(connection.key)
+            self._condition.notify_all()
+        self._close_retired()
+
+    def prune(self):
+        """Evict idle, expired and unhealthy transports for every key."""
+        with self._condition:
+            for key in list(self.connections):
+                self._evict(key)
+            self._condition.notify_all()
+        self._close_retired()
+
+    def stats(self):
+        with self._condition:
+            connections = [c for group in self.connections.values() for c in group]
+            return {
+                "connections": len(connections),
+                "sessions": sum(c.in_use for c in connections),
+                "idle": sum(1 for c in connections if c.in_use == 0),
+            }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            for key in list(self.connections):
+                for connection in list(self.connections[key]):
+                    self._remove(connection)
+            self._condition.notify_all()
+        self._close_retired()
+
+    def _reserve(self, key, deadline):
+        """
+        Claim a session slot on a pooled connection for ``key``, waiting for
+        one if the key is at its limits; returns None when the caller should
+        open a new connection instead. Called with the lock held.
+        """
+        while True:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            self._evict(key)
+            connection = self._find_available(key)
+            if connection is not None:
+                connection.in_use += 1
+                connection.last_used = time.monotonic()
+                return connection
+
+            opened = len(self.connections.get(key, ())) + self._pending.get(key, 0)
+            if opened < self.max_connections_per_host:
+                self._pending[key] = self._pending.get(key, 0) + 1
+                return None
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                host, port, _ = key
+                raise TimeoutError(f"No pooled connection available for {host}:{port}")
+            self._condition.wait(remaining)
+
+    def _find_available(self, key):
+        # 가장 많이 사용 중인 연결부터 채워 유휴 연결이 빨리 만료되도록 함
+        candidates = [
+            c
+            for c in self.connections.get(key, ())
+            if c.in_use < self.max_sessions_per_connection
+        ]
+        return max(candidates, key=lambda c: c.in_use, default=None)
+
+    def _evict(self, key):
+        now = time.monotonic()
+        for connection in list(self.connections.get(key, ())):
+            # 수명이 다한 연결은 사용 중이어도 풀에서 빼고, 마지막 세션이 끝나면 닫음
+            if connection.age(now) >= self.max_lifetime:
+                reason = "max lifetime"
+            elif connection.in_use:
+                continue
+            elif not connection.transport.is_active():
+                reason = "closed"
+            elif connection.idle_time(now) >= self.max_idle:
+                reason = "max idle"
+            else:
+                continue
+            self.logger.debug(f"Evicting pooled connection for {key} ({reason})")
+            self._remove(connection)
+
+    def _remove(self, connection):
+        connection.retired = True
+        group = self.connections.get(connection.key, [])
+        if connection in group:
+            group.remove(connection)
+            if not group:
+                del self.connections[connection.key]
+        if connection.in_use == 0:
+            self._closing.append(connection.transport)
+
+    def _close_retired(self):
+        """Close the transports removed under the lock, without holding it."""
+        with self._condition:
+            transports, self._closing = self._closing, []
+        for transport in transports:
+            transport.close()
@@ -0,0 +1,196 @@
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from src.network.transport import Transport
+from src.utils.logger import Logger
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_TIMEOUT = 60.0
+
+
+class HostResult:
+    """Outcome of running one command on one host."""
+
+    def __init__(
+        self,
+        host,
+        port,
+        exit_status=None,
+        stdout=b"",
+        stderr=b"",
+        error=None,
+        duration=0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.exit_status = exit_status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.error = error
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return self.error is None and self.exit_status == 0
+
+    def __repr__(self):
+        status = self.error or f"exit {self.exit_status}"
+        return f"HostResult({self.host}:{self.port}, {status}, {self.duration:.3f}s)"
+
+
+def _default_connection_factory(host, port, username, timeout):
+    return Transport(host, port, username).connect(timeout=timeout)
+
+
+def run_command(transport, command, timeout=None):
+    """Run ``command`` on a session channel; return (exit_status, stdout, stderr)."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    def remaining():
+        return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+    stdout, stderr = bytearray(), bytearray()
+    channel = transport.open_session(timeout=remaining())
+    try:
+        channel.exec_command(command)
+        # stdout 과 stderr 는 윈도우를 공유하므로 어느 쪽이든 도착하는 대로 비움
+        while True:
+            channel.wait_readable(timeout=remaining())
+            if not (channel.recv_ready() or channel.recv_stderr_ready()):
+                break
+            if channel.recv_ready():
+                stdout += channel.recv()
+            if channel.recv_stderr_ready():
+                stderr += channel.recv_stderr()
+        exit_status = channel.recv_exit_status(timeout=remaining())
+    finally:
+        channel.close(timeout=remaining())
+    return exit_status, bytes(stdout), bytes(stderr)
+
+
+class ParallelExecutor:
+    """
+    Run one command on many hosts with at most ``concurrency`` in flight.
+
+    ``run`` yields a HostResult per host as soon as that host finishes, so
+    callers can report progress on large fleets instead of waiting for the
+    slowest host. Failures (connect errors, timeouts, non-zero exits) are
+    reported as results, never raised. ``timeout`` bounds each host from
+    connect to exit status.
+    """
+
+    def __init__(
+        self,
+        concurrency=DEFAULT_CONCURRENCY,
+        timeout=DEFAULT_TIMEOUT,
+        connection_factory=None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.logger = Logger.get_logger(__name__)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.connection_factory = connection_factory or _default_connection_factory
+        self._cancelled = threading.Event()
+
+    def run(self, hosts, command, username=None, port=22):
+        """
+        Yield HostResult objects in completion order.
+
+        ``hosts`` holds host names, (host, port) or (host, port, username)
+        tuples and may be a lazy iterable; it is consumed only as worker
+        slots free up.
+        """
+        hosts = iter(hosts)
+        pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="ssh-exec")
+        with pool:
+            pending = set()
+            try:
+                while True:
+                    while len(pending) < self.concurrency and not self._cancelled.is_set():
+                        target = next(hosts, None)
+                        if target is None:
+                            break
+                        host, host_port, user = (
+                            (target + (username,))[:3]
+                            if isinstance(target, tuple)
+                            else (target, port, username)
+                        )
+                        pending.add(
+                            pool.submit(self._run_host, host, host_port, user, command)
+                        )
+                    if not pending:
+                        return
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                # 소비자가 중간에 멈추면 아직 시작하지 않은 호스트는 건너뜀
+                for future in pending:
+                    future.cancel()
+
+    def cancel(self):
+        """Stop scheduling new hosts; hosts already running finish normally."""
+        self._cancelled.set()
+
+    def _run_host(self, host, port, username, command):
+        started = time.monotonic()
+        transport = None
+        # KeyboardInterrupt 등은 결과로 바꾸지 않고 그대로 전달
+        result = None
+        try:
+            transport = self.connection_factory(host, port, username, self.timeout)
+            remaining = None
+            if self.timeout is not None:
+                remaining = self.timeout - (time.monotonic() - started)
+            exit_status, stdout, stderr = run_command(transport, command, timeout=remaining)
+            result = HostResult(host, port, exit_status, stdout, stderr)
+        except Exception as e:
+            self.logger.debug(f"Command failed on {host}:{port}: {e}")
+            result = HostResult(host, port, error=f"{type(e).__name__}: {e}")
+        finally:
+            if transport is not None:
+                transport.close()
+        result.duration = time.monotonic() - started
+        return result
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class ExecutionSummary:
+    """Running success/failure counts and latency percentiles."""
+
+    def __init__(self):
+        self.succeeded = 0
+        self.failed = 0
+        self.durations = []
+
+    def add(self, result):
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.durations.append(result.duration)
+
+    @property
+    def total(self):
+        return self.succeeded + self.failed
+
+    def as_dict(self):
+        durations = sorted(self.durations)
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "p50": percentile(durations, 0.50),
+            "p90": percentile(durations, 0.90),
+            "p99": percentile(durations, 0.99),
+            "max": durations[-1] if durations else None,
+        }
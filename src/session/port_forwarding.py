@@ -0,0 +1,480 @@
+# src/session/port_forwarding.py
+# TCP 포트 포워딩 (RFC 4254 7): 전달되는 모든 연결을 하나의 스레드가 selector 로 중계
+
+import errno
+import selectors
+import socket
+import threading
+from collections import deque
+from src.network.message import pack_string, pack_uint32
+from src.utils.logger import Logger
+
+# 모든 연결이 함께 쓰는 수신 버퍼 (채널 최대 패킷 두 개 분량)
+RELAY_BUFFER_SIZE = 64 * 1024
+LISTEN_BACKLOG = 512
+# 한 번의 이벤트에서 받아들이는 최대 연결 수
+ACCEPT_BATCH = 64
+
+
+def parse_forward_spec(spec):
+    """
+    ``[bind_address:]port:host:hostport`` as in ``ssh -L``/``-R``; returns
+    (bind_address, port, host, hostport) with an empty bind address when
+    it is left out. IPv6 addresses go in brackets.
+    """
+    parts = []
+    rest = spec
+    while rest:
+        if rest.startswith("["):
+            address, _, rest = rest[1:].partition("]")
+            rest = rest[1:] if rest.startswith(":") else rest
+            parts.append(address)
+        else:
+            part, _, rest = rest.partition(":")
+            parts.append(part)
+    if len(parts) == 3:
+        parts.insert(0, "")
+    if len(parts) != 4 or not parts[1].isdigit() or not parts[3].isdigit():
+        raise ValueError(f"Invalid forward specification: {spec}")
+    return parts[0], int(parts[1]), parts[2], int(parts[3])
+
+
+class _Relay:
+    """One forwarded TCP connection and the channel carrying it."""
+
+    __slots__ = (
+        "sock",
+        "channel",
+        "connecting",
+        "pending",
+        "queued",
+        "local_eof",
+        "remote_eof",
+        "events",
+        "closed",
+    )
+
+    def __init__(self, sock, channel, connecting=False):
+        self.sock = sock
+        self.channel = channel
+        self.connecting = connecting
+        # 소켓이 아직 받지 못한 채널 데이터
+        self.pending = b""
+        # 윈도우가 모자라 채널에 남아 있는 바이트 수
+        self.queued = 0
+        self.local_eof = False
+        self.remote_eof = False
+        self.events = 0
+        self.closed = False
+
+
+class PortForwarder:
+    """
+    Local (``direct-tcpip``) and remote (``tcpip-forward``) TCP forwarding
+    over one transport.
+
+    All forwarded connections are relayed by a single selector thread, and
+    one more thread keeps reading the transport, so hundreds of connections
+    cost sockets and channel buffers rather than threads. Data moves
+    through one preallocated buffer with ``recv_into``. A socket is only
+    read while its channel has window space left and the peer's data is
+    only taken from the channel as fast as the socket accepts it, so a slow
+    end holds back the other through the channel windows instead of
+    buffering without bound.
+    """
+
+    def __init__(self, transport, buffer_size=RELAY_BUFFER_SIZE):
+        self.logger = Logger.get_logger(__name__)
+        self.transport = transport
+        self.channel_manager = transport.channel_manager
+        self.selector = selectors.DefaultSelector()
+        self.remote_forwards = {}
+        # forward_remote 에서 미리 풀어 둔 대상 주소 (getaddrinfo 결과)
+        self._target_addresses = {}
+        self.closed = False
+        self._listeners = []
+        self._relays = {}
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._ready = deque()
+        self._calls = deque()
+        self._relay_thread = None
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self.selector.register(
+            self._wakeup_reader, selectors.EVENT_READ, self._drain_wakeups
+        )
+        self.channel_manager.register_open_handler(
+            "forwarded-tcpip", self._on_forwarded_channel
+        )
+
+    @property
+    def connections(self):
+        """Number of forwarded connections currently relayed."""
+        return len(self._relays)
+
+    # ---- 포워딩 설정 -----------------------------------------------------
+
+    def forward_local(self, port, remote_host, remote_port, bind_address="127.0.0.1"):
+        """
+        Listen on ``bind_address``:``port`` and tunnel each connection to
+        ``remote_host``:``remote_port`` as seen from the server (``ssh -L``).
+        Returns the local port, useful with ``port=0``.
+        """
+        listener = socket.create_server(
+            (bind_address or "127.0.0.1", port), backlog=LISTEN_BACKLOG
+        )
+        listener.setblocking(False)
+        target = (remote_host, remote_port)
+        self._call_soon(
+            lambda: self.selector.register(
+                listener, selectors.EVENT_READ, lambda: self._accept(listener, target)
+            )
+        )
+        self._listeners.append(listener)
+        self._start()
+        bound = listener.getsockname()[1]
+        self.logger.info(
+            f"Forwarding {bind_address}:{bound} to {remote_host}:{remote_port}"
+        )
+        return bound
+
+    def forward_remote(self, port, local_host, local_port, bind_address=""):
+        """
+        Ask the server to listen on ``bind_address``:``port`` and tunnel each
+        connection back to ``local_host``:``local_port`` (``ssh -R``).
+        Returns the port the server bound, useful with ``port=0``.
+        The target is resolved once, here, so no DNS lookup ever runs on
+        the relay thread.
+        """
+        target = (local_host, local_port)
+        self._target_addresses[target] = socket.getaddrinfo(
+            local_host, local_port, type=socket.SOCK_STREAM
+        )[0]
+        self._start()
+        reply = self.channel_manager.global_request(
+            "tcpip-forward", pack_string(bind_address) + pack_uint32(port)
+        )
+        if port == 0:
+            port = reply.read_uint32()
+        self.remote_forwards[(bind_address, port)] = target
+        self.logger.info(
+            f"Server forwarding {bind_address or '*'}:{port} "
+            f"to {local_host}:{local_port}"
+        )
+        return port
+
+    def cancel_remote(self, port, bind_address=""):
+        self.remote_forwards.pop((bind_address, port), None)
+        self.channel_manager.global_request(
+            "cancel-tcpip-forward",
+            pack_string(bind_address) + pack_uint32(port),
+            want_reply=False,
+        )
+
+    def close(self):
+        """Stop listening, close every forwarded connection and the threads."""
+        if self.closed:
+            return
+        for bind_address, port in list(self.remote_forwards):
+            try:
+                self.cancel_remote(port, bind_address)
+            except (ConnectionError, OSError) as e:
+                self.logger.debug(f"Cancelling remote forward failed: {e}")
+        self.closed = True
+        self.channel_manager.open_handlers.pop("forwarded-tcpip", None)
+        self._wake()
+        if self._relay_thread is not None:
+            self._relay_thread.join()
+        for listener in self._listeners:
+            listener.close()
+        for relay in list(self._relays.values()):
+            self._finish(relay)
+        self.selector.close()
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- 스레드 ----------------------------------------------------------
+
+    def _start(self):
+        if self._relay_thread is not None:
+            return
+        self._relay_thread = threading.Thread(
+            target=self._relay_loop, name="port-forward-relay", daemon=True
+        )
+        self._relay_thread.start()
+        # 읽기 스레드는 transport 가 닫힐 때까지 패킷을 기다리므로 join 하지 않음
+        threading.Thread(
+            target=self._read_loop, name="port-forward-reader", daemon=True
+        ).start()
+
+    def _read_loop(self):
+        """Keep packets flowing so channel events reach the relay thread."""
+        try:
+            while not self.closed:
+                self.channel_manager.process_packet()
+        except (ConnectionError, OSError, ValueError) as e:
+            if not self.closed:
+                self.logger.warning(f"Port forwarding transport failed: {e}")
+        self._wake()
+
+    def _relay_loop(self):
+        while not self.closed:
+            for key, events in self.selector.select():
+                if isinstance(key.data, _Relay):
+                    self._on_socket_event(key.data, events)
+                else:
+                    key.data()
+            while self._calls:
+                self._calls.popleft()()
+            while self._ready:
+                relay = self._relays.get(self._ready.popleft())
+                if relay is not None:
+                    self._service(relay)
+
+    def _call_soon(self, function):
+        self._calls.append(function)
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wakeup_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            # 이미 깨울 신호가 쌓여 있거나 닫힘
+            pass
+
+    def _drain_wakeups(self):
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _on_channel_event(self, channel):
+        # 패킷을 처리하는 스레드에서 호출되므로 표시만 하고 중계 스레드를 깨움
+        self._ready.append(channel)
+        self._wake()
+
+    # ---- 연결 수립 -------------------------------------------------------
+
+    def _accept(self, listener, target):
+        for _ in range(ACCEPT_BATCH):
+            try:
+                sock, origin = listener.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                self.logger.warning(f"Accept failed: {e}")
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                channel = self.channel_manager.open_channel(
+                    "direct-tcpip",
+                    pack_string(target[0])
+                    + pack_uint32(target[1])
+                    + pack_string(origin[0])
+                    + pack_uint32(origin[1]),
+                    wait=False,
+                )
+            except (ConnectionError, OSError) as e:
+                self.logger.warning(f"Cannot open forwarding channel: {e}")
+                sock.close()
+                continue
+            self._add_relay(_Relay(sock, channel))
+
+    def _on_forwarded_channel(self, channel, reader):
+        address = reader.read_text()
+        port = reader.read_uint32()
+        origin = f"{reader.read_text()}:{reader.read_uint32()}"
+        target = self.remote_forwards.get((address, port))
+        if target is None:
+            # 서버가 주소를 바꿔 알려 줄 수 있으므로 포트만으로도 찾음
+            target = next(
+                (t for (_, p), t in self.remote_forwards.items() if p == port), None
+            )
+        if target is None or self.closed:
+            self.logger.warning(f"Refusing forwarded connection for port {port}")
+            channel.close(wait=False)
+            return
+        self.logger.debug(f"Forwarded connection from {origin} to {target}")
+        # 연결 전에 도착한 데이터는 채널 버퍼에 남아 있다가 연결 후 전달됨
+        channel.listener = self._on_channel_event
+        self._call_soon(lambda: self._connect(channel, target))
+
+    def _connect(self, channel, target):
+        family, kind, proto, _, address = self._target_addresses[target]
+        try:
+            sock = socket.socket(family, kind, proto)
+        except OSError as e:
+            self.logger.warning(f"Cannot connect to {target[0]}:{target[1]}: {e}")
+            channel.listener = None
+            channel.close(wait=False)
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        result = sock.connect_ex(address)
+        relay = _Relay(sock, channel, connecting=result != 0)
+        self._add_relay(relay)
+        if result not in (0, errno.EINPROGRESS):
+            self.logger.warning(
+                f"Cannot connect to {target[0]}:{target[1]}: "
+                f"{errno.errorcode.get(result)}"
+            )
+            self._finish(relay)
+
+    def _add_relay(self, relay):
+        self._relays[relay.channel] = relay
+        relay.channel.listener = self._on_channel_event
+        # 리스너를 달기 전에 채널 응답이 이미 처리됐을 수 있음
+        self._service(relay)
+
+    # ---- 중계 -----------------------------------------------------------
+
+    def _on_socket_event(self, relay, events):
+        if relay.connecting:
+            error = relay.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                self.logger.warning(
+                    f"Forward connection failed: {errno.errorcode.get(error)}"
+                )
+                self._finish(relay)
+                return
+            relay.connecting = False
+        elif events & selectors.EVENT_READ and not relay.closed:
+            self._read_socket(relay)
+        if not relay.closed:
+            self._service(relay)
+
+    def _read_socket(self, relay):
+        channel = relay.channel
+        space = min(channel.send_space, len(self._buffer))
+        if not space:
+            return
+        try:
+            count = relay.sock.recv_into(self._buffer, space)
+            if count:
+                relay.queued = channel.send_nowait(self._view[:count])
+            else:
+                relay.local_eof = True
+        except BlockingIOError:
+            pass
+        except (ConnectionError, OSError) as e:
+            self.logger.debug(f"Forwarded connection ended: {e}")
+            self._finish(relay)
+
+    def _service(self, relay):
+        """Move whatever can move now, then wait for the events that can't."""
+        channel = relay.channel
+        if relay.closed:
+            return
+        if channel.open_error is not None:
+            self.logger.warning(f"Forwarding refused by server: {channel.open_error}")
+            self._finish(relay)
+            return
+        if channel.opened and not relay.connecting:
+            try:
+                self._to_socket(relay)
+                if relay.queued:
+                    relay.queued = channel.send_nowait()
+                if relay.local_eof and not relay.queued and not channel.closed:
+                    channel.send_eof()
+            except (ConnectionError, OSError) as e:
+                self.logger.debug(f"Forwarded connection ended: {e}")
+                self._finish(relay)
+                return
+            finished = relay.local_eof and relay.remote_eof and not relay.queued
+            if finished or (channel.close_received and relay.remote_eof):
+                self._finish(relay)
+                return
+        self._update(relay)
+
+    def _to_socket(self, relay):
+        channel = relay.channel
+        sock = relay.sock
+        if relay.pending:
+            sent = self._send(sock, relay.pending)
+            relay.pending = relay.pending[sent:]
+        while not relay.pending and channel.recv_ready():
+            count = channel.recv_into(self._buffer, 0)
+            sent = self._send(sock, self._view[:count])
+            if sent < count:
+                relay.pending = bytes(self._view[sent:count])
+        if (
+            channel.eof_received
+            and not relay.pending
+            and not channel.recv_ready()
+            and not relay.remote_eof
+        ):
+            relay.remote_eof = True
+            try:
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _send(sock, data):
+        try:
+            return sock.send(data)
+        except BlockingIOError:
+            return 0
+
+    def _update(self, relay):
+        channel = relay.channel
+        events = 0
+        if relay.connecting or relay.pending:
+            events |= selectors.EVENT_WRITE
+        if (
+            channel.opened
+            and not relay.connecting
+            and not relay.local_eof
+            and not relay.queued
+            and not channel.closed
+            and channel.send_space
+        ):
+            events |= selectors.EVENT_READ
+        if events == relay.events:
+            return
+        if not relay.events:
+            self.selector.register(relay.sock, events, relay)
+        elif not events:
+            self.selector.unregister(relay.sock)
+        else:
+            self.selector.modify(relay.sock, events, relay)
+        relay.events = events
+
+    def _finish(self, relay):
+        if relay.closed:
+            return
+        relay.closed = True
+        if relay.events:
+            self.selector.unregister(relay.sock)
+            relay.events = 0
+        relay.sock.close()
+        channel = relay.channel
+        self._relays.pop(channel, None)
+        if channel.opened or channel.open_error is not None:
+            channel.listener = None
+            if not channel.close_sent:
+                self._close_channel(channel)
+        else:
+            # 채널이 열리기 전에 로컬 연결이 끊김: 열리는 대로 닫음
+            channel.listener = self._close_when_opened
+
+    def _close_channel(self, channel):
+        try:
+            channel.close(wait=False)
+        except (ConnectionError, OSError) as e:
+            self.logger.debug(f"Closing forwarding channel failed: {e}")
+
+    def _close_when_opened(self, channel):
+        if channel.opened or channel.open_error is not None:
+            channel.listener = None
+            self._close_channel(channel)
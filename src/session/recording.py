@@ -0,0 +1,404 @@
+# src/session/recording.py
+# 세션 녹화: 청크 단위로 압축하고 시간 -> 오프셋 인덱스를 붙인 추가 전용 파일
+
+import bisect
+import json
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+from src.shell.terminal_emulator import TerminalEmulator
+from src.utils.logger import Logger
+
+MAGIC = b"SSHREC\x01\n"
+TRAILER_MAGIC = b"SSHRIDX\n"
+# 청크 헤더: 표식, 압축 크기, 이벤트 수, 첫/마지막 이벤트 시각, 플래그
+_CHUNK_HEADER = struct.Struct("<4sIIddI")
+_CHUNK_TAG = b"CHNK"
+# 이벤트: 녹화 시작 후 경과 초, 스트림, 데이터 길이
+_EVENT_HEADER = struct.Struct("<dBI")
+_INDEX_ENTRY = struct.Struct("<ddQI")
+_TRAILER = struct.Struct("<QI8s")
+_LENGTH = struct.Struct("<I")
+_RESIZE = struct.Struct("<II")
+
+# 이벤트 스트림
+OUTPUT = 0
+STDERR = 1
+INPUT = 2
+RESIZE = 3
+# 청크 맨 앞의 화면 상태 (이 청크부터 재생을 시작할 수 있음)
+SNAPSHOT = 4
+# 큐가 가득 차서 버린 이벤트 수
+GAP = 5
+
+KEYFRAME = 1
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_QUEUE_SIZE = 4096
+DEFAULT_FLUSH_INTERVAL = 1.0
+COMPRESSION_LEVEL = 6
+# 검색은 이 크기씩 이어 붙여 검사하고, 경계의 끝부분은 다음 번에 다시 검사
+SEARCH_WINDOW = 256 * 1024
+SEARCH_OVERLAP = 4096
+
+Event = namedtuple("Event", "time stream data")
+ChunkInfo = namedtuple("ChunkInfo", "first_time last_time offset flags")
+
+
+class RecordingError(ValueError):
+    pass
+
+
+def pack_resize(columns, rows):
+    return _RESIZE.pack(columns, rows)
+
+
+def unpack_resize(data):
+    return _RESIZE.unpack(data)
+
+
+class SessionRecorder:
+    """
+    Append-only session recording.
+
+    ``record`` only puts the event on a bounded queue and never blocks: a
+    writer thread batches events into chunks of about ``chunk_size`` raw
+    bytes, compresses each chunk with zlib and appends it. If the queue is
+    full the event is dropped and counted, and a GAP event marks the loss
+    in the file, so a slow disk never stalls the live session. Chunks are
+    also written every ``flush_interval`` seconds while the session is idle.
+    ``close`` appends the chunk index; a file whose writer died without it
+    is still readable (the index is rebuilt from the chunk headers).
+
+    When ``wants_snapshot`` is set, the producer should call
+    ``record_snapshot`` with the current screen after feeding its output;
+    the snapshot starts a new chunk, which replay can then begin from.
+    """
+
+    def __init__(
+        self,
+        path,
+        metadata=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        snapshots=False,
+        clock=time.monotonic,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.snapshots = snapshots
+        self.clock = clock
+        self.started = clock()
+        self.dropped = 0
+        self.wants_snapshot = False
+        self.closed = False
+        self._queue = queue.Queue(queue_size)
+        self._file = open(path, "xb")
+        header = dict(metadata or {}, started=time.time())
+        encoded = json.dumps(header).encode()
+        self._file.write(MAGIC + _LENGTH.pack(len(encoded)) + encoded)
+        self._offset = self._file.tell()
+        self._index = []
+        self._events = []
+        self._raw_size = 0
+        self._keyframe = True
+        self._since_keyframe = 0
+        self._reported_drops = 0
+        self._writer = threading.Thread(
+            target=self._run, name=f"recorder {path}", daemon=True
+        )
+        self._writer.start()
+
+    # ---- 생산자 쪽 (I/O 스레드) ------------------------------------------
+
+    def record(self, stream, data):
+        """Queue an event; drops it (and counts the drop) instead of blocking."""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait((self.clock() - self.started, stream, bytes(data)))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def record_snapshot(self, screen):
+        """Record ``screen`` (a terminal_emulator.Screen) as a replay point."""
+        data = pack_resize(screen.columns, screen.rows) + screen.snapshot().encode()
+        if self.record(SNAPSHOT, data):
+            self.wants_snapshot = False
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._writer.is_alive():
+            self._queue.put(None)
+        self._writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- 기록 스레드 -----------------------------------------------------
+
+    def _run(self):
+        try:
+            while True:
+                try:
+                    event = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    self._write_chunk()
+                    continue
+                if event is None:
+                    break
+                self._add(event)
+            self._report_drops(self.clock() - self.started)
+            self._write_chunk()
+            self._write_index()
+        except OSError as e:
+            self.logger.error(f"Recording {self.path} failed: {e}")
+        finally:
+            self._file.close()
+
+    def _report_drops(self, when):
+        if self.dropped != self._reported_drops:
+            count = self.dropped - self._reported_drops
+            self._reported_drops = self.dropped
+            self._append(Event(when, GAP, _LENGTH.pack(count)))
+
+    def _add(self, event):
+        self._report_drops(event[0])
+        if event[1] == SNAPSHOT:
+            # 스냅샷은 새 청크의 첫 이벤트 (재생 시작 지점)
+            self._write_chunk()
+            self._keyframe = True
+            self._since_keyframe = 0
+        self._append(Event(*event))
+        if (
+            self._raw_size >= self.chunk_size
+            or event[0] - self._events[0].time >= self.flush_interval
+        ):
+            self._write_chunk()
+
+    def _append(self, event):
+        self._events.append(event)
+        size = _EVENT_HEADER.size + len(event.data)
+        self._raw_size += size
+        self._since_keyframe += size
+        if self.snapshots and self._since_keyframe >= self.chunk_size:
+            self.wants_snapshot = True
+
+    def _write_chunk(self):
+        if not self._events:
+            return
+        raw = b"".join(
+            _EVENT_HEADER.pack(event.time, event.stream, len(event.data)) + event.data
+            for event in self._events
+        )
+        body = zlib.compress(raw, COMPRESSION_LEVEL)
+        first, last = self._events[0].time, self._events[-1].time
+        flags = KEYFRAME if self._keyframe else 0
+        header = _CHUNK_HEADER.pack(
+            _CHUNK_TAG, len(body), len(self._events), first, last, flags
+        )
+        self._file.write(header + body)
+        self._file.flush()
+        self._index.append(ChunkInfo(first, last, self._offset, flags))
+        self._offset += len(header) + len(body)
+        self._events = []
+        self._raw_size = 0
+        self._keyframe = False
+
+    def _write_index(self):
+        entries = b"".join(_INDEX_ENTRY.pack(*entry) for entry in self._index)
+        self._file.write(
+            entries + _TRAILER.pack(self._offset, len(self._index), TRAILER_MAGIC)
+        )
+
+
+class RecordingReader:
+    """
+    Random access to a recording.
+
+    Only the header and the index are read up front. ``events(start)`` and
+    ``screen_at(t)`` find their chunk by binary search over the index and
+    decompress from there (for the screen, from the nearest preceding
+    snapshot), so jumping into a long session reads a few chunks, not the
+    whole file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            raise RecordingError(f"{path} is not a session recording")
+        (length,) = _LENGTH.unpack(self._file.read(_LENGTH.size))
+        self.metadata = json.loads(self._file.read(length))
+        self._data_offset = self._file.tell()
+        self.chunks = self._read_index() or self._scan_chunks()
+        self._first_times = [chunk.first_time for chunk in self.chunks]
+        self._last_times = [chunk.last_time for chunk in self.chunks]
+        self._chunk = lru_cache(maxsize=8)(self._load_chunk)
+
+    @property
+    def duration(self):
+        return self.chunks[-1].last_time if self.chunks else 0.0
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _read_index(self):
+        self._file.seek(0, 2)
+        end = self._file.tell()
+        if end - self._data_offset < _TRAILER.size:
+            return None
+        self._file.seek(end - _TRAILER.size)
+        offset, count, magic = _TRAILER.unpack(self._file.read(_TRAILER.size))
+        if magic != TRAILER_MAGIC:
+            return None
+        self._file.seek(offset)
+        data = self._file.read(count * _INDEX_ENTRY.size)
+        return [ChunkInfo(*entry) for entry in _INDEX_ENTRY.iter_unpack(data)]
+
+    def _scan_chunks(self):
+        """Rebuild the index from chunk headers (recording was not closed)."""
+        self._file.seek(0, 2)
+        size = self._file.tell()
+        chunks = []
+        offset = self._data_offset
+        while offset + _CHUNK_HEADER.size <= size:
+            self._file.seek(offset)
+            tag, length, _, first, last, flags = _CHUNK_HEADER.unpack(
+                self._file.read(_CHUNK_HEADER.size)
+            )
+            end = offset + _CHUNK_HEADER.size + length
+            # 기록 중에 끊긴 마지막 청크는 버림
+            if tag != _CHUNK_TAG or end > size:
+                break
+            chunks.append(ChunkInfo(first, last, offset, flags))
+            offset = end
+        return chunks
+
+    def _load_chunk(self, number):
+        chunk = self.chunks[number]
+        self._file.seek(chunk.offset)
+        tag, size, count, *_ = _CHUNK_HEADER.unpack(self._file.read(_CHUNK_HEADER.size))
+        if tag != _CHUNK_TAG:
+            raise RecordingError(f"Bad chunk at offset {chunk.offset}")
+        try:
+            raw = zlib.decompress(self._file.read(size))
+        except zlib.error as e:
+            raise RecordingError(f"Corrupt chunk at offset {chunk.offset}") from e
+        events = []
+        position = 0
+        for _ in range(count):
+            when, stream, length = _EVENT_HEADER.unpack_from(raw, position)
+            position += _EVENT_HEADER.size
+            events.append(Event(when, stream, raw[position : position + length]))
+            position += length
+        return events
+
+    def _chunk_at(self, when):
+        """Number of the first chunk holding events at or after ``when``."""
+        return bisect.bisect_left(self._last_times, when)
+
+    def events(self, start=0.0, end=None, streams=None):
+        """Events with ``start <= time`` (and ``time <= end``), in order."""
+        for number in range(self._chunk_at(start), len(self.chunks)):
+            if end is not None and self._first_times[number] > end:
+                return
+            for event in self._chunk(number):
+                if event.time < start:
+                    continue
+                if end is not None and event.time > end:
+                    return
+                if streams is None or event.stream in streams:
+                    yield event
+
+    def screen_at(self, when, columns=None, rows=None):
+        """Terminal screen as it looked at ``when`` seconds into the session."""
+        number = min(self._chunk_at(when), len(self.chunks) - 1)
+        while number > 0 and not self.chunks[number].flags & KEYFRAME:
+            number -= 1
+        emulator = TerminalEmulator(
+            columns or self.metadata.get("columns", 80),
+            rows or self.metadata.get("rows", 24),
+            scrollback=0,
+        )
+        start = self._first_times[number] if self.chunks else 0.0
+        for event in self.events(start, when, (OUTPUT, RESIZE, SNAPSHOT)):
+            if event.stream == OUTPUT:
+                emulator.feed(event.data)
+            else:
+                emulator.resize(*unpack_resize(event.data[: _RESIZE.size]))
+                emulator.feed(event.data[_RESIZE.size :])
+        return emulator.screen
+
+    def search(self, pattern, streams=(OUTPUT,), start=0.0):
+        """
+        Sorted times of the events where ``pattern`` (bytes or a compiled
+        bytes regex) matches. A match spanning several events counts for
+        the event it starts in.
+        """
+        if isinstance(pattern, bytes):
+            pattern = re.compile(re.escape(pattern))
+        text = bytearray()
+        starts = []
+        times = []
+        found = set()
+
+        def scan(limit):
+            for match in pattern.finditer(text):
+                if match.start() >= limit:
+                    break
+                found.add(times[bisect.bisect_right(starts, match.start()) - 1])
+
+        for event in self.events(start, streams=streams):
+            starts.append(len(text))
+            times.append(event.time)
+            text += event.data
+            if len(text) < SEARCH_WINDOW:
+                continue
+            # 끝부분은 다음 이벤트와 이어서 다시 검사 (경계에 걸친 일치)
+            limit = len(text) - SEARCH_OVERLAP
+            scan(limit)
+            first = bisect.bisect_right(starts, limit) - 1
+            cut = starts[first]
+            del text[:cut]
+            starts = [position - cut for position in starts[first:]]
+            times = times[first:]
+        scan(len(text) + 1)
+        return sorted(found)
+
+    def replay(self, write, start=0.0, speed=1.0, max_idle=2.0, sleep=time.sleep):
+        """
+        Write the output from ``start`` onwards with its original timing,
+        ``speed`` times faster and with pauses capped at ``max_idle``.
+        Begins with the screen as it was at ``start``.
+        """
+        if start > 0:
+            write(self.screen_at(start).snapshot().encode())
+        previous = start
+        for event in self.events(start, streams=(OUTPUT,)):
+            delay = min(event.time - previous, max_idle) / speed
+            if delay > 0:
+                sleep(delay)
+            previous = event.time
+            write(event.data)
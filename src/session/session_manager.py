@@ -1,17 +1,54 @@
+from src.config.config import Config
+from src.session.connection_pool import ConnectionPool
 from src.utils.logger import Logger
 
 
+class Session:
+    def __init__(self, session_id, lease, channel):
+        self.session_id = session_id
+        self.lease = lease
+        self.channel = channel
+
+
 class SessionManager:
-    def __init__(self):
+    def __init__(self, pool=None):
         self.logger = Logger.get_logger(__name__)
         self.sessions = {}
+        self.pool = pool or ConnectionPool()
 
-    def create_session(self, session_id):
+    def create_session(self, session_id, host=None, port=None, username=None):
+        """Open a session channel on a pooled transport for (host, port, username)."""
         self.logger.info(f"Creating new session: {session_id}")
-        # Implement session creation logic here
-        pass
+        if session_id in self.sessions:
+            raise ValueError(f"Session already exists: {session_id}")
+
+        host = host or Config.get_server_host()
+        port = port or Config.get_server_port()
+        lease = self.pool.acquire(host, port, username)
+        try:
+            channel = lease.transport.open_session()
+        except BaseException:
+            lease.release(discard=not lease.transport.is_active())
+            raise
+        self.sessions[session_id] = Session(session_id, lease, channel)
+        return channel
+
+    def get_session(self, session_id):
+        session = self.sessions.get(session_id)
+        return session.channel if session else None
 
     def close_session(self, session_id):
         self.logger.info(f"Closing session: {session_id}")
-        # Implement session closing logic here
-        pass
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            self.logger.warning(f"Attempting to close unknown session: {session_id}")
+            return
+        try:
+            session.channel.close()
+        finally:
+            session.lease.release()
+
+    def close(self):
+        for session_id in list(self.sessions):
+            self.close_session(session_id)
+        self.pool.close()
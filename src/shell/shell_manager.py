@@ -0,0 +1,289 @@
+# src/shell/shell_manager.py
+# 대화형 셸: PTY 채널 출력을 터미널 에뮬레이터로 해석하고 바뀐 줄만 다시 그림
+
+import os
+import shutil
+import signal
+import sys
+import threading
+import time
+import uuid
+from src.config.config import Config
+from src.network.message import pack_uint32
+from src.session.connection_pool import ConnectionPool
+from src.session.recording import RESIZE, SessionRecorder, pack_resize
+from src.shell.terminal_emulator import DEFAULT_SCROLLBACK, TerminalEmulator
+from src.utils.logger import Logger
+
+DEFAULT_TERM = "xterm-256color"
+# 화면은 초당 최대 60 번만 다시 그림 (출력이 아무리 많아도 그리기 비용은 일정)
+FRAME_INTERVAL = 1 / 60
+READ_BUFFER_SIZE = 64 * 1024
+# 원격 프로그램이 DECCKM 을 켜면 커서 키를 SS3 형식으로 바꿔 보냄
+_APPLICATION_CURSOR_KEYS = {
+    b"\x1b[A": b"\x1bOA",
+    b"\x1b[B": b"\x1bOB",
+    b"\x1b[C": b"\x1bOC",
+    b"\x1b[D": b"\x1bOD",
+    b"\x1b[H": b"\x1bOH",
+    b"\x1b[F": b"\x1bOF",
+}
+
+
+def render_damage(screen, full=False):
+    """
+    Escape sequences that bring a terminal showing the last frame up to date:
+    only the rows damaged since then are redrawn (every row with ``full``).
+    """
+    rows = range(screen.rows) if full else screen.damage()
+    if full:
+        screen.dirty.clear()
+    parts = ["\x1b[?25l"]
+    for y in rows:
+        text, end = screen.lines[y].render()
+        parts.append(f"\x1b[{y + 1};1H{text}\x1b[0m")
+        if end < screen.columns:
+            parts.append("\x1b[K")
+    parts.append(f"\x1b[{screen.y + 1};{screen.x + 1}H")
+    if screen.cursor_visible:
+        parts.append("\x1b[?25h")
+    return "".join(parts)
+
+
+class ShellSession:
+    """
+    A shell with a PTY on one session channel.
+
+    With a ``recorder`` (a SessionRecorder made with ``snapshots=True``)
+    the channel's input and output are recorded along with resizes and,
+    every so often, the screen itself as a replay starting point.
+
+    ``pump`` reads a chunk of output into the emulator and ``render``
+    returns what changed since the previous frame; ``interact`` ties both
+    to the local terminal. Output is parsed as fast as it arrives but drawn
+    at most once per ``FRAME_INTERVAL``, so a flood of output costs parsing
+    time only, not a redraw per packet.
+    """
+
+    def __init__(
+        self,
+        channel,
+        columns=80,
+        rows=24,
+        term=DEFAULT_TERM,
+        scrollback=DEFAULT_SCROLLBACK,
+        recorder=None,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.channel = channel
+        self.term = term
+        self.recorder = recorder
+        channel.recorder = recorder
+        self.emulator = TerminalEmulator(columns, rows, scrollback, write=channel.send)
+        self.screen = self.emulator.screen
+        self.lock = threading.Lock()
+        self.closed = False
+        self._buffer = bytearray(READ_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+
+    def start(self):
+        if self.recorder is not None:
+            self.recorder.record(
+                RESIZE, pack_resize(self.screen.columns, self.screen.rows)
+            )
+        self.channel.request_pty(self.term, self.screen.columns, self.screen.rows)
+        self.channel.invoke_shell()
+        return self
+
+    def send_keys(self, data):
+        """Send keyboard input, adjusting cursor keys to the remote mode."""
+        if isinstance(data, str):
+            data = data.encode()
+        if self.screen.application_cursor and b"\x1b[" in data:
+            for key, replacement in _APPLICATION_CURSOR_KEYS.items():
+                data = data.replace(key, replacement)
+        self.channel.send(data)
+
+    def resize(self, columns, rows):
+        with self.lock:
+            self.emulator.resize(columns, rows)
+            if self.recorder is not None:
+                self.recorder.record(RESIZE, pack_resize(columns, rows))
+        self.channel.send_request(
+            "window-change",
+            pack_uint32(columns) + pack_uint32(rows) + pack_uint32(0) + pack_uint32(0),
+            want_reply=False,
+        )
+
+    def pump(self, timeout=None):
+        """Feed one chunk of output to the screen; returns its size, 0 at EOF."""
+        count = self.channel.recv_into(self._buffer, timeout)
+        if count:
+            with self.lock:
+                self.emulator.feed(self._view[:count])
+                if self.recorder is not None and self.recorder.wants_snapshot:
+                    self.recorder.record_snapshot(self.screen)
+        else:
+            self.closed = True
+        return count
+
+    def expect(self, text, timeout=10.0):
+        """Read output until ``text`` is visible on the screen."""
+        deadline = time.monotonic() + timeout
+        while not any(text in line for line in self.screen.display):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{text!r} did not appear on the screen")
+            if not self.pump(remaining):
+                raise ConnectionError(f"Shell closed before {text!r} appeared")
+
+    def render(self, full=False):
+        with self.lock:
+            return render_damage(self.screen, full)
+
+    def close(self):
+        try:
+            self.channel.close()
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+
+    # ---- 로컬 터미널 연결 ------------------------------------------------
+
+    def interact(self, stdin=None, stdout=None):
+        """
+        Attach to the local terminal until the remote shell exits; returns
+        the exit status. The local terminal is put in raw mode and switched
+        to its alternate screen for the duration.
+        """
+        import termios
+        import tty
+
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        updated = threading.Event()
+        resized = threading.Event()
+
+        def read_output():
+            try:
+                while self.pump():
+                    updated.set()
+            except (ConnectionError, OSError) as e:
+                self.logger.warning(f"Shell output stopped: {e}")
+                self.closed = True
+            updated.set()
+
+        def read_input():
+            while not self.closed:
+                data = os.read(stdin.fileno(), 1024)
+                if not data:
+                    self.channel.send_eof()
+                    return
+                self.send_keys(data)
+
+        saved = termios.tcgetattr(stdin.fileno())
+
+        def on_resize(signum, frame):
+            resized.set()
+            updated.set()
+
+        previous_handler = signal.signal(signal.SIGWINCH, on_resize)
+        tty.setraw(stdin.fileno())
+        stdout.write("\x1b[?1049h")
+        try:
+            threading.Thread(target=read_output, daemon=True).start()
+            threading.Thread(target=read_input, daemon=True).start()
+            full = True
+            updated.set()
+            while not self.closed:
+                updated.wait()
+                updated.clear()
+                if resized.is_set():
+                    resized.clear()
+                    self.resize(*shutil.get_terminal_size())
+                    full = True
+                stdout.write(self.render(full))
+                stdout.flush()
+                full = False
+                # 다음 프레임까지는 출력만 해석하고 그리지 않음
+                time.sleep(FRAME_INTERVAL)
+        finally:
+            stdout.write("\x1b[0m\x1b[?1049l")
+            stdout.flush()
+            termios.tcsetattr(stdin.fileno(), termios.TCSADRAIN, saved)
+            signal.signal(signal.SIGWINCH, previous_handler)
+        return self.channel.recv_exit_status(timeout=5)
+
+
+def recording_path(directory, host, username):
+    """Unique recording file name under ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    name = f"{username or 'unknown'}@{host}-{stamp}-{uuid.uuid4().hex[:8]}.sshrec"
+    return os.path.join(directory, name)
+
+
+class ShellManager:
+    """
+    Interactive shells on pooled transports, one session channel each.
+
+    Shells are recorded to ``record`` (a file path) when given, otherwise
+    into ``Config.RECORDING_DIR`` when that is set.
+    """
+
+    def __init__(self, pool=None):
+        self.logger = Logger.get_logger(__name__)
+        self.pool = pool or ConnectionPool()
+        self.shells = {}
+
+    def open_shell(
+        self,
+        host=None,
+        port=None,
+        username=None,
+        columns=None,
+        rows=None,
+        term=DEFAULT_TERM,
+        scrollback=DEFAULT_SCROLLBACK,
+        record=None,
+    ):
+        """Open a shell sized like the local terminal unless a size is given."""
+        host = host or Config.get_server_host()
+        port = port or Config.get_server_port()
+        if columns is None or rows is None:
+            size = shutil.get_terminal_size()
+            columns, rows = columns or size.columns, rows or size.lines
+        if record is None and Config.RECORDING_DIR:
+            record = recording_path(Config.RECORDING_DIR, host, username)
+        lease = self.pool.acquire(host, port, username)
+        recorder = None
+        try:
+            channel = lease.transport.open_session()
+            if record:
+                metadata = dict(host=host, port=port, user=username, term=term)
+                metadata.update(columns=columns, rows=rows)
+                recorder = SessionRecorder(record, metadata, snapshots=True)
+            shell = ShellSession(
+                channel, columns, rows, term, scrollback, recorder
+            ).start()
+        except BaseException:
+            if recorder is not None:
+                recorder.close()
+            lease.release(discard=not lease.transport.is_active())
+            raise
+        self.shells[shell] = lease
+        self.logger.info(f"Opened shell on {host}:{port} ({columns}x{rows})")
+        return shell
+
+    def close_shell(self, shell):
+        lease = self.shells.pop(shell, None)
+        try:
+            shell.close()
+        finally:
+            if lease is not None:
+                lease.release()
+
+    def close(self):
+        for shell in list(self.shells):
+            self.close_shell(shell)
+        self.pool.close()
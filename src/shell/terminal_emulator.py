@@ -0,0 +1,1055 @@
+# src/shell/terminal_emulator.py
+# 증분 VT100/ANSI 파서와 변경된 줄을 추적하는 화면 버퍼
+
+import codecs
+import re
+import unicodedata
+from array import array
+from collections import deque
+from functools import lru_cache
+
+DEFAULT_COLUMNS = 80
+DEFAULT_ROWS = 24
+# 스크롤백 최대 줄 수 (링 버퍼, 넘치면 오래된 줄부터 버림)
+DEFAULT_SCROLLBACK = 10000
+# 제어 시퀀스 인자 / OSC 문자열 크기 제한 (잘못된 출력이 메모리를 잡아먹지 않도록)
+MAX_PARAMS = 32
+MAX_PARAM_VALUE = 65535
+MAX_STRING_LENGTH = 4096
+
+# 셀 속성: 하위 8비트는 플래그, 그 위로 전경색 / 배경색 (0-255, 256 = 기본색)
+BOLD = 1
+DIM = 2
+ITALIC = 4
+UNDERLINE = 8
+BLINK = 16
+REVERSE = 32
+HIDDEN = 64
+STRIKE = 128
+DEFAULT_COLOR = 256
+_FG_SHIFT = 8
+_BG_SHIFT = 17
+_COLOR_MASK = 0x1FF
+_FG_MASK = _COLOR_MASK << _FG_SHIFT
+_BG_MASK = _COLOR_MASK << _BG_SHIFT
+DEFAULT_ATTRS = DEFAULT_COLOR << _FG_SHIFT | DEFAULT_COLOR << _BG_SHIFT
+
+_SGR_FLAGS = {1: BOLD, 2: DIM, 3: ITALIC, 4: UNDERLINE, 5: BLINK}
+_SGR_FLAGS.update({7: REVERSE, 8: HIDDEN, 9: STRIKE})
+_SGR_RESET_FLAGS = {21: BOLD, 22: BOLD | DIM, 23: ITALIC, 24: UNDERLINE, 25: BLINK}
+_SGR_RESET_FLAGS.update({27: REVERSE, 28: HIDDEN, 29: STRIKE})
+
+
+def color_of(attrs, background=False):
+    """Palette index (0-255) of a packed attribute value, None for the default."""
+    color = attrs >> (_BG_SHIFT if background else _FG_SHIFT) & _COLOR_MASK
+    return None if color == DEFAULT_COLOR else color
+
+
+@lru_cache(maxsize=4096)
+def char_width(char):
+    """Columns ``char`` takes: 0 for combining marks, 2 for wide East Asian."""
+    if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+@lru_cache(maxsize=1024)
+def sgr_sequence(attrs):
+    """SGR escape sequence that selects ``attrs`` from a reset state."""
+    codes = ["0"]
+    codes += [str(code) for code, flag in _SGR_FLAGS.items() if attrs & flag]
+    for base, background in ((30, False), (40, True)):
+        color = color_of(attrs, background)
+        if color is None:
+            continue
+        if color < 8:
+            codes.append(str(base + color))
+        elif color < 16:
+            codes.append(str(base + 60 + color - 8))
+        else:
+            codes.append(f"{base + 8};5;{color}")
+    return f"\x1b[{';'.join(codes)}m"
+
+
+def _rgb_to_palette(red, green, blue):
+    """Nearest xterm 256-colour palette entry (6x6x6 cube) for a true colour."""
+    return 16 + 36 * round(red / 51) + 6 * round(green / 51) + round(blue / 51)
+
+
+@lru_cache(maxsize=64)
+def _fill(attrs, count):
+    return array("I", (attrs,)) * count
+
+
+def _blank_attrs(count):
+    return _fill(DEFAULT_ATTRS, count)
+
+
+class Cell:
+    """One character cell as returned by ``Screen.cell``."""
+
+    __slots__ = ("char", "attrs")
+
+    def __init__(self, char=" ", attrs=DEFAULT_ATTRS):
+        self.char = char
+        self.attrs = attrs
+
+    @property
+    def fg(self):
+        return color_of(self.attrs)
+
+    @property
+    def bg(self):
+        return color_of(self.attrs, background=True)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Cell)
+            and self.char == other.char
+            and self.attrs == other.attrs
+        )
+
+    def __repr__(self):
+        return f"Cell({self.char!r}, {self.attrs:#x})"
+
+
+class Line:
+    """
+    One row: characters in a list and packed attributes in an ``array``.
+
+    A wide character occupies its cell plus a following "" placeholder, so
+    ``"".join(chars)`` is the row's text.
+    """
+
+    __slots__ = ("chars", "attrs", "wrapped")
+
+    def __init__(self, columns, attrs=DEFAULT_ATTRS):
+        self.chars = [" "] * columns
+        self.attrs = array("I", (attrs,)) * columns
+        self.wrapped = False
+
+    @property
+    def text(self):
+        return "".join(self.chars).rstrip()
+
+    def resize(self, columns):
+        missing = columns - len(self.chars)
+        if missing > 0:
+            self.chars += [" "] * missing
+            self.attrs += array("I", (DEFAULT_ATTRS,)) * missing
+        else:
+            del self.chars[columns:]
+            del self.attrs[columns:]
+
+    def trim(self):
+        """Drop trailing blank default cells (lines kept in scrollback)."""
+        chars, attrs = self.chars, self.attrs
+        end = len(chars)
+        text = "".join(chars)
+        if len(text) == end:
+            # 넓은 문자가 없으면 rstrip 으로 한 번에 찾음
+            end = len(text.rstrip(" "))
+            if attrs[end:] != _blank_attrs(len(chars) - end):
+                end = len(chars)
+        while end and chars[end - 1] == " " and attrs[end - 1] == DEFAULT_ATTRS:
+            end -= 1
+        self.resize(end)
+        return self
+
+    def render(self):
+        """Text with SGR sequences; trailing blank default cells are left out."""
+        chars, attrs = self.chars, self.attrs
+        end = len(chars)
+        while end and chars[end - 1] == " " and attrs[end - 1] == DEFAULT_ATTRS:
+            end -= 1
+        parts = []
+        start = 0
+        while start < end:
+            current = attrs[start]
+            stop = start + 1
+            while stop < end and attrs[stop] == current:
+                stop += 1
+            parts.append(sgr_sequence(current))
+            parts.append("".join(chars[start:stop]))
+            start = stop
+        return "".join(parts), end
+
+
+class Screen:
+    """
+    Screen buffer with cursor, scrolling region, alternate screen and
+    scrollback.
+
+    Every operation records the rows it touched in ``dirty``; ``damage()``
+    hands them out and starts over, so a renderer only redraws what changed
+    since its last frame. Lines scrolled off the top of the main screen go
+    to ``history``, a ring buffer of at most ``scrollback`` trimmed lines.
+    """
+
+    def __init__(
+        self, columns=DEFAULT_COLUMNS, rows=DEFAULT_ROWS, scrollback=DEFAULT_SCROLLBACK
+    ):
+        self.columns = columns
+        self.rows = rows
+        self.history = deque(maxlen=scrollback)
+        self.dirty = set()
+        self.title = ""
+        self.bell_count = 0
+        self.reset()
+
+    def reset(self):
+        self.lines = [Line(self.columns) for _ in range(self.rows)]
+        self.x = 0
+        self.y = 0
+        self.attrs = DEFAULT_ATTRS
+        self.wrap_pending = False
+        self.autowrap = True
+        self.insert_mode = False
+        self.origin_mode = False
+        self.cursor_visible = True
+        self.application_cursor = False
+        self.top = 0
+        self.bottom = self.rows - 1
+        self.tab_stops = set(range(8, self.columns, 8))
+        self.saved_cursor = None
+        self.saved_screen = None
+        self.last_char = " "
+        self.dirty.update(range(self.rows))
+
+    # ---- 조회 ------------------------------------------------------------
+
+    @property
+    def alternate(self):
+        return self.saved_screen is not None
+
+    @property
+    def display(self):
+        return [line.text for line in self.lines]
+
+    def cell(self, y, x):
+        line = self.lines[y]
+        return Cell(line.chars[x], line.attrs[x])
+
+    def snapshot(self):
+        """Escape sequences that redraw this screen from scratch."""
+        parts = ["\x1b[0m\x1b[H\x1b[2J"]
+        for y, line in enumerate(self.lines):
+            text, end = line.render()
+            if end:
+                parts.append(f"\x1b[{y + 1};1H{text}")
+        parts.append("\x1b[0m")
+        if (self.top, self.bottom) != (0, self.rows - 1):
+            parts.append(f"\x1b[{self.top + 1};{self.bottom + 1}r")
+        parts.append(f"\x1b[{self.y + 1};{self.x + 1}H")
+        parts.append(sgr_sequence(self.attrs))
+        if not self.cursor_visible:
+            parts.append("\x1b[?25l")
+        if self.application_cursor:
+            parts.append("\x1b[?1h")
+        if not self.autowrap:
+            parts.append("\x1b[?7l")
+        return "".join(parts)
+
+    def damage(self):
+        """Rows changed since the last call, in order."""
+        rows = sorted(self.dirty)
+        self.dirty.clear()
+        return rows
+
+    # ---- 문자 출력 -------------------------------------------------------
+
+    def draw(self, text):
+        """Print a run of characters (no control characters) at the cursor."""
+        if not text:
+            return
+        if not text.isascii():
+            self._draw_wide(text)
+            return
+        columns = self.columns
+        length = len(text)
+        start = 0
+        while start < length:
+            if self.wrap_pending:
+                if not self.autowrap:
+                    # 줄 끝에서 멈춤: 마지막 칸만 계속 덮어씀
+                    self._put(self.lines[self.y], columns - 1, text[-1:])
+                    break
+                self._wrap()
+            count = min(columns - self.x, length - start)
+            line = self.lines[self.y]
+            if self.insert_mode:
+                self._shift_right(line, self.x, count)
+            self._put(line, self.x, text[start : start + count])
+            start += count
+            self._advance(count)
+        self.last_char = text[-1]
+
+    def _draw_wide(self, text):
+        columns = self.columns
+        for char in text:
+            width = char_width(char)
+            if width == 0:
+                # 결합 문자는 앞 칸에 붙임
+                x = self.x if self.wrap_pending else self.x - 1
+                line = self.lines[self.y]
+                if x >= 0:
+                    if line.chars[x] == "" and x:
+                        x -= 1
+                    line.chars[x] += char
+                    self.dirty.add(self.y)
+                continue
+            if self.wrap_pending or (width == 2 and self.x == columns - 1):
+                if not self.autowrap:
+                    self.x = columns - width
+                    self.wrap_pending = False
+                else:
+                    if not self.wrap_pending:
+                        self._put(self.lines[self.y], self.x, " ")
+                    self._wrap()
+            if width > columns:
+                continue
+            line = self.lines[self.y]
+            if self.insert_mode:
+                self._shift_right(line, self.x, width)
+            self._put(line, self.x, char if width == 1 else (char, ""))
+            self._advance(width)
+            self.last_char = char
+
+    def _put(self, line, x, chars):
+        end = x + len(chars)
+        line_chars = line.chars
+        # 넓은 문자의 반쪽을 덮어쓰면 나머지 반쪽은 빈칸으로
+        if line_chars[x] == "" and x:
+            line_chars[x - 1] = " "
+        if end < len(line_chars) and line_chars[end] == "":
+            line_chars[end] = " "
+        line_chars[x:end] = chars
+        line.attrs[x:end] = _fill(self.attrs, len(chars))
+        self.dirty.add(self.y)
+
+    def _advance(self, count):
+        x = self.x + count
+        if x >= self.columns:
+            self.x = self.columns - 1
+            self.wrap_pending = True
+        else:
+            self.x = x
+
+    def _wrap(self):
+        self.lines[self.y].wrapped = True
+        self.x = 0
+        self.wrap_pending = False
+        self.index()
+
+    def repeat(self, count=1):
+        """REP: print the last printed character ``count`` more times."""
+        self.draw(self.last_char * min(count, self.columns * self.rows))
+
+    # ---- 제어 문자 -------------------------------------------------------
+
+    def linefeed(self):
+        self.index()
+
+    def index(self):
+        self.wrap_pending = False
+        if self.y == self.bottom:
+            self.scroll_up(1)
+        elif self.y < self.rows - 1:
+            self.y += 1
+
+    def reverse_index(self):
+        self.wrap_pending = False
+        if self.y == self.top:
+            self.scroll_down(1)
+        elif self.y > 0:
+            self.y -= 1
+
+    def next_line(self, count=1):
+        self.x = 0
+        for _ in range(min(count, self.rows)):
+            self.index()
+
+    def previous_line(self, count=1):
+        self.x = 0
+        self.cursor_up(count)
+
+    def carriage_return(self):
+        self.x = 0
+        self.wrap_pending = False
+
+    def backspace(self):
+        self.x = max(0, self.x - 1)
+        self.wrap_pending = False
+
+    def tab(self, count=1):
+        for _ in range(min(count, self.columns)):
+            stops = [stop for stop in self.tab_stops if stop > self.x]
+            self.x = min(stops) if stops else self.columns - 1
+        self.wrap_pending = False
+
+    def back_tab(self, count=1):
+        for _ in range(min(count, self.columns)):
+            stops = [stop for stop in self.tab_stops if stop < self.x]
+            self.x = max(stops) if stops else 0
+        self.wrap_pending = False
+
+    def set_tab_stop(self):
+        self.tab_stops.add(self.x)
+
+    def clear_tab_stop(self, mode=0):
+        if mode == 0:
+            self.tab_stops.discard(self.x)
+        elif mode == 3:
+            self.tab_stops.clear()
+
+    def bell(self):
+        self.bell_count += 1
+
+    # ---- 커서 이동 -------------------------------------------------------
+
+    def _limits(self):
+        """Rows the cursor may move between (the region when inside it)."""
+        if self.top <= self.y <= self.bottom:
+            return self.top, self.bottom
+        return 0, self.rows - 1
+
+    def cursor_up(self, count=1):
+        self.y = max(self._limits()[0], self.y - count)
+        self.wrap_pending = False
+
+    def cursor_down(self, count=1):
+        self.y = min(self._limits()[1], self.y + count)
+        self.wrap_pending = False
+
+    def cursor_forward(self, count=1):
+        self.x = min(self.columns - 1, self.x + count)
+        self.wrap_pending = False
+
+    def cursor_back(self, count=1):
+        self.x = max(0, self.x - count)
+        self.wrap_pending = False
+
+    def cursor_position(self, row=1, column=1):
+        """CUP with 1-based row/column (relative to the region in origin mode)."""
+        top, bottom = (
+            (self.top, self.bottom) if self.origin_mode else (0, self.rows - 1)
+        )
+        self.y = min(bottom, top + max(row, 1) - 1)
+        self.x = min(self.columns - 1, max(column, 1) - 1)
+        self.wrap_pending = False
+
+    def cursor_column(self, column=1):
+        self.x = min(self.columns - 1, max(column, 1) - 1)
+        self.wrap_pending = False
+
+    def cursor_row(self, row=1):
+        self.cursor_position(row, self.x + 1)
+
+    def save_cursor(self):
+        self.saved_cursor = (
+            self.x,
+            self.y,
+            self.attrs,
+            self.wrap_pending,
+            self.origin_mode,
+            self.autowrap,
+        )
+
+    def restore_cursor(self):
+        if self.saved_cursor is None:
+            self.x = self.y = 0
+            self.attrs = DEFAULT_ATTRS
+            self.wrap_pending = False
+            return
+        (
+            self.x,
+            self.y,
+            self.attrs,
+            self.wrap_pending,
+            self.origin_mode,
+            self.autowrap,
+        ) = self.saved_cursor
+        self.x = min(self.x, self.columns - 1)
+        self.y = min(self.y, self.rows - 1)
+
+    # ---- 스크롤 ----------------------------------------------------------
+
+    def set_margins(self, top=1, bottom=None):
+        """DECSTBM with 1-based rows; an invalid region is ignored."""
+        top = max(top, 1) - 1
+        bottom = self.rows - 1 if not bottom else min(bottom, self.rows) - 1
+        if top >= bottom:
+            return
+        self.top, self.bottom = top, bottom
+        self.cursor_position()
+
+    def _blank_attrs(self):
+        # 지우거나 새로 생긴 칸은 현재 배경색을 씀 (BCE)
+        return self.attrs & _BG_MASK | DEFAULT_ATTRS & _FG_MASK
+
+    def scroll_up(self, count=1):
+        self._scroll_up(self.top, count, keep=self.top == 0 and not self.alternate)
+
+    def _scroll_up(self, top, count, keep=False):
+        bottom = self.bottom
+        count = min(count, bottom - top + 1)
+        removed = self.lines[top : top + count]
+        del self.lines[top : top + count]
+        if keep:
+            self.history.extend(line.trim() for line in removed)
+        attrs = self._blank_attrs()
+        position = bottom - count + 1
+        self.lines[position:position] = [
+            Line(self.columns, attrs) for _ in range(count)
+        ]
+        self.dirty.update(range(top, bottom + 1))
+
+    def scroll_down(self, count=1):
+        self._scroll_down(self.top, count)
+
+    def _scroll_down(self, top, count):
+        bottom = self.bottom
+        count = min(count, bottom - top + 1)
+        del self.lines[bottom - count + 1 : bottom + 1]
+        attrs = self._blank_attrs()
+        self.lines[top:top] = [Line(self.columns, attrs) for _ in range(count)]
+        self.dirty.update(range(top, bottom + 1))
+
+    def insert_lines(self, count=1):
+        if self.top <= self.y <= self.bottom:
+            self._scroll_down(self.y, count)
+            self.x = 0
+            self.wrap_pending = False
+
+    def delete_lines(self, count=1):
+        if self.top <= self.y <= self.bottom:
+            self._scroll_up(self.y, count)
+            self.x = 0
+            self.wrap_pending = False
+
+    # ---- 지우기 / 편집 ---------------------------------------------------
+
+    def _erase(self, y, start, end):
+        line = self.lines[y]
+        end = min(end, self.columns)
+        if start >= end:
+            return
+        if start and line.chars[start] == "":
+            start -= 1
+        if end < self.columns and line.chars[end] == "":
+            end += 1
+        line.chars[start:end] = [" "] * (end - start)
+        line.attrs[start:end] = array("I", (self._blank_attrs(),)) * (end - start)
+        line.wrapped = line.wrapped and end < self.columns
+        self.dirty.add(y)
+
+    def erase_in_line(self, mode=0):
+        if mode == 0:
+            self._erase(self.y, self.x, self.columns)
+        elif mode == 1:
+            self._erase(self.y, 0, self.x + 1)
+        elif mode == 2:
+            self._erase(self.y, 0, self.columns)
+        self.wrap_pending = False
+
+    def erase_in_display(self, mode=0):
+        if mode == 0:
+            self.erase_in_line(0)
+            rows = range(self.y + 1, self.rows)
+        elif mode == 1:
+            self.erase_in_line(1)
+            rows = range(0, self.y)
+        elif mode in (2, 3):
+            rows = range(self.rows)
+            if mode == 3:
+                self.history.clear()
+        else:
+            return
+        for y in rows:
+            self._erase(y, 0, self.columns)
+
+    def erase_chars(self, count=1):
+        self._erase(self.y, self.x, self.x + count)
+        self.wrap_pending = False
+
+    def _shift_right(self, line, x, count):
+        count = min(count, self.columns - x)
+        attrs = self._blank_attrs()
+        line.chars[x:x] = [" "] * count
+        line.attrs[x:x] = array("I", (attrs,)) * count
+        del line.chars[self.columns :]
+        del line.attrs[self.columns :]
+        if line.chars[-1] != "" and char_width(line.chars[-1][:1] or " ") == 2:
+            line.chars[-1] = " "
+
+    def insert_chars(self, count=1):
+        self._shift_right(self.lines[self.y], self.x, count)
+        self.dirty.add(self.y)
+        self.wrap_pending = False
+
+    def delete_chars(self, count=1):
+        line = self.lines[self.y]
+        count = min(count, self.columns - self.x)
+        del line.chars[self.x : self.x + count]
+        del line.attrs[self.x : self.x + count]
+        line.chars += [" "] * count
+        line.attrs += array("I", (self._blank_attrs(),)) * count
+        if line.chars[self.x] == "":
+            line.chars[self.x] = " "
+        self.dirty.add(self.y)
+        self.wrap_pending = False
+
+    # ---- 모드 / 속성 -----------------------------------------------------
+
+    def set_mode(self, mode, enabled):
+        if mode == 4:
+            self.insert_mode = enabled
+
+    def set_private_mode(self, mode, enabled):
+        if mode == 1:
+            self.application_cursor = enabled
+        elif mode == 6:
+            self.origin_mode = enabled
+            self.cursor_position()
+        elif mode == 7:
+            self.autowrap = enabled
+        elif mode == 25:
+            self.cursor_visible = enabled
+        elif mode in (47, 1047, 1049):
+            if mode == 1049 and enabled:
+                self.save_cursor()
+            self._switch_screen(enabled)
+            if mode == 1049 and not enabled:
+                self.restore_cursor()
+
+    def _switch_screen(self, alternate):
+        if alternate == self.alternate:
+            return
+        if alternate:
+            self.saved_screen = self.lines
+            self.lines = [Line(self.columns) for _ in range(self.rows)]
+        else:
+            self.lines = self.saved_screen
+            self.saved_screen = None
+        self.dirty.update(range(self.rows))
+
+    def select_graphic_rendition(self, params=()):
+        attrs = self.attrs
+        params = list(params) or [0]
+        i = 0
+        while i < len(params):
+            code = params[i]
+            i += 1
+            if code == 0:
+                attrs = DEFAULT_ATTRS
+            elif code in _SGR_FLAGS:
+                attrs |= _SGR_FLAGS[code]
+            elif code in _SGR_RESET_FLAGS:
+                attrs &= ~_SGR_RESET_FLAGS[code]
+            elif 30 <= code <= 37 or 90 <= code <= 97 or code == 39:
+                color = DEFAULT_COLOR if code == 39 else code % 10 + (code >= 90) * 8
+                attrs = attrs & ~_FG_MASK | color << _FG_SHIFT
+            elif 40 <= code <= 47 or 100 <= code <= 107 or code == 49:
+                color = DEFAULT_COLOR if code == 49 else code % 10 + (code >= 100) * 8
+                attrs = attrs & ~_BG_MASK | color << _BG_SHIFT
+            elif code in (38, 48) and i < len(params):
+                if params[i] == 5 and i + 1 < len(params):
+                    color = min(params[i + 1], 255)
+                    i += 2
+                elif params[i] == 2 and i + 3 < len(params):
+                    color = _rgb_to_palette(
+                        *(min(v, 255) for v in params[i + 1 : i + 4])
+                    )
+                    i += 4
+                else:
+                    break
+                shift, mask = (
+                    (_FG_SHIFT, _FG_MASK) if code == 38 else (_BG_SHIFT, _BG_MASK)
+                )
+                attrs = attrs & ~mask | color << shift
+        self.attrs = attrs
+
+    # ---- 크기 변경 -------------------------------------------------------
+
+    def resize(self, columns, rows):
+        """Change the size; lines are cut or padded, not re-wrapped."""
+        columns, rows = max(columns, 1), max(rows, 1)
+        screens = [self.lines] + ([self.saved_screen] if self.alternate else [])
+        for lines in screens:
+            for line in lines:
+                line.resize(columns)
+        excess = self.rows - rows
+        if excess > 0:
+            # 커서 아래의 빈 줄을 먼저 버리고, 그래도 넘치면 위쪽 줄을 스크롤백으로
+            below = min(excess, self.rows - 1 - self.y)
+            for lines in screens:
+                del lines[len(lines) - below :]
+            scrolled = excess - below
+            if scrolled:
+                if not self.alternate:
+                    self.history.extend(line.trim() for line in self.lines[:scrolled])
+                for lines in screens:
+                    del lines[:scrolled]
+            self.y -= scrolled
+        elif excess < 0:
+            for lines in screens:
+                lines.extend(Line(columns) for _ in range(-excess))
+        self.columns, self.rows = columns, rows
+        self.top, self.bottom = 0, rows - 1
+        self.tab_stops = set(range(8, columns, 8))
+        self.x = min(self.x, columns - 1)
+        self.y = min(self.y, rows - 1)
+        self.wrap_pending = False
+        self.dirty = set(range(rows))
+
+
+# ---- 파서 ----------------------------------------------------------------
+# vt100.net 의 DEC ANSI 파서 상태도를 표로 옮김. 코드 포인트 0xA0 이상은
+# 모두 인쇄 가능 문자 하나로 취급함 (UTF-8 을 먼저 디코딩하므로)
+
+(
+    GROUND,
+    ESCAPE,
+    ESCAPE_INTERMEDIATE,
+    CSI_ENTRY,
+    CSI_PARAM,
+    CSI_INTERMEDIATE,
+    CSI_IGNORE,
+    OSC_STRING,
+    STRING_IGNORE,
+) = range(9)
+
+(
+    IGNORE,
+    PRINT,
+    EXECUTE,
+    CLEAR,
+    COLLECT,
+    PARAM,
+    ESC_DISPATCH,
+    CSI_DISPATCH,
+    OSC_START,
+    OSC_PUT,
+    OSC_END,
+) = range(11)
+
+_TABLE_SIZE = 0xA1
+
+
+def _build_table():
+    table = [[(IGNORE, state)] * _TABLE_SIZE for state in range(9)]
+
+    def add(state, codes, action, next_state=None):
+        for code in codes:
+            table[state][code] = (action, state if next_state is None else next_state)
+
+    c0 = [*range(0x00, 0x18), 0x19, *range(0x1C, 0x20)]
+    for state in range(9):
+        # 어느 상태에서든 적용되는 전이
+        add(state, [0x18, 0x1A], EXECUTE, GROUND)
+        add(
+            state, [*range(0x80, 0x90), *range(0x91, 0x98), 0x99, 0x9A], EXECUTE, GROUND
+        )
+        add(state, [0x9C], IGNORE, GROUND)
+        add(state, [0x1B], CLEAR, ESCAPE)
+        add(state, [0x9B], CLEAR, CSI_ENTRY)
+        add(state, [0x9D], OSC_START, OSC_STRING)
+        add(state, [0x90, 0x98, 0x9E, 0x9F], IGNORE, STRING_IGNORE)
+
+    add(GROUND, c0, EXECUTE)
+    add(GROUND, [*range(0x20, 0x7F), 0xA0], PRINT)
+
+    add(ESCAPE, c0, EXECUTE)
+    add(ESCAPE, range(0x20, 0x30), COLLECT, ESCAPE_INTERMEDIATE)
+    add(ESCAPE, range(0x30, 0x7F), ESC_DISPATCH, GROUND)
+    add(ESCAPE, [0x5B], IGNORE, CSI_ENTRY)
+    add(ESCAPE, [0x5D], OSC_START, OSC_STRING)
+    add(ESCAPE, [0x50, 0x58, 0x5E, 0x5F], IGNORE, STRING_IGNORE)
+
+    add(ESCAPE_INTERMEDIATE, c0, EXECUTE)
+    add(ESCAPE_INTERMEDIATE, range(0x20, 0x30), COLLECT)
+    add(ESCAPE_INTERMEDIATE, range(0x30, 0x7F), ESC_DISPATCH, GROUND)
+
+    add(CSI_ENTRY, c0, EXECUTE)
+    add(CSI_ENTRY, range(0x20, 0x30), COLLECT, CSI_INTERMEDIATE)
+    add(CSI_ENTRY, range(0x30, 0x3C), PARAM, CSI_PARAM)
+    add(CSI_ENTRY, range(0x3C, 0x40), COLLECT, CSI_PARAM)
+    add(CSI_ENTRY, range(0x40, 0x7F), CSI_DISPATCH, GROUND)
+
+    add(CSI_PARAM, c0, EXECUTE)
+    add(CSI_PARAM, range(0x30, 0x3C), PARAM)
+    add(CSI_PARAM, range(0x3C, 0x40), IGNORE, CSI_IGNORE)
+    add(CSI_PARAM, range(0x20, 0x30), COLLECT, CSI_INTERMEDIATE)
+    add(CSI_PARAM, range(0x40, 0x7F), CSI_DISPATCH, GROUND)
+
+    add(CSI_INTERMEDIATE, c0, EXECUTE)
+    add(CSI_INTERMEDIATE, range(0x20, 0x30), COLLECT)
+    add(CSI_INTERMEDIATE, range(0x30, 0x40), IGNORE, CSI_IGNORE)
+    add(CSI_INTERMEDIATE, range(0x40, 0x7F), CSI_DISPATCH, GROUND)
+
+    add(CSI_IGNORE, c0, EXECUTE)
+    add(CSI_IGNORE, range(0x40, 0x7F), IGNORE, GROUND)
+
+    # OSC 는 BEL (xterm) 또는 ST (ESC \) 로 끝남
+    add(OSC_STRING, [*range(0x20, 0x80), 0xA0], OSC_PUT)
+    add(OSC_STRING, [0x07], OSC_END, GROUND)
+    add(OSC_STRING, [0x1B], OSC_END, ESCAPE)
+    add(OSC_STRING, [0x9C], OSC_END, GROUND)
+
+    return [tuple(row) for row in table]
+
+
+_TABLE = _build_table()
+_PRINTABLE = re.compile("[^\x00-\x1f\x7f-\x9f]+")
+# 한 청크 안에 온전히 들어 있는 흔한 CSI 시퀀스 (표를 한 글자씩 거치지 않음)
+_CSI_SEQUENCE = re.compile("\x1b\\[([<=>?]?)([0-9:;]*)([ -/]*)([@-~])")
+_PARAM_SEPARATOR = re.compile("[;:]")
+
+
+class Parser:
+    """
+    Incremental, table-driven VT500-style parser.
+
+    ``feed`` takes decoded text in arbitrary chunks; a sequence split across
+    chunks is completed on the next call. Runs of printable characters are
+    found with one regex match and handed to ``handler.draw`` whole, so
+    plain output costs one call per run rather than per character. The
+    handler receives ``draw(text)``, ``execute(char)``,
+    ``esc_dispatch(intermediates, final)``,
+    ``csi_dispatch(private, params, intermediates, final)`` and
+    ``osc_dispatch(text)``.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.state = GROUND
+        self._intermediates = ""
+        self._params = ""
+        self._osc = []
+        self._osc_length = 0
+
+    def feed(self, text):
+        handler = self.handler
+        state = self.state
+        i = 0
+        length = len(text)
+        while i < length:
+            if state == GROUND:
+                match = _PRINTABLE.match(text, i)
+                if match:
+                    handler.draw(match.group())
+                    i = match.end()
+                    continue
+                match = _CSI_SEQUENCE.match(text, i)
+                if match:
+                    private, params, intermediates, final = match.groups()
+                    self._intermediates = private + intermediates
+                    self._params = params
+                    self._csi_dispatch(final)
+                    i = match.end()
+                    continue
+            elif state == OSC_STRING:
+                match = _PRINTABLE.match(text, i)
+                if match:
+                    self._osc_put(match.group())
+                    i = match.end()
+                    continue
+            char = text[i]
+            code = ord(char)
+            action, state = _TABLE[state][code if code < _TABLE_SIZE else 0xA0]
+            i += 1
+            if action == IGNORE:
+                continue
+            if action == EXECUTE:
+                handler.execute(char)
+            elif action == PRINT:
+                handler.draw(char)
+            elif action == CLEAR:
+                self._intermediates = ""
+                self._params = ""
+            elif action == COLLECT:
+                if len(self._intermediates) < 4:
+                    self._intermediates += char
+            elif action == PARAM:
+                if len(self._params) < MAX_PARAMS * 6:
+                    self._params += char
+            elif action == ESC_DISPATCH:
+                handler.esc_dispatch(self._intermediates, char)
+            elif action == CSI_DISPATCH:
+                self._csi_dispatch(char)
+            elif action == OSC_START:
+                self._osc = []
+                self._osc_length = 0
+            elif action == OSC_PUT:
+                self._osc_put(char)
+            elif action == OSC_END:
+                handler.osc_dispatch("".join(self._osc))
+                self._osc = []
+                self._intermediates = ""
+                self._params = ""
+        self.state = state
+
+    def _osc_put(self, text):
+        room = MAX_STRING_LENGTH - self._osc_length
+        if room > 0:
+            self._osc.append(text[:room])
+            self._osc_length += min(len(text), room)
+
+    def _csi_dispatch(self, final):
+        private = self._intermediates[:1] if self._intermediates[:1] in "<=>?" else ""
+        intermediates = self._intermediates[len(private) :]
+        params = []
+        if self._params:
+            for value in _PARAM_SEPARATOR.split(self._params)[:MAX_PARAMS]:
+                params.append(min(int(value[:6]), MAX_PARAM_VALUE) if value else 0)
+        self.handler.csi_dispatch(private, params, intermediates, final)
+
+
+# 인자 하나 (기본값 1) 를 받는 CSI 명령
+_COUNT_COMMANDS = {
+    "@": "insert_chars",
+    "A": "cursor_up",
+    "B": "cursor_down",
+    "C": "cursor_forward",
+    "D": "cursor_back",
+    "E": "next_line",
+    "F": "previous_line",
+    "G": "cursor_column",
+    "I": "tab",
+    "L": "insert_lines",
+    "M": "delete_lines",
+    "P": "delete_chars",
+    "S": "scroll_up",
+    "T": "scroll_down",
+    "X": "erase_chars",
+    "Z": "back_tab",
+    "`": "cursor_column",
+    "a": "cursor_forward",
+    "b": "repeat",
+    "d": "cursor_row",
+    "e": "cursor_down",
+}
+_ESCAPE_COMMANDS = {
+    "7": "save_cursor",
+    "8": "restore_cursor",
+    "D": "index",
+    "E": "next_line",
+    "H": "set_tab_stop",
+    "M": "reverse_index",
+    "c": "reset",
+}
+_CONTROL_COMMANDS = {
+    "\x07": "bell",
+    "\x08": "backspace",
+    "\x09": "tab",
+    "\x0a": "index",
+    "\x0b": "index",
+    "\x0c": "index",
+    "\x0d": "carriage_return",
+    "\x84": "index",
+    "\x85": "next_line",
+    "\x88": "set_tab_stop",
+    "\x8d": "reverse_index",
+}
+
+
+class TerminalEmulator:
+    """
+    Screen plus parser: ``feed`` channel bytes in any chunking.
+
+    UTF-8 is decoded incrementally, so a character split across two reads
+    is not mangled. Queries from the remote side (cursor position, device
+    attributes) are answered through ``write`` when it is given.
+    """
+
+    def __init__(
+        self,
+        columns=DEFAULT_COLUMNS,
+        rows=DEFAULT_ROWS,
+        scrollback=DEFAULT_SCROLLBACK,
+        write=None,
+    ):
+        self.screen = Screen(columns, rows, scrollback)
+        self.parser = Parser(self)
+        self.write = write
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._controls = {
+            char: getattr(self.screen, name) for char, name in _CONTROL_COMMANDS.items()
+        }
+
+    def feed(self, data):
+        self.parser.feed(self._decoder.decode(data))
+
+    def resize(self, columns, rows):
+        self.screen.resize(columns, rows)
+
+    # ---- Parser 콜백 -----------------------------------------------------
+
+    def draw(self, text):
+        self.screen.draw(text)
+
+    def execute(self, char):
+        command = self._controls.get(char)
+        if command is not None:
+            command()
+
+    def esc_dispatch(self, intermediates, final):
+        # 문자 집합 지정 (ESC ( B 등) 과 키패드 모드는 화면에 영향이 없어 무시
+        if not intermediates and final in _ESCAPE_COMMANDS:
+            getattr(self.screen, _ESCAPE_COMMANDS[final])()
+
+    def csi_dispatch(self, private, params, intermediates, final):
+        screen = self.screen
+        first = params[0] if params else 0
+        if intermediates:
+            if intermediates == "!" and final == "p":
+                screen.reset()
+            return
+        if private == "?":
+            if final in "hl":
+                for mode in params:
+                    screen.set_private_mode(mode, final == "h")
+            return
+        if private:
+            if private == ">" and final == "c":
+                self._reply("\x1b[>0;0;0c")
+            return
+        if final in _COUNT_COMMANDS:
+            getattr(screen, _COUNT_COMMANDS[final])(first or 1)
+        elif final in "Hf":
+            screen.cursor_position(first or 1, params[1] if len(params) > 1 else 1)
+        elif final == "J":
+            screen.erase_in_display(first)
+        elif final == "K":
+            screen.erase_in_line(first)
+        elif final == "m":
+            screen.select_graphic_rendition(params)
+        elif final == "r":
+            screen.set_margins(first or 1, params[1] if len(params) > 1 else None)
+        elif final in "hl":
+            for mode in params:
+                screen.set_mode(mode, final == "h")
+        elif final == "g":
+            screen.clear_tab_stop(first)
+        elif final == "s":
+            screen.save_cursor()
+        elif final == "u":
+            screen.restore_cursor()
+        elif final == "n":
+            if first == 5:
+                self._reply("\x1b[0n")
+            elif first == 6:
+                row = screen.y - (screen.top if screen.origin_mode else 0)
+                self._reply(f"\x1b[{row + 1};{screen.x + 1}R")
+        elif final == "c" and first == 0:
+            self._reply("\x1b[?1;2c")
+
+    def osc_dispatch(self, text):
+        command, _, value = text.partition(";")
+        if command in ("0", "2"):
+            self.screen.title = value
+
+    def _reply(self, text):
+        if self.write is not None:
+            self.write(text.encode())
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import threading
+import unittest
+from src.benchmarks.bench_cipher_suites import bench_create_and_parse
+from src.benchmarks.bench_startup import (
+    bench_startup,
+    deferred_imports,
+    parse_importtime,
+    run_importtime,
+)
+from src.benchmarks.bench_transport import (
+    bench_channel_download,
+    bench_channel_upload,
+    bench_handshake,
+    connect,
+)
+from src.benchmarks.load_test import run as run_load_test
+from src.benchmarks.loopback_server import LinkProfile, LoopbackServerThread, _Link
+from src.benchmarks.run_benchmarks import compare
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Smoke runs with tiny sizes, so the harness keeps working as the code changes."""
+
+    def test_packet_benchmark(self):
+        metrics = bench_create_and_parse(
+            "aes128-ctr", "hmac-sha2-256-etm@openssh.com", 64, 10
+        )
+        self.assertGreater(metrics["parse_ops_per_s"], 0)
+
+    def test_loopback_server(self):
+        with LoopbackServerThread() as server:
+            self.assertIn("p50_ms", bench_handshake(server, 1))
+            self.assertGreater(bench_channel_upload(server, 100_000)["mb_per_s"], 0)
+            self.assertGreater(bench_channel_download(server, 100_000)["mb_per_s"], 0)
+
+    def test_compare(self):
+        old = [{"benchmark": "handshake", "params": {}, "metrics": {"p50_ms": 2.0}}]
+        new = [{"benchmark": "handshake", "params": {}, "metrics": {"p50_ms": 3.0}}]
+
+        self.assertEqual(compare(new, old), ["handshake  p50_ms: 3.00 (2.00, +50.0%)"])
+
+
+class TestStartup(unittest.TestCase):
+    """One-shot CLI runs must not pay for packages only a command needs."""
+
+    def test_help_skips_deferred_packages(self):
+        imports, _ = run_importtime(("main.py", "--help"))
+
+        self.assertIn("src.config.config", [module for module, *_ in imports])
+        self.assertEqual(deferred_imports(imports), [])
+
+    def test_logger_setup_is_deferred(self):
+        imports, _ = run_importtime(
+            (
+                "-c",
+                "from src.utils.logger import Logger; Logger.get_logger('startup')",
+            )
+        )
+
+        self.assertEqual(deferred_imports(imports), [])
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       125 |        232 |   src.config\n"
+            "import time:      2401 |       2632 | src.config.config\n"
+        )
+
+        self.assertEqual(
+            parse_importtime(output),
+            [("src.config", 125, 232, 1), ("src.config.config", 2401, 2632, 0)],
+        )
+
+    def test_startup_benchmark(self):
+        metrics = bench_startup(1)
+
+        self.assertGreater(metrics["import_p50_ms"], 0)
+        self.assertGreater(metrics["modules"], 0)
+
+
+class AlwaysLost:
+    def random(self):
+        return 0.0
+
+
+class TestLoopbackServer(unittest.TestCase):
+    def test_exec_commands_and_rekey(self):
+        with LoopbackServerThread() as server:
+            transport = connect(server)
+            try:
+                session_id = transport.session_id
+                transport.key_exchange()
+                self.assertEqual(transport.session_id, session_id)
+
+                channel = transport.open_session(timeout=5)
+                channel.exec_command("echo")
+                channel.send(b"ping")
+                self.assertEqual(channel.recv(4, timeout=5), b"ping")
+                channel.send_eof()
+                self.assertEqual(channel.recv_exit_status(timeout=5), 0)
+
+                channel = transport.open_session(timeout=5)
+                channel.exec_command("exit 3")
+                self.assertEqual(channel.recv_exit_status(timeout=5), 3)
+            finally:
+                transport.close()
+
+    def test_automatic_rekey_during_bulk_echo(self):
+        data = os.urandom(3 * 1024 * 1024)
+        received = bytearray()
+        with LoopbackServerThread() as server:
+            transport = connect(server)
+            try:
+                session_id = transport.session_id
+                transport.rekey_bytes = 512 * 1024
+                channel = transport.open_session(timeout=5)
+                channel.exec_command("echo")
+
+                def read_back():
+                    while len(received) < len(data):
+                        chunk = channel.recv(64 * 1024, timeout=10)
+                        if not chunk:
+                            break
+                        received.extend(chunk)
+
+                reader = threading.Thread(target=read_back)
+                reader.start()
+                view = memoryview(data)
+                for offset in range(0, len(data), 100_000):
+                    channel.send(view[offset : offset + 100_000])
+                reader.join(timeout=30)
+
+                self.assertEqual(bytes(received), data)
+                self.assertGreaterEqual(transport.rekeys, 2)
+                self.assertEqual(transport.session_id, session_id)
+                channel.send_eof()
+                self.assertEqual(channel.recv_exit_status(timeout=5), 0)
+            finally:
+                transport.close()
+
+    def test_server_initiated_rekey_during_download(self):
+        with LoopbackServerThread(rekey_bytes=256 * 1024) as server:
+            transport = connect(server)
+            try:
+                channel = transport.open_session(timeout=5)
+                channel.exec_command("source 2000000")
+                total = 0
+                while chunk := channel.recv(64 * 1024, timeout=10):
+                    total += len(chunk)
+
+                self.assertEqual(total, 2_000_000)
+                self.assertEqual(channel.recv_exit_status(timeout=5), 0)
+                self.assertGreaterEqual(transport.rekeys, 3)
+            finally:
+                transport.close()
+
+    def test_link_schedule(self):
+        link = _Link(LinkProfile(latency=0.1, bandwidth=1000), None)
+        # 대역폭으로 직렬화된 뒤 지연만큼 늦게 도착
+        self.assertAlmostEqual(link.delivery_time(0.0, 500), 0.6)
+        self.assertAlmostEqual(link.delivery_time(0.0, 500), 1.1)
+
+        lossy = _Link(LinkProfile(loss=0.01, retransmit_timeout=0.2), AlwaysLost())
+        self.assertAlmostEqual(lossy.delivery_time(1.0, 100), 1.2)
+        # 앞선 청크가 재전송을 기다리는 동안 뒤 청크도 막힘
+        lossy.rng = None
+        lossy.profile.loss = 0
+        self.assertAlmostEqual(lossy.delivery_time(1.0, 100), 1.2)
+
+    def test_concurrent_sessions_with_latency(self):
+        metrics = asyncio.run(run_load_test(20, 10, 100_000, LinkProfile(latency=0.01)))
+
+        self.assertEqual(metrics["failed"], 0)
+        # 버전 교환과 키 교환에 최소 두 번의 왕복
+        self.assertGreaterEqual(metrics["handshake_p50_ms"], 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from src.config.inventory import Inventory
+from src.config.secrets import FileSecretBackend, SecretCache, SecretError
+
+INVENTORY = """
+# 전역 기본값
+User deploy
+
+Host web-1 web-2
+    Port 2201
+
+Host db-primary
+    HostName 10.0.0.5
+    PasswordSecret secret/data/db#password
+
+Host web-* !web-2
+    IdentityFile ~/.ssh/web_key
+    PasswordSecret secret/data/web#password
+
+Host *
+    Port 22
+    IdentityFile ~/.ssh/id_ed25519
+    HostName %h.example.com
+"""
+
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.inventory = Inventory(INVENTORY)
+
+    def test_first_value_wins(self):
+        web = self.inventory.lookup("web-1")
+
+        self.assertEqual(web.port, 2201)
+        self.assertEqual(web.user, "deploy")
+        self.assertEqual(web.hostname, "web-1.example.com")
+        self.assertEqual(
+            web.identity_files,
+            [
+                os.path.expanduser("~/.ssh/web_key"),
+                os.path.expanduser("~/.ssh/id_ed25519"),
+            ],
+        )
+        self.assertEqual(self.inventory.lookup("db-primary").hostname, "10.0.0.5")
+
+    def test_negated_pattern(self):
+        self.assertEqual(self.inventory.lookup("web-2").secret_references, [])
+        self.assertEqual(
+            self.inventory.lookup("web-9").secret_references,
+            ["secret/data/web#password"],
+        )
+
+    def test_host_selection_and_secret_references(self):
+        self.assertEqual(self.inventory.hosts(), ["web-1", "web-2", "db-primary"])
+        self.assertEqual(self.inventory.hosts(["web-*", "!web-2"]), ["web-1"])
+        self.assertEqual(
+            self.inventory.secret_references(self.inventory.hosts()),
+            ["secret/data/web#password", "secret/data/db#password"],
+        )
+
+    def test_match_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Inventory("Match host foo\n    User bar\n")
+
+
+class CountingBackend:
+    def __init__(self, secrets):
+        self.secrets = secrets
+        self.batches = []
+
+    def fetch(self, paths):
+        self.batches.append(sorted(paths))
+        return {path: self.secrets[path] for path in paths if path in self.secrets}
+
+
+class TestSecretCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.backend = CountingBackend(
+            {"secret/data/web": {"password": "w"}, "secret/data/db": {"password": "d"}}
+        )
+        self.cache = SecretCache(self.backend, ttl=60, clock=lambda: self.now)
+
+    def test_prefetch_is_one_batch(self):
+        self.cache.prefetch(
+            ["secret/data/web#password", "secret/data/db#password", "secret/data/web"]
+        )
+
+        self.assertEqual(self.cache.get("secret/data/web#password"), "w")
+        self.assertEqual(self.cache.get("secret/data/db#password"), "d")
+        self.assertEqual(self.backend.batches, [["secret/data/db", "secret/data/web"]])
+
+    def test_entries_expire(self):
+        self.cache.get("secret/data/web#password")
+        self.now = 59
+        self.cache.get("secret/data/web#password")
+        self.now = 61
+        self.cache.get("secret/data/web#password")
+
+        self.assertEqual(len(self.backend.batches), 2)
+
+    def test_missing_secret_and_key(self):
+        with self.assertRaises(SecretError):
+            self.cache.get("secret/data/missing#password")
+        with self.assertRaises(SecretError):
+            self.cache.get("secret/data/web#token")
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        fetching, release = threading.Event(), threading.Event()
+        backend = self.backend
+
+        class SlowBackend:
+            def fetch(self, paths):
+                fetching.set()
+                release.wait(5)
+                return backend.fetch(paths)
+
+        cache = SecretCache(SlowBackend(), ttl=60)
+        results = []
+
+        def lookup():
+            results.append(cache.get("secret/data/web#password"))
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        threads[0].start()
+        fetching.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["w"] * 8)
+        self.assertEqual(backend.batches, [["secret/data/web"]])
+
+    def test_file_backend(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"secret/data/web": {"password": "from-file"}}, f)
+        self.addCleanup(os.remove, f.name)
+
+        cache = SecretCache(FileSecretBackend(f.name), ttl=60)
+
+        self.assertEqual(cache.get("secret/data/web#password"), "from-file")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,327 @@
+# tests/test_crypto.py
+
+import base64
+import hashlib
+import hmac
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from src.config.config import Config
+from src.crypto.cipher_suites import (
+    CIPHER_SUITES,
+    HmacKey,
+    MAC_SUITES,
+    create_packet_cipher,
+    get_cipher_suite,
+)
+from src.crypto.host_keys import (
+    HostKeyError,
+    HostKeyVerifier,
+    KnownHosts,
+    public_key_blob,
+    sign,
+    signature_algorithms_for,
+    verify_signature,
+)
+from src.crypto.key_exchange import KEX_METHODS, KeyExchange
+from src.network.packet_framer import PacketFramer
+from src.network.packet_manager import PacketManager
+
+SUITE_COMBINATIONS = [
+    ("chacha20-poly1305@openssh.com", None),
+    ("aes128-gcm@openssh.com", None),
+    ("aes256-gcm@openssh.com", None),
+    ("aes128-ctr", "hmac-sha2-256"),
+    ("aes256-ctr", "hmac-sha2-512"),
+    ("aes128-ctr", "hmac-sha2-256-etm@openssh.com"),
+    ("aes256-ctr", "hmac-sha2-512-etm@openssh.com"),
+]
+
+
+def make_pair(cipher, mac):
+    suite = CIPHER_SUITES[cipher]
+    key = os.urandom(suite.key_size)
+    iv = os.urandom(suite.iv_size) or None
+    mac_key = os.urandom(MAC_SUITES[mac].key_size) if mac else None
+
+    sender, receiver = PacketManager(), PacketManager()
+    sender.set_outgoing_cipher(cipher, key, iv, mac, mac_key)
+    receiver.set_incoming_cipher(cipher, key, iv, mac, mac_key)
+    return sender, receiver
+
+
+class TestCipherSuites(unittest.TestCase):
+    def test_round_trip_every_suite(self):
+        for cipher, mac in SUITE_COMBINATIONS:
+            with self.subTest(cipher=cipher, mac=mac):
+                sender, receiver = make_pair(cipher, mac)
+                for payload in (b"", b"a", os.urandom(1000)):
+                    self.assertEqual(
+                        receiver.parse_packet(sender.create_packet(payload)), payload
+                    )
+
+    def test_framer_with_every_suite(self):
+        for cipher, mac in SUITE_COMBINATIONS:
+            with self.subTest(cipher=cipher, mac=mac):
+                sender, receiver = make_pair(cipher, mac)
+                payloads = [b"one", os.urandom(5000), b"three"]
+                framer = PacketFramer(receiver)
+                for payload in payloads:
+                    framer.feed(sender.create_packet(payload))
+
+                self.assertEqual([bytes(p) for p in framer.packets()], payloads)
+
+    def test_batch_matches_every_suite(self):
+        for cipher, mac in SUITE_COMBINATIONS:
+            with self.subTest(cipher=cipher, mac=mac):
+                sender, receiver = make_pair(cipher, mac)
+                payloads = [b"x" * size for size in (1, 31, 300)]
+                framer = PacketFramer(receiver)
+                for segment in sender.create_packets(payloads):
+                    framer.feed(segment)
+
+                self.assertEqual([bytes(p) for p in framer.packets()], payloads)
+
+    def test_tampering_is_detected(self):
+        for cipher, mac in SUITE_COMBINATIONS:
+            with self.subTest(cipher=cipher, mac=mac):
+                sender, receiver = make_pair(cipher, mac)
+                packet = bytearray(sender.create_packet(b"payload" * 4))
+                packet[-20] ^= 0x01
+
+                with self.assertRaises(ValueError):
+                    receiver.parse_packet(packet)
+
+    def test_aead_padding_excludes_length_field(self):
+        sender, _ = make_pair("aes128-gcm@openssh.com", None)
+        packet = sender.create_packet(b"abc")
+
+        packet_length = int.from_bytes(packet[:4], "big")
+        self.assertEqual(packet_length % 16, 0)
+        self.assertEqual(len(packet), 4 + packet_length + 16)
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            get_cipher_suite("des-cbc")
+        with self.assertRaises(ValueError):
+            create_packet_cipher("aes128-ctr", b"\x00" * 16, b"\x00" * 16, "hmac-md5", b"")
+
+    def test_hmac_key_reuses_template(self):
+        mac = HmacKey(MAC_SUITES["hmac-sha2-256"], b"key")
+
+        first = mac.sign(1, b"data")
+        self.assertEqual(mac.sign(1, b"da", b"ta"), first)
+        self.assertNotEqual(mac.sign(2, b"data"), first)
+
+
+def run_key_exchange(client, server):
+    """Shuttle packets between two KeyExchange engines until both finish."""
+    queues = {client: [client.start()], server: [server.start()]}
+    peers = {client: server, server: client}
+    while not (client.complete and server.complete):
+        progressed = False
+        for sender in (client, server):
+            outputs, queues[sender] = queues[sender], []
+            for payload in outputs:
+                packet = sender.packet_manager.create_packet(payload)
+                receiver = peers[sender]
+                queues[receiver] += receiver.handle(
+                    receiver.packet_manager.parse_packet(packet)
+                )
+                progressed = True
+            sender.outputs_sent()
+        if not progressed:
+            raise AssertionError("Key exchange stalled")
+
+
+class TestKeyExchange(unittest.TestCase):
+    def setUp(self):
+        self.host_key = ed25519.Ed25519PrivateKey.generate()
+
+    def make_pair(self, verifier=None):
+        client = KeyExchange(
+            PacketManager(), "SSH-2.0-Client", "SSH-2.0-Server",
+            host_key_verifier=verifier, host="example.com", port=22,
+        )
+        server = KeyExchange(
+            PacketManager(), "SSH-2.0-Client", "SSH-2.0-Server", host_key=self.host_key
+        )
+        return client, server
+
+    def assert_keys_match(self, client, server):
+        self.assertEqual(client.session_id, server.session_id)
+        for sender, receiver in ((client, server), (server, client)):
+            packet = sender.packet_manager.create_packet(b"after kex")
+            self.assertEqual(receiver.packet_manager.parse_packet(packet), b"after kex")
+
+    def test_every_method_derives_matching_keys(self):
+        for method in KEX_METHODS:
+            with self.subTest(method=method), patch.object(
+                Config, "KEX_ALGORITHMS", [method]
+            ):
+                client, server = self.make_pair()
+                run_key_exchange(client, server)
+
+                self.assertEqual(client.algorithms.kex, method)
+                self.assert_keys_match(client, server)
+
+    def test_every_cipher_after_kex(self):
+        for cipher, mac in SUITE_COMBINATIONS:
+            with self.subTest(cipher=cipher, mac=mac), patch.object(
+                Config, "ENCRYPTION_ALGORITHMS", [cipher]
+            ), patch.object(Config, "MAC_ALGORITHMS", [mac or "hmac-sha2-256"]):
+                client, server = self.make_pair()
+                run_key_exchange(client, server)
+
+                self.assert_keys_match(client, server)
+
+    def test_strict_kex_resets_sequence_numbers(self):
+        client, server = self.make_pair()
+        run_key_exchange(client, server)
+
+        self.assertTrue(client.strict and server.strict)
+        self.assertEqual(client.packet_manager.sequence_number, 0)
+        self.assertEqual(client.packet_manager.receive_sequence_number, 0)
+
+    def test_strict_kex_rejects_packets_before_kexinit(self):
+        client, server = self.make_pair()
+        client.start()
+        server_packet = server.packet_manager.create_packet(b"\x02ignored")
+        client.handle(client.packet_manager.parse_packet(server_packet))
+        kexinit = server.packet_manager.create_packet(server.start())
+
+        with self.assertRaises(ConnectionError):
+            client.handle(client.packet_manager.parse_packet(kexinit))
+
+    def test_compression_negotiation(self):
+        client, server = self.make_pair()
+        run_key_exchange(client, server)
+        self.assertEqual(client.algorithms.compression_client_to_server, "none")
+
+        with patch.object(Config, "COMPRESSION", "yes"):
+            client, server = self.make_pair()
+            run_key_exchange(client, server)
+        self.assertEqual(
+            client.algorithms.compression_client_to_server, "zlib@openssh.com"
+        )
+        self.assertIsNone(client.packet_manager.compressor)
+
+        client.packet_manager.parse_packet(server.packet_manager.create_packet(b"\x34"))
+        self.assertIsNotNone(client.packet_manager.compressor)
+        self.assert_keys_match(client, server)
+
+    def test_no_common_algorithm(self):
+        client, server = self.make_pair()
+        with patch.object(Config, "ENCRYPTION_ALGORITHMS", ["aes128-ctr"]):
+            client.start()
+        with patch.object(Config, "ENCRYPTION_ALGORITHMS", ["aes256-ctr"]):
+            kexinit = server.start()
+
+        with self.assertRaises(ConnectionError):
+            client.handle(kexinit)
+
+    def test_host_key_is_verified(self):
+        with tempfile.TemporaryDirectory() as directory:
+            known_hosts = os.path.join(directory, "known_hosts")
+            other_key = public_key_blob(ed25519.Ed25519PrivateKey.generate())
+            KnownHosts(known_hosts).add("example.com", 22, other_key)
+            client, server = self.make_pair(HostKeyVerifier(known_hosts, policy="strict"))
+
+            with self.assertRaises(HostKeyError):
+                run_key_exchange(client, server)
+
+
+class TestHostKeys(unittest.TestCase):
+    def setUp(self):
+        HostKeyVerifier._memory_cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.known_hosts = os.path.join(self.directory.name, "known_hosts")
+        self.cache = os.path.join(self.directory.name, "cache", "host_keys.json")
+        self.blob = public_key_blob(ed25519.Ed25519PrivateKey.generate())
+
+    def tearDown(self):
+        HostKeyVerifier._memory_cache.clear()
+        self.directory.cleanup()
+
+    def test_signatures_for_every_key_type(self):
+        keys = [
+            ed25519.Ed25519PrivateKey.generate(),
+            ec.generate_private_key(ec.SECP256R1()),
+            rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        ]
+        for key in keys:
+            for algorithm in signature_algorithms_for(key):
+                with self.subTest(algorithm=algorithm):
+                    signature = sign(key, algorithm, b"exchange hash")
+                    verify_signature(public_key_blob(key), signature, b"exchange hash")
+                    with self.assertRaises(HostKeyError):
+                        verify_signature(public_key_blob(key), signature, b"tampered")
+
+    def test_accept_new_records_host(self):
+        verifier = HostKeyVerifier(self.known_hosts, self.cache)
+
+        self.assertTrue(verifier.verify("example.com", 2222, self.blob))
+        keys, _ = KnownHosts(self.known_hosts).lookup("example.com", 2222)
+        self.assertEqual(keys, [self.blob])
+        self.assertEqual(verifier.known_key_types("example.com", 2222), ["ssh-ed25519"])
+
+    def test_strict_rejects_unknown_and_changed_keys(self):
+        verifier = HostKeyVerifier(self.known_hosts, policy="strict")
+        with self.assertRaises(HostKeyError):
+            verifier.verify("example.com", 22, self.blob)
+
+        KnownHosts(self.known_hosts).add("example.com", 22, self.blob)
+        changed = public_key_blob(ed25519.Ed25519PrivateKey.generate())
+        with self.assertRaises(HostKeyError):
+            HostKeyVerifier(self.known_hosts, policy="accept-new").verify(
+                "example.com", 22, changed
+            )
+
+    def test_hashed_and_revoked_entries(self):
+        salt = os.urandom(20)
+        digest = hmac.new(salt, b"example.com", hashlib.sha1).digest()
+        revoked = public_key_blob(ed25519.Ed25519PrivateKey.generate())
+        with open(self.known_hosts, "w") as known_hosts:
+            known_hosts.write(
+                f"|1|{base64.b64encode(salt).decode()}|{base64.b64encode(digest).decode()} "
+                f"ssh-ed25519 {base64.b64encode(self.blob).decode()}\n"
+                f"@revoked * ssh-ed25519 {base64.b64encode(revoked).decode()}\n"
+            )
+        verifier = HostKeyVerifier(self.known_hosts, policy="strict")
+
+        self.assertTrue(verifier.verify("example.com", 22, self.blob))
+        with self.assertRaises(HostKeyError):
+            verifier.verify("example.com", 22, revoked)
+
+    def test_cache_skips_known_hosts_parsing(self):
+        KnownHosts(self.known_hosts).add("example.com", 22, self.blob)
+        HostKeyVerifier(self.known_hosts, self.cache, "strict").verify(
+            "example.com", 22, self.blob
+        )
+
+        with patch.object(KnownHosts, "lookup") as lookup:
+            HostKeyVerifier(self.known_hosts, self.cache, "strict").verify(
+                "example.com", 22, self.blob
+            )
+            # 디스크 캐시만으로도 (새 프로세스처럼) 확인 가능
+            HostKeyVerifier._memory_cache.clear()
+            HostKeyVerifier(self.known_hosts, self.cache, "strict").verify(
+                "example.com", 22, self.blob
+            )
+        lookup.assert_not_called()
+
+    def test_cache_invalidated_when_known_hosts_changes(self):
+        KnownHosts(self.known_hosts).add("example.com", 22, self.blob)
+        verifier = HostKeyVerifier(self.known_hosts, self.cache, "strict")
+        verifier.verify("example.com", 22, self.blob)
+
+        with open(self.known_hosts, "w") as known_hosts:
+            known_hosts.write("# emptied\n")
+        with self.assertRaises(HostKeyError):
+            verifier.verify("example.com", 22, self.blob)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,643 @@
+# tests/test_file_transfer.py
+
+import hashlib
+import os
+import shlex
+import time
+import tempfile
+import unittest
+import unittest.mock
+from src.file_transfer.checkpoint import CHECKPOINT_SUFFIX, RangeTracker
+from src.file_transfer import directory_sync
+from src.file_transfer.directory_sync import DirectorySync, parse_sha256sum
+from src.file_transfer.scp_handler import SCPClient, SCPError
+from src.file_transfer.sftp_handler import (
+    SFTPAttributes,
+    SFTPClient,
+    SFTPError,
+    SSH_FXF_CREAT,
+    SSH_FXF_READ,
+    SSH_FXF_TRUNC,
+    SSH_FXF_WRITE,
+    SSH_FX_EOF,
+    SSH_FX_NO_SUCH_FILE,
+    SSH_FX_OK,
+    SSH_FXP_ATTRS,
+    SSH_FXP_CLOSE,
+    SSH_FXP_DATA,
+    SSH_FXP_FSTAT,
+    SSH_FXP_HANDLE,
+    SSH_FXP_INIT,
+    SSH_FXP_LSTAT,
+    SSH_FXP_MKDIR,
+    SSH_FXP_NAME,
+    SSH_FXP_OPEN,
+    SSH_FXP_OPENDIR,
+    SSH_FXP_READ,
+    SSH_FXP_READDIR,
+    SSH_FXP_REALPATH,
+    SSH_FXP_REMOVE,
+    SSH_FXP_RENAME,
+    SSH_FXP_RMDIR,
+    SSH_FXP_SETSTAT,
+    SSH_FXP_STAT,
+    SSH_FXP_STATUS,
+    SSH_FXP_VERSION,
+    SSH_FXP_WRITE,
+)
+from src.network.message import (
+    MessageReader,
+    pack_byte,
+    pack_string,
+    pack_uint32,
+)
+
+
+def attributes_of(path):
+    st = os.stat(path)
+    return SFTPAttributes(
+        st.st_size, st.st_uid, st.st_gid, st.st_mode, int(st.st_atime), int(st.st_mtime)
+    )
+
+
+class FakeSFTPChannel:
+    """
+    SFTP v3 server over a local directory, standing in for a session channel.
+
+    Replies to each batch of requests are returned in reverse order, and
+    reads are capped at ``max_read`` bytes, so clients must cope with
+    out-of-order and short replies.
+    """
+
+    def __init__(self, root, max_read=10000, fail_after=None):
+        self.root = root
+        self.max_read = max_read
+        self.fail_after = fail_after
+        self.max_in_flight = 0
+        self.closed = False
+        self._inbound = bytearray()
+        self._outbound = bytearray()
+        self._pending = []
+        self._handles = {}
+        self._next_handle = 0
+
+    def sendall(self, data):
+        if self.fail_after is not None:
+            self.fail_after -= 1
+            if self.fail_after < 0:
+                raise ConnectionError("connection reset")
+        self._inbound += data
+        while len(self._inbound) >= 4:
+            length = int.from_bytes(self._inbound[:4], "big")
+            if len(self._inbound) < 4 + length:
+                break
+            message = bytes(self._inbound[4 : 4 + length])
+            del self._inbound[: 4 + length]
+            self._pending.append(self._handle(message))
+        self.max_in_flight = max(self.max_in_flight, len(self._pending))
+
+    def send_buffers(self, buffers):
+        self.sendall(b"".join(buffers))
+
+    def recv(self, size, timeout=None):
+        for reply in reversed(self._pending):
+            self._outbound += pack_uint32(len(reply)) + reply
+        self._pending.clear()
+        data = bytes(self._outbound[:size])
+        del self._outbound[:size]
+        return data
+
+    def close(self):
+        self.closed = True
+
+    def _path(self, reader):
+        return os.path.join(self.root, reader.read_text().lstrip("/"))
+
+    def _handle(self, message):
+        reader = MessageReader(message, 1)
+        if message[0] == SSH_FXP_INIT:
+            return pack_byte(SSH_FXP_VERSION) + pack_uint32(3)
+        request_id = reader.read_uint32()
+        prefix = pack_uint32(request_id)
+        try:
+            return self._dispatch(message[0], reader, prefix)
+        except FileNotFoundError as e:
+            return self._status(prefix, SSH_FX_NO_SUCH_FILE, str(e))
+
+    def _status(self, prefix, code, message=""):
+        return (
+            pack_byte(SSH_FXP_STATUS)
+            + prefix
+            + pack_uint32(code)
+            + pack_string(message)
+            + pack_string("")
+        )
+
+    def _new_handle(self, prefix, value):
+        self._next_handle += 1
+        handle = str(self._next_handle).encode()
+        self._handles[handle] = value
+        return pack_byte(SSH_FXP_HANDLE) + prefix + pack_string(handle)
+
+    def _dispatch(self, message_type, reader, prefix):
+        if message_type == SSH_FXP_OPEN:
+            path, flags = self._path(reader), reader.read_uint32()
+            mode = "r+b" if flags & SSH_FXF_WRITE else "rb"
+            if flags & SSH_FXF_TRUNC or (
+                flags & SSH_FXF_CREAT and not os.path.exists(path)
+            ):
+                mode = "w+b"
+            return self._new_handle(prefix, open(path, mode))
+        if message_type == SSH_FXP_OPENDIR:
+            path = self._path(reader)
+            return self._new_handle(prefix, (path, sorted(os.listdir(path))))
+        if message_type == SSH_FXP_CLOSE:
+            handle = self._handles.pop(reader.read_string())
+            if hasattr(handle, "close"):
+                handle.close()
+            return self._status(prefix, SSH_FX_OK)
+        if message_type == SSH_FXP_READ:
+            handle = self._handles[reader.read_string()]
+            offset, length = reader.read_uint64(), reader.read_uint32()
+            handle.seek(offset)
+            data = handle.read(min(length, self.max_read))
+            if not data:
+                return self._status(prefix, SSH_FX_EOF)
+            return pack_byte(SSH_FXP_DATA) + prefix + pack_string(data)
+        if message_type == SSH_FXP_WRITE:
+            handle = self._handles[reader.read_string()]
+            handle.seek(reader.read_uint64())
+            handle.write(reader.read_string())
+            return self._status(prefix, SSH_FX_OK)
+        if message_type == SSH_FXP_FSTAT:
+            handle = self._handles[reader.read_string()]
+            handle.flush()
+            st = os.fstat(handle.fileno())
+            attrs = SFTPAttributes(
+                st.st_size, permissions=st.st_mode, atime=st.st_atime, mtime=st.st_mtime
+            )
+            return pack_byte(SSH_FXP_ATTRS) + prefix + attrs.pack()
+        if message_type in (SSH_FXP_STAT, SSH_FXP_LSTAT):
+            return (
+                pack_byte(SSH_FXP_ATTRS)
+                + prefix
+                + attributes_of(self._path(reader)).pack()
+            )
+        if message_type == SSH_FXP_SETSTAT:
+            path, attrs = self._path(reader), SFTPAttributes.read(reader)
+            if attrs.mtime is not None:
+                os.utime(path, (attrs.atime, attrs.mtime))
+            if attrs.permissions is not None:
+                os.chmod(path, attrs.permissions & 0o7777)
+            return self._status(prefix, SSH_FX_OK)
+        if message_type == SSH_FXP_READDIR:
+            handle = reader.read_string()
+            path, names = self._handles[handle]
+            if not names:
+                return self._status(prefix, SSH_FX_EOF)
+            self._handles[handle] = (path, [])
+            entries = [(n, attributes_of(os.path.join(path, n))) for n in names]
+            return self._names(prefix, entries)
+        if message_type == SSH_FXP_REALPATH:
+            path = "/" + reader.read_text().strip("./")
+            return self._names(prefix, [(path, SFTPAttributes())])
+        if message_type == SSH_FXP_REMOVE:
+            os.remove(self._path(reader))
+        elif message_type == SSH_FXP_MKDIR:
+            os.mkdir(self._path(reader))
+        elif message_type == SSH_FXP_RMDIR:
+            os.rmdir(self._path(reader))
+        elif message_type == SSH_FXP_RENAME:
+            os.rename(self._path(reader), self._path(reader))
+        return self._status(prefix, SSH_FX_OK)
+
+    def _names(self, prefix, entries):
+        body = pack_byte(SSH_FXP_NAME) + prefix + pack_uint32(len(entries))
+        for name, attrs in entries:
+            body += pack_string(name) + pack_string(name) + attrs.pack()
+        return body
+
+
+class TestSFTPClient(unittest.TestCase):
+    def setUp(self):
+        self.remote = tempfile.TemporaryDirectory()
+        self.local = tempfile.TemporaryDirectory()
+        self.channel = FakeSFTPChannel(self.remote.name)
+        self.client = SFTPClient(self.channel)
+        self.client.init()
+
+    def tearDown(self):
+        self.remote.cleanup()
+        self.local.cleanup()
+
+    def remote_path(self, name):
+        return os.path.join(self.remote.name, name)
+
+    def local_path(self, name):
+        return os.path.join(self.local.name, name)
+
+    def test_pipelined_download_reassembles_out_of_order_replies(self):
+        content = os.urandom(1_000_003)
+        with open(self.remote_path("dump.bin"), "wb") as f:
+            f.write(content)
+        progress = []
+
+        written = self.client.get(
+            "dump.bin",
+            self.local_path("dump.bin"),
+            window=16,
+            chunk_size=32768,
+            callback=lambda done, total: progress.append(done),
+        )
+
+        with open(self.local_path("dump.bin"), "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(written, len(content))
+        self.assertEqual(progress[-1], len(content))
+        self.assertEqual(self.channel.max_in_flight, 16)
+
+    def test_pipelined_upload(self):
+        content = os.urandom(500_000)
+        with open(self.local_path("upload.bin"), "wb") as f:
+            f.write(content)
+
+        sent = self.client.put(self.local_path("upload.bin"), "upload.bin", window=8)
+
+        with open(self.remote_path("upload.bin"), "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(sent, len(content))
+        self.assertEqual(self.channel.max_in_flight, 8)
+
+    def test_empty_file(self):
+        open(self.remote_path("empty"), "wb").close()
+
+        self.assertEqual(self.client.get("empty", self.local_path("empty")), 0)
+        self.assertEqual(os.path.getsize(self.local_path("empty")), 0)
+
+    def test_single_requests(self):
+        handle = self.client.open("note.txt", SSH_FXF_WRITE | SSH_FXF_CREAT)
+        self.client.write(handle, 0, b"hello world")
+        self.client.close(handle)
+
+        handle = self.client.open("note.txt", SSH_FXF_READ)
+        self.assertEqual(self.client.read(handle, 6, 100), b"world")
+        self.assertEqual(self.client.read(handle, 100, 100), b"")
+        self.client.close(handle)
+        self.assertEqual(self.client.stat("note.txt").size, 11)
+
+    def test_directory_operations(self):
+        self.client.mkdir("sub")
+        self.client.rename("sub", "renamed")
+        open(self.remote_path("file"), "w").close()
+
+        self.assertEqual(sorted(self.client.listdir(".")), ["file", "renamed"])
+        self.assertTrue(self.client.stat("renamed").is_dir())
+        self.client.rmdir("renamed")
+        self.client.remove("file")
+        self.assertEqual(self.client.listdir("."), [])
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(SFTPError) as context:
+            self.client.get("missing", self.local_path("missing"))
+
+        self.assertEqual(context.exception.code, SSH_FX_NO_SUCH_FILE)
+
+
+class TestResumableTransfers(unittest.TestCase):
+    def setUp(self):
+        self.remote = tempfile.TemporaryDirectory()
+        self.local = tempfile.TemporaryDirectory()
+        self.content = os.urandom(700_000)
+
+    def tearDown(self):
+        self.remote.cleanup()
+        self.local.cleanup()
+
+    def client(self, fail_after=None):
+        client = SFTPClient(FakeSFTPChannel(self.remote.name, fail_after=fail_after))
+        client.init()
+        return client
+
+    def test_download_resumes_from_checkpoint(self):
+        with open(os.path.join(self.remote.name, "dump"), "wb") as f:
+            f.write(self.content)
+        local_path = os.path.join(self.local.name, "dump")
+
+        # 응답은 역순으로 오므로 몇 차례 요청을 보낸 뒤 연결이 끊기도록
+        with self.assertRaises(ConnectionError):
+            self.client(fail_after=10).get("dump", local_path, window=4, resume=True)
+        self.assertTrue(os.path.exists(local_path + CHECKPOINT_SUFFIX))
+
+        transferred = self.client().get("dump", local_path, window=4, resume=True)
+
+        with open(local_path, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertLess(transferred, len(self.content))
+        self.assertFalse(os.path.exists(local_path + CHECKPOINT_SUFFIX))
+
+    def test_changed_source_restarts_download(self):
+        remote_path = os.path.join(self.remote.name, "dump")
+        with open(remote_path, "wb") as f:
+            f.write(self.content)
+        local_path = os.path.join(self.local.name, "dump")
+        with self.assertRaises(ConnectionError):
+            self.client(fail_after=10).get("dump", local_path, window=4, resume=True)
+
+        with open(remote_path, "wb") as f:
+            f.write(self.content[::-1])
+        os.utime(remote_path, (1_000_000, 1_000_000))
+        transferred = self.client().get("dump", local_path, resume=True)
+
+        self.assertEqual(transferred, len(self.content))
+        with open(local_path, "rb") as f:
+            self.assertEqual(f.read(), self.content[::-1])
+
+    def test_upload_resumes_from_checkpoint(self):
+        local_path = os.path.join(self.local.name, "upload")
+        with open(local_path, "wb") as f:
+            f.write(self.content)
+
+        with self.assertRaises(ConnectionError):
+            self.client(fail_after=10).put(local_path, "upload", window=4, resume=True)
+        transferred = self.client().put(local_path, "upload", window=4, resume=True)
+
+        with open(os.path.join(self.remote.name, "upload"), "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertLess(transferred, len(self.content))
+        self.assertFalse(os.path.exists(local_path + CHECKPOINT_SUFFIX))
+
+    def test_range_tracker_only_confirms_contiguous_prefix(self):
+        tracker = RangeTracker(100)
+        tracker.complete(200, 300)
+        self.assertEqual(tracker.watermark, 100)
+        tracker.complete(100, 200)
+        self.assertEqual((tracker.watermark, tracker.highest), (300, 300))
+
+
+class FakeSCPChannel:
+    """Remote ``scp -t``/``scp -f`` run against a local directory."""
+
+    def __init__(self, root):
+        self.root = root
+        self.exit_status = None
+        self._outbound = bytearray()
+        self._inbound = bytearray()
+        self._mode = None
+
+    def exec_command(self, command):
+        arguments = shlex.split(command)
+        self._mode, self._path = arguments[-2], os.path.join(self.root, arguments[-1])
+        if self._mode == "-t":
+            self._outbound += b"\x00"
+
+    def sendall(self, data):
+        self._inbound += data
+        if self._mode == "-f":
+            self._serve_file()
+        else:
+            self._receive_file()
+
+    def send_buffers(self, buffers):
+        self.sendall(b"".join(buffers))
+
+    def _serve_file(self):
+        if self._inbound != b"\x00":
+            self._inbound.clear()
+            return
+        self._inbound.clear()
+        if not os.path.exists(self._path):
+            self._outbound += b"\x01scp: no such file\n"
+            self.exit_status = 1
+        elif self.exit_status is None:
+            with open(self._path, "rb") as f:
+                data = f.read()
+            self._outbound += f"C0640 {len(data)} name\n".encode() + data + b"\x00"
+            self.exit_status = 0
+
+    def _receive_file(self):
+        while self._inbound:
+            if self._inbound.startswith(b"C") and b"\n" in self._inbound:
+                header, _, rest = bytes(self._inbound).partition(b"\n")
+                self._size = int(header.split()[1])
+                self._inbound[:] = rest
+                self._outbound += b"\x00"
+            elif len(self._inbound) >= self._size + 1:
+                with open(self._path, "wb") as f:
+                    f.write(self._inbound[: self._size])
+                del self._inbound[: self._size + 1]
+                self._outbound += b"\x00"
+                self.exit_status = 0
+            else:
+                return
+
+    def recv(self, size=32768, timeout=None):
+        data = bytes(self._outbound[:size])
+        del self._outbound[:size]
+        return data
+
+    def recv_into(self, buffer, timeout=None):
+        # 작은 조각으로 나누어 여러 번 recv_into 가 호출되도록
+        count = min(len(buffer), len(self._outbound), 4096)
+        buffer[:count] = self._outbound[:count]
+        del self._outbound[:count]
+        return count
+
+    def send_eof(self):
+        pass
+
+    def recv_exit_status(self, timeout=None):
+        return self.exit_status
+
+    def close(self, timeout=None):
+        pass
+
+
+class FakeSCPTransport:
+    def __init__(self, root):
+        self.root = root
+
+    def open_session(self, timeout=None):
+        return FakeSCPChannel(self.root)
+
+
+class TestSCPClient(unittest.TestCase):
+    def setUp(self):
+        self.remote = tempfile.TemporaryDirectory()
+        self.local = tempfile.TemporaryDirectory()
+        self.client = SCPClient(FakeSCPTransport(self.remote.name), chunk_size=10000)
+
+    def tearDown(self):
+        self.remote.cleanup()
+        self.local.cleanup()
+
+    def test_round_trip_through_memory_map(self):
+        content = os.urandom(123_457)
+        local_path = os.path.join(self.local.name, "data")
+        with open(local_path, "wb") as f:
+            f.write(content)
+        progress = []
+
+        self.assertEqual(self.client.put(local_path, "data"), len(content))
+        self.assertEqual(
+            self.client.get(
+                "data", local_path + ".copy", callback=lambda d, t: progress.append(d)
+            ),
+            len(content),
+        )
+
+        with open(local_path + ".copy", "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(progress[-1], len(content))
+        self.assertEqual(os.stat(local_path + ".copy").st_mode & 0o777, 0o640)
+
+    def test_empty_file(self):
+        local_path = os.path.join(self.local.name, "empty")
+        open(local_path, "wb").close()
+
+        self.assertEqual(self.client.put(local_path, "empty"), 0)
+        self.assertEqual(self.client.get("empty", local_path + ".copy"), 0)
+
+    def test_remote_error(self):
+        with self.assertRaises(SCPError):
+            self.client.get("missing", os.path.join(self.local.name, "missing"))
+
+
+class FakeExecChannel:
+    """Runs ``sha256sum`` for the checksum mode of DirectorySync."""
+
+    def __init__(self, root):
+        self.root = root
+        self.output = b""
+
+    def exec_command(self, command):
+        arguments = shlex.split(command)
+        assert arguments[:2] == ["sha256sum", "--"]
+        for path in arguments[2:]:
+            with open(os.path.join(self.root, path.lstrip("/")), "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            # GNU sha256sum 처럼 \ 와 줄바꿈이 있는 이름은 이스케이프
+            if "\\" in path or "\n" in path:
+                path = path.replace("\\", "\\\\").replace("\n", "\\n")
+                digest = "\\" + digest
+            self.output += f"{digest}  {path}\n".encode()
+
+    def recv(self, size=32768, timeout=None):
+        data, self.output = self.output[:size], self.output[size:]
+        return data
+
+    def close(self, timeout=None):
+        pass
+
+
+class TestDirectorySync(unittest.TestCase):
+    def setUp(self):
+        self.remote = tempfile.TemporaryDirectory()
+        self.local = tempfile.TemporaryDirectory()
+        self.channels = []
+        self.exec_transport = unittest.mock.Mock()
+        self.exec_transport.open_session.side_effect = lambda: FakeExecChannel(
+            self.remote.name
+        )
+        self.write_local("a.txt", b"alpha")
+        self.write_local("sub/b.bin", os.urandom(50_000))
+        self.write_local("sub/deeper/c.txt", b"gamma")
+
+    def tearDown(self):
+        self.remote.cleanup()
+        self.local.cleanup()
+
+    def write_local(self, path, data):
+        path = os.path.join(self.local.name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def client_factory(self):
+        channel = FakeSFTPChannel(self.remote.name)
+        self.channels.append(channel)
+        client = SFTPClient(channel)
+        client.init()
+        return client
+
+    def sync(self, **options):
+        with DirectorySync(
+            self.exec_transport, client_factory=self.client_factory, **options
+        ) as sync:
+            return sync.upload(self.local.name, "backup")
+
+    def test_initial_sync_copies_tree(self):
+        result = self.sync(workers=3)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(
+            sorted(result.transferred), ["a.txt", "sub/b.bin", "sub/deeper/c.txt"]
+        )
+        with open(os.path.join(self.remote.name, "backup/sub/deeper/c.txt"), "rb") as f:
+            self.assertEqual(f.read(), b"gamma")
+
+    def test_unchanged_files_are_skipped(self):
+        self.sync()
+        self.write_local("a.txt", b"alpha, edited")
+
+        result = self.sync()
+
+        self.assertEqual(result.transferred, ["a.txt"])
+        self.assertEqual(result.skipped, 2)
+
+    def test_checksum_skips_touched_but_identical_files(self):
+        self.sync()
+        later = time.time() + 100
+        os.utime(os.path.join(self.local.name, "a.txt"), (later, later))
+        self.write_local("sub/deeper/c.txt", b"GAMMA")
+        os.utime(os.path.join(self.local.name, "sub/deeper/c.txt"), (later, later))
+
+        self.assertEqual(
+            sorted(self.sync().transferred), ["a.txt", "sub/deeper/c.txt"]
+        )
+        os.utime(os.path.join(self.local.name, "a.txt"), (later + 100, later + 100))
+        self.assertEqual(self.sync(checksum=True).transferred, [])
+        self.exec_transport.open_session.reset_mock()
+        self.assertEqual(self.sync(checksum=True).transferred, [])
+        self.exec_transport.open_session.assert_not_called()
+
+    def test_checksum_batches_and_escaped_names(self):
+        for i in range(10):
+            self.write_local(f"many/file-{i}.txt", b"same")
+        self.write_local("odd\\name.txt", b"backslash")
+        self.write_local("new\nline.txt", b"newline")
+        self.sync()
+        later = time.time() + 100
+        for root, _, files in os.walk(self.local.name):
+            for name in files:
+                os.utime(os.path.join(root, name), (later, later))
+
+        with unittest.mock.patch.object(directory_sync, "DIGEST_COMMAND_BYTES", 64):
+            self.assertEqual(self.sync(checksum=True).transferred, [])
+        self.assertGreater(self.exec_transport.open_session.call_count, 5)
+
+    def test_parse_sha256sum(self):
+        output = b"aa  plain.txt\n\\bb  back\\\\slash\\nname\ncc *binary.bin\n"
+
+        self.assertEqual(
+            parse_sha256sum(output),
+            {"plain.txt": "aa", "back\\slash\nname": "bb", "binary.bin": "cc"},
+        )
+
+    def test_download(self):
+        self.sync()
+        destination = tempfile.TemporaryDirectory()
+        self.addCleanup(destination.cleanup)
+
+        with DirectorySync(client_factory=self.client_factory, workers=2) as sync:
+            first = sync.download("backup", destination.name)
+            second = sync.download("backup", destination.name)
+
+        self.assertEqual(len(first.transferred), 3)
+        self.assertEqual(second.transferred, [])
+        with open(os.path.join(destination.name, "sub/b.bin"), "rb") as f:
+            with open(os.path.join(self.local.name, "sub/b.bin"), "rb") as original:
+                self.assertEqual(f.read(), original.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import logging
+import logging.handlers
+import unittest
+from unittest.mock import patch
+from src.config.config import Config
+from src.utils.logger import Logger, log_payload
+
+
+class Unformattable:
+    """A buffer that fails the test if anything tries to read it."""
+
+    def __len__(self):
+        return 10 * 1024 * 1024
+
+    def __getitem__(self, index):
+        raise AssertionError("payload was formatted")
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestLogger(unittest.TestCase):
+    def make_logger(self, level):
+        logger = logging.getLogger(f"test.logger.{self.id()}")
+        logger.setLevel(level)
+        logger.propagate = False
+        handler = RecordingHandler()
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger, handler
+
+    def test_loggers_share_one_queue_handler(self):
+        first = Logger.get_logger("test.logger.shared.first")
+        second = Logger.get_logger("test.logger.shared.second")
+
+        self.assertIs(first.handlers[0], second.handlers[0])
+        self.assertIsInstance(first.handlers[0], logging.handlers.QueueHandler)
+
+    def test_payload_not_formatted_when_debug_disabled(self):
+        logger, handler = self.make_logger(logging.INFO)
+
+        log_payload(logger, "Sending data", Unformattable())
+
+        self.assertEqual(handler.messages, [])
+
+    def test_payload_dump_is_truncated(self):
+        logger, handler = self.make_logger(logging.DEBUG)
+
+        with patch.object(Config, "LOG_PAYLOAD_BYTES", 4):
+            log_payload(logger, "Received data", bytearray(b"\x01\x02\x03\x04\x05" * 2))
+            log_payload(logger, "Received data", b"\xff" * 100, 2)
+
+        self.assertEqual(
+            handler.messages,
+            [
+                "Received data (10 bytes): 01 02 03 04 ... (6 more bytes)",
+                "Received data (2 bytes): ff ff",
+            ],
+        )
+
+    def test_payload_sampling(self):
+        logger, handler = self.make_logger(logging.DEBUG)
+
+        with patch.object(Config, "LOG_PAYLOAD_SAMPLE", 3):
+            for _ in range(9):
+                log_payload(logger, "Sending data", b"data")
+
+        self.assertEqual(len(handler.messages), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
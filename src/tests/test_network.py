@@ -0,0 +1,126 @@
+# tests/test_network.py
+
+import asyncio
+import os
+import unittest
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from src.config.config import Config
+from src.crypto.host_keys import HostKeyVerifier
+from src.crypto.key_exchange import KeyExchange
+from src.network.async_connection import AsyncSSHConnection
+from src.network.async_socket_handler import AsyncSocketHandler
+from src.network.packet_framer import PacketFramer
+from src.network.packet_manager import PacketManager
+
+HOST_KEY = ed25519.Ed25519PrivateKey.generate()
+
+
+async def fake_ssh_server(reader, writer, banner=b"SSH-2.0-OpenSSH_9.6\r\n"):
+    """Minimal peer: runs the server side of the key exchange, then echoes one packet."""
+    packet_manager = PacketManager()
+    framer = PacketFramer(packet_manager)
+    writer.write(banner)
+    client_version = (await reader.readline()).decode()
+    kex = KeyExchange(packet_manager, client_version, banner.decode(), host_key=HOST_KEY)
+
+    async def next_payload():
+        while (payload := framer.next_packet()) is None:
+            data = await reader.read(4096)
+            if not data:
+                return None
+            framer.feed(data)
+        return bytes(payload)
+
+    # 두 번에 나누어 보내 프레이밍 경계를 확인
+    packet = packet_manager.create_packet(kex.start())
+    writer.write(packet[:7])
+    await writer.drain()
+    writer.write(packet[7:])
+
+    while not kex.complete:
+        payload = await next_payload()
+        if payload is None:
+            writer.close()
+            return
+        for output in kex.handle(payload):
+            writer.write(packet_manager.create_packet(output))
+        kex.outputs_sent()
+
+    payload = await next_payload()
+    if payload is not None:
+        writer.write(packet_manager.create_packet(payload))
+        await writer.drain()
+        await reader.read()
+    writer.close()
+
+
+def make_connection(port):
+    verifier = HostKeyVerifier(os.devnull, policy="ignore")
+    return AsyncSSHConnection("127.0.0.1", port, host_key_verifier=verifier)
+
+
+class TestAsyncSSHConnection(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await asyncio.start_server(fake_ssh_server, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_handshake_and_encrypted_echo(self):
+        connection = make_connection(self.port)
+
+        await connection.connect(timeout=5)
+        await connection.send_packet(b"\x02encrypted")
+        echoed = await connection.read_packet()
+        await connection.close()
+
+        self.assertEqual(connection.server_version, "SSH-2.0-OpenSSH_9.6")
+        self.assertEqual(connection.server_kexinit[0], 20)
+        self.assertEqual(len(connection.session_id), 32)
+        self.assertEqual(echoed, b"\x02encrypted")
+        self.assertEqual(
+            connection.packet_manager._send_cipher.name, Config.ENCRYPTION_ALGORITHMS[0]
+        )
+
+    async def test_many_connections_share_one_loop(self):
+        connections = [make_connection(self.port) for _ in range(50)]
+
+        await asyncio.gather(*(c.connect(timeout=5) for c in connections))
+        await asyncio.gather(*(c.close() for c in connections))
+
+        self.assertTrue(all(c.session_id for c in connections))
+        self.assertEqual(len({c.session_id for c in connections}), 50)
+
+    async def test_invalid_banner(self):
+        server = await asyncio.start_server(
+            lambda r, w: fake_ssh_server(r, w, banner=b"HTTP/1.1 400\r\n"), "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+        connection = make_connection(port)
+
+        with self.assertRaises(ConnectionError):
+            await connection.connect(timeout=5)
+        self.assertIsNone(connection.socket_handler.writer)
+        server.close()
+        await server.wait_closed()
+
+
+class TestAsyncSocketHandler(unittest.IsolatedAsyncioTestCase):
+    async def test_send_without_connection(self):
+        with self.assertRaises(ValueError):
+            await AsyncSocketHandler().send(b"data")
+
+    async def test_connect_refused(self):
+        server = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+
+        with self.assertRaises(OSError):
+            await AsyncSocketHandler().connect("127.0.0.1", port, timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
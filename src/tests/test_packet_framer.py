@@ -0,0 +1,88 @@
+# tests/test_packet_framer.py
+
+import unittest
+from src.network.packet_framer import PacketFramer
+from src.network.packet_manager import PacketManager
+
+
+class FakeSocketHandler:
+    """Serves pre-recorded bytes through recv_into in fixed-size chunks."""
+
+    def __init__(self, data, chunk_size):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.offset = 0
+
+    def receive_into(self, buffer, nbytes=0):
+        size = min(len(buffer), self.chunk_size, len(self.data) - self.offset)
+        buffer[:size] = self.data[self.offset : self.offset + size]
+        self.offset += size
+        return size
+
+
+class TestPacketFramer(unittest.TestCase):
+    def setUp(self):
+        self.sender = PacketManager()
+        self.receiver = PacketManager()
+
+    def _stream(self, payloads):
+        return b"".join(self.sender.create_packet(p) for p in payloads)
+
+    def test_packets_split_across_reads(self):
+        payloads = [b"first", b"x" * 1000, b"third"]
+        socket_handler = FakeSocketHandler(self._stream(payloads), chunk_size=3)
+        framer = PacketFramer(self.receiver, buffer_size=64)
+
+        received = [bytes(framer.read_packet(socket_handler)) for _ in payloads]
+
+        self.assertEqual(received, payloads)
+        self.assertEqual(self.receiver.receive_sequence_number, 3)
+
+    def test_encrypted_packets(self):
+        self.sender.set_encryption(b"\x01" * 32, b"\x02" * 32)
+        self.receiver.set_encryption(b"\x01" * 32, b"\x02" * 32)
+        payloads = [b"hello", b"y" * 70000]
+        socket_handler = FakeSocketHandler(self._stream(payloads), chunk_size=1500)
+        framer = PacketFramer(self.receiver)
+
+        received = [bytes(framer.read_packet(socket_handler)) for _ in payloads]
+
+        self.assertEqual(received, payloads)
+
+    def test_feed_yields_memoryview_payloads(self):
+        framer = PacketFramer(self.receiver)
+        framer.feed(self._stream([b"a", b"b"]) + b"\x00\x00")
+
+        payloads = list(framer.packets())
+
+        self.assertTrue(all(isinstance(p, memoryview) for p in payloads))
+        self.assertEqual([bytes(p) for p in payloads], [b"a", b"b"])
+        self.assertEqual(framer.buffered, 2)
+
+    def test_tampered_mac_is_rejected(self):
+        self.sender.set_encryption(b"\x01" * 32, b"\x02" * 32)
+        self.receiver.set_encryption(b"\x01" * 32, b"\x02" * 32)
+        packet = bytearray(self.sender.create_packet(b"payload"))
+        packet[-1] ^= 0xFF
+        framer = PacketFramer(self.receiver)
+        framer.feed(packet)
+
+        with self.assertRaises(ValueError):
+            framer.next_packet()
+
+    def test_invalid_packet_length(self):
+        framer = PacketFramer(self.receiver)
+        framer.feed(b"\xff\xff\xff\xff" + b"\x00" * 4)
+
+        with self.assertRaises(ValueError):
+            framer.next_packet()
+
+    def test_connection_closed(self):
+        framer = PacketFramer(self.receiver)
+
+        with self.assertRaises(ConnectionError):
+            framer.read_packet(FakeSocketHandler(b"", chunk_size=10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@
 import unittest
 from unittest.mock import patch
 from src.network.packet_manager import PacketManager
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 import os
 
 
@@ -96,6 +97,162 @@ class TestPacketManager(unittest.TestCase):
         self.packet_manager.parse_packet(self.packet_manager.create_packet(b"Test"))
         self.assertEqual(self.packet_manager.sequence_number, initial_seq + 2)
 
+    def test_sequence_number_wraps(self):
+        sender, receiver = PacketManager(), PacketManager()
+        sender.set_encryption(b"\x01" * 16, b"\x02" * 32)
+        receiver.set_encryption(b"\x01" * 16, b"\x02" * 32)
+        sender.sequence_number = receiver.receive_sequence_number = 0xFFFFFFFF
+
+        packets = [sender.create_packet(b"last")] + sender.create_packets(
+            [b"first", b"second"]
+        )
+
+        self.assertEqual(sender.sequence_number, 2)
+        self.assertEqual(receiver.parse_packet(packets[0]), b"last")
+        self.assertEqual(receiver.parse_packet(b"".join(packets[1:3])), b"first")
+        self.assertEqual(receiver.receive_sequence_number, 1)
+
+    def test_rekey_due_per_direction(self):
+        self.packet_manager.set_encryption(b"\x01" * 16, b"\x02" * 32)
+        self.assertFalse(self.packet_manager.rekey_due(1000, 10, 3600))
+
+        for _ in range(10):
+            self.packet_manager.create_packet(b"x" * 100)
+        self.assertTrue(self.packet_manager.rekey_due(1000, 0, 0))
+        self.assertTrue(self.packet_manager.rekey_due(0, 10, 0))
+        self.assertFalse(self.packet_manager.rekey_due(0, 0, 0))
+        self.assertTrue(self.packet_manager.rekey_due(0, 0, 1e-9))
+
+        # 새 송신 키가 설치되면 카운터가 다시 시작됨
+        self.packet_manager.set_outgoing_cipher("aes128-ctr", b"\x03" * 16)
+        self.assertFalse(self.packet_manager.rekey_due(1000, 10, 3600))
+
+    def test_ctr_counter_continues_across_packets(self):
+        key, iv = b"\x01" * 16, b"\x02" * 16
+        self.packet_manager.set_encryption(key, None, iv)
+
+        with patch("os.urandom", side_effect=lambda n: b"\x00" * n):
+            first = self.packet_manager.create_packet(b"first")
+            second = self.packet_manager.create_packet(b"second")
+
+        reference = Cipher(algorithms.AES(key), modes.CTR(iv)).decryptor()
+        plaintext = reference.update(first + second)
+        self.assertEqual(plaintext[5:10], b"first")
+        self.assertEqual(plaintext[len(first) + 5 : len(first) + 11], b"second")
+
+    def test_separate_keys_per_direction(self):
+        client, server = PacketManager(), PacketManager()
+        client.set_encryption(
+            b"\x01" * 16, b"\x03" * 32, b"\x05" * 16, b"\x02" * 16, b"\x04" * 32, b"\x06" * 16
+        )
+        server.set_encryption(
+            b"\x02" * 16, b"\x04" * 32, b"\x06" * 16, b"\x01" * 16, b"\x03" * 32, b"\x05" * 16
+        )
+
+        for i in range(3):
+            payload = b"message %d" % i
+            self.assertEqual(server.parse_packet(client.create_packet(payload)), payload)
+            self.assertEqual(client.parse_packet(server.create_packet(payload)), payload)
+
+    def test_create_packets_batch(self):
+        sender, receiver = PacketManager(), PacketManager()
+        sender.set_encryption(b"\x01" * 32, b"\x02" * 32)
+        receiver.set_encryption(b"\x01" * 32, b"\x02" * 32)
+        payloads = [b"a", b"b" * 100, b"c" * 33]
+
+        segments = sender.create_packets(payloads)
+        stream = b"".join(bytes(segment) for segment in segments)
+
+        self.assertEqual(len(segments), 2 * len(payloads))
+        self.assertEqual(sender.sequence_number, len(payloads))
+        parsed = []
+        while stream:
+            packet_length = len(segments[2 * len(parsed)]) + 32
+            parsed.append(receiver.parse_packet(stream[:packet_length]))
+            stream = stream[packet_length:]
+        self.assertEqual(parsed, payloads)
+
+
+class TestCompression(unittest.TestCase):
+    def make_pair(self, name, adaptive=False):
+        sender, receiver = PacketManager(), PacketManager()
+        sender.set_outgoing_compression(name, adaptive=adaptive)
+        receiver.set_incoming_compression(name)
+        return sender, receiver
+
+    def test_zlib_stream_round_trip(self):
+        sender, receiver = self.make_pair("zlib")
+        payloads = [b"\x5e" + b"log line %d: request served\n" % i * 20 for i in range(50)]
+
+        for payload in payloads:
+            packet = sender.create_packet(payload)
+            self.assertLess(len(packet), len(payload))
+            self.assertEqual(receiver.parse_packet(packet), payload)
+
+        segments = sender.create_packets(payloads[:3])
+        parsed = [receiver.parse_packet(bytes(segment)) for segment in segments]
+        self.assertEqual(parsed, payloads[:3])
+
+    def test_rekey_starts_new_zlib_stream(self):
+        for name in ("zlib", "zlib@openssh.com"):
+            sender, receiver = self.make_pair(name)
+            sender.authenticated = receiver.authenticated = True
+            payload = b"\x5e" + b"same data every time\n" * 50
+            for _ in range(3):
+                receiver.parse_packet(sender.create_packet(payload))
+
+            # NEWKEYS: 양쪽 모두 압축 상태를 새로 시작해야 함
+            sender.set_outgoing_compression(name)
+            receiver.set_incoming_compression(name)
+            fresh = PacketManager()
+            fresh.authenticated = True
+            fresh.set_incoming_compression(name)
+
+            packet = sender.create_packet(payload)
+            self.assertLess(len(packet), len(payload))
+            self.assertEqual(fresh.parse_packet(packet), payload)
+            self.assertEqual(receiver.parse_packet(packet), payload)
+
+    def test_delayed_compression_starts_after_userauth_success(self):
+        server, client = self.make_pair("zlib@openssh.com")
+        payload = b"\x5e" + b"x" * 1000
+
+        self.assertGreater(len(server.create_packet(payload)), len(payload))
+        client.parse_packet(server.create_packet(payload))
+        client.parse_packet(server.create_packet(b"\x34"))
+
+        packet = server.create_packet(payload)
+        self.assertLess(len(packet), len(payload))
+        self.assertEqual(client.parse_packet(packet), payload)
+
+    def test_adaptive_mode_stops_compressing_random_data(self):
+        sender, receiver = self.make_pair("zlib", adaptive=True)
+        compressor = sender.compressor
+        compressor.probe_interval = 4
+        text = b"\x5e" + b"GET /index.html 200\n" * 100
+
+        for _ in range(3):
+            payload = b"\x5e" + os.urandom(8000)
+            self.assertEqual(receiver.parse_packet(sender.create_packet(payload)), payload)
+        self.assertFalse(compressor.enabled)
+
+        # 압축하지 않는 동안에도 스트림은 유효하고, 주기적 표본으로 다시 켜짐
+        for _ in range(compressor.probe_interval):
+            self.assertEqual(receiver.parse_packet(sender.create_packet(text)), text)
+        self.assertTrue(compressor.enabled)
+        packet = sender.create_packet(text)
+        self.assertLess(len(packet), len(text) // 4)
+        self.assertEqual(receiver.parse_packet(packet), text)
+
+    def test_rejects_oversized_decompressed_payload(self):
+        sender, receiver = self.make_pair("zlib")
+        with self.assertRaises(ValueError):
+            receiver.parse_packet(sender.create_packet(b"\x00" * (300 * 1024)))
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            PacketManager().set_outgoing_compression("lz4")
+
 
 if __name__ == "__main__":
     unittest.main()
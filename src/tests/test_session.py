@@ -0,0 +1,886 @@
+# tests/test_session.py
+
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from src.benchmarks.bench_transport import connect
+from src.benchmarks.loopback_server import LoopbackServerThread
+from src.network.message import (
+    MessageReader,
+    SSH_MSG_CHANNEL_CLOSE,
+    SSH_MSG_CHANNEL_DATA,
+    SSH_MSG_CHANNEL_EOF,
+    SSH_MSG_CHANNEL_EXTENDED_DATA,
+    SSH_MSG_CHANNEL_OPEN,
+    SSH_MSG_CHANNEL_OPEN_CONFIRMATION,
+    SSH_MSG_CHANNEL_OPEN_FAILURE,
+    SSH_MSG_CHANNEL_REQUEST,
+    SSH_MSG_CHANNEL_SUCCESS,
+    SSH_MSG_CHANNEL_WINDOW_ADJUST,
+    SSH_MSG_GLOBAL_REQUEST,
+    SSH_MSG_REQUEST_SUCCESS,
+    pack_boolean,
+    pack_byte,
+    pack_string,
+    pack_uint32,
+)
+from src.session.channel_manager import ChannelManager, ChannelOpenError
+from src.session.connection_pool import ConnectionPool
+from src.session.port_forwarding import PortForwarder, parse_forward_spec
+from src.session.executor import (
+    ExecutionSummary,
+    HostResult,
+    ParallelExecutor,
+    percentile,
+    run_command,
+)
+from src.session.recording import (
+    GAP,
+    INPUT,
+    OUTPUT,
+    RecordingReader,
+    SessionRecorder,
+)
+from src.session.session_manager import SessionManager
+from src.shell.terminal_emulator import TerminalEmulator
+
+
+class FakeTransport:
+    def __init__(self, host, port, username):
+        self.key = (host, port, username)
+        self.active = True
+        self.channels = []
+
+    def is_active(self):
+        return self.active
+
+    def open_session(self):
+        channel = MagicMock()
+        self.channels.append(channel)
+        return channel
+
+    def close(self):
+        self.active = False
+
+
+class CountingFactory:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self, host, port, username):
+        transport = FakeTransport(host, port, username)
+        self.created.append(transport)
+        return transport
+
+
+def acquired_within(pool, host, timeout):
+    """Whether ``pool.acquire(host)`` (then released) finishes within ``timeout``."""
+    acquired = threading.Event()
+
+    def acquire():
+        pool.acquire(host, 22, "user").release()
+        acquired.set()
+
+    threading.Thread(target=acquire, daemon=True).start()
+    return acquired.wait(timeout)
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.factory = CountingFactory()
+
+    def test_reuses_transport_for_same_key(self):
+        pool = ConnectionPool(self.factory)
+
+        first = pool.acquire("host", 22, "user")
+        first.release()
+        second = pool.acquire("host", 22, "user")
+
+        self.assertIs(first.transport, second.transport)
+        self.assertEqual(len(self.factory.created), 1)
+
+    def test_multiplexes_sessions_up_to_limit(self):
+        pool = ConnectionPool(self.factory, max_sessions_per_connection=2)
+
+        leases = [pool.acquire("host", 22, "user") for _ in range(3)]
+
+        self.assertIs(leases[0].transport, leases[1].transport)
+        self.assertIsNot(leases[0].transport, leases[2].transport)
+        self.assertEqual(pool.stats(), {"connections": 2, "sessions": 3, "idle": 0})
+
+    def test_different_keys_get_different_transports(self):
+        pool = ConnectionPool(self.factory)
+
+        a = pool.acquire("host", 22, "alice")
+        b = pool.acquire("host", 22, "bob")
+
+        self.assertIsNot(a.transport, b.transport)
+
+    def test_per_host_cap_blocks_until_release(self):
+        pool = ConnectionPool(
+            self.factory, max_connections_per_host=1, max_sessions_per_connection=1
+        )
+        first = pool.acquire("host", 22, "user")
+        threading.Timer(0.05, first.release).start()
+
+        second = pool.acquire("host", 22, "user", timeout=5)
+
+        self.assertIs(second.transport, first.transport)
+
+    def test_per_host_cap_timeout(self):
+        pool = ConnectionPool(
+            self.factory, max_connections_per_host=1, max_sessions_per_connection=1
+        )
+        pool.acquire("host", 22, "user")
+
+        with self.assertRaises(TimeoutError):
+            pool.acquire("host", 22, "user", timeout=0.01)
+
+    def test_idle_eviction(self):
+        pool = ConnectionPool(self.factory, max_idle=10)
+        pool.acquire("host", 22, "user").release()
+
+        with patch("time.monotonic", return_value=time.monotonic() + 11):
+            pool.prune()
+
+        self.assertEqual(pool.stats()["connections"], 0)
+        self.assertFalse(self.factory.created[0].active)
+
+    def test_max_lifetime_retires_busy_connection(self):
+        pool = ConnectionPool(self.factory, max_lifetime=10)
+        lease = pool.acquire("host", 22, "user")
+
+        with patch("time.monotonic", return_value=time.monotonic() + 11):
+            fresh = pool.acquire("host", 22, "user")
+            self.assertIsNot(fresh.transport, lease.transport)
+            self.assertTrue(lease.transport.active)
+            lease.release()
+
+        self.assertFalse(lease.transport.active)
+        self.assertTrue(fresh.transport.active)
+
+    def test_unhealthy_transport_is_replaced(self):
+        pool = ConnectionPool(self.factory)
+        lease = pool.acquire("host", 22, "user")
+        lease.release()
+        lease.transport.active = False
+
+        replacement = pool.acquire("host", 22, "user")
+
+        self.assertIsNot(replacement.transport, lease.transport)
+        self.assertEqual(len(self.factory.created), 2)
+
+    def test_factory_failure_frees_slot(self):
+        calls = []
+
+        def failing_factory(host, port, username):
+            calls.append(1)
+            if len(calls) == 1:
+                raise ConnectionError("handshake failed")
+            return FakeTransport(host, port, username)
+
+        pool = ConnectionPool(failing_factory, max_connections_per_host=1)
+        with self.assertRaises(ConnectionError):
+            pool.acquire("host", 22, "user")
+
+        self.assertIsNotNone(pool.acquire("host", 22, "user", timeout=0.01))
+
+    def test_blocking_close_does_not_stall_other_hosts(self):
+        pool = ConnectionPool(self.factory)
+        stuck = pool.acquire("dead", 22, "user")
+        unblock = threading.Event()
+        closing = threading.Event()
+
+        def close():
+            closing.set()
+            unblock.wait(5)
+
+        stuck.transport.close = close
+        releaser = threading.Thread(target=stuck.release, kwargs={"discard": True})
+        releaser.start()
+        closing.wait(5)
+        try:
+            self.assertTrue(acquired_within(pool, "alive", 2))
+            self.assertEqual(pool.stats()["connections"], 1)
+        finally:
+            unblock.set()
+            releaser.join()
+
+    def test_health_check_runs_outside_lock(self):
+        checking = threading.Event()
+        unblock = threading.Event()
+
+        def health_check(transport):
+            if transport.key[0] == "dead":
+                checking.set()
+                return unblock.wait(5)
+            return True
+
+        pool = ConnectionPool(self.factory, health_check=health_check)
+        pool.acquire("dead", 22, "user").release()
+        checker = threading.Thread(target=pool.acquire, args=("dead", 22, "user"))
+        checker.start()
+        checking.wait(5)
+        try:
+            self.assertTrue(acquired_within(pool, "alive", 2))
+        finally:
+            unblock.set()
+            checker.join()
+
+
+class TestSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.factory = CountingFactory()
+        self.manager = SessionManager(ConnectionPool(self.factory))
+
+    def test_sessions_share_pooled_transport(self):
+        first = self.manager.create_session("a", "host", 22, "user")
+        second = self.manager.create_session("b", "host", 22, "user")
+
+        self.assertEqual(len(self.factory.created), 1)
+        self.assertEqual(self.factory.created[0].channels, [first, second])
+        self.assertIs(self.manager.get_session("a"), first)
+
+    def test_close_session_returns_transport_to_pool(self):
+        channel = self.manager.create_session("a", "host", 22, "user")
+        self.manager.close_session("a")
+
+        channel.close.assert_called_once()
+        self.assertIsNone(self.manager.get_session("a"))
+        self.assertEqual(self.manager.pool.stats()["idle"], 1)
+
+    def test_duplicate_session_id(self):
+        self.manager.create_session("a", "host", 22, "user")
+
+        with self.assertRaises(ValueError):
+            self.manager.create_session("a", "host", 22, "user")
+
+    def test_close_closes_pool(self):
+        self.manager.create_session("a", "host", 22, "user")
+        self.manager.close()
+
+        self.assertFalse(self.factory.created[0].active)
+
+
+class ScriptedPeer:
+    """
+    In-memory stand-in for the transport plus the server's connection layer.
+
+    Every payload the client sends is recorded and answered by ``respond``.
+    """
+
+    def __init__(self, window=1 << 20, max_packet=1 << 15):
+        self.window = window
+        self.max_packet = max_packet
+        self.sent = []
+        self.incoming = queue.Queue()
+        self.received_data = {}
+        self.lock = threading.Lock()
+
+    def push(self, payload):
+        self.incoming.put(payload)
+
+    def send_packet(self, payload, flush=True):
+        with self.lock:
+            self.sent.append(payload)
+            self.respond(payload)
+
+    def send_packets(self, payloads, flush=True):
+        for payload in payloads:
+            self.send_packet(payload)
+
+    def read_packet(self):
+        return self.incoming.get(timeout=5)
+
+    def data_packets(self):
+        return [p for p in self.sent if p[0] == SSH_MSG_CHANNEL_DATA]
+
+    def respond(self, payload):
+        reader = MessageReader(payload, 1)
+        if payload[0] == SSH_MSG_CHANNEL_OPEN:
+            channel_type = reader.read_text()
+            sender = reader.read_uint32()
+            if channel_type == "forbidden":
+                self.push(
+                    pack_byte(SSH_MSG_CHANNEL_OPEN_FAILURE) + pack_uint32(sender)
+                    + pack_uint32(1) + pack_string("nope") + pack_string("")
+                )
+                return
+            self.push(
+                pack_byte(SSH_MSG_CHANNEL_OPEN_CONFIRMATION) + pack_uint32(sender)
+                + pack_uint32(100 + sender) + pack_uint32(self.window)
+                + pack_uint32(self.max_packet)
+            )
+        elif payload[0] == SSH_MSG_CHANNEL_REQUEST:
+            recipient = reader.read_uint32()
+            request_type = reader.read_text()
+            reader.read_boolean()
+            local_id = recipient - 100
+            self.push(pack_byte(SSH_MSG_CHANNEL_SUCCESS) + pack_uint32(local_id))
+            if request_type == "exec":
+                command = reader.read_string()
+                self.push(
+                    pack_byte(SSH_MSG_CHANNEL_DATA) + pack_uint32(local_id)
+                    + pack_string(b"out:" + command)
+                )
+                self.push(
+                    pack_byte(SSH_MSG_CHANNEL_REQUEST) + pack_uint32(local_id)
+                    + pack_string("exit-status") + pack_boolean(False) + pack_uint32(3)
+                )
+                self.push(pack_byte(SSH_MSG_CHANNEL_EOF) + pack_uint32(local_id))
+                self.push(pack_byte(SSH_MSG_CHANNEL_CLOSE) + pack_uint32(local_id))
+        elif payload[0] == SSH_MSG_CHANNEL_DATA:
+            recipient = reader.read_uint32()
+            data = reader.read_string()
+            self.received_data.setdefault(recipient, bytearray()).extend(data)
+        elif payload[0] == SSH_MSG_GLOBAL_REQUEST:
+            self.push(pack_byte(SSH_MSG_REQUEST_SUCCESS) + pack_uint32(2222))
+
+
+class TestChannelManager(unittest.TestCase):
+    def setUp(self):
+        self.peer = ScriptedPeer()
+        self.manager = ChannelManager(self.peer)
+
+    def test_exec_reads_output_and_exit_status(self):
+        channel = self.manager.open_session()
+        channel.exec_command("uptime")
+
+        self.assertEqual(channel.recv(), b"out:uptime")
+        self.assertEqual(channel.recv(), b"")
+        self.assertEqual(channel.recv_exit_status(), 3)
+        self.assertTrue(channel.closed)
+        self.assertNotIn(channel.local_id, self.manager.channels)
+
+    def test_send_buffers_and_recv_into(self):
+        channel = self.manager.open_session()
+        channel.send_buffers([b"head", memoryview(b"--body--")[2:6]])
+        channel.exec_command("ls")
+        target = bytearray(32)
+
+        count = channel.recv_into(memoryview(target)[4:])
+
+        self.assertEqual(bytes(self.peer.received_data[channel.remote_id]), b"headbody")
+        self.assertEqual(bytes(target[4 : 4 + count]), b"out:ls")
+
+    def test_open_failure(self):
+        with self.assertRaises(ChannelOpenError) as context:
+            self.manager.open_channel("forbidden")
+
+        self.assertEqual(context.exception.reason_code, 1)
+        self.assertEqual(self.manager.channels, {})
+
+    def test_send_respects_window_and_max_packet(self):
+        self.peer.window, self.peer.max_packet = 100, 40
+        channel = self.manager.open_session()
+        sender = threading.Thread(target=channel.send, args=(b"x" * 250,))
+        sender.start()
+
+        deadline = time.monotonic() + 5
+        while len(self.peer.data_packets()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sizes = [MessageReader(p, 5).read_uint32() for p in self.peer.data_packets()]
+        self.assertEqual(sizes, [40, 40, 20])
+
+        self.peer.push(
+            pack_byte(SSH_MSG_CHANNEL_WINDOW_ADJUST) + pack_uint32(channel.local_id)
+            + pack_uint32(1000)
+        )
+        sender.join(5)
+
+        self.assertFalse(sender.is_alive())
+        self.assertEqual(bytes(self.peer.received_data[channel.remote_id]), b"x" * 250)
+
+    def test_round_robin_between_channels(self):
+        bulk = self.manager.open_session()
+        interactive = self.manager.open_session()
+        self.manager._enqueue(bulk, memoryview(b"b" * 100000))
+        self.manager._enqueue(interactive, memoryview(b"i"))
+
+        self.manager.flush()
+
+        recipients = [MessageReader(p, 1).read_uint32() for p in self.peer.data_packets()]
+        self.assertEqual(recipients[:2], [bulk.remote_id, interactive.remote_id])
+
+    def test_window_adjust_after_threshold(self):
+        manager = ChannelManager(self.peer, window_size=100, window_adjust_threshold=0.5)
+        channel = manager.open_session()
+        for _ in range(3):
+            self.peer.push(
+                pack_byte(SSH_MSG_CHANNEL_DATA) + pack_uint32(channel.local_id)
+                + pack_string(b"z" * 30)
+            )
+
+        channel.recv(30)
+        self.assertFalse([p for p in self.peer.sent if p[0] == SSH_MSG_CHANNEL_WINDOW_ADJUST])
+        channel.recv(30)
+
+        adjusts = [p for p in self.peer.sent if p[0] == SSH_MSG_CHANNEL_WINDOW_ADJUST]
+        self.assertEqual(len(adjusts), 1)
+        self.assertEqual(MessageReader(adjusts[0], 5).read_uint32(), 60)
+        self.assertEqual(channel.local_window, 100)
+
+    def test_server_initiated_channel(self):
+        accepted = []
+        self.manager.register_open_handler(
+            "forwarded-tcpip", lambda channel, reader: accepted.append(channel)
+        )
+        for channel_type in ("x11", "forwarded-tcpip"):
+            self.peer.push(
+                pack_byte(SSH_MSG_CHANNEL_OPEN) + pack_string(channel_type)
+                + pack_uint32(7) + pack_uint32(1000) + pack_uint32(100)
+            )
+            self.manager.process_packet()
+
+        replies = [p[0] for p in self.peer.sent]
+        self.assertEqual(
+            replies, [SSH_MSG_CHANNEL_OPEN_FAILURE, SSH_MSG_CHANNEL_OPEN_CONFIRMATION]
+        )
+        self.assertEqual(accepted[0].remote_id, 7)
+
+    def test_global_request(self):
+        reader = self.manager.global_request("tcpip-forward", b"")
+
+        self.assertEqual(reader.read_uint32(), 2222)
+
+    def test_transport_failure_wakes_waiters(self):
+        channel = self.manager.open_session()
+        self.peer.read_packet = MagicMock(side_effect=ConnectionError("reset"))
+
+        with self.assertRaises(ConnectionError):
+            channel.recv()
+        self.assertEqual(channel.recv(), b"")
+
+
+class PeerTransport(ScriptedPeer):
+    """ScriptedPeer with the Transport surface the executor uses."""
+
+    def __init__(self):
+        super().__init__()
+        self.channel_manager = ChannelManager(self)
+        self.closed = False
+
+    def open_session(self, timeout=None):
+        return self.channel_manager.open_session(timeout=timeout)
+
+    def close(self):
+        self.closed = True
+
+
+class StderrFloodPeer(PeerTransport):
+    """Answers exec with ``total`` bytes of stderr, within the window, then stdout."""
+
+    def __init__(self, total, window=4096):
+        super().__init__()
+        self.channel_manager = ChannelManager(self, window_size=window)
+        self.pending = total
+        self.client_window = window
+        self.local_id = None
+
+    def respond(self, payload):
+        reader = MessageReader(payload, 1)
+        if payload[0] == SSH_MSG_CHANNEL_REQUEST:
+            self.local_id = reader.read_uint32() - 100
+            self.push(pack_byte(SSH_MSG_CHANNEL_SUCCESS) + pack_uint32(self.local_id))
+            self.flood()
+        elif payload[0] == SSH_MSG_CHANNEL_WINDOW_ADJUST:
+            reader.read_uint32()
+            self.client_window += reader.read_uint32()
+            self.flood()
+        else:
+            super().respond(payload)
+
+    def flood(self):
+        while self.pending and self.client_window:
+            size = min(self.pending, self.client_window, 1024)
+            self.push(
+                pack_byte(SSH_MSG_CHANNEL_EXTENDED_DATA) + pack_uint32(self.local_id)
+                + pack_uint32(1) + pack_string(b"e" * size)
+            )
+            self.pending -= size
+            self.client_window -= size
+            if not self.pending:
+                self.push(
+                    pack_byte(SSH_MSG_CHANNEL_DATA) + pack_uint32(self.local_id)
+                    + pack_string(b"done")
+                )
+                self.push(pack_byte(SSH_MSG_CHANNEL_EOF) + pack_uint32(self.local_id))
+                self.push(pack_byte(SSH_MSG_CHANNEL_CLOSE) + pack_uint32(self.local_id))
+
+
+class TestParallelExecutor(unittest.TestCase):
+    def test_run_command_collects_output(self):
+        exit_status, stdout, stderr = run_command(PeerTransport(), "uptime", timeout=5)
+
+        self.assertEqual((exit_status, stdout, stderr), (3, b"out:uptime", b""))
+
+    def test_stderr_larger_than_window_before_stdout(self):
+        peer = StderrFloodPeer(total=100_000)
+
+        _, stdout, stderr = run_command(peer, "noisy", timeout=5)
+
+        self.assertEqual((stdout, len(stderr)), (b"done", 100_000))
+
+    def test_interrupt_propagates_and_closes_transport(self):
+        transport = PeerTransport()
+
+        def factory(host, port, username, timeout):
+            return transport
+
+        executor = ParallelExecutor(connection_factory=factory)
+        with patch(
+            "src.session.executor.run_command", side_effect=KeyboardInterrupt
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                executor._run_host("host", 22, "user", "uptime")
+        self.assertTrue(transport.closed)
+
+    def test_results_stream_in_completion_order(self):
+        release = threading.Event()
+
+        def factory(host, port, username, timeout):
+            if host == "slow":
+                release.wait(5)
+            return PeerTransport()
+
+        results = ParallelExecutor(concurrency=2, connection_factory=factory).run(
+            ["slow", "fast"], "uptime"
+        )
+        first = next(results)
+        release.set()
+        second = next(results)
+
+        self.assertEqual((first.host, second.host), ("fast", "slow"))
+        self.assertEqual(first.stdout, b"out:uptime")
+        self.assertEqual(list(results), [])
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def factory(host, port, username, timeout):
+            with lock:
+                active.append(host)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(host)
+            return PeerTransport()
+
+        executor = ParallelExecutor(concurrency=3, connection_factory=factory)
+        results = list(executor.run([f"host{i}" for i in range(12)], "true"))
+
+        self.assertEqual(len(results), 12)
+        self.assertLessEqual(max(peak), 3)
+
+    def test_failures_are_reported_not_raised(self):
+        transports = []
+
+        def factory(host, port, username, timeout):
+            if host == "down":
+                raise ConnectionRefusedError("refused")
+            transports.append(PeerTransport())
+            return transports[-1]
+
+        executor = ParallelExecutor(connection_factory=factory)
+        results = {r.host: r for r in executor.run(["down", ("up", 2222)], "true")}
+
+        self.assertIn("ConnectionRefusedError", results["down"].error)
+        self.assertEqual(results["up"].port, 2222)
+        self.assertEqual(results["up"].exit_status, 3)
+        self.assertFalse(results["up"].ok)
+        self.assertTrue(transports[0].closed)
+
+    def test_per_host_username(self):
+        users = {}
+
+        def factory(host, port, username, timeout):
+            users[host] = username
+            return PeerTransport()
+
+        executor = ParallelExecutor(connection_factory=factory)
+        list(executor.run(["a", ("b", 22), ("c", 22, "deploy")], "true", "root"))
+
+        self.assertEqual(users, {"a": "root", "b": "root", "c": "deploy"})
+
+    def test_summary_percentiles(self):
+        summary = ExecutionSummary()
+        for duration in range(1, 101):
+            status = 0 if duration > 10 else 1
+            summary.add(HostResult("h", 22, status, duration=float(duration)))
+
+        stats = summary.as_dict()
+        self.assertEqual((stats["succeeded"], stats["failed"]), (90, 10))
+        self.assertEqual((stats["p50"], stats["p90"], stats["p99"]), (50.0, 90.0, 99.0))
+        self.assertEqual(stats["max"], 100.0)
+        self.assertIsNone(percentile([], 0.5))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRecording(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "session.sshrec")
+        self.clock = FakeClock()
+
+    def record_lines(self, count, chunk_size=512, **options):
+        recorder = SessionRecorder(
+            self.path, {"host": "web-1"}, chunk_size=chunk_size, clock=self.clock
+        )
+        for i in range(count):
+            self.clock.now = float(i)
+            recorder.record(OUTPUT, b"line %d\r\n" % i)
+        return recorder
+
+    def test_seek_reads_from_the_index(self):
+        self.record_lines(1000).close()
+
+        with RecordingReader(self.path) as recording:
+            self.assertEqual(recording.metadata["host"], "web-1")
+            self.assertGreater(len(recording.chunks), 10)
+            self.assertEqual(recording.duration, 999.0)
+
+            events = list(recording.events(start=500, end=502))
+            self.assertEqual(
+                [e.data for e in events],
+                [b"line 500\r\n", b"line 501\r\n", b"line 502\r\n"],
+            )
+            # 앞쪽 청크는 읽지 않음
+            self.assertLessEqual(recording._chunk.cache_info().misses, 2)
+
+    def test_search_spans_events(self):
+        self.record_lines(300).close()
+
+        with RecordingReader(self.path) as recording:
+            self.assertEqual(recording.search(b"line 42\r"), [42.0])
+            self.assertEqual(recording.search(b"\nline 250"), [249.0])
+
+    def test_unfinished_recording_is_readable(self):
+        self.record_lines(1000).close()
+        with RecordingReader(self.path) as recording:
+            last = recording.chunks[-1]
+        # 인덱스가 없고 마지막 청크가 잘린 파일 (기록 중 종료)
+        with open(self.path, "r+b") as f:
+            f.truncate(last.offset + 10)
+
+        with RecordingReader(self.path) as recording:
+            self.assertEqual(recording.chunks[-1].last_time, last.first_time - 1)
+            self.assertEqual(next(recording.events(10)).data, b"line 10\r\n")
+
+    def test_screen_at_starts_from_snapshot(self):
+        recorder = SessionRecorder(
+            self.path, {"columns": 20, "rows": 3}, chunk_size=256, clock=self.clock
+        )
+        terminal = TerminalEmulator(20, 3)
+        for i in range(200):
+            self.clock.now = float(i)
+            data = b"\x1b[1mrow\x1b[0m %d\r\n" % i
+            terminal.feed(data)
+            recorder.record(OUTPUT, data)
+            if i == 150:
+                recorder.record_snapshot(terminal.screen)
+        recorder.close()
+
+        with RecordingReader(self.path) as recording:
+            screen = recording.screen_at(160.5)
+            self.assertEqual(screen.display, ["row 159", "row 160", ""])
+            self.assertTrue(screen.cell(0, 0).attrs & 1)
+            self.assertLess(
+                recording._chunk.cache_info().misses, len(recording.chunks) // 2
+            )
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        recorder = SessionRecorder(self.path, queue_size=2, clock=self.clock)
+        release = threading.Event()
+        add = recorder._add
+
+        def slow_add(event):
+            release.wait(5)
+            add(event)
+
+        recorder._add = slow_add
+        started = time.monotonic()
+        results = [recorder.record(INPUT, b"x") for _ in range(10)]
+        self.assertLess(time.monotonic() - started, 1)
+        release.set()
+        recorder.close()
+
+        self.assertGreater(recorder.dropped, 0)
+        self.assertEqual(results.count(False), recorder.dropped)
+        with RecordingReader(self.path) as recording:
+            streams = [event.stream for event in recording.events()]
+        self.assertIn(GAP, streams)
+
+
+def tcp_server(handle):
+    """Listening socket on a free port; each connection gets its own thread."""
+    listener = socket.create_server(("127.0.0.1", 0), backlog=512)
+
+    def serve():
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return listener
+
+
+def wait_until(predicate, timeout=5):
+    """Poll ``predicate`` until it holds or ``timeout`` runs out; returns its value."""
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def echo(connection):
+    with connection:
+        while data := connection.recv(65536):
+            connection.sendall(data)
+
+
+def round_trip(port, data):
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as client:
+        received = bytearray()
+
+        def read():
+            while chunk := client.recv(65536):
+                received.extend(chunk)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        client.sendall(data)
+        client.shutdown(socket.SHUT_WR)
+        reader.join()
+    return bytes(received)
+
+
+class TestPortForwarder(unittest.TestCase):
+    def setUp(self):
+        self.threads_before = set(threading.enumerate())
+        self.target = tcp_server(echo)
+        self.target_port = self.target.getsockname()[1]
+        self.server = LoopbackServerThread().start()
+        self.transport = connect(self.server)
+        self.forwarder = PortForwarder(self.transport)
+
+    def tearDown(self):
+        self.forwarder.close()
+        self.transport.close()
+        self.server.close()
+        self.target.close()
+
+    def test_local_forward_many_connections(self):
+        port = self.forwarder.forward_local(0, "127.0.0.1", self.target_port)
+        payloads = [os.urandom(20_000 + i) for i in range(100)]
+        results = [None] * len(payloads)
+        seen = set()
+
+        def run(i):
+            results[i] = round_trip(port, payloads[i])
+            seen.update(threading.enumerate())
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(100)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, payloads)
+        # 한 transport 위에서 중계 스레드 하나로 처리 (연결마다 스레드를 만들지 않음)
+        forwarder_threads = sorted(
+            thread.name
+            for thread in seen - self.threads_before
+            if thread.name.startswith("port-forward")
+        )
+        self.assertEqual(
+            forwarder_threads, ["port-forward-reader", "port-forward-relay"]
+        )
+        # 채널은 상대의 CLOSE 가 도착해야 정리됨
+        channels = self.transport.channel_manager.channels
+        self.assertTrue(
+            wait_until(lambda: not channels and not self.forwarder.connections)
+        )
+
+    def test_remote_forward(self):
+        lookups = []
+        getaddrinfo = socket.getaddrinfo
+
+        def recording_getaddrinfo(*args, **kwargs):
+            lookups.append(threading.current_thread().name)
+            return getaddrinfo(*args, **kwargs)
+
+        with patch("socket.getaddrinfo", recording_getaddrinfo):
+            port = self.forwarder.forward_remote(0, "127.0.0.1", self.target_port)
+            data = os.urandom(1_000_000)
+
+            self.assertEqual(round_trip(port, data), data)
+        # 대상 주소는 forward_remote 에서 한 번만 풀고 중계 스레드는 DNS 를 기다리지 않음
+        self.assertNotIn("port-forward-relay", lookups)
+
+        self.forwarder.cancel_remote(port)
+        time.sleep(0.1)
+        with self.assertRaises(OSError):
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+
+    def test_slow_reader_is_held_back_by_the_window(self):
+        size = 32 * 1024 * 1024
+
+        def flood(connection):
+            with connection:
+                connection.sendall(bytes(size))
+
+        source = tcp_server(flood)
+        port = self.forwarder.forward_local(
+            0, "127.0.0.1", source.getsockname()[1]
+        )
+        with socket.create_connection(("127.0.0.1", port), timeout=10) as client:
+            time.sleep(0.5)
+            (channel,) = self.transport.channel_manager.channels.values()
+            self.assertLessEqual(len(channel._stdout), channel.local_window_size)
+
+            total = 0
+            while data := client.recv(1 << 20):
+                total += len(data)
+        source.close()
+        self.assertEqual(total, size)
+
+    def test_unreachable_target_closes_local_connection(self):
+        unused = socket.create_server(("127.0.0.1", 0))
+        closed_port = unused.getsockname()[1]
+        unused.close()
+        port = self.forwarder.forward_local(0, "127.0.0.1", closed_port)
+
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as client:
+            self.assertEqual(client.recv(1), b"")
+
+    def test_parse_forward_spec(self):
+        self.assertEqual(
+            parse_forward_spec("8080:db:5432"), ("", 8080, "db", 5432)
+        )
+        self.assertEqual(
+            parse_forward_spec("[::1]:8080:10.0.0.5:80"),
+            ("::1", 8080, "10.0.0.5", 80),
+        )
+        with self.assertRaises(ValueError):
+            parse_forward_spec("8080:db")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import tempfile
+import unittest
+from src.benchmarks.bench_transport import connect
+from src.benchmarks.loopback_server import LoopbackServerThread
+from src.session.connection_pool import ConnectionPool
+from src.session.recording import INPUT, RESIZE, RecordingReader
+from src.shell.shell_manager import ShellManager, render_damage
+from src.shell.terminal_emulator import BOLD, Screen, TerminalEmulator
+
+
+class TestTerminalEmulator(unittest.TestCase):
+    def setUp(self):
+        self.replies = []
+        self.terminal = TerminalEmulator(20, 5, scrollback=3, write=self.replies.append)
+        self.screen = self.terminal.screen
+
+    def test_text_wrap_and_newlines(self):
+        self.terminal.feed(b"hello\r\n" + b"x" * 25)
+
+        self.assertEqual(self.screen.display[:3], ["hello", "x" * 20, "x" * 5])
+        self.assertTrue(self.screen.lines[1].wrapped)
+        self.assertEqual((self.screen.x, self.screen.y), (5, 2))
+
+    def test_split_chunks_match_whole_feed(self):
+        data = (
+            "\x1b[2J\x1b[H\x1b[1;31m빨강\x1b[0m plain\r\n"
+            "\x1b]0;my title\x07\x1b[3;5Habc\x1b[?25l"
+        ).encode()
+        whole = TerminalEmulator(20, 5)
+        whole.feed(data)
+        for byte in data:
+            self.terminal.feed(bytes([byte]))
+
+        self.assertEqual(self.screen.display, whole.screen.display)
+        self.assertEqual(self.screen.title, "my title")
+        self.assertFalse(self.screen.cursor_visible)
+        self.assertEqual(self.screen.display[0], "빨강 plain")
+
+    def test_wide_characters_take_two_cells(self):
+        self.terminal.feed("한글ab".encode())
+
+        self.assertEqual(self.screen.x, 6)
+        self.assertEqual(self.screen.cell(0, 1).char, "")
+        self.terminal.feed(b"\x1b[2Gz")
+        self.assertEqual(self.screen.display[0], " z글ab")
+
+    def test_graphic_rendition(self):
+        self.terminal.feed(b"\x1b[1;38;5;196;44mX\x1b[0mY")
+
+        cell = self.screen.cell(0, 0)
+        self.assertTrue(cell.attrs & BOLD)
+        self.assertEqual((cell.fg, cell.bg), (196, 4))
+        self.assertEqual(self.screen.cell(0, 1).fg, None)
+
+    def test_erase_and_edit(self):
+        self.terminal.feed(b"abcdef\x1b[3G\x1b[2P\r\n123456\x1b[1;2H\x1b[K")
+        self.terminal.feed(b"\x1b[2;3H\x1b[2@")
+
+        self.assertEqual(self.screen.display[:2], ["a", "12  3456"])
+
+    def test_scrolling_region_and_line_editing(self):
+        self.terminal.feed(b"1\r\n2\r\n3\r\n4\r\n5")
+        self.terminal.feed(b"\x1b[2;4r\x1b[4H\n")
+        self.assertEqual(self.screen.display, ["1", "3", "4", "", "5"])
+
+        self.terminal.feed(b"\x1b[2H\x1b[L")
+        self.assertEqual(self.screen.display, ["1", "", "3", "4", "5"])
+        self.assertEqual(list(self.screen.history), [])
+
+    def test_scrollback_is_capped(self):
+        self.terminal.feed(b"".join(b"line %d\r\n" % i for i in range(100)))
+
+        self.assertEqual(
+            [line.text for line in self.screen.history],
+            ["line 93", "line 94", "line 95"],
+        )
+        self.assertEqual(len(self.screen.history[0].chars), len("line 93"))
+
+    def test_alternate_screen_restores_main(self):
+        self.terminal.feed(b"main\x1b[?1049h\x1b[2J\x1b[Hfull screen app")
+        self.assertEqual(self.screen.display[0], "full screen app")
+
+        self.terminal.feed(b"\x1b[?1049l")
+        self.assertEqual(self.screen.display[0], "main")
+        self.assertEqual(self.screen.x, 4)
+
+    def test_damage_covers_only_changed_rows(self):
+        self.screen.damage()
+        self.terminal.feed(b"\x1b[3Hchanged")
+        self.assertEqual(self.screen.damage(), [2])
+        self.assertEqual(self.screen.damage(), [])
+
+        frame = render_damage(self.screen)
+        self.assertNotIn("changed", frame)
+        self.assertIn("\x1b[3;8H", frame)
+
+    def test_device_status_report(self):
+        self.terminal.feed(b"\x1b[2;3H\x1b[6n")
+
+        self.assertEqual(self.replies, [b"\x1b[2;3R"])
+
+    def test_resize_keeps_cursor_line(self):
+        screen = Screen(10, 4)
+        for row, text in enumerate(["a", "b", "c"]):
+            screen.cursor_position(row + 1, 1)
+            screen.draw(text)
+
+        screen.resize(5, 2)
+
+        self.assertEqual(screen.display, ["b", "c"])
+        self.assertEqual([line.text for line in screen.history], ["a"])
+        self.assertEqual(screen.y, 1)
+
+    def test_malformed_input_is_bounded(self):
+        self.terminal.feed(b"\x1b[" + b"9" * 10000 + b"A\x1b]0;" + b"t" * 100000)
+        self.terminal.feed(b"\x07ok")
+
+        self.assertEqual(self.screen.display[0], "ok")
+        self.assertLessEqual(len(self.screen.title), 4096)
+
+
+class TestShellManager(unittest.TestCase):
+    def test_shell_round_trip(self):
+        with LoopbackServerThread() as server:
+            pool = ConnectionPool(connection_factory=lambda *key: connect(server))
+            manager = ShellManager(pool)
+            try:
+                shell = manager.open_shell(
+                    "127.0.0.1", server.port, columns=40, rows=10
+                )
+                # 루프백 서버의 shell 은 입력을 그대로 돌려줌
+                shell.send_keys("\x1b[2J\x1b[Hprompt$ \x1b[32mok\x1b[0m\r\n")
+                shell.expect("prompt$ ok")
+                self.assertEqual(shell.screen.cell(0, 8).fg, 2)
+
+                shell.resize(30, 5)
+                shell.send_keys("after resize")
+                shell.expect("after resize")
+                self.assertEqual(shell.screen.columns, 30)
+            finally:
+                manager.close()
+
+    def test_recorded_shell_replays(self):
+        path = os.path.join(tempfile.mkdtemp(), "shell.sshrec")
+        with LoopbackServerThread() as server:
+            pool = ConnectionPool(connection_factory=lambda *key: connect(server))
+            manager = ShellManager(pool)
+            try:
+                shell = manager.open_shell(
+                    "127.0.0.1", server.port, columns=40, rows=10, record=path
+                )
+                shell.send_keys("first\r\n")
+                shell.expect("first")
+                shell.resize(30, 5)
+                shell.send_keys("second")
+                shell.expect("second")
+                manager.close_shell(shell)
+            finally:
+                manager.close()
+
+        with RecordingReader(path) as recording:
+            self.assertEqual(recording.metadata["columns"], 40)
+            streams = {event.stream for event in recording.events()}
+            self.assertTrue({INPUT, RESIZE} <= streams)
+            screen = recording.screen_at(recording.duration)
+            self.assertEqual(screen.display, ["first", "second", "", "", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
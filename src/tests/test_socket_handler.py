@@ -4,6 +4,7 @@ from unittest.mock import patch, MagicMock
 from src.network.socket_handler import SocketHandler
 from src.config.config import Config
 
+
 # give when then
 class TestSocketHandler(unittest.TestCase):
 
@@ -73,6 +74,19 @@ class TestSocketHandler(unittest.TestCase):
         with self.assertRaises(socket.error):
             self.handler.receive()
 
+    @patch("socket.socket")
+    def test_receive_into_success(self, mock_socket):
+        mock_socket_instance = MagicMock()
+        mock_socket_instance.recv_into.return_value = 4
+        mock_socket.return_value = mock_socket_instance
+        buffer = bytearray(16)
+
+        self.handler.connect(Config.SERVER_HOST, Config.SERVER_PORT)
+        received = self.handler.receive_into(buffer)
+
+        self.assertEqual(received, 4)
+        mock_socket_instance.recv_into.assert_called_once_with(buffer, 0)
+
     @patch("socket.socket")
     def test_close(self, mock_socket):
         mock_socket_instance = MagicMock()
@@ -83,6 +97,108 @@ class TestSocketHandler(unittest.TestCase):
 
         mock_socket_instance.close.assert_called_once()
 
+    @patch("socket.socket")
+    def test_connect_sets_socket_options(self, mock_socket):
+        mock_socket_instance = MagicMock()
+        mock_socket.return_value = mock_socket_instance
+        handler = SocketHandler(send_buffer_size=1 << 20, receive_buffer_size=1 << 21)
+
+        handler.connect(Config.SERVER_HOST, Config.SERVER_PORT)
+
+        mock_socket_instance.setsockopt.assert_any_call(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20
+        )
+        mock_socket_instance.setsockopt.assert_any_call(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 21
+        )
+        mock_socket_instance.setsockopt.assert_any_call(
+            socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+        )
+
+
+class TestSendCoalescing(unittest.TestCase):
+    def make_handler(self, **options):
+        handler = SocketHandler(**options)
+        handler.socket, self.peer = socket.socketpair()
+        self.addCleanup(self.peer.close)
+        self.addCleanup(lambda: handler.socket and handler.close())
+        self.peer.settimeout(5)
+        return handler
+
+    def read_exactly(self, size):
+        data = b""
+        while len(data) < size:
+            data += self.peer.recv(size - len(data))
+        return data
+
+    def test_queued_packets_leave_in_one_sendmsg(self):
+        handler = self.make_handler(coalesce_bytes=1024, coalesce_delay=10)
+        handler.socket = MagicMock(wraps=handler.socket)
+
+        for i in range(5):
+            handler.queue(b"packet%d;" % i)
+        handler.socket.sendmsg.assert_not_called()
+        handler.send(b"last")
+
+        handler.socket.sendmsg.assert_called_once()
+        handler.socket.sendall.assert_not_called()
+        expected = b"".join(b"packet%d;" % i for i in range(5)) + b"last"
+        self.assertEqual(self.read_exactly(len(expected)), expected)
+
+    def test_flush_on_size(self):
+        handler = self.make_handler(coalesce_bytes=16, coalesce_delay=10)
+
+        handler.queue(b"a" * 10)
+        handler.queue(b"b" * 10)
+
+        self.assertEqual(self.read_exactly(20), b"a" * 10 + b"b" * 10)
+
+    def test_flush_after_delay(self):
+        handler = self.make_handler(coalesce_bytes=1024, coalesce_delay=0.01)
+
+        handler.queue(bytearray(b"window adjust"))
+
+        self.assertEqual(self.read_exactly(13), b"window adjust")
+
+    def test_receive_flushes_queue_first(self):
+        handler = self.make_handler(coalesce_bytes=1024, coalesce_delay=10)
+        handler.queue(b"request")
+        self.peer.sendall(b"reply")
+
+        self.assertEqual(handler.receive(5), b"reply")
+        self.assertEqual(self.read_exactly(7), b"request")
+
+    def test_send_buffers_handles_partial_writes(self):
+        handler = self.make_handler()
+        handler.socket = MagicMock(wraps=handler.socket)
+        sent = []
+
+        def short_sendmsg(buffers):
+            # 한 번에 최대 3바이트만 쓰는 소켓
+            data = b"".join(bytes(b) for b in buffers)[:3]
+            sent.append(data)
+            return len(data)
+
+        handler.socket.sendmsg.side_effect = short_sendmsg
+        handler.send_buffers([b"ab", memoryview(b"cdef"), b"", b"g"])
+
+        self.assertEqual(b"".join(sent), b"abcdefg")
+
+    def test_failed_delayed_flush_fails_later_sends(self):
+        handler = self.make_handler(coalesce_bytes=1024, coalesce_delay=0.01)
+        handler.socket = MagicMock(wraps=handler.socket)
+        handler.socket.sendmsg.side_effect = socket.timeout("timed out")
+
+        handler.queue(b"encrypted packet")
+        handler._flusher.join(5)
+
+        # 빠진 패킷 뒤로 이어서 보내면 상대는 MAC 오류로 끊으므로 보내지 않음
+        with self.assertRaises(socket.timeout):
+            handler.send(b"next packet")
+        with self.assertRaises(socket.timeout):
+            handler.receive(5)
+        handler.socket.sendall.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
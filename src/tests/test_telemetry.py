@@ -0,0 +1,129 @@
+import asyncio
+import gc
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+from src.network.packet_manager import PacketManager
+from src.tests.test_network import fake_ssh_server, make_connection
+from src.utils import telemetry
+
+
+class RecordedSpan:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.status = None
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def set_status(self, status):
+        self.status = status
+
+    def record_exception(self, error):
+        self.attributes["exception"] = repr(error)
+
+    def end(self):
+        self.ended = True
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes=None):
+        span = RecordedSpan(name, attributes)
+        self.spans.append(span)
+        return span
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = self.start_span(name, attributes)
+        try:
+            yield span
+        finally:
+            span.end()
+
+
+class TestTrafficMetrics(unittest.TestCase):
+    def observe(self, sent, received):
+        return {
+            o.attributes["direction"]: o.value
+            for o in telemetry._observe(sent, received)(None)
+        }
+
+    def test_packet_counts_survive_closed_connections(self):
+        before = self.observe("packets_sent", "packets_received")
+        sender, receiver = PacketManager(), PacketManager()
+        sender.set_encryption(b"\x01" * 16, b"\x02" * 32)
+        receiver.set_encryption(b"\x01" * 16, b"\x02" * 32)
+
+        wire = 0
+        for payload in (b"a", b"b" * 100):
+            packet = sender.create_packet(payload)
+            wire += len(packet)
+            receiver.parse_packet(packet)
+        segments = sender.create_packets([b"c", b"d"])
+
+        self.assertEqual(sender.stats.packets_sent, 4)
+        self.assertEqual(receiver.stats.packets_received, 2)
+        self.assertEqual(receiver.stats.bytes_received, wire)
+        self.assertEqual(sender.stats.bytes_sent, wire + sum(len(s) for s in segments))
+        del sender, receiver
+        gc.collect()
+
+        after = self.observe("packets_sent", "packets_received")
+        self.assertEqual(after["sent"] - before["sent"], 4)
+        self.assertEqual(after["received"] - before["received"], 2)
+
+    def test_handshake_phase_histogram(self):
+        histogram = MagicMock()
+        with patch.object(telemetry, "handshake_duration", histogram):
+            with telemetry.span("ssh.tcp_connect", phase="tcp"):
+                pass
+            with self.assertRaises(ConnectionError):
+                with telemetry.span("ssh.key_exchange", phase="key_exchange"):
+                    raise ConnectionError("reset")
+
+        phases = [c.args[1]["ssh.phase"] for c in histogram.record.call_args_list]
+        self.assertEqual(phases, ["tcp", "key_exchange"])
+
+
+class TestHandshakeSpans(unittest.IsolatedAsyncioTestCase):
+    async def test_connect_spans(self):
+        server = await asyncio.start_server(fake_ssh_server, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        tracer = RecordingTracer()
+
+        with patch.object(telemetry, "tracer", tracer):
+            connection = make_connection(port)
+            await connection.connect(timeout=5)
+            await connection.close()
+        server.close()
+        await server.wait_closed()
+
+        spans = {span.name: span for span in tracer.spans}
+        self.assertEqual(
+            [span.name for span in tracer.spans],
+            [
+                "ssh.connect",
+                "ssh.tcp_connect",
+                "ssh.version_exchange",
+                "ssh.key_exchange",
+            ],
+        )
+        self.assertTrue(all(span.ended for span in tracer.spans))
+        self.assertEqual(spans["ssh.connect"].attributes["net.peer.port"], port)
+        self.assertEqual(
+            spans["ssh.version_exchange"].attributes["ssh.server_version"],
+            "SSH-2.0-OpenSSH_9.6",
+        )
+        self.assertIn("ssh.kex", spans["ssh.key_exchange"].attributes)
+
+
+if __name__ == "__main__":
+    unittest.main()
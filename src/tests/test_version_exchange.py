@@ -2,7 +2,7 @@
 
 import unittest
 from unittest.mock import Mock, patch
-from src.network.version_exchange import VersionExchange
+from src.network.version_exchange import BannerReader, VersionExchange
 
 
 class TestVersionExchange(unittest.TestCase):
@@ -66,6 +66,45 @@ class TestVersionExchange(unittest.TestCase):
         mock_socket.send.assert_called_once_with(b"SSH-2.0-PythonSSHClient_1.0\r\n")
         self.assertEqual(server_version, "SSH-2.0-OpenSSH_8.2p1")
 
+    def test_kexinit_sent_with_banner(self):
+        self.mock_socket_handler.receive.return_value = b"SSH-2.0-OpenSSH_9.6\r\n"
+        self.mock_packet_manager.create_packet.return_value = b"<kexinit packet>"
+
+        self.version_exchange.exchange_versions(b"\x14kexinit")
+
+        self.mock_packet_manager.create_packet.assert_called_once_with(b"\x14kexinit")
+        self.mock_socket_handler.send.assert_called_once_with(
+            b"SSH-2.0-PythonSSHClient_1.0\r\n<kexinit packet>"
+        )
+
+
+class TestBannerReader(unittest.TestCase):
+    def test_split_banner_and_pre_banner_lines(self):
+        reader = BannerReader()
+
+        for chunk in (b"Welcome\r\nauthorized use ", b"only\r\nSSH-2.0-Op", b"enSSH"):
+            reader.feed(chunk)
+            self.assertIsNone(reader.next_banner())
+        reader.feed(b"_9.6\r\n\x00\x00\x01\x0c")
+
+        self.assertEqual(reader.next_banner(), "SSH-2.0-OpenSSH_9.6")
+        self.assertEqual(reader.pre_banner, ["Welcome", "authorized use only"])
+        self.assertEqual(reader.excess, b"\x00\x00\x01\x0c")
+
+    def test_binary_data_before_banner(self):
+        reader = BannerReader()
+        reader.feed(b"\x00\x00\x01\x0c\x0a\x14")
+
+        with self.assertRaises(ValueError):
+            reader.next_banner()
+
+    def test_unterminated_banner_too_long(self):
+        reader = BannerReader()
+        reader.feed(b"SSH-2.0-" + b"X" * 300)
+
+        with self.assertRaises(ValueError):
+            reader.next_banner()
+
 
 if __name__ == "__main__":
     unittest.main()
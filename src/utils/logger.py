@@ -1,5 +1,10 @@
+import atexit
+import itertools
 import logging
-import colorlog
+import logging.handlers
+import queue
+import threading
+from src.config.config import Config
 
 # 이전 Code
 # class Logger:
@@ -28,37 +33,142 @@ import colorlog
 
 
 class Logger:
+    """
+    Module loggers sharing one background writer.
+
+    Every logger gets the same QueueHandler; a single QueueListener thread
+    formats records for the console and ``ssh_client.log``, so socket
+    threads never wait on terminal or file I/O. The writer thread, colorlog
+    and the log file are only set up when the first record is emitted, so
+    a run that logs nothing starts none of them.
+    """
+
+    _queue_handler = None
+    _listener = None
+    _started = False
+    _lock = threading.Lock()
+
     @staticmethod
     def get_logger(name):
-        logger = colorlog.getLogger(name)
+        logger = logging.getLogger(name)
         if not logger.handlers:
-            logger.setLevel(logging.DEBUG)
-
-            # Console handler
-            console_handler = colorlog.StreamHandler()
-            console_handler.setLevel(logging.INFO)
-            color_formatter = colorlog.ColoredFormatter(
-                "%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-                log_colors={
-                    "DEBUG": "cyan",
-                    "INFO": "green",
-                    "WARNING": "yellow",
-                    "ERROR": "red",
-                    "CRITICAL": "red,bg_white",
-                },
-                secondary_log_colors={},
-                style="%",
-            )
-            console_handler.setFormatter(color_formatter)
-            logger.addHandler(console_handler)
-
-            # 파일 핸들러 (색상 없음)
-            file_handler = logging.FileHandler("ssh_client.log")
-            file_handler.setLevel(logging.DEBUG)
-            file_formatter = logging.Formatter(
-                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            logger.setLevel(Config.LOG_LEVEL)
+            logger.addHandler(Logger._shared_handler())
+        return logger
+
+    @classmethod
+    def _shared_handler(cls):
+        with cls._lock:
+            if cls._queue_handler is None:
+                cls._queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        return cls._queue_handler
+
+    @classmethod
+    def _start_listener(cls, log_queue):
+        with cls._lock:
+            # shutdown 뒤에는 다시 시작하지 않음 (종료 중 기록은 버림)
+            if cls._started:
+                return
+            cls._started = True
+            cls._listener = logging.handlers.QueueListener(
+                log_queue,
+                cls._console_handler(),
+                cls._file_handler(),
+                respect_handler_level=True,
             )
-            file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
+            cls._listener.start()
+            atexit.register(cls.shutdown)
 
-        return logger
+    @classmethod
+    def shutdown(cls):
+        """Write out queued records and stop the writer thread."""
+        with cls._lock:
+            if cls._listener is not None:
+                cls._listener.stop()
+                cls._listener = None
+
+    @staticmethod
+    def _console_handler():
+        import colorlog
+
+        console_handler = colorlog.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        color_formatter = colorlog.ColoredFormatter(
+            "%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            log_colors={
+                "DEBUG": "cyan",
+                "INFO": "green",
+                "WARNING": "yellow",
+                "ERROR": "red",
+                "CRITICAL": "red,bg_white",
+            },
+            secondary_log_colors={},
+            style="%",
+        )
+        console_handler.setFormatter(color_formatter)
+        return console_handler
+
+    @staticmethod
+    def _file_handler():
+        # 파일 핸들러 (색상 없음), 첫 기록 때 파일을 엶
+        file_handler = logging.FileHandler(Config.LOG_FILE, delay=True)
+        file_handler.setLevel(logging.DEBUG)
+        file_formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
+        file_handler.setFormatter(file_formatter)
+        return file_handler
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that starts the shared writer on the first record."""
+
+    def emit(self, record):
+        if not Logger._started:
+            Logger._start_listener(self.queue)
+        super().emit(record)
+
+
+class PayloadDump:
+    """
+    Lazy ``%s`` argument for packet dumps.
+
+    Nothing is formatted unless the record is emitted, and then only the
+    first ``limit`` bytes, so multi-megabyte buffers cost the same as small
+    ones.
+    """
+
+    __slots__ = ("data", "length", "limit")
+
+    def __init__(self, data, length, limit):
+        self.data = data
+        self.length = length
+        self.limit = limit
+
+    def __str__(self):
+        dump = bytes(self.data[: min(self.length, self.limit)]).hex(" ")
+        if self.length > self.limit:
+            dump += f" ... ({self.length - self.limit} more bytes)"
+        return dump
+
+
+_payload_counter = itertools.count()
+
+
+def log_payload(logger, message, data, length=None):
+    """
+    Debug-log the first ``length`` bytes of ``data`` (all by default),
+    truncated to Config.LOG_PAYLOAD_BYTES, one call in
+    Config.LOG_PAYLOAD_SAMPLE. Costs one level check when DEBUG is off.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if next(_payload_counter) % Config.LOG_PAYLOAD_SAMPLE:
+        return
+    length = len(data) if length is None else length
+    logger.debug(
+        "%s (%d bytes): %s",
+        message,
+        length,
+        PayloadDump(data, length, Config.LOG_PAYLOAD_BYTES),
+    )
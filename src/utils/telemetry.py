@@ -0,0 +1,180 @@
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from opentelemetry import metrics, trace
+from opentelemetry.trace import Status, StatusCode
+
+# SDK 의 provider 가 설정되지 않으면 모두 no-op (기본값)
+tracer = trace.get_tracer("ssh_client")
+meter = metrics.get_meter("ssh_client")
+
+# 패킷 암호화/MAC 시간은 N 패킷에 한 번만 측정
+CRYPTO_SAMPLE_INTERVAL = 64
+
+handshake_duration = meter.create_histogram(
+    "ssh.client.handshake.duration",
+    unit="s",
+    description="Connection setup time per phase (tcp, version_exchange, key_exchange)",
+)
+crypto_duration = meter.create_histogram(
+    "ssh.client.packet.crypto.duration",
+    unit="s",
+    description="Encrypt+MAC (seal) or decrypt+verify (open) time of one packet, sampled",
+)
+
+
+class PacketStats:
+    """Per-connection packet and byte counts, read by the observable counters."""
+
+    __slots__ = ("packets_sent", "packets_received", "bytes_sent", "bytes_received")
+
+    def __init__(self):
+        self.packets_sent = 0
+        self.packets_received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class _TrafficRegistry:
+    """
+    Totals over live connections plus those already closed.
+
+    Counting happens as plain integer increments on each connection's
+    PacketStats; the exporter's collection callback does the summing, so the
+    packet path never calls into OpenTelemetry.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._live = set()
+        self._retired = PacketStats()
+
+    def track(self, owner):
+        stats = PacketStats()
+        with self._lock:
+            self._live.add(stats)
+        weakref.finalize(owner, self._retire, stats)
+        return stats
+
+    def _retire(self, stats):
+        with self._lock:
+            self._live.discard(stats)
+            for field in PacketStats.__slots__:
+                setattr(
+                    self._retired,
+                    field,
+                    getattr(self._retired, field) + getattr(stats, field),
+                )
+
+    def total(self, field):
+        with self._lock:
+            return getattr(self._retired, field) + sum(
+                getattr(stats, field) for stats in self._live
+            )
+
+
+traffic = _TrafficRegistry()
+_pools = weakref.WeakSet()
+
+
+def _observe(field_sent, field_received):
+    def callback(options):
+        yield metrics.Observation(traffic.total(field_sent), {"direction": "sent"})
+        yield metrics.Observation(
+            traffic.total(field_received), {"direction": "received"}
+        )
+
+    return callback
+
+
+meter.create_observable_counter(
+    "ssh.client.transport.bytes",
+    callbacks=[_observe("bytes_sent", "bytes_received")],
+    unit="By",
+    description="Bytes on the wire per direction (rate gives throughput)",
+)
+meter.create_observable_counter(
+    "ssh.client.transport.packets",
+    callbacks=[_observe("packets_sent", "packets_received")],
+    unit="{packet}",
+    description="SSH packets per direction",
+)
+
+
+def track_pool(pool):
+    _pools.add(pool)
+
+
+def _observe_pools(options):
+    totals = {"connections": 0, "idle": 0, "sessions": 0}
+    for pool in list(_pools):
+        for name, value in pool.stats().items():
+            totals[name] += value
+    in_use = totals["connections"] - totals["idle"]
+    yield metrics.Observation(in_use, {"state": "in_use"})
+    yield metrics.Observation(totals["idle"], {"state": "idle"})
+    yield metrics.Observation(totals["sessions"], {"state": "sessions"})
+
+
+meter.create_observable_gauge(
+    "ssh.client.pool.utilization",
+    callbacks=[_observe_pools],
+    unit="{connection}",
+    description="Pooled connections in use and idle, and sessions multiplexed on them",
+)
+
+
+def record_crypto(operation, cipher, seconds):
+    crypto_duration.record(
+        seconds, {"ssh.operation": operation, "ssh.cipher": cipher.name}
+    )
+
+
+@contextmanager
+def span(name, phase=None, **attributes):
+    """
+    A span around one step of the connection setup.
+
+    With ``phase`` the duration also goes to the handshake histogram.
+    Exceptions are recorded on the span and re-raised.
+    """
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        if phase is None:
+            yield current
+            return
+        started = time.perf_counter()
+        try:
+            yield current
+        finally:
+            handshake_duration.record(
+                time.perf_counter() - started, {"ssh.phase": phase}
+            )
+
+
+def describe_version_exchange(current, is_valid, result):
+    if is_valid:
+        current.set_attribute("ssh.server_version", result)
+    else:
+        current.set_status(Status(StatusCode.ERROR, result))
+
+
+def describe_key_exchange(current, kex):
+    """Attach the negotiated algorithms to a key exchange span."""
+    algorithms = kex.algorithms
+    current.set_attributes(
+        {
+            "ssh.kex": algorithms.kex,
+            "ssh.host_key": algorithms.host_key,
+            "ssh.cipher": algorithms.cipher_client_to_server,
+            "ssh.compression": algorithms.compression_client_to_server,
+            "ssh.strict_kex": kex.strict,
+        }
+    )
+
+
+def end_span(current, error=None):
+    if error is not None:
+        current.record_exception(error)
+        current.set_status(Status(StatusCode.ERROR, str(error)))
+    current.end()